@@ -12,7 +12,6 @@
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
-import yaml
 import collections
 
 """Default timeout value in seconds"""
@@ -54,6 +53,7 @@ class Config(object):
         self._store_content(content)
 
     def _store_content(self, content_list):
+        import yaml     # only needed here, and slow to import
         result = []
         for content in content_list:
             if content:
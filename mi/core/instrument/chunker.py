@@ -12,6 +12,7 @@ __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
 from mi.core.log import get_logger ; log = get_logger()
+from mi.logging import LevelGuard ; log_level = LevelGuard(__name__)
 
 from mi.core.exceptions import SampleException
 
@@ -100,8 +101,9 @@ class Chunker(object):
             
             if self.nondata_chunk_list == []:
                 self.nondata_chunk_list = result['non_data_chunk_list']
-                log.debug("Added chunk, data_chunk_list: %s, nondata_chunk_list: %s",
-                      self.data_chunk_list, self.nondata_chunk_list)
+                if log_level.debug:
+                    log.debug("Added chunk, data_chunk_list: %s, nondata_chunk_list: %s",
+                          self.data_chunk_list, self.nondata_chunk_list)
                 return
             for (s, e, t) in self.nondata_chunk_list:
                 if e >= first_new_s:
@@ -114,8 +116,9 @@ class Chunker(object):
             new_nondata_list.extend(result['non_data_chunk_list'])
             
             self.nondata_chunk_list = new_nondata_list
-            log.debug("Added chunk, data_chunk_list: %s, nondata_chunk_list: %s",
-                      self.data_chunk_list, self.nondata_chunk_list)
+            if log_level.debug:
+                log.debug("Added chunk, data_chunk_list: %s, nondata_chunk_list: %s",
+                          self.data_chunk_list, self.nondata_chunk_list)
          
     def _generate_data_lists(self, timestamp, start_index=0):
         """
@@ -131,7 +134,8 @@ class Chunker(object):
             that include the full data chunk lists for this block of data.
             Indices are respect to the buffer, not the chunk
         """
-        log.debug("Generating data lists with start index %s", start_index)
+        if log_level.debug:
+            log.debug("Generating data lists with start index %s", start_index)
         return_list = {'data_chunk_list':[], 'non_data_chunk_list':[]}
         result = self.sieve(self.buffer[start_index:])
         # assert no overlap!
@@ -162,7 +166,8 @@ class Chunker(object):
                 previous_end = e
 
         return_list['non_data_chunk_list'] = self.add_timestamps(return_list['non_data_chunk_list'])
-        log.debug("Generated return list: %s", return_list)
+        if log_level.debug:
+            log.debug("Generated return list: %s", return_list)
         return return_list    
     
     def add_timestamps(self, start_end_list):
@@ -196,7 +201,8 @@ class Chunker(object):
                     result_list.append((s, e, raw_t))
                     break
                     
-        log.trace("add_timestamp returning result_list: %s", result_list)
+        if log_level.trace:
+            log.trace("add_timestamp returning result_list: %s", result_list)
         return result_list
     
     @staticmethod
@@ -305,8 +311,9 @@ class Chunker(object):
         """
         new_nondata_list = []
 
-        log.debug("Cleaning data chunk, data_chunk_list: %s, nondata_chunk_list: %s",
-                  self.data_chunk_list, self.nondata_chunk_list)
+        if log_level.debug:
+            log.debug("Cleaning data chunk, data_chunk_list: %s, nondata_chunk_list: %s",
+                      self.data_chunk_list, self.nondata_chunk_list)
 
         for (s, e, t) in self.data_chunk_list:
             if (e <= index):
@@ -22,18 +22,19 @@ to create a logger automatically scoped with the calling package and ready to us
 
     from ooi.logging import log    # no longer need get_logger at all
 
+The methods of classes created with get_logging_metaclass log their arguments and return values,
+but only when the logging level allows it.  To leave the methods unwrapped altogether, set the environment
+variable MI_METHOD_LOGGING to off, or call set_method_logging(False) before the classes are created.
+
 """
-import inspect
 import logging
 import os
 import sys
-import yaml
-import pkg_resources
 from types import FunctionType
 from functools import wraps
 
 from mi.core.common import Singleton
-from mi.logging import config, log
+from mi.logging import config, log, LevelGuard
 
 LOGGING_CONFIG_ENVIRONMENT_VARIABLE="MI_LOGGING_CONFIG"
 
@@ -42,6 +43,11 @@ LOGGING_PRIMARY_FROM_EGG='mi-logging.yml'
 LOGGING_MI_OVERRIDE='res/config/mi-logging.local.yml'
 LOGGING_CONTAINER_OVERRIDE='res/config/logging.local.yml'
 
+METHOD_LOGGING_ENVIRONMENT_VARIABLE="MI_METHOD_LOGGING"
+
+# process-wide switch for the method logging wrappers of get_logging_metaclass
+_method_logging = [os.environ.get(METHOD_LOGGING_ENVIRONMENT_VARIABLE, 'on').lower() not in ('off', 'false', 'no', '0')]
+
 
 class LoggerManager(Singleton):
     """
@@ -62,8 +68,8 @@ class LoggerManager(Singleton):
             if debug:
                 print >> sys.stderr, str(os.getpid()) + ' configured logging from ' + LOGGING_PRIMARY_FROM_FILE
         else:
-            logconfig = pkg_resources.resource_string('mi', LOGGING_PRIMARY_FROM_EGG)
-            parsed = yaml.load(logconfig)
+            logconfig = _read_package_resource(LOGGING_PRIMARY_FROM_EGG)
+            parsed = config.parse_configuration(logconfig)
             config.replace_configuration(parsed)
             if debug:
                 print >> sys.stderr, str(os.getpid()) + ' configured logging from config/' + LOGGING_PRIMARY_FROM_FILE
@@ -78,9 +84,30 @@ class LoggerManager(Singleton):
                 print >> sys.stderr, str(os.getpid()) + ' supplemented logging from ' + LOGGING_CONTAINER_OVERRIDE
 
 
+def _read_package_resource(resource_name):
+    """ read a file packaged with mi, without importing pkg_resources when the package is a plain directory """
+    import mi
+    path = os.path.join(os.path.dirname(mi.__file__), resource_name)
+    if os.path.isfile(path):
+        with open(path, 'r') as infile:
+            return infile.read()
+    import pkg_resources
+    return pkg_resources.resource_string('mi', resource_name)
+
+
+def set_method_logging(enabled):
+    """
+    Switch the method logging of classes created with get_logging_metaclass.  Classes which
+    have already been created keep their methods as they are.
+    """
+    _method_logging[0] = enabled
+
+
 def get_logging_metaclass(log_level='trace'):
     class LoggingMetaClass(type):
         def __new__(mcs, class_name, bases, class_dict):
+            if not _method_logging[0]:
+                return type.__new__(mcs, class_name, bases, class_dict)
             wrapper = log_method(class_name=class_name, log_level=log_level)
             new_class_dict = {}
             for attributeName, attribute in class_dict.items():
@@ -93,15 +120,17 @@ def get_logging_metaclass(log_level='trace'):
 
 def log_method(class_name=None, log_level='trace'):
     name = "UNKNOWN_MODULE_NAME"
-    stack = inspect.stack()
+    frame = sys._getframe()
     # step through the stack until we leave mi.core.log
-    for frame in stack:
-        module = inspect.getmodule(frame[0])
-        if module:
-            name = module.__name__
+    while frame is not None:
+        module_name = frame.f_globals.get('__name__')
+        if module_name in sys.modules:
+            name = module_name
             if name != 'mi.core.log':
                 break
+        frame = frame.f_back
     logger = logging.getLogger(name)
+    log_level_enabled = LevelGuard(name)
 
     def wrapper(func):
         if class_name is not None:
@@ -111,6 +140,8 @@ def log_method(class_name=None, log_level='trace'):
 
         @wraps(func)
         def inner(*args, **kwargs):
+            if not getattr(log_level_enabled, log_level):
+                return func(*args, **kwargs)
             getattr(logger, log_level)('entered %s | args: %r | kwargs: %r', func_name, args, kwargs)
             r = func(*args, **kwargs)
             getattr(logger, log_level)('exiting %s | returning %r', func_name, r)
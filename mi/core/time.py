@@ -13,8 +13,9 @@ __author__ = 'Bill French'
 __license__ = 'Apache 2.0'
 
 import calendar
-from datetime import datetime
+from datetime import date, datetime
 import ntplib
+import numpy
 import time
 import re
 
@@ -25,6 +26,26 @@ DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z?$'
 DATE_MATCHER = re.compile(DATE_PATTERN)
 DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# ISO8601 date strings with at most microsecond resolution, converted without strptime
+ISO8601_FIELDS_PATTERN = r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?Z?\Z'
+ISO8601_FIELDS_MATCHER = re.compile(ISO8601_FIELDS_PATTERN)
+
+# The difference between the NTP and unix epochs in seconds
+NTP_UNIX_EPOCH_DELTA = ntplib.system_to_ntp_time(0)
+
+SECONDS_PER_DAY = 86400
+MICROSECONDS_PER_SECOND = 1000000.0
+
+# Cache of the unix time of midnight for each date seen, keyed by the year, month and day strings
+_utc_date_cache = {}
+MAX_UTC_DATE_CACHE_SIZE = 4096
+
+# Character codes used to validate timestamp strings in bulk
+_ZERO = ord('0')
+_NINE = ord('9')
+
+DAYS_IN_MONTH = numpy.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
 
 def string_to_ntp_date_time(datestr):
     """
@@ -40,6 +61,10 @@ def string_to_ntp_date_time(datestr):
     if not DATE_MATCHER.match(datestr):
         raise ValueError("date string not in ISO8601 format YYYY-MM-DDTHH:MM:SS.SSSSZ")
 
+    unix_timestamp = _iso8601_to_unix_time(datestr)
+    if unix_timestamp is not None:
+        return ntplib.system_to_ntp_time(unix_timestamp)
+
     try:
         # This assumes input date string are in UTC (=GMT)
 
@@ -79,3 +104,196 @@ def time_to_ntp_date_time(unix_time=None):
 
     timestamp = ntplib.system_to_ntp_time(unix_time)
     return float(timestamp)
+
+
+def utc_date_seconds(year, month, day):
+    """
+    Get the unix time of midnight at the start of a date.  Dates are
+    validated and converted once and then remembered, as a file of
+    timestamps usually covers only a few dates.
+    @param year the 4 digit year string
+    @param month the 2 digit month string
+    @param day the 2 digit day string
+    @retval seconds since jan 1 1970 to the start of the date
+    @throws ValueError if the date is not valid
+    """
+    key = (year, month, day)
+    seconds = _utc_date_cache.get(key)
+
+    if seconds is None:
+        date_value = date(int(year), int(month), int(day))
+        seconds = calendar.timegm(date_value.timetuple())
+
+        if len(_utc_date_cache) >= MAX_UTC_DATE_CACHE_SIZE:
+            _utc_date_cache.clear()
+        _utc_date_cache[key] = seconds
+
+    return seconds
+
+
+def _iso8601_to_unix_time(datestr):
+    """
+    Convert an ISO8601 formatted date string to unix time without strptime
+    @param datestr an ISO8601 formatted string containing date information
+    @retval unix time, or None if the string is not one this can convert
+    """
+    match = ISO8601_FIELDS_MATCHER.match(datestr)
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second, fraction = match.groups()
+    hour = int(hour)
+    minute = int(minute)
+    second = int(second)
+
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+
+    try:
+        unix_time = utc_date_seconds(year, month, day) + hour * 3600 + minute * 60 + second
+    except ValueError:
+        return None
+
+    microsecond = int(fraction.ljust(6, '0')) if fraction else 0
+    return unix_time + (microsecond / MICROSECONDS_PER_SECOND)
+
+
+def _digits_value(chars, start, stop):
+    """
+    Get the integer value of a column range of ascii digits
+    @param chars 2-D uint8 array with one timestamp string per row
+    @param start the first column
+    @param stop the column after the last one
+    @retval int64 array of the values
+    """
+    value = numpy.zeros(chars.shape[0], dtype=numpy.int64)
+    for column in xrange(start, stop):
+        value = value * 10 + (chars[:, column] - _ZERO)
+    return value
+
+
+def fixed_format_to_unix_time(timestamps, date_separator, date_time_separator, suffix='',
+                              min_fraction_digits=0, max_fraction_digits=6, max_second=59):
+    """
+    Convert an array of equal length timestamp strings laid out as
+    YYYY?MM?DD?HH:MM:SS[.fraction][suffix] to unix time in one pass.
+    The characters are checked and converted as a 2-D array of character
+    codes and the dates are found with numpy.datetime64 arithmetic.
+    @param timestamps sequence of timestamp strings
+    @param date_separator the character between the year, month and day
+    @param date_time_separator the character between the date and the time
+    @param suffix the characters ending each timestamp
+    @param min_fraction_digits the fewest digits of fractional seconds allowed
+    @param max_fraction_digits the most digits of fractional seconds allowed
+    @param max_second the largest allowed seconds value
+    @retval float64 array of unix times, or None if the timestamps are not
+    all the same length and valid for the layout.  Callers fall back to
+    converting one at a time, which reports any errors.
+    """
+    timestamps = numpy.asarray(timestamps, dtype=numpy.string_)
+
+    if timestamps.ndim != 1:
+        return None
+
+    num_timestamps = timestamps.shape[0]
+    if num_timestamps == 0:
+        return numpy.zeros(0, dtype=numpy.float64)
+
+    # every timestamp must be the same length, so that its fields are in fixed columns
+    length = timestamps.dtype.itemsize
+    if length == 0 or (numpy.char.str_len(timestamps) != length).any():
+        return None
+
+    # a fraction is a '.' and at least one digit, so a single fraction character is never valid
+    num_fraction_chars = length - 19 - len(suffix)
+    if num_fraction_chars < 0 or num_fraction_chars == 1:
+        return None
+    num_fraction_digits = max(num_fraction_chars - 1, 0)
+    if not min_fraction_digits <= num_fraction_digits <= max_fraction_digits:
+        return None
+
+    chars = timestamps.view(numpy.uint8).reshape(num_timestamps, length)
+
+    separators = ((4, date_separator), (7, date_separator), (10, date_time_separator), (13, ':'), (16, ':'))
+    if num_fraction_chars:
+        separators += ((19, '.'),)
+    for column, char in separators:
+        if (chars[:, column] != ord(char)).any():
+            return None
+
+    for column, char in enumerate(suffix, length - len(suffix)):
+        if (chars[:, column] != ord(char)).any():
+            return None
+
+    digit_columns = range(0, 4) + range(5, 7) + range(8, 10) + range(11, 13) + range(14, 16) + \
+        range(17, 19) + range(20, 20 + num_fraction_digits)
+    digits = chars[:, digit_columns]
+    if ((digits < _ZERO) | (digits > _NINE)).any():
+        return None
+
+    years = _digits_value(chars, 0, 4)
+    months = _digits_value(chars, 5, 7)
+    days = _digits_value(chars, 8, 10)
+    hours = _digits_value(chars, 11, 13)
+    minutes = _digits_value(chars, 14, 16)
+    seconds = _digits_value(chars, 17, 19)
+
+    leap_years = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    if (years < 1).any() or (months < 1).any() or (months > 12).any() or (days < 1).any():
+        return None
+    if (days > DAYS_IN_MONTH[months] + (leap_years & (months == 2))).any():
+        return None
+    if (hours > 23).any() or (minutes > 59).any() or (seconds > max_second).any():
+        return None
+
+    dates = (years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (months - 1)
+    dates = dates.astype('datetime64[D]') + (days - 1)
+    whole_seconds = dates.astype(numpy.int64) * SECONDS_PER_DAY + hours * 3600 + minutes * 60 + seconds
+
+    if num_fraction_digits:
+        fraction = _digits_value(chars, 20, 20 + num_fraction_digits) / float(10 ** num_fraction_digits)
+    else:
+        fraction = numpy.zeros(num_timestamps)
+
+    return whole_seconds + fraction
+
+
+def unix_time_array_to_ntp_date_time(unix_times):
+    """
+    Convert unix (POSIX) times to NTP timestamps
+    @param unix_times array of seconds since jan 1 1970
+    @retval float64 array of ntp timestamps
+    """
+    return numpy.asarray(unix_times, dtype=numpy.float64) + NTP_UNIX_EPOCH_DELTA
+
+
+def datetime64_to_ntp_date_time(datetimes):
+    """
+    Convert numpy.datetime64 values to NTP timestamps
+    @param datetimes array of numpy.datetime64 values, of any resolution
+    @retval float64 array of ntp timestamps
+    """
+    datetimes = numpy.asarray(datetimes, dtype='datetime64[us]')
+    whole_seconds = datetimes.astype('datetime64[s]')
+    microseconds = (datetimes - whole_seconds).astype(numpy.int64)
+
+    return (whole_seconds.astype(numpy.int64) + microseconds / MICROSECONDS_PER_SECOND) + NTP_UNIX_EPOCH_DELTA
+
+
+def string_array_to_ntp_date_time(datestrs):
+    """
+    Extract ntp dates from ISO8601 formatted date strings all at once
+    @param datestrs sequence of ISO8601 formatted strings containing date information
+    @retval float64 array of ntp dates (seconds since jan 1 1900)
+    @throws ValueError if a date string cannot be formatted to a date.
+    """
+    unix_times = None
+    for suffix in ('Z', ''):
+        unix_times = fixed_format_to_unix_time(datestrs, '-', 'T', suffix)
+        if unix_times is not None:
+            break
+
+    if unix_times is None:
+        return numpy.array([string_to_ntp_date_time(datestr) for datestr in datestrs], dtype=numpy.float64)
+
+    return unix_times + NTP_UNIX_EPOCH_DELTA
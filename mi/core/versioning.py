@@ -1,5 +1,10 @@
+import threading
 from functools import wraps
 
+# the (module, version number) of the versioned functions running in each thread, innermost last
+_running = threading.local()
+
+
 def version(version_number):
     """Wrapper to add version name to parser.
     Placing the version number on the parse function seems to make
@@ -8,8 +13,23 @@ def version(version_number):
     def put_version(to_wrap):
         @wraps(to_wrap)
         def inner(*args, **kwargs):
-            return to_wrap(*args, **kwargs)
+            stack = _running.__dict__.setdefault('stack', [])
+            stack.append((to_wrap.__module__, version_number))
+            try:
+                return to_wrap(*args, **kwargs)
+            finally:
+                stack.pop()
         inner.version = version_number
         return inner
     return put_version
 
+
+def running_version():
+    """
+    Get the innermost versioned function running in this thread, such as a driver parse function
+    :return: tuple of the module of the function and its version number, or None
+    """
+    stack = getattr(_running, 'stack', None)
+    if stack:
+        return stack[-1]
+    return None
@@ -1,21 +1,34 @@
 import os
 
-from mi.logging import config
+from mi.logging import config, LevelGuard
 from mi.core.log import get_logger
 from mi.core.exceptions import NotImplementedException
+from mi.core.instrument.data_particle import DataParticle
+from mi.core.versioning import running_version
+from mi.dataset.dataset_parser import CheckpointLineReader
+from mi.dataset import parse_cache
 
 
 __author__ = 'wordenm'
 log = get_logger()
+log_level = LevelGuard(__name__)
 
 
 class ParticleDataHandler(object):
-    def __init__(self):
+    def __init__(self, parse_options=None, resume=False, checkpoint=None):
         self._samples = {}
         self._failure = False
+        # the ParseOptions limiting the particles wanted, applied to the parser by the driver
+        self.parse_options = parse_options
+        # when resume is set, parsers which can be resumed parse the file from the checkpoint
+        # of an earlier parse, or from the start if it is None, and the driver replaces the
+        # checkpoint with the one to resume the next parse of the file from
+        self.resume = resume
+        self.checkpoint = checkpoint
 
     def addParticleSample(self, sample_type, sample):
-        log.debug("Sample type: %s, Sample data: %s", sample_type, sample)
+        if log_level.debug:
+            log.debug("Sample type: %s, Sample data: %s", sample_type, sample)
         self._samples.setdefault(sample_type, []).append(sample)
 
     def setParticleDataCaptureFailure(self):
@@ -36,11 +49,94 @@ class DataSetDriver(object):
         self._parser = parser
         self._particle_data_handler = particle_data_handler
 
+        # a handler may only want some of the particles
+        parse_options = getattr(particle_data_handler, 'parse_options', None)
+        if parse_options is not None:
+            parser.parse_options = parse_options
+
+        # a handler may also parse a growing file in parts, each resumed where the last one ended
+        self._resumed = getattr(particle_data_handler, 'resume', False) and \
+            getattr(parser, 'checkpoint_supported', False)
+        if self._resumed:
+            parser.resume(getattr(particle_data_handler, 'checkpoint', None))
+
     def processFileStream(self):
         """
         Method to extract records from a parser's get_records method
-        and pass them to the Java particle_data_handler passed in from uFrame
+        and pass them to the Java particle_data_handler passed in from uFrame.
+        The particles are replayed from the parse cache, when there is one,
+        if the file has been parsed before by the same driver version.
+        """
+        self._process_file_stream()
+
+        if self._resumed:
+            self._particle_data_handler.checkpoint = self._parser.get_checkpoint()
+
+    def _process_file_stream(self):
+        cache = parse_cache.get_parse_cache()
+        key = None
+        if cache is not None:
+            key = self._parse_cache_key()
+
+        if key is None:
+            self._process_records()
+            return
+
+        entry = cache.get(key)
+        if entry is not None:
+            log.debug("Replaying particles from parse cache entry %s", key)
+            parse_cache.replay(entry, self._particle_data_handler)
+            return
+
+        # most exception callbacks close over the handler the driver was given rather than
+        # going through the recorder, so the failure is read from that handler after parsing.
+        # A handler which has already failed, or does not show whether it has, is not cached.
+        particle_data_handler = self._particle_data_handler
+        if parse_cache.handler_failure(particle_data_handler) is not False:
+            self._process_records()
+            return
+
+        recorder = parse_cache.RecordingParticleDataHandler(particle_data_handler)
+        self._particle_data_handler = recorder
+        try:
+            self._process_records()
+        finally:
+            self._particle_data_handler = particle_data_handler
+
+        if parse_cache.handler_failure(particle_data_handler):
+            recorder.failure = True
+        cache.put(key, recorder.entry())
+
+    def _parse_cache_key(self):
+        """
+        Build the parse cache key of the file being parsed by a versioned driver parse function
+        :return: The key, or None if the particles can not be cached
         """
+        running = running_version()
+        stream_handle = getattr(self._parser, '_stream_handle', None)
+        if running is None or stream_handle is None or isinstance(stream_handle, CheckpointLineReader) or \
+                getattr(self._parser, 'parse_options', None) is not None:
+            # not all the particles of a whole file parsed by a driver
+            return None
+
+        try:
+            content_digest = parse_cache.file_digest(stream_handle)
+        except (AttributeError, IOError) as e:
+            log.debug("Not caching particles of an unhashable stream: %s", e)
+            return None
+
+        driver_module, driver_version = running
+        generate = DataParticle.generate
+        serializer = '%s.%s' % (generate.__module__, generate.__name__)
+        try:
+            return parse_cache.cache_key(content_digest, getattr(stream_handle, 'name', None), driver_module,
+                                         driver_version, type(self._parser),
+                                         getattr(self._parser, '_config', None), serializer)
+        except (TypeError, ValueError) as e:
+            log.debug("Not caching particles of a parser with an unserializable configuration: %s", e)
+            return None
+
+    def _process_records(self):
         while True:
             try:
                 records = self._parser.get_records(1)
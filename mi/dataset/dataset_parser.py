@@ -11,17 +11,24 @@ out of files and feed them into the system.
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import hashlib
 import time
 import ntplib
 
 from mi.core.log import get_logger
+from mi.logging import LevelGuard
 log = get_logger()
+log_level = LevelGuard(__name__)
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.data_particle import DataParticleKey
 from mi.core.exceptions import RecoverableSampleException, SampleEncodingException
-from mi.core.exceptions import NotImplementedException, UnexpectedDataException
+from mi.core.exceptions import NotImplementedException, UnexpectedDataException, DatasetParserException
 from mi.core.common import BaseEnum
 
+# the number of bytes at the start of a file, and before a checkpoint, which
+# are compared to check that a file has only been appended to since the checkpoint
+CHECKPOINT_FINGERPRINT_BYTES = 256
+
 
 class DataSetDriverConfigKeys(BaseEnum):
     PARTICLE_MODULE = "particle_module"
@@ -40,11 +47,146 @@ class DataSetDriverConfigKeys(BaseEnum):
     CLASS_ARGS = "class_args"
 
 
+class CheckpointKey(BaseEnum):
+    OFFSET = "offset"
+    FINGERPRINT = "fingerprint"
+    STATE = "state"
+
+
+def checkpoint_fingerprint(stream_handle, offset):
+    """
+    Fingerprint the start of a file and the bytes before an offset in it
+    @param stream_handle: The stream handle of the file
+    @param offset: The offset in the file
+    @return The hex digest of the bytes, which differs once the file is truncated or replaced
+    """
+    digest = hashlib.md5()
+    stream_handle.seek(0)
+    digest.update(stream_handle.read(min(offset, CHECKPOINT_FINGERPRINT_BYTES)))
+    start = max(offset - CHECKPOINT_FINGERPRINT_BYTES, 0)
+    stream_handle.seek(start)
+    digest.update(stream_handle.read(offset - start))
+    return digest.hexdigest()
+
+
+class CheckpointLineReader(object):
+    """
+    Reads the complete lines of a file from an offset, keeping the offset after the
+    last line read.  A last line without a newline, which may still be being written,
+    is not read.  Other attributes are those of the wrapped stream handle.
+    """
+
+    def __init__(self, stream_handle, offset=0):
+        self._stream_handle = stream_handle
+        self.offset = offset
+        stream_handle.seek(offset)
+
+    def readline(self):
+        line = self._stream_handle.readline()
+        if not line.endswith('\n'):
+            # the end of the file, go back before any partial line so it is read once complete
+            self._stream_handle.seek(self.offset)
+            return ''
+
+        # the position in the file, rather than the length of the line, which is shorter
+        # than the line in the file when it is read with universal newlines
+        self.offset = self._stream_handle.tell()
+        return line
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+    def __getattr__(self, name):
+        return getattr(self._stream_handle, name)
+
+
+class ParseOptions(object):
+    """
+    Limits on the particles a parser produces: a window of internal timestamps
+    and a set of particle streams.  Particles outside of them are left out
+    before their values are encoded.
+    """
+
+    def __init__(self, start_time=None, end_time=None, streams=None, use_time_index=False):
+        """
+        @param start_time The earliest internal timestamp to produce, in NTP seconds, or None
+        @param end_time The latest internal timestamp to produce, in NTP seconds, or None
+        @param streams The names of the particle streams to produce, or None for all of them
+        @param use_time_index If True, parsers with a current time index of the file
+           start reading at the last indexed record before the start time
+        """
+        self.start_time = start_time
+        self.end_time = end_time
+        self.streams = None if streams is None else frozenset(streams)
+        self.use_time_index = use_time_index
+
+    def has_time_window(self):
+        return self.start_time is not None or self.end_time is not None
+
+    def includes_time(self, timestamp):
+        """
+        @param timestamp An NTP timestamp, or None if it is not known
+        @retval True if the timestamp is in the window, or not known
+        """
+        if timestamp is None:
+            return True
+        if self.start_time is not None and timestamp < self.start_time:
+            return False
+        return self.end_time is None or timestamp <= self.end_time
+
+    def includes_stream(self, particle_class):
+        """
+        @param particle_class A data particle class
+        @retval True if the stream of the particles of the class is produced
+        """
+        stream = getattr(particle_class, '_data_particle_type', None)
+        return self.streams is None or stream is None or stream in self.streams
+
+    def includes(self, particle):
+        """
+        @param particle A data particle, or None
+        @retval True if the particle is produced
+        """
+        if particle is None:
+            return False
+        if self.streams is not None and particle.data_particle_type() not in self.streams:
+            return False
+        return self.includes_time(particle.contents.get(DataParticleKey.INTERNAL_TIMESTAMP))
+
+    def record_window(self, count, record_time):
+        """
+        Find the records in the time window out of a sequence of records in time order
+        @param count The number of records
+        @param record_time Function of a record index returning the NTP timestamp of the record
+        @retval tuple of the index of the first record in the window, and the index after the last
+        """
+        first = 0
+        if self.start_time is not None:
+            first = self._first_record(first, count, lambda index: record_time(index) >= self.start_time)
+
+        end = count
+        if self.end_time is not None:
+            end = self._first_record(first, count, lambda index: record_time(index) > self.end_time)
+
+        return first, end
+
+    @staticmethod
+    def _first_record(low, high, is_after):
+        # binary search for the first record index from low to high for which is_after is true
+        while low < high:
+            middle = (low + high) // 2
+            if is_after(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+
 class Parser(object):
     """ abstract class to show API needed for plugin poller objects """
 
     def __init__(self, config, stream_handle, state, sieve_fn,
-                 state_callback, publish_callback, exception_callback=None):
+                 state_callback, publish_callback, exception_callback=None, parse_options=None):
         """
         @param config The configuration parameters to feed into the parser
         @param stream_handle An already open file-like filehandle
@@ -61,8 +203,10 @@ class Parser(object):
         @param exception_callback The callback from the agent driver (and
            ultimately from the agent) where we send our error events to
            be published into ION
+        @param parse_options The ParseOptions limiting the particles produced, or None
         """
         self._chunker = StringChunker(sieve_fn)
+        self.parse_options = parse_options
         self._stream_handle = stream_handle
         self._state = state
         self._state_callback = state_callback
@@ -121,12 +265,15 @@ class Parser(object):
                 particle = particle_class(raw_data, internal_timestamp=timestamp,
                                           preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP)
 
-                # need to actually parse the particle fields to find out of there are errors
-                particle.generate_dict()
-                encoding_errors = particle.get_encoding_errors()
-                if encoding_errors:
-                    log.warn("Failed to encode: %s", encoding_errors)
-                    raise SampleEncodingException("Failed to encode: %s" % encoding_errors)
+                # particles left out by the parse options are not encoded, and are
+                # dropped when the records are returned
+                if self.parse_options is None or self.parse_options.includes(particle):
+                    # need to actually parse the particle fields to find out of there are errors
+                    particle.generate_dict()
+                    encoding_errors = particle.get_encoding_errors()
+                    if encoding_errors:
+                        log.warn("Failed to encode: %s", encoding_errors)
+                        raise SampleEncodingException("Failed to encode: %s" % encoding_errors)
 
         except (RecoverableSampleException, SampleEncodingException) as e:
             log.error("Sample exception detected: %s raw data: %s", e, raw_data)
@@ -147,7 +294,7 @@ class BufferLoadingParser(Parser):
     """
 
     def __init__(self, config, stream_handle, state, sieve_fn,
-                 state_callback, publish_callback, exception_callback=None):
+                 state_callback, publish_callback, exception_callback=None, parse_options=None):
         """
         @param config The configuration parameters to feed into the parser
         @param stream_handle An already open file-like filehandle
@@ -164,6 +311,7 @@ class BufferLoadingParser(Parser):
         @param exception_callback The callback from the agent driver (and
            ultimately from the agent) where we send our error events to
            be published into ION
+        @param parse_options The ParseOptions limiting the particles produced, or None
         """
         self._record_buffer = []
         self._timestamp = 0.0
@@ -172,7 +320,8 @@ class BufferLoadingParser(Parser):
         super(BufferLoadingParser, self).__init__(config, stream_handle, state,
                                                   sieve_fn, state_callback,
                                                   publish_callback,
-                                                  exception_callback)
+                                                  exception_callback,
+                                                  parse_options)
 
     def get_records(self, num_records):
         """
@@ -228,7 +377,8 @@ class BufferLoadingParser(Parser):
             self._state = records_to_return[-1][1]  # state side of tuple of last entry
             # strip the state info off of them now that we have what we need
             for item in records_to_return:
-                log.debug("Record to return: %s", item)
+                if log_level.debug:
+                    log.debug("Record to return: %s", item)
                 return_list.append(item[0])
             self._publish_sample(return_list)
             log.trace("Sending parser state [%s] to driver", self._state)
@@ -247,6 +397,8 @@ class BufferLoadingParser(Parser):
         """
         while self.get_block():
             result = self.parse_chunks()
+            if self.parse_options is not None:
+                result = [record for record in result if self.parse_options.includes(record[0])]
             self._record_buffer.extend(result)
 
     def get_block(self, size=1024):
@@ -279,13 +431,18 @@ class BufferLoadingParser(Parser):
 
 class SimpleParser(Parser):
 
-    def __init__(self, config, stream_handle, exception_callback):
+    # True for parsers which read their file a line at a time, by iterating over the
+    # stream handle or calling its readline, and so can be resumed from a checkpoint
+    checkpoint_supported = False
+
+    def __init__(self, config, stream_handle, exception_callback, parse_options=None):
         """
         Initialize the simple parser, which does not use state or the chunker
         and sieve functions.
         @param config: The parser configuration dictionary
         @param stream_handle: The stream handle of the file to parse
         @param exception_callback: The callback to use when an exception occurs
+        @param parse_options: The ParseOptions limiting the particles produced, or None
         """
 
         # the record buffer which will store all parsed particles
@@ -299,7 +456,8 @@ class SimpleParser(Parser):
                                            None,  # sieve_fn not used
                                            None,  # state_callback not used
                                            None,  # publish_callback not used
-                                           exception_callback)
+                                           exception_callback,
+                                           parse_options)
 
     def parse_file(self):
         """
@@ -323,6 +481,92 @@ class SimpleParser(Parser):
                 self._file_parsed = True
 
         while len(particles_to_return) < number_requested and len(self._record_buffer) > 0:
-            particles_to_return.append(self._record_buffer.pop(0))
+            particle = self._record_buffer.pop(0)
+            if self.parse_options is None or self.parse_options.includes(particle):
+                particles_to_return.append(particle)
 
         return particles_to_return
+
+    def resume(self, checkpoint=None):
+        """
+        Parse the file from a checkpoint returned by get_checkpoint after an earlier parse,
+        so only the lines appended since then are parsed.  Only complete lines are parsed,
+        a last line still being written is left for the next parse.  The file is parsed from
+        the start if it has been truncated or replaced since the checkpoint.
+        Must be called before the first get_records.
+        @param checkpoint: The checkpoint, or None to parse the file from the start
+        @throws NotImplementedException if the parser can not be resumed
+        """
+        if not self.checkpoint_supported:
+            raise NotImplementedException("%s can not be resumed from a checkpoint" % self.__class__.__name__)
+
+        offset = 0
+        if checkpoint is not None:
+            offset = checkpoint[CheckpointKey.OFFSET]
+            if checkpoint_fingerprint(self._stream_handle, offset) == checkpoint[CheckpointKey.FINGERPRINT]:
+                self._set_checkpoint_state(checkpoint[CheckpointKey.STATE])
+            else:
+                log.warn("File changed before the checkpoint at offset %d, parsing it from the start", offset)
+                offset = 0
+
+        self._stream_handle = CheckpointLineReader(self._stream_handle, offset)
+
+    def get_checkpoint(self):
+        """
+        Get the checkpoint to resume the next parse of the file from, once it has been parsed
+        @return dict of the offset after the last complete line, the fingerprint of the file
+                up to it and the parser state carried over to the next line
+        @throws DatasetParserException if resume was not called
+        """
+        if not isinstance(self._stream_handle, CheckpointLineReader):
+            raise DatasetParserException("resume() must be called before get_checkpoint()")
+
+        offset = self._stream_handle.offset
+        fingerprint = checkpoint_fingerprint(self._stream_handle, offset)
+        self._stream_handle.seek(offset)
+
+        return {CheckpointKey.OFFSET: offset,
+                CheckpointKey.FINGERPRINT: fingerprint,
+                CheckpointKey.STATE: self._get_checkpoint_state()}
+
+    def _get_checkpoint_state(self):
+        """
+        Override to get the state carried from one line to the next, such as a partly read
+        multi-line record.  The state must be JSON serializable.
+        @return The state, None by default
+        """
+        return None
+
+    def _set_checkpoint_state(self, state):
+        """
+        Override to restore the state returned by _get_checkpoint_state
+        @param state: The state
+        """
+        pass
+
+    def _time_index_seek(self, file_format):
+        """
+        Look up where to start reading for the start time of the parse options, in the
+        time index of the file
+        @param file_format: The time index format name of the file
+        @return tuple of the first TimeIndexEntry of the file and the one to start reading
+                at, or None to read the file from its start
+        """
+        options = self.parse_options
+        file_path = getattr(self._stream_handle, 'name', None)
+        if options is None or not options.use_time_index or options.start_time is None or \
+                not isinstance(file_path, basestring):
+            return None
+
+        from mi.dataset import time_index  # uses numpy, so only imported when an index is wanted
+
+        index = time_index.load_index(file_path, file_format)
+        if index is None:
+            return None
+
+        position = index.seek_position(options.start_time)
+        if position == 0:
+            return None
+
+        log.debug("Starting at offset %d of %s from its time index", index.entry(position).offset, file_path)
+        return index.entry(0), index.entry(position)
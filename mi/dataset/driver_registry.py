@@ -0,0 +1,620 @@
+"""
+@package mi.dataset.driver_registry
+@file mi/dataset/driver_registry.py
+@brief A registry of the dataset drivers, read from a manifest built ahead of time
+
+Each dataset driver is a module with a parse function, and finding out what
+the drivers are by importing them all takes seconds.  The manifest lists every
+driver module with the @version of its parse function, the parser classes it
+builds and their base classes, the streams of the particles those parsers produce and glob patterns
+for the files it is given.  It is built by reading the source of the drivers
+and parsers, without importing them, and is stored next to the drivers:
+
+    python utils/build_driver_manifest.py
+
+A DriverRegistry reads the manifest and imports a driver only when it is used.
+"""
+
+import ast
+import fnmatch
+import importlib
+import json
+import os
+
+from mi.core.log import get_logger
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+# the directory holding the mi package
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DRIVER_PACKAGE = 'mi.dataset.driver'
+PARSER_PACKAGE = 'mi.dataset.parser'
+
+MANIFEST_PATH = os.path.join(SOURCE_ROOT, 'mi', 'dataset', 'driver', 'driver_manifest.json')
+
+MANIFEST_VERSION = 1
+
+# files in the driver resource directories which are not sample data files
+NON_DATA_EXTENSIONS = ('.py', '.pyc', '.yml', '.yaml', '.json', '.zip')
+
+# the attribute of a particle class naming its stream
+PARTICLE_TYPE_ATTRIBUTE = '_data_particle_type'
+
+
+class DriverEntry(object):
+    """
+    The manifest entry of one driver
+    """
+
+    def __init__(self, module, version=None, parsers=(), particle_streams=(), file_patterns=(), parser_bases=()):
+        """
+        :param module: The dotted name of the driver module
+        :param version: The @version of the parse function, or None
+        :param parsers: list of the dotted names of the parser classes the driver builds
+        :param parser_bases: list of the dotted names of the base classes of those parsers
+        :param particle_streams: list of the streams of the particles it produces
+        :param file_patterns: list of glob patterns of the file names it is given
+        """
+        self.module = module
+        self.version = version
+        self.parsers = list(parsers)
+        self.parser_bases = list(parser_bases)
+        self.particle_streams = list(particle_streams)
+        self.file_patterns = list(file_patterns)
+
+    def __repr__(self):
+        return 'DriverEntry(%r, version=%r)' % (self.module, self.version)
+
+    def matches_file(self, file_path):
+        """
+        Check whether the name of a file matches one of the file patterns
+        :param file_path: The file path or name
+        :return: True if the file name matches
+        """
+        file_name = os.path.basename(file_path)
+        return any(fnmatch.fnmatchcase(file_name, pattern) for pattern in self.file_patterns)
+
+    def load(self):
+        """
+        Import the driver module
+        :return: The module
+        """
+        return importlib.import_module(self.module)
+
+    def to_dict(self):
+        return {
+            'module': self.module,
+            'version': self.version,
+            'parsers': self.parsers,
+            'parser_bases': self.parser_bases,
+            'particle_streams': self.particle_streams,
+            'file_patterns': self.file_patterns
+        }
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values['module'], values.get('version'), values.get('parsers', ()),
+                   values.get('particle_streams', ()), values.get('file_patterns', ()),
+                   values.get('parser_bases', ()))
+
+
+class DriverRegistry(object):
+    """
+    The drivers listed in a manifest.  The manifest is read when the registry
+    is first used, and each driver module is imported when it is loaded.
+    """
+
+    def __init__(self, manifest_path=MANIFEST_PATH):
+        """
+        :param manifest_path: The path of the manifest file
+        """
+        self.manifest_path = manifest_path
+        self._entries = None
+        self._modules = {}
+
+    def _read(self):
+        if self._entries is None:
+            with open(self.manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+
+            if manifest.get('manifest_version') != MANIFEST_VERSION:
+                raise ValueError('Unsupported driver manifest version %r in %s' %
+                                 (manifest.get('manifest_version'), self.manifest_path))
+
+            entries = [DriverEntry.from_dict(values) for values in manifest['drivers']]
+            self._entries = dict((entry.module, entry) for entry in entries)
+
+        return self._entries
+
+    def __len__(self):
+        return len(self._read())
+
+    def __contains__(self, module):
+        return module in self._read()
+
+    def entries(self):
+        """
+        :return: list of the DriverEntry of every driver, ordered by module
+        """
+        entries = self._read()
+        return [entries[module] for module in sorted(entries)]
+
+    def get(self, module):
+        """
+        Get the entry of a driver
+        :param module: The dotted name of the driver module
+        :return: The DriverEntry
+        :raises KeyError: if the driver is not in the manifest
+        """
+        return self._read()[module]
+
+    def resolve(self, name):
+        """
+        Find a driver from its dotted module name, the path of its file or the
+        last part of its module name
+        :param name: The driver name
+        :return: The DriverEntry, or None if no driver, or more than one, has the name
+        """
+        entries = self._read()
+        module = name
+        if module.endswith('.py'):
+            module = module[:-3].replace('\\', '/').replace('/', '.')
+            # the path may be relative to any directory above the mi package
+            if ('.' + DRIVER_PACKAGE + '.') in module:
+                module = module[module.rindex('.' + DRIVER_PACKAGE + '.') + 1:]
+
+        if module in entries:
+            return entries[module]
+
+        matches = [entry for entry in entries.itervalues() if entry.module.rsplit('.', 1)[-1] == module]
+        if len(matches) == 1:
+            return matches[0]
+
+        return None
+
+    def find(self, version=None, parser=None, stream=None, file_path=None):
+        """
+        Find the drivers matching all of the given criteria
+        :param version: The @version of the parse function
+        :param parser: The dotted or plain name of a parser class the driver builds
+        :param stream: The stream of a particle the driver produces
+        :param file_path: A file path whose name matches one of the driver's file patterns
+        :return: list of the matching DriverEntry, ordered by module
+        """
+        found = []
+        for entry in self.entries():
+            if version is not None and entry.version != version:
+                continue
+            if parser is not None and not any(name == parser or name.rsplit('.', 1)[-1] == parser
+                                              for name in entry.parsers):
+                continue
+            if stream is not None and stream not in entry.particle_streams:
+                continue
+            if file_path is not None and not entry.matches_file(file_path):
+                continue
+            found.append(entry)
+
+        return found
+
+    def load(self, module):
+        """
+        Import a driver
+        :param module: The dotted name of the driver module
+        :return: The driver module, which has the parse function
+        :raises KeyError: if the driver is not in the manifest
+        """
+        if module not in self._modules:
+            self._modules[module] = self.get(module).load()
+
+        return self._modules[module]
+
+    def parse_function(self, module):
+        """
+        :param module: The dotted name of the driver module
+        :return: The parse function of the driver
+        """
+        return self.load(module).parse
+
+
+_registry = None
+
+
+def get_registry():
+    """
+    :return: The DriverRegistry of the installed manifest
+    """
+    global _registry
+    if _registry is None:
+        _registry = DriverRegistry()
+
+    return _registry
+
+
+class _ModuleSource(object):
+    """
+    The classes, constants and imports at the top level of a module, read from its source
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.classes = {}
+        self.constants = {}
+        self.assignments = {}
+        self.imports = {}
+        self.module_imports = {}
+
+        with open(path) as source_file:
+            self.tree = ast.parse(source_file.read(), path)
+
+        for node in self.tree.body:
+            if isinstance(node, ast.ClassDef):
+                self.classes[node.name] = node
+
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        self.assignments[target.id] = node.value
+                        if isinstance(node.value, ast.Str):
+                            self.constants[target.id] = node.value.s
+
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    local_name = alias.asname or alias.name
+                    self.imports[local_name] = (node.module, alias.name)
+                    # 'from mi.dataset.parser import x' may import a module
+                    self.module_imports[local_name] = '%s.%s' % (node.module, alias.name)
+
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    self.module_imports[alias.asname or alias.name] = alias.name
+
+
+class _SourceReader(object):
+    """
+    Reads the drivers and the parser modules they use, following names from
+    module to module without importing anything
+    """
+
+    def __init__(self, source_root=SOURCE_ROOT):
+        self.source_root = source_root
+        self._modules = {}
+
+    def module(self, name):
+        """
+        :param name: The dotted module name
+        :return: The _ModuleSource, or None if the module is not in the source tree
+        """
+        if name not in self._modules:
+            base_path = os.path.join(self.source_root, *name.split('.'))
+            module_source = None
+            for path in (base_path + '.py', os.path.join(base_path, '__init__.py')):
+                if os.path.isfile(path):
+                    try:
+                        module_source = _ModuleSource(name, path)
+                    except SyntaxError as e:
+                        log.warn('Unable to read %s: %s', path, e)
+                    break
+            self._modules[name] = module_source
+
+        return self._modules[name]
+
+    def resolve_class(self, module_name, class_name, depth=0):
+        """
+        Find the definition of a class, following imports
+        :return: (module source, class node) or None
+        """
+        module_source = self.module(module_name)
+        if module_source is None or depth > 10:
+            return None
+
+        if class_name in module_source.classes:
+            return module_source, module_source.classes[class_name]
+
+        if class_name in module_source.imports:
+            imported_module, imported_name = module_source.imports[class_name]
+            return self.resolve_class(imported_module, imported_name, depth + 1)
+
+        return None
+
+    def resolve_expression(self, module_source, node):
+        """
+        Find the class an expression names, such as 'Parser' or 'parser_module.Parser'
+        :return: (module source, class node) or None
+        """
+        if isinstance(node, ast.Name):
+            return self.resolve_class(module_source.name, node.id)
+
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and \
+                node.value.id in module_source.module_imports:
+            return self.resolve_class(module_source.module_imports[node.value.id], node.attr)
+
+        return None
+
+    def string_value(self, module_source, node):
+        """
+        Find the string an expression evaluates to, such as 'stream',
+        STREAM or DataParticleType.STREAM
+        :return: The string, or None
+        """
+        if isinstance(node, ast.Str):
+            return node.s
+
+        if isinstance(node, ast.Name):
+            if node.id in module_source.constants:
+                return module_source.constants[node.id]
+            if node.id in module_source.imports:
+                imported_module, imported_name = module_source.imports[node.id]
+                imported_source = self.module(imported_module)
+                if imported_source is not None:
+                    return imported_source.constants.get(imported_name)
+            return None
+
+        if isinstance(node, ast.Attribute):
+            resolved = self.resolve_expression(module_source, node.value)
+            if resolved is not None:
+                return self.class_attribute(resolved[0], resolved[1], node.attr)
+
+        return None
+
+    def bases(self, module_source, class_node):
+        """
+        :return: list of the (module source, class node) of the base classes found in the source tree
+        """
+        bases = []
+        for base in class_node.bases:
+            resolved = self.resolve_expression(module_source, base)
+            if resolved is not None:
+                bases.append(resolved)
+        return bases
+
+    def class_attribute(self, module_source, class_node, attribute, depth=0):
+        """
+        Find the string value of a class attribute, looking through the base classes
+        :return: The string, or None
+        """
+        if depth > 10:
+            return None
+
+        for node in class_node.body:
+            if isinstance(node, ast.Assign) and \
+                    any(isinstance(target, ast.Name) and target.id == attribute for target in node.targets):
+                return self.string_value(module_source, node.value)
+
+        for base_source, base_node in self.bases(module_source, class_node):
+            value = self.class_attribute(base_source, base_node, attribute, depth + 1)
+            if value is not None:
+                return value
+
+        return None
+
+    def particle_stream(self, module_source, class_node):
+        """
+        :return: The stream of a particle class, or None if it is not a particle class
+        """
+        return self.class_attribute(module_source, class_node, PARTICLE_TYPE_ATTRIBUTE)
+
+    def ancestors(self, module_source, class_node, depth=0):
+        """
+        :return: set of the dotted names of the base classes found in the source tree, and their bases
+        """
+        ancestors = set()
+        if depth > 10:
+            return ancestors
+
+        for base_source, base_node in self.bases(module_source, class_node):
+            ancestors.add('%s.%s' % (base_source.name, base_node.name))
+            ancestors.update(self.ancestors(base_source, base_node, depth + 1))
+
+        return ancestors
+
+    def is_parser(self, module_source, class_node, depth=0):
+        """
+        Check whether a class is a parser, from its name or the names of its bases
+        """
+        if class_node.name.endswith('Parser'):
+            return True
+
+        if depth > 10:
+            return False
+
+        return any(self.is_parser(base_source, base_node, depth + 1)
+                   for base_source, base_node in self.bases(module_source, class_node))
+
+    def _particle_streams(self, module_source, class_node):
+        """
+        :return: set of the stream of a particle class, or an empty set
+        """
+        stream = self.particle_stream(module_source, class_node)
+        return set() if stream is None else {stream}
+
+    def referenced_streams(self, module_source, class_node, depth=0):
+        """
+        Find the streams of the particle classes named in the body of a class
+        or its bases, or in the module level values, such as message maps, it names
+        :return: set of the streams
+        """
+        streams = set()
+        if depth > 10:
+            return streams
+
+        nodes = [class_node]
+        walked = set()
+        while nodes:
+            for node in ast.walk(nodes.pop()):
+                if isinstance(node, (ast.Name, ast.Attribute)) and node is not class_node:
+                    resolved = self.resolve_expression(module_source, node)
+                    if resolved is not None and resolved[1] is not class_node:
+                        streams.update(self._particle_streams(*resolved))
+
+                    elif isinstance(node, ast.Name) and node.id in module_source.assignments and \
+                            node.id not in walked:
+                        walked.add(node.id)
+                        nodes.append(module_source.assignments[node.id])
+
+                elif isinstance(node, ast.Str) and _is_identifier(node.s):
+                    # particle classes are often named by strings
+                    resolved = self.resolve_class(module_source.name, node.s)
+                    if resolved is not None:
+                        streams.update(self._particle_streams(*resolved))
+
+        for base_source, base_node in self.bases(module_source, class_node):
+            streams.update(self.referenced_streams(base_source, base_node, depth + 1))
+
+        return streams
+
+    def _driver_sources(self, driver_source):
+        """
+        Find the driver module and the driver modules it imports, which many
+        drivers share their code through
+        :return: list of the _ModuleSource
+        """
+        sources = [driver_source]
+        for module_source in sources:
+            for module in sorted(set(module for module, _ in module_source.imports.values())):
+                if module.startswith(DRIVER_PACKAGE + '.'):
+                    imported_source = self.module(module)
+                    if imported_source is not None and imported_source not in sources:
+                        sources.append(imported_source)
+        return sources
+
+    def read_driver(self, module_name):
+        """
+        Read the manifest entry of a driver module
+        :return: DriverEntry, or None if the module has no parse function
+        """
+        driver_source = self.module(module_name)
+        if driver_source is None:
+            return None
+
+        parse_function = None
+        for node in driver_source.tree.body:
+            if isinstance(node, ast.FunctionDef) and node.name == 'parse':
+                parse_function = node
+
+        if parse_function is None:
+            return None
+
+        version = None
+        for decorator in parse_function.decorator_list:
+            if isinstance(decorator, ast.Call) and getattr(decorator.func, 'id', None) == 'version' and \
+                    decorator.args:
+                version = self.string_value(driver_source, decorator.args[0])
+
+        named_modules = set()
+        named_classes = []
+        strings = []
+        for module_source in self._driver_sources(driver_source):
+            # the parser modules named in the driver, whose classes strings in the driver may name
+            named_modules.update(module for module, _ in module_source.imports.values()
+                                 if module.startswith(PARSER_PACKAGE))
+            named_modules.update(module for module in module_source.module_imports.values()
+                                 if module.startswith(PARSER_PACKAGE))
+
+            for node in ast.walk(module_source.tree):
+                if isinstance(node, (ast.Name, ast.Attribute)):
+                    resolved = self.resolve_expression(module_source, node)
+                    if resolved is not None and resolved[0].name.startswith(PARSER_PACKAGE):
+                        named_classes.append(resolved)
+                elif isinstance(node, ast.Str):
+                    if node.s.startswith(PARSER_PACKAGE + '.'):
+                        named_modules.add(node.s)
+                    elif _is_identifier(node.s):
+                        strings.append(node.s)
+
+        for name in strings:
+            for module in sorted(named_modules):
+                resolved = self.resolve_class(module, name)
+                if resolved is not None:
+                    named_classes.append(resolved)
+                    break
+
+        parsers = set()
+        parser_bases = set()
+        particle_streams = set()
+        parser_classes = []
+        for class_source, class_node in named_classes:
+            stream = self.particle_stream(class_source, class_node)
+            if stream is not None:
+                particle_streams.add(stream)
+            elif self.is_parser(class_source, class_node):
+                parsers.add('%s.%s' % (class_source.name, class_node.name))
+                parser_classes.append((class_source, class_node))
+                parser_bases.update(self.ancestors(class_source, class_node))
+
+        # drivers which do not name their particles get the particles their parsers name
+        if not particle_streams:
+            for class_source, class_node in parser_classes:
+                particle_streams.update(self.referenced_streams(class_source, class_node))
+
+        return DriverEntry(module_name, version, sorted(parsers), sorted(particle_streams),
+                           _file_patterns(os.path.dirname(driver_source.path)), sorted(parser_bases))
+
+
+def _is_identifier(text):
+    return bool(text) and (text[0].isalpha() or text[0] == '_') and text.replace('_', 'a').isalnum()
+
+
+def _file_patterns(driver_directory):
+    """
+    Build the glob patterns of the files a driver is given from the sample
+    data files in its resource directory, or its parent's
+    :param driver_directory: The directory of the driver module
+    :return: sorted list of patterns such as '*.log'
+    """
+    for directory in (driver_directory, os.path.dirname(driver_directory)):
+        resource_directory = os.path.join(directory, 'resource')
+        if os.path.isdir(resource_directory):
+            patterns = set()
+            for file_name in os.listdir(resource_directory):
+                extension = os.path.splitext(file_name)[1]
+                if extension and extension.lower() not in NON_DATA_EXTENSIONS and \
+                        os.path.isfile(os.path.join(resource_directory, file_name)):
+                    patterns.add('*' + extension)
+            if patterns:
+                return sorted(patterns)
+
+    return []
+
+
+def build_manifest(source_root=SOURCE_ROOT):
+    """
+    Build the manifest by reading the source of the drivers and parsers
+    :param source_root: The directory holding the mi package
+    :return: The manifest dictionary
+    """
+    reader = _SourceReader(source_root)
+    driver_root = os.path.join(source_root, *DRIVER_PACKAGE.split('.'))
+
+    drivers = []
+    for directory, directory_names, file_names in os.walk(driver_root):
+        directory_names[:] = sorted(name for name in directory_names
+                                    if os.path.isfile(os.path.join(directory, name, '__init__.py')))
+
+        package = os.path.relpath(directory, source_root).replace(os.sep, '.')
+        for file_name in sorted(file_names):
+            if file_name.endswith('.py') and file_name != '__init__.py':
+                entry = reader.read_driver('%s.%s' % (package, file_name[:-3]))
+                if entry is not None:
+                    drivers.append(entry)
+
+    log.info('Read %d drivers for the driver manifest', len(drivers))
+
+    return {
+        'manifest_version': MANIFEST_VERSION,
+        'drivers': [entry.to_dict() for entry in sorted(drivers, key=lambda entry: entry.module)]
+    }
+
+
+def write_manifest(manifest, manifest_path=MANIFEST_PATH):
+    """
+    Write a manifest, replacing the file only once it is complete
+    """
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True, separators=(',', ': '))
+        manifest_file.write('\n')
+    os.rename(temp_path, manifest_path)
@@ -0,0 +1,325 @@
+"""
+@package mi.dataset.file_sniffer
+@file mi/dataset/file_sniffer.py
+@brief Recognize the family of a raw data file from its first few kilobytes
+
+A directory handed to ingest may hold DCL logs, SIO mule files, PD0 files,
+WFP E and C files, msgpack files, glider ASCII files and CSPP text files side
+by side.  Each family is recognized by the signature its parsers already look
+for, such as the SIO controller header or the PD0 header ID, in the start of
+the file.  WFP C files have no header, so they are recognized by the end of
+profile marker at the end of the file.
+
+The drivers for a family are those whose parsers are, or derive from, the
+family's parser classes, as recorded in the driver manifest.
+"""
+
+import os
+import re
+
+from mi.core.log import get_logger
+from mi.dataset.driver_registry import get_registry
+from mi.dataset.parser.WFP_E_file_common import HEADER_MATCHER as WFP_E_HEADER_MATCHER
+from mi.dataset.parser.adcp_pd0 import ADCPS_PD0_HEADER_REGEX
+from mi.dataset.parser.common_regexes import DATE_YYYY_MM_DD_REGEX, TIME_HR_MIN_SEC_MSEC_REGEX
+from mi.dataset.parser.cspp_base import HEADER_PART_MATCHER as CSPP_HEADER_PART_MATCHER
+from mi.dataset.parser.sio_mule_common import SIO_HEADER_MATCHER
+from mi.dataset.parser.wfp_c_file_common import EOP_MATCHER, FOOTER_BYTES
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+# the number of bytes read from the start of a file
+HEAD_BYTES = 4096
+
+# the number of bytes read from the end of a file, enough for a WFP C file footer and padding
+TAIL_BYTES = 64
+
+# the number of lines of a text file which are looked at
+HEAD_LINES = 20
+
+DCL_TIMESTAMP_MATCHER = re.compile(DATE_YYYY_MM_DD_REGEX + ' ' + TIME_HR_MIN_SEC_MSEC_REGEX + ' ')
+
+# the instrument name in DCL log messages such as '[ctdbp1:DLOGP3]:Instrument Started',
+# without its instance number
+DCL_LOG_TAG_MATCHER = re.compile(r'\[([A-Za-z][A-Za-z0-9]*?)\d*:')
+
+# splits file names into words, such as 20131123.pco2w1.log into 20131123, pco2w1 and log
+WORD_SPLITTER = re.compile(r'[^a-z0-9]+')
+
+# the instance number ending an instrument name, such as the 1 of pco2w1
+INSTANCE_NUMBER_MATCHER = re.compile(r'(?<=[a-z])\d+$')
+
+# the parts of driver module names which do not name the instrument or format
+GENERIC_DRIVER_NAME_PARTS = frozenset(['driver', 'recovered', 'telemetered'])
+
+# glider ASCII files start with a header of 14 'key: value' lines
+GLIDER_HEADER_LINES = 14
+GLIDER_FIRST_KEY = 'dbd_label:'
+GLIDER_TAG_COUNT_MATCHER = re.compile(r'num_ascii_tags: *%d\s' % GLIDER_HEADER_LINES)
+
+CSPP_SOURCE_FILE_KEY = 'Source File'
+
+# the first byte of a msgpack array of 2 to 15 items, and of the integer, or float,
+# each record of a msgpack file starts with
+MSGPACK_FIXARRAY_BYTES = frozenset(chr(byte) for byte in range(0x92, 0xa0))
+MSGPACK_NUMBER_BYTES = frozenset([chr(byte) for byte in range(0x80)] +
+                                 [chr(byte) for byte in range(0xca, 0xd4)])
+
+
+class FileSample(object):
+    """
+    The start, and end, of a file
+    """
+
+    def __init__(self, head, tail, size):
+        """
+        :param head: The first bytes of the file
+        :param tail: The last bytes of the file
+        :param size: The file size in bytes
+        """
+        self.head = head
+        self.tail = tail
+        self.size = size
+        self._lines = None
+
+    @classmethod
+    def read(cls, file_path):
+        """
+        Read the start and end of a file
+        :param file_path: The file path
+        :return: The FileSample
+        """
+        with open(file_path, 'rb') as file_handle:
+            head = file_handle.read(HEAD_BYTES)
+            file_handle.seek(0, 2)
+            size = file_handle.tell()
+            file_handle.seek(max(size - TAIL_BYTES, 0))
+            tail = file_handle.read(TAIL_BYTES)
+
+        return cls(head, tail, size)
+
+    @property
+    def lines(self):
+        """
+        :return: list of the first complete lines in the head of the file.  Files
+                 such as DCL logs of binary instruments hold binary data between lines.
+        """
+        if self._lines is None:
+            lines = self.head.splitlines(True)
+            if len(self.head) < self.size and lines:
+                # the last line is cut off unless the whole file was read
+                lines.pop()
+            self._lines = lines[:HEAD_LINES]
+
+        return self._lines
+
+
+def _is_sio(sample):
+    return SIO_HEADER_MATCHER.match(sample.head) is not None
+
+
+def _is_pd0(sample):
+    return sample.head.startswith(ADCPS_PD0_HEADER_REGEX)
+
+
+def _is_wfp_e(sample):
+    return WFP_E_HEADER_MATCHER.match(sample.head) is not None
+
+
+def _is_wfp_c(sample):
+    return sample.size >= FOOTER_BYTES and EOP_MATCHER.search(sample.tail) is not None
+
+
+def _is_msgpack(sample):
+    return len(sample.head) > 1 and sample.head[0] in MSGPACK_FIXARRAY_BYTES and \
+        sample.head[1] in MSGPACK_NUMBER_BYTES
+
+
+def _is_glider(sample):
+    lines = sample.lines
+    return len(lines) >= GLIDER_HEADER_LINES and lines[0].startswith(GLIDER_FIRST_KEY) and \
+        any(GLIDER_TAG_COUNT_MATCHER.match(line) for line in lines[:GLIDER_HEADER_LINES])
+
+
+def _is_cspp(sample):
+    lines = sample.lines
+    if not lines:
+        return False
+
+    match = CSPP_HEADER_PART_MATCHER.match(lines[0])
+    return match is not None and match.group(1) == CSPP_SOURCE_FILE_KEY
+
+
+def _is_dcl(sample):
+    return any(DCL_TIMESTAMP_MATCHER.match(line) for line in sample.lines)
+
+
+class FileFamily(object):
+    """
+    A family of files read by parsers sharing a format
+    """
+
+    def __init__(self, name, recognize, parser_classes=(), parser_module_token=None):
+        """
+        :param name: The family name
+        :param recognize: function of a FileSample returning True for files of the family
+        :param parser_classes: dotted names of the classes the parsers of the family
+                               are, or derive from
+        :param parser_module_token: text found in the module names of parsers of the
+                                    family which do not share a class
+        """
+        self.name = name
+        self.recognize = recognize
+        self.parser_classes = frozenset(parser_classes)
+        self.parser_module_token = parser_module_token
+
+    def __repr__(self):
+        return 'FileFamily(%r)' % self.name
+
+    def reads(self, entry):
+        """
+        Check whether a driver reads files of the family
+        :param entry: The DriverEntry of the driver
+        :return: True if a parser of the driver is one of the family's parsers
+        """
+        if self.parser_classes.intersection(entry.parsers) or self.parser_classes.intersection(entry.parser_bases):
+            return True
+
+        return self.parser_module_token is not None and \
+            any(self.parser_module_token in parser.split('.')[-2] for parser in entry.parsers)
+
+
+# The families, in the order they are tried.  Binary signatures come before
+# the text ones, and the WFP C file end of profile marker, which any file
+# could end with, comes last.
+FILE_FAMILIES = (
+    FileFamily('sio', _is_sio, ['mi.dataset.parser.sio_mule_common.SioParser']),
+    FileFamily('pd0', _is_pd0, ['mi.dataset.parser.adcp_pd0.AdcpPd0Parser']),
+    FileFamily('wfp_e', _is_wfp_e, ['mi.dataset.parser.WFP_E_file_common.WfpEFileParser']),
+    FileFamily('msgpack', _is_msgpack, ['mi.dataset.parser.dpc.DeepProfilerParser',
+                                        'mi.dataset.parser.mmp_cds_base.MmpCdsParser']),
+    FileFamily('glider', _is_glider, ['mi.dataset.parser.glider.GliderParser']),
+    FileFamily('cspp', _is_cspp, ['mi.dataset.parser.cspp_base.CsppParser'],
+               parser_module_token='cspp'),
+    FileFamily('dcl', _is_dcl, ['mi.dataset.parser.dcl_file_common.DclFileCommonParser'],
+               parser_module_token='dcl'),
+    FileFamily('wfp_c', _is_wfp_c, ['mi.dataset.parser.wfp_c_file_common.WfpCFileCommonParser']),
+)
+
+
+def sniff(file_path):
+    """
+    Recognize the family of a file
+    :param file_path: The file path
+    :return: The FileFamily, or None if the file is not recognized
+    """
+    return sniff_sample(FileSample.read(file_path))
+
+
+def sniff_sample(sample):
+    """
+    Recognize the family of a file from its FileSample
+    :return: The FileFamily, or None if the file is not recognized
+    """
+    for family in FILE_FAMILIES:
+        if family.recognize(sample):
+            return family
+
+    return None
+
+
+def _file_words(file_path):
+    """
+    :param file_path: The file path
+    :return: set of the words in the file name, with and without instance numbers
+    """
+    words = set(WORD_SPLITTER.split(os.path.basename(file_path).lower()))
+    words.update([INSTANCE_NUMBER_MATCHER.sub('', word) for word in words])
+    words.discard('')
+    return words
+
+
+def _name_score(entry, named):
+    """
+    Count the parts of a driver module name, such as nutnr, b, dcl and full
+    for nutnr_b_dcl_full_recovered_driver, found in the words naming a file
+    :param entry: The DriverEntry
+    :param named: set of the words in the file name and the DCL log tags of the file
+    :return: The number of parts found
+    """
+    parts = set(entry.module.rsplit('.', 1)[-1].lower().split('_')) - GENERIC_DRIVER_NAME_PARTS
+    return len(parts & named)
+
+
+class CandidateDrivers(list):
+    """
+    The DriverEntry of the drivers which may read a file, most likely first
+    """
+
+    def __init__(self, entries=(), top_count=0):
+        """
+        :param entries: The DriverEntry, most likely first
+        :param top_count: The number of entries as likely as the first, or 0 if nothing
+                          in the file names any of the drivers
+        """
+        super(CandidateDrivers, self).__init__(entries)
+        self.top_count = top_count
+
+    @property
+    def ambiguous(self):
+        """
+        :return: True if more than one driver is the most likely
+        """
+        return self.top_count > 1
+
+    @property
+    def best(self):
+        """
+        :return: The DriverEntry of the one most likely driver, or None if there is
+                 no candidate or the most likely is ambiguous
+        """
+        if self.top_count == 1:
+            return self[0]
+        return None
+
+
+def candidate_drivers(file_path, registry=None):
+    """
+    Find the drivers which may read a file.  The drivers of the file's family
+    are scored by how much of their module names is found in the file name
+    and the DCL log tags of the file.  They are ordered by score, then with
+    those whose file patterns match the file name first.  Drivers with none of
+    their name found are kept last, and are never the best candidate.
+    :param file_path: The file path
+    :param registry: The DriverRegistry, or None for the installed one
+    :return: The CandidateDrivers, empty if the file is not recognized
+    """
+    if registry is None:
+        registry = get_registry()
+
+    sample = FileSample.read(file_path)
+    family = sniff_sample(sample)
+    if family is None:
+        log.debug('Unable to recognize the format of %s', file_path)
+        return CandidateDrivers()
+
+    entries = [entry for entry in registry.entries() if family.reads(entry)]
+    log.debug('%s is a %s file, read by %d drivers', file_path, family.name, len(entries))
+
+    named = _file_words(file_path)
+    named.update(match.group(1).lower() for line in sample.lines for match in DCL_LOG_TAG_MATCHER.finditer(line))
+
+    ranked = sorted((((-_name_score(entry, named), not entry.matches_file(file_path)), entry) for entry in entries),
+                    key=lambda item: item[0])
+
+    top_count = 0
+    if ranked and ranked[0][0][0] < 0:
+        top_count = len([rank for rank, _ in ranked if rank == ranked[0][0]])
+    candidates = CandidateDrivers([entry for _, entry in ranked], top_count)
+
+    if candidates.ambiguous:
+        log.debug('%s may be read by any of %s', file_path, ', '.join(entry.module for entry in candidates[:top_count]))
+
+    return candidates
@@ -0,0 +1,525 @@
+"""
+@package mi.dataset.harvester
+@file mi/dataset/harvester.py
+@brief Harvest new data files from a directory and parse them in batches
+
+A Harvester polls a directory, configured with the DataSetDriverConfigKeys
+harvester keys, for files matching a pattern.  A file is ready once it has
+not been modified for FILE_MOD_WAIT_TIME seconds, so files still being
+written are left for a later poll.  Ready files are grouped into batches by
+the driver which reads them, either the driver configured with MODULE or the
+one most likely driver the file sniffer proposes, and the batches are parsed
+by a pool of worker processes.  Files the sniffer finds no single most likely
+driver for are not parsed, and are recorded as failures.
+
+Every harvested file is recorded in a ledger kept in STORAGE_DIRECTORY, with
+its size and modification time, so a restarted harvester does not parse a
+file again.  Files read by a parser which can be resumed are parsed a line at
+a time up to the last complete line, and the ledger keeps the checkpoint the
+parse ended at.  A file which has changed since it was harvested, such as a
+DCL log which is still being appended to, is parsed from its checkpoint, so
+only the lines added since are parsed.  A changed file without a checkpoint
+is not parsed again, as its particles have already been delivered.
+
+A file which could not be parsed, because no single driver was found for it
+or the driver raised an exception, is tried again on later polls, up to
+max_attempts times while it is unchanged.  A directory is only listed again
+once its own modification time changes.
+"""
+
+import fnmatch
+import json
+import multiprocessing
+import os
+import time
+
+from mi.core.exceptions import ConfigurationException
+from mi.core.log import get_logger
+from mi.dataset.dataset_driver import ParticleDataHandler
+from mi.dataset.dataset_parser import DataSetDriverConfigKeys
+from mi.dataset.driver_registry import SOURCE_ROOT, get_registry
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+LEDGER_FILE_NAME = 'harvester_ledger.jsonl'
+
+DEFAULT_PATTERN = '*'
+DEFAULT_FREQUENCY = 60.0
+DEFAULT_FILE_MOD_WAIT_TIME = 30.0
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 3
+
+# a directory listing is only reused if it was taken this many seconds after the
+# directory was last modified, as file systems may keep coarse modification times
+LISTING_SETTLE_TIME = 2.0
+
+
+class HarvestedFile(object):
+    """
+    A data file found by the harvester
+    """
+
+    def __init__(self, path, size, mtime, checkpoint=None):
+        """
+        :param path: The file path
+        :param size: The file size in bytes
+        :param mtime: The file modification time, in seconds since the epoch
+        :param checkpoint: The parser checkpoint to resume parsing the file from, or None
+        """
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.checkpoint = checkpoint
+
+    def __repr__(self):
+        return 'HarvestedFile(%r, %r, %r)' % (self.path, self.size, self.mtime)
+
+
+class HarvestResult(object):
+    """
+    The outcome of parsing one harvested file
+    """
+
+    def __init__(self, harvested_file, driver, handler=None, error=None):
+        """
+        :param harvested_file: The HarvestedFile
+        :param driver: The dotted name of the driver module, or None if no driver reads the file
+        :param handler: The particle data handler the file was parsed into
+        :param error: The message of the exception raised parsing the file, or None
+        """
+        self.harvested_file = harvested_file
+        self.driver = driver
+        self.handler = handler
+        self.error = error
+
+    @property
+    def failure(self):
+        """
+        :return: True if the file could not be parsed, or a particle could not be captured
+        """
+        return self.driver is None or self.error is not None or bool(getattr(self.handler, '_failure', False))
+
+    @property
+    def checkpoint(self):
+        """
+        :return: The parser checkpoint to resume the next parse of the file from, or None
+        """
+        return getattr(self.handler, 'checkpoint', None)
+
+
+class HarvesterLedger(object):
+    """
+    The files a harvester has parsed, as a journal of JSON lines.  A line is
+    added for each file as soon as it is parsed, and the last line for a file
+    wins, so a harvester stopped at any point loses at most the line it was
+    writing.
+    """
+
+    def __init__(self, path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        :param path: The path of the ledger file
+        :param max_attempts: The number of times an unchanged file which could not be parsed is tried
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.records = {}
+        # changed files which can not be resumed, and have been reported
+        self._not_resumable = set()
+        self._read()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path) as ledger_file:
+            for line_number, line in enumerate(ledger_file, 1):
+                try:
+                    record = json.loads(line)
+                    self.records[record['path']] = record
+                except (ValueError, KeyError, TypeError):
+                    log.warn('Ignoring unreadable line %d of harvester ledger %s', line_number, self.path)
+
+        log.info('Read %d harvested files from %s', len(self.records), self.path)
+
+    def __contains__(self, path):
+        return path in self.records
+
+    def is_current(self, harvested_file):
+        """
+        :param harvested_file: The HarvestedFile
+        :return: True if the file needs no harvesting: it was harvested with its current size and
+                 modification time, could not be parsed in max_attempts tries while unchanged, or
+                 has changed since it was harvested but has no checkpoint to resume parsing from
+        """
+        record = self.records.get(harvested_file.path)
+        if record is None:
+            return False
+
+        unchanged = record['size'] == harvested_file.size and record['mtime'] == harvested_file.mtime
+        if record.get('error') is not None:
+            return unchanged and record.get('attempts', 1) >= self.max_attempts
+
+        if unchanged:
+            return True
+
+        if record.get('checkpoint') is None:
+            if harvested_file.path not in self._not_resumable:
+                log.warn('Not harvesting %s again, it has changed but its parser can not resume it',
+                         harvested_file.path)
+                self._not_resumable.add(harvested_file.path)
+            return True
+
+        return False
+
+    def checkpoint(self, path):
+        """
+        :param path: The file path
+        :return: The parser checkpoint to resume parsing the file from, or None to parse it from the start
+        """
+        record = self.records.get(path)
+        return None if record is None else record.get('checkpoint')
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, results):
+        """
+        Add the results of parsing files to the ledger
+        :param results: list of HarvestResult
+        """
+        lines = []
+        for result in results:
+            harvested_file = result.harvested_file
+            checkpoint = result.checkpoint
+            attempts = 1
+            if result.error is not None:
+                # parsed again from where the last parse which did not raise ended
+                previous = self.records.get(harvested_file.path, {})
+                checkpoint = previous.get('checkpoint')
+                if previous.get('error') is not None and previous['size'] == harvested_file.size and \
+                        previous['mtime'] == harvested_file.mtime:
+                    attempts = previous.get('attempts', 1) + 1
+
+            record = {
+                'path': harvested_file.path,
+                'size': harvested_file.size,
+                'mtime': harvested_file.mtime,
+                'driver': result.driver,
+                'failure': result.failure,
+                'error': result.error,
+                'attempts': attempts,
+                'checkpoint': checkpoint,
+                'harvested': time.time()
+            }
+            self.records[record['path']] = record
+            lines.append(json.dumps(record, sort_keys=True) + '\n')
+
+        with open(self.path, 'a') as ledger_file:
+            ledger_file.writelines(lines)
+            ledger_file.flush()
+            os.fsync(ledger_file.fileno())
+
+
+def _directory_entries(directory):
+    """
+    List a directory
+    :param directory: The directory path
+    :return: list of (path, is_directory) tuples
+    """
+    if scandir is not None:
+        return [(entry.path, entry.is_dir()) for entry in scandir(directory)]
+
+    paths = [os.path.join(directory, name) for name in os.listdir(directory)]
+    return [(path, os.path.isdir(path)) for path in paths]
+
+
+class DirectoryScanner(object):
+    """
+    Find the files matching a pattern in a directory and its subdirectories,
+    listing a directory again only when it may hold new files
+    """
+
+    def __init__(self, directory, pattern=DEFAULT_PATTERN, recursive=True):
+        """
+        :param directory: The directory to scan
+        :param pattern: glob pattern the file names must match
+        :param recursive: True to scan the subdirectories too
+        """
+        self.directory = directory
+        self.pattern = pattern
+        self.recursive = recursive
+
+        # directory path to (directory mtime, time listed, list of file paths, list of subdirectory paths)
+        self._listings = {}
+
+    def _listing(self, directory, mtime):
+        listing = self._listings.get(directory)
+        if listing is None or listing[0] != mtime or listing[1] - mtime < LISTING_SETTLE_TIME:
+            listed = time.time()
+            files = []
+            subdirectories = []
+            for path, is_directory in _directory_entries(directory):
+                if is_directory:
+                    subdirectories.append(path)
+                elif fnmatch.fnmatch(os.path.basename(path), self.pattern):
+                    files.append(path)
+            listing = (mtime, listed, files, subdirectories)
+            self._listings[directory] = listing
+
+        return listing
+
+    def forget(self, directory):
+        """
+        List a directory again on the next scan
+        :param directory: The directory path
+        """
+        self._listings.pop(directory, None)
+
+    def scan(self, skip=lambda harvested_file: False):
+        """
+        Find the matching files
+        :param skip: function of a HarvestedFile returning True for files which
+                     are known and unchanged
+        :return: list of HarvestedFile
+        """
+        found = []
+        directories = [self.directory]
+        seen = set()
+        while directories:
+            directory = directories.pop()
+            if directory in seen:
+                continue
+            seen.add(directory)
+
+            try:
+                _, _, files, subdirectories = self._listing(directory, os.stat(directory).st_mtime)
+            except OSError as e:
+                log.warn('Unable to list %s: %s', directory, e)
+                self.forget(directory)
+                continue
+
+            for path in files:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed since the directory was listed
+                    continue
+                harvested_file = HarvestedFile(path, stat.st_size, stat.st_mtime)
+                if not skip(harvested_file):
+                    found.append(harvested_file)
+
+            if self.recursive:
+                directories.extend(subdirectories)
+
+        return found
+
+
+def parse_batch(batch):
+    """
+    Parse a batch of files with one driver, in a worker
+    :param batch: (driver module, list of HarvestedFile, handler factory) tuple
+    :return: list of HarvestResult
+    """
+    driver, harvested_files, handler_factory = batch
+
+    try:
+        parse = get_registry().parse_function(driver)
+    except Exception as e:
+        log.error('Unable to load driver %s: %s', driver, e)
+        return [HarvestResult(harvested_file, driver, error='Unable to load driver: %s' % e)
+                for harvested_file in harvested_files]
+
+    results = []
+    for harvested_file in harvested_files:
+        handler = handler_factory()
+        # parsers which can be resumed only parse what was added since the file was last harvested
+        handler.resume = True
+        handler.checkpoint = harvested_file.checkpoint
+        try:
+            parse(SOURCE_ROOT, harvested_file.path, handler)
+            results.append(HarvestResult(harvested_file, driver, handler))
+        except Exception as e:
+            log.exception('Unable to parse %s with %s', harvested_file.path, driver)
+            results.append(HarvestResult(harvested_file, driver, handler, error=str(e)))
+
+    return results
+
+
+class Harvester(object):
+    """
+    Poll a directory for new data files and parse them in batches by driver
+    """
+
+    def __init__(self, config, handler_factory=ParticleDataHandler, workers=1,
+                 batch_size=DEFAULT_BATCH_SIZE, result_callback=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        :param config: dictionary of DataSetDriverConfigKeys: DIRECTORY and
+                       STORAGE_DIRECTORY are required, PATTERN, FREQUENCY (seconds),
+                       FILE_MOD_WAIT_TIME (seconds) and MODULE (driver module) are optional
+        :param handler_factory: callable creating the particle data handler for a
+                                file, which must be picklable if workers > 1
+        :param workers: The number of worker processes, or 1 to parse in this process
+        :param batch_size: The largest number of files in a batch
+        :param result_callback: function called with each HarvestResult, in this process
+        :param max_attempts: The number of times an unchanged file which could not be parsed is tried
+        :raises ConfigurationException: if a required key is missing
+        """
+        for key in (DataSetDriverConfigKeys.DIRECTORY, DataSetDriverConfigKeys.STORAGE_DIRECTORY):
+            if not config.get(key):
+                raise ConfigurationException('Harvester configuration is missing %s' % key)
+
+        self.directory = config[DataSetDriverConfigKeys.DIRECTORY]
+        self.frequency = float(config.get(DataSetDriverConfigKeys.FREQUENCY, DEFAULT_FREQUENCY))
+        self.file_mod_wait_time = float(config.get(DataSetDriverConfigKeys.FILE_MOD_WAIT_TIME,
+                                                   DEFAULT_FILE_MOD_WAIT_TIME))
+        self.driver = config.get(DataSetDriverConfigKeys.MODULE)
+
+        storage_directory = config[DataSetDriverConfigKeys.STORAGE_DIRECTORY]
+        if not os.path.isdir(storage_directory):
+            os.makedirs(storage_directory)
+
+        self.scanner = DirectoryScanner(self.directory, config.get(DataSetDriverConfigKeys.PATTERN, DEFAULT_PATTERN))
+        self.ledger = HarvesterLedger(os.path.join(storage_directory, LEDGER_FILE_NAME), max_attempts)
+
+        self.handler_factory = handler_factory
+        self.batch_size = batch_size
+        self.result_callback = result_callback
+        self._pool = multiprocessing.Pool(workers) if workers > 1 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _route(self, harvested_file):
+        """
+        :return: The driver module to parse a file with, or None if no driver, or more
+                 than one equally likely driver, reads it
+        """
+        if self.driver is not None:
+            return self.driver
+
+        # imported here as it imports parser modules for their signatures
+        from mi.dataset.file_sniffer import candidate_drivers
+
+        candidates = candidate_drivers(harvested_file.path)
+        if candidates.ambiguous:
+            log.warn('Not harvesting %s, which may be read by any of %s', harvested_file.path,
+                     ', '.join(entry.module for entry in candidates[:candidates.top_count]))
+        elif candidates.best is None:
+            log.warn('No driver found for %s', harvested_file.path)
+        else:
+            return candidates.best.module
+
+        return None
+
+    def find_ready_files(self, now=None):
+        """
+        Find the files which are not in the ledger, have changed since they were harvested
+        or are to be tried again, and have not been modified for the file modification wait time
+        :param now: The current time, in seconds since the epoch
+        :return: list of HarvestedFile, oldest first
+        """
+        if now is None:
+            now = time.time()
+
+        found = self.scanner.scan(skip=self.ledger.is_current)
+        ready = [harvested_file for harvested_file in found
+                 if now - harvested_file.mtime >= self.file_mod_wait_time]
+        for harvested_file in ready:
+            harvested_file.checkpoint = self.ledger.checkpoint(harvested_file.path)
+
+        if len(ready) < len(found):
+            log.debug('Waiting for %d files still being modified', len(found) - len(ready))
+
+        return sorted(ready, key=lambda harvested_file: (harvested_file.mtime, harvested_file.path))
+
+    def batches(self, harvested_files):
+        """
+        Group files into batches by the driver which reads them
+        :param harvested_files: list of HarvestedFile
+        :return: list of (driver module, list of HarvestedFile) tuples, and
+                 list of the HarvestResult of files no driver reads
+        """
+        by_driver = {}
+        unrouted = []
+        for harvested_file in harvested_files:
+            driver = self._route(harvested_file)
+            if driver is None:
+                unrouted.append(HarvestResult(harvested_file, None, error='No single driver found'))
+            else:
+                by_driver.setdefault(driver, []).append(harvested_file)
+
+        batches = []
+        for driver in sorted(by_driver):
+            files = by_driver[driver]
+            for start in range(0, len(files), self.batch_size):
+                batches.append((driver, files[start:start + self.batch_size]))
+
+        return batches, unrouted
+
+    def _record(self, results):
+        self.ledger.record(results)
+        if self.result_callback is not None:
+            for result in results:
+                self.result_callback(result)
+
+    def poll(self, now=None):
+        """
+        Harvest the ready files once
+        :param now: The current time, in seconds since the epoch
+        :return: list of the HarvestResult of the files harvested
+        """
+        batches, unrouted = self.batches(self.find_ready_files(now))
+        if unrouted:
+            self._record(unrouted)
+
+        jobs = [(driver, harvested_files, self.handler_factory) for driver, harvested_files in batches]
+        if self._pool is None:
+            completed = (parse_batch(job) for job in jobs)
+        else:
+            completed = self._pool.imap_unordered(parse_batch, jobs)
+
+        harvested = list(unrouted)
+        for results in completed:
+            # recorded as each batch completes, so a stopped harvester keeps the batches it finished
+            self._record(results)
+            harvested.extend(results)
+
+        if harvested:
+            log.info('Harvested %d files in %d batches from %s', len(harvested), len(batches), self.directory)
+
+        return harvested
+
+    def run(self, polls=None):
+        """
+        Poll the directory every FREQUENCY seconds
+        :param polls: The number of polls, or None to poll until interrupted
+        """
+        count = 0
+        while polls is None or count < polls:
+            start = time.time()
+            self.poll()
+            count += 1
+            if polls is None or count < polls:
+                time.sleep(max(self.frequency - (time.time() - start), 0))
@@ -0,0 +1,259 @@
+"""
+@package mi.dataset.parse_cache
+@file mi/dataset/parse_cache.py
+@brief Cache of the particles parsed from raw data files
+
+Reprocessing runs the same drivers over the same files again.  The particles
+a driver produces from a file depend only on the file contents, the driver
+and its @version, the parser and its configuration, and the particle
+serializer, so they are kept on local disk under a hash of those and
+replayed to the particle data handler rather than parsing the file again.
+The least recently used entries are removed once the cache grows past its
+size limit.
+
+The cache used by drivers is set by set_parse_cache, or else from the
+MI_PARSE_CACHE and MI_PARSE_CACHE_SIZE environment variables.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from mi.core.log import get_logger
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = 'MI_PARSE_CACHE'
+CACHE_SIZE_ENVIRONMENT_VARIABLE = 'MI_PARSE_CACHE_SIZE'
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+ENTRY_EXTENSION = '.particles'
+
+# the size of the blocks a file is read in to hash it
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(stream_handle):
+    """
+    Hash the contents of an open file, leaving its position unchanged
+    :param stream_handle: The stream handle of the file
+    :return: The hex digest
+    """
+    position = stream_handle.tell()
+    stream_handle.seek(0)
+    digest = hashlib.sha1()
+    for block in iter(lambda: stream_handle.read(HASH_BLOCK_SIZE), ''):
+        digest.update(block)
+    stream_handle.seek(position)
+    return digest.hexdigest()
+
+
+def cache_key(content_digest, source_name, driver_module, driver_version, parser_class, config, serializer):
+    """
+    Build the key of the particles parsed from a file.  Some parsers take particle
+    values from the file name or path, so files with the same contents under other
+    names have other keys.
+    :param content_digest: The hex digest of the file contents
+    :param source_name: The name the file was opened with, or None if it has none
+    :param driver_module: The name of the driver module
+    :param driver_version: The @version of the driver parse function
+    :param parser_class: The parser class
+    :param config: The parser configuration, which may hold particle classes
+    :param serializer: The name of the function turning particles into samples
+    :return: The hex key
+    """
+    parser_name = '%s.%s' % (parser_class.__module__, parser_class.__name__)
+    identity = json.dumps([content_digest, source_name, driver_module, driver_version, parser_name, config,
+                           serializer], sort_keys=True, default=repr)
+    return hashlib.sha1(identity).hexdigest()
+
+
+def handler_failure(particle_data_handler):
+    """
+    Read the data capture failure flag of a particle data handler
+    :param particle_data_handler: The particle data handler
+    :return: True if it has been told of a failure, False if not, or None if it does not say
+    """
+    for name in ('_failure', 'failure'):
+        failure = getattr(particle_data_handler, name, None)
+        if isinstance(failure, bool):
+            return failure
+    return None
+
+
+class RecordingParticleDataHandler(object):
+    """
+    Passes particle samples on to a particle data handler, keeping a copy of
+    them by stream to put in the cache
+    """
+
+    def __init__(self, particle_data_handler):
+        self._particle_data_handler = particle_data_handler
+        self.samples = {}
+        self.failure = False
+
+    def addParticleSample(self, sample_type, sample):
+        # samples other than JSON strings are copied before the handler can change them
+        kept = sample
+        if not isinstance(sample, basestring):
+            kept = pickle.loads(pickle.dumps(sample, pickle.HIGHEST_PROTOCOL))
+        self.samples.setdefault(sample_type, []).append(kept)
+        self._particle_data_handler.addParticleSample(sample_type, sample)
+
+    def setParticleDataCaptureFailure(self):
+        self.failure = True
+        self._particle_data_handler.setParticleDataCaptureFailure()
+
+    def entry(self):
+        """
+        :return: The cache entry of the samples and failure passed on
+        """
+        return {'samples': self.samples, 'failure': self.failure}
+
+
+def replay(entry, particle_data_handler):
+    """
+    Pass the samples and failure of a cache entry to a particle data handler
+    :param entry: The cache entry
+    :param particle_data_handler: The particle data handler
+    """
+    for sample_type, samples in entry['samples'].iteritems():
+        for sample in samples:
+            particle_data_handler.addParticleSample(sample_type, sample)
+
+    if entry['failure']:
+        particle_data_handler.setParticleDataCaptureFailure()
+
+
+class ParseCache(object):
+    """
+    Directory of cache entries, one file per entry, limited in total size by
+    removing the entries least recently put or read
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        :param directory: The cache directory, created if it does not exist
+        :param max_bytes: The size limit of the entries in bytes
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def get(self, key):
+        """
+        Read an entry, marking it as the most recently used
+        :param key: The entry key
+        :return: The entry, or None if it is not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                entry = pickle.load(entry_file)
+            os.utime(path, None)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        except (pickle.UnpicklingError, EOFError, ValueError) as e:
+            log.warn('Removing unreadable parse cache entry %s: %s', path, e)
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """
+        Write an entry, then remove the least recently used entries past the size limit
+        :param key: The entry key
+        :param entry: The entry
+        """
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as entry_file:
+                pickle.dump(entry, entry_file, pickle.HIGHEST_PROTOCOL)
+            os.rename(temp_path, self._path(key))
+        except Exception:
+            self._remove(temp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache is within its size limit
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if not name.endswith(ENTRY_EXTENSION):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            log.debug('Evicting parse cache entry %s', path)
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_parse_cache = None
+_parse_cache_set = False
+
+
+def set_parse_cache(cache):
+    """
+    Set the cache used by drivers
+    :param cache: The ParseCache, or None to parse every file
+    """
+    global _parse_cache, _parse_cache_set
+    _parse_cache = cache
+    _parse_cache_set = True
+
+
+def get_parse_cache():
+    """
+    Get the cache used by drivers, from the environment unless it has been set
+    :return: The ParseCache, or None if there is none
+    """
+    if not _parse_cache_set:
+        directory = os.environ.get(CACHE_DIRECTORY_ENVIRONMENT_VARIABLE)
+        cache = None
+        if directory:
+            max_bytes = int(os.environ.get(CACHE_SIZE_ENVIRONMENT_VARIABLE, DEFAULT_MAX_BYTES))
+            cache = ParseCache(directory, max_bytes)
+        set_parse_cache(cache)
+
+    return _parse_cache
@@ -18,7 +18,7 @@ from mi.core.exceptions import UnexpectedDataException
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import SimpleParser, DataSetDriverConfigKeys
-from mi.dataset.parser.pd0_parser import AdcpPd0Record, \
+from mi.dataset.parser.pd0_parser import AdcpPd0Record, BlockId, \
     PD0ParsingException, BadHeaderException, \
     BadOffsetException, ChecksumException, UnhandledBlockException
 
@@ -29,6 +29,73 @@ __license__ = 'Apache 2.0'
 log = get_logger()
 ADCPS_PD0_HEADER_REGEX = b'\x7f\x7f'  # header bytes in PD0 files flagged by 7F7F
 
+NTP_EPOCH = dt.datetime(1900, 1, 1)
+
+# the offsets of the number of data types and the data type offsets in the ensemble header
+NUM_DATA_TYPES_OFFSET = 5
+DATA_TYPE_OFFSETS_OFFSET = 6
+# the real time clock year to hundredths, after the variable leader ID and ensemble number
+VARIABLE_LEADER_TIME_OFFSET = 4
+VARIABLE_LEADER_TIME_STRUCT = struct.Struct('<7B')
+
+# the format name of the time index of PD0 files, see mi.dataset.time_index
+TIME_INDEX_FORMAT = 'pd0'
+
+
+def rtc_ntp_time(year, month, day, hour, minute, second, hundredths):
+    """
+    Convert the real time clock time of an ensemble to an NTP timestamp
+    """
+    dts = dt.datetime(2000 + year, month, day, hour, minute, second)
+    return (dts - NTP_EPOCH).total_seconds() + hundredths / 100.0
+
+
+def ensemble_time(ensemble):
+    """
+    Read the time of an ensemble from its variable leader without decoding the rest of it
+    @param ensemble: The ensemble bytes
+    @return: The NTP timestamp, or None if it can not be read
+    """
+    try:
+        num_data_types = ord(ensemble[NUM_DATA_TYPES_OFFSET])
+        for offset in struct.unpack_from('<%dH' % num_data_types, ensemble, DATA_TYPE_OFFSETS_OFFSET):
+            if struct.unpack_from('<H', ensemble, offset)[0] == BlockId.VARIABLE_DATA:
+                return rtc_ntp_time(*VARIABLE_LEADER_TIME_STRUCT.unpack_from(ensemble,
+                                                                             offset + VARIABLE_LEADER_TIME_OFFSET))
+    except (struct.error, IndexError, ValueError):
+        pass
+
+    return None
+
+
+def time_index_entries(file_path):
+    """
+    List the ensembles of a PD0 file for its time index, stepping from one ensemble
+    header to the next as the parser does, without decoding them
+    @param file_path: The path of the PD0 file
+    @return: generator of (offset, header ID, NTP timestamp) of the ensembles
+    """
+    with open(file_path, 'rb') as stream_handle:
+        position = 0
+        header_id_bytes = stream_handle.read(2)
+
+        while len(header_id_bytes) == 2:
+            if header_id_bytes == ADCPS_PD0_HEADER_REGEX:
+                num_bytes = struct.unpack("<H", stream_handle.read(2).ljust(2, '\x00'))[0]
+                stream_handle.seek(position)
+                input_buffer = stream_handle.read(num_bytes + 2)
+                if len(input_buffer) < num_bytes + 2:
+                    break  # incomplete ensemble at the end of the file
+
+                timestamp = ensemble_time(input_buffer)
+                if timestamp is not None:
+                    yield position, ord(ADCPS_PD0_HEADER_REGEX[0]), timestamp
+                else:
+                    stream_handle.seek(position + 2)
+
+            position = stream_handle.tell()
+            header_id_bytes = stream_handle.read(2)
+
 
 class AdcpPd0ParsedKey(BaseEnum):
     """
@@ -228,21 +295,20 @@ class AdcpDataParticleType(BaseEnum):
 
 
 class Pd0Base(DataParticle):
-    ntp_epoch = dt.datetime(1900, 1, 1)
+    ntp_epoch = NTP_EPOCH
 
     def __init__(self, *args, **kwargs):
         if 'preferred_timestamp' not in kwargs:
             kwargs['preferred_timestamp'] = DataParticleKey.INTERNAL_TIMESTAMP
         super(Pd0Base, self).__init__(*args, **kwargs)
-        record = self.raw_data
-        dts = dt.datetime(2000 + record.variable_data.rtc_year,
-                          record.variable_data.rtc_month,
-                          record.variable_data.rtc_day,
-                          record.variable_data.rtc_hour,
-                          record.variable_data.rtc_minute,
-                          record.variable_data.rtc_second)
-
-        rtc_time = (dts - self.ntp_epoch).total_seconds() + record.variable_data.rtc_hundredths / 100.0
+        variable_data = self.raw_data.variable_data
+        rtc_time = rtc_ntp_time(variable_data.rtc_year,
+                                variable_data.rtc_month,
+                                variable_data.rtc_day,
+                                variable_data.rtc_hour,
+                                variable_data.rtc_minute,
+                                variable_data.rtc_second,
+                                variable_data.rtc_hundredths)
         self.set_internal_timestamp(rtc_time)
 
 
@@ -666,6 +732,22 @@ class AdcpPd0Parser(SimpleParser):
         self._last_values[stream] = values
         return True
 
+    def _wants(self, name):
+        """
+        @param name: The key of a particle class in the particle classes dictionary
+        @return: True if the stream of the particle class is produced
+        """
+        return self.parse_options is None or self.parse_options.includes_stream(self._particle_classes[name])
+
+    def _in_time_window(self, ensemble):
+        """
+        @param ensemble: The ensemble bytes
+        @return: True unless the ensemble is outside the time window of the parse options
+        """
+        if self.parse_options is None or not self.parse_options.has_time_window():
+            return True
+        return self.parse_options.includes_time(ensemble_time(ensemble))
+
     def parse_file(self):
         """
         Entry point into parsing the file
@@ -673,6 +755,13 @@ class AdcpPd0Parser(SimpleParser):
         """
 
         position = 0  # set position to beginning of file
+
+        # start at the last ensemble before the start time when the file has a time index
+        time_index_seek = self._time_index_seek(TIME_INDEX_FORMAT)
+        if time_index_seek is not None:
+            position = time_index_seek[1].offset
+            self._stream_handle.seek(position)
+
         header_id_bytes = self._stream_handle.read(2)  # read the first two bytes of the file
 
         while header_id_bytes:  # will be None when EOF is found
@@ -685,28 +774,33 @@ class AdcpPd0Parser(SimpleParser):
                 self._stream_handle.seek(position)  # reset to beginning of ensemble
                 input_buffer = self._stream_handle.read(num_bytes + 2)  # read entire ensemble
 
-                if len(input_buffer) == num_bytes + 2:  # make sure there are enough bytes including checksum
+                if len(input_buffer) == num_bytes + 2 and not self._in_time_window(input_buffer):
+                    pass  # skip the ensemble without decoding it
+
+                elif len(input_buffer) == num_bytes + 2:  # make sure there are enough bytes including checksum
 
                     try:
                         pd0 = AdcpPd0Record(input_buffer, glider=self._glider)
 
-                        velocity = self._particle_classes['velocity'](pd0)
-                        self._record_buffer.append(velocity)
+                        if self._wants('velocity'):
+                            velocity = self._particle_classes['velocity'](pd0)
+                            self._record_buffer.append(velocity)
 
-                        config = self._particle_classes['config'](pd0)
-                        engineering = self._particle_classes['engineering'](pd0)
-
-                        for particle in [config, engineering]:
-                            if self._changed(particle):
-                                self._record_buffer.append(particle)
+                        for name in ['config', 'engineering']:
+                            if self._wants(name):
+                                particle = self._particle_classes[name](pd0)
+                                if self._changed(particle):
+                                    self._record_buffer.append(particle)
 
                         if hasattr(pd0, 'bottom_track'):
-                            bt = self._particle_classes['bottom_track'](pd0)
-                            bt_config = self._particle_classes['bottom_track_config'](pd0)
-                            self._record_buffer.append(bt)
-
-                            if self._changed(bt_config):
-                                self._record_buffer.append(bt_config)
+                            if self._wants('bottom_track'):
+                                bt = self._particle_classes['bottom_track'](pd0)
+                                self._record_buffer.append(bt)
+
+                            if self._wants('bottom_track_config'):
+                                bt_config = self._particle_classes['bottom_track_config'](pd0)
+                                if self._changed(bt_config):
+                                    self._record_buffer.append(bt_config)
 
                     except (BadOffsetException, UnhandledBlockException, BadHeaderException):
                         self._stream_handle.seek(position + 2)
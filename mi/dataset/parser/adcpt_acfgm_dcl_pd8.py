@@ -26,6 +26,9 @@ The sensor data record has the following format:
 <DCL Timestamp>   ...
 <DCL Timestamp>   <N>   <DIR N>   <MAG N>      <EW N>      <NS N>      <VERT N>       <ERR N>    <ECHO1 N>    <ECHO2 N>    <ECHO3 N>    <ECHO4 N>
 
+The bin table lines of an ensemble are read as one block of text when they are
+in the form the instrument writes them, and the values of the block are
+converted together.  Any other line of the table is matched on its own.
 
 Release notes:
 
@@ -36,6 +39,8 @@ __author__ = 'Sung Ahn'
 __license__ = 'Apache 2.0'
 
 import re
+import string
+
 import numpy
 from mi.core.log import get_logger
 log = get_logger()
@@ -46,6 +51,7 @@ from mi.dataset.parser.dcl_file_common import DclInstrumentDataParticle, \
 
 from mi.core.exceptions import RecoverableSampleException
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser.utilities import LineReader
 
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, UNSIGNED_INT_REGEX, INT_REGEX, \
     SPACE_REGEX, ANY_CHARS_REGEX, ASCII_HEX_CHAR_REGEX
@@ -118,6 +124,21 @@ SENSOR_DATA_PATTERN += UINT + MULTI_SPACE       # Echo3
 SENSOR_DATA_PATTERN += UINT                     # Echo4
 SENSOR_DATA_MATCHER = re.compile(SENSOR_DATA_PATTERN)
 
+# Bin table line in the form the instrument writes it: the values are separated by
+# spaces, there is no text after the last one, and the integers are short enough
+# to be converted exactly as floating point.  Every such line matches
+# SENSOR_DATA_MATCHER, with the values as its groups.
+BIN_TIMESTAMP = r'\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}\.\d{3}'
+BIN_UINT = MULTI_SPACE + r'[0-9]{1,15}'
+BIN_SINT = MULTI_SPACE + r'[+-]?[0-9]{1,15}'
+BIN_FLOAT_OR_DASH = MULTI_SPACE + r'(?:[+-]?[0-9]+\.[0-9]+|--)'
+BIN_LINE_PATTERN = BIN_TIMESTAMP + BIN_UINT            # DCL controller timestamp, bin
+BIN_LINE_PATTERN += BIN_FLOAT_OR_DASH * 2              # Dir, Mag
+BIN_LINE_PATTERN += BIN_SINT * 4                       # E/W, N/S, Vert, Err
+BIN_LINE_PATTERN += BIN_UINT * 4                       # Echo1 - Echo4
+BIN_LINE_PATTERN += SPACE_REGEX + r'*\r?\n'
+BIN_TABLE_MATCHER = re.compile('(?:' + BIN_LINE_PATTERN + ')+')
+
 # Empty Timestamp
 # 2013/12/01 01:04:20.834\n
 IGNORE_EMPTY_PATTERN = TIMESTAMP + '\s*$'       # DCL controller timestamp
@@ -145,6 +166,47 @@ TEMP_HEX = 10
 # SENSOR_DATA_MATCHER produces the following groups.
 SENSOR_DATA_BIN = 8
 
+# The length of the DCL timestamp at the start of each line
+TIMESTAMP_LENGTH = len('2013/12/01 01:04:18.213')
+
+# The patterns which can match a line, by the first character after its DCL timestamp and spaces
+LINE_START_MATCHERS = {
+    '[': (DCL_LOG_MATCHER,),
+    'H': (SENSOR_HEAD_MATCHER,),
+    'T': (SENSOR_TEMP_MATCHER,),
+    'B': (IGNORE_HEADING_MATCHER,)
+}
+LINE_START_MATCHERS.update((digit, (SENSOR_TIME_MATCHER, SENSOR_DATA_MATCHER)) for digit in string.digits)
+
+# The number of values in a bin table line after the DCL timestamp
+BIN_LINE_VALUES = 11
+
+# The columns of the bin values, after the bin number
+DIR_MAG_COLUMNS = slice(1, 3)
+VELOCITY_COLUMNS = slice(3, 7)
+ECHO_COLUMNS = slice(7, 11)
+
+
+def match_line(matcher, line):
+    """
+    Match a line against a pattern, without running the pattern when the text
+    after the DCL timestamp starts with a character it cannot match
+    @param matcher: The compiled regex
+    @param line: The line
+    @return: The match, or None
+    """
+    if matcher not in LINE_START_MATCHERS.get(line[TIMESTAMP_LENGTH:].lstrip(' ')[:1], ()):
+        return None
+
+    return matcher.match(line)
+
+
+class BinColumn(list):
+    """
+    The values of a column of a bin table, already converted by the parser
+    """
+    pass
+
 
 #  encoding function for water_velocity and water_direction
 #  the adcp puts "--" in the output when these can't be computed
@@ -156,6 +218,30 @@ def float_or_dash(val):
         return float(val)
 
 
+def encode_float_or_dash_column(values):
+    """
+    Encode the direction or magnitude values of a bin table
+    @param values: BinColumn, or list of the value strings
+    @return: list of the float values, None for '--'
+    """
+    if isinstance(values, BinColumn):
+        return list(values)
+
+    return [float_or_dash(y) for y in values]
+
+
+def encode_int_column(values):
+    """
+    Encode the velocity or echo intensity values of a bin table
+    @param values: BinColumn, or list of the value strings
+    @return: list of the integer values
+    """
+    if isinstance(values, BinColumn):
+        return list(values)
+
+    return [int(y) for y in values]
+
+
 # The following is used for DclInstrumentDataParticle._build_parsed_values() and defined as below:
 # (parameter name, index into parsed_data[], encoding function)
 PD8_DATA_MAP = [
@@ -170,20 +256,47 @@ PD8_DATA_MAP = [
     ('bit_result_demod_1',                  15, int),
     ('bit_result_demod_0',                  16, int),
     ('bit_result_timing',                   17, int),
-    ('water_direction',                     18, lambda x: [float_or_dash(y) for y in x]),
-    ('water_velocity',                      19, lambda x: [float_or_dash(y) for y in x]),
-    ('water_velocity_east',                 20, lambda x: [int(y) for y in x]),
-    ('water_velocity_north',                21, lambda x: [int(y) for y in x]),
-    ('water_velocity_up',                   22, lambda x: [int(y) for y in x]),
-    ('error_velocity',                      23, lambda x: [int(y) for y in x]),
-    ('echo_intensity_beam1',                24, lambda x: [int(y) for y in x]),
-    ('echo_intensity_beam2',                25, lambda x: [int(y) for y in x]),
-    ('echo_intensity_beam3',                26, lambda x: [int(y) for y in x]),
-    ('echo_intensity_beam4',                27, lambda x: [int(y) for y in x]),
+    ('water_direction',                     18, encode_float_or_dash_column),
+    ('water_velocity',                      19, encode_float_or_dash_column),
+    ('water_velocity_east',                 20, encode_int_column),
+    ('water_velocity_north',                21, encode_int_column),
+    ('water_velocity_up',                   22, encode_int_column),
+    ('error_velocity',                      23, encode_int_column),
+    ('echo_intensity_beam1',                24, encode_int_column),
+    ('echo_intensity_beam2',                25, encode_int_column),
+    ('echo_intensity_beam3',                26, encode_int_column),
+    ('echo_intensity_beam4',                27, encode_int_column),
     ('num_cells',                           28, int)
 ]
 
 
+def decode_bin_block(block):
+    """
+    Convert the values of a block of well formed bin table lines together
+    @param block: The text of the lines, each matching BIN_LINE_PATTERN
+    @return: 2-D float array of the bin values with a row per line and NaN for
+             '--', or None if the values could not all be converted
+    """
+    lines = block.split('\n')
+    text = '\n'.join([line[TIMESTAMP_LENGTH:] for line in lines]).replace('--', 'nan')
+    values = numpy.fromstring(text, dtype=numpy.float64, sep=' ')
+
+    # the block ends with a newline, so the last of the lines is empty
+    if len(values) != (len(lines) - 1) * BIN_LINE_VALUES:
+        return None
+
+    return values.reshape(-1, BIN_LINE_VALUES)
+
+
+def split_bin_block(block):
+    """
+    Split a block of well formed bin table lines into the bin values of each line
+    @param block: The text of the lines, each matching BIN_LINE_PATTERN
+    @return: list of the tuple of bin value strings of each line, as matched by SENSOR_DATA_MATCHER
+    """
+    return [tuple(line.split()[2:]) for line in block.splitlines()]
+
+
 class DataParticleType(BaseEnum):
     ADCPT_ACFGM_PD8_DCL_INSTRUMENT = 'adcpt_acfgm_pd8_dcl_instrument'
     ADCPT_ACFGM_PD8_DCL_INSTRUMENT_RECOVERED = 'adcpt_acfgm_pd8_dcl_instrument_recovered'
@@ -194,6 +307,12 @@ class AdcptAcfgmPd8InstrumentDataParticle(DclInstrumentDataParticle):
     Class for generating the adcpt_acfgm_dcl_pd8 instrument particle.
     """
 
+    # 2-D arrays of the bin table with a row per bin, or None if the table could
+    # not be converted together: the E/W, N/S, vertical and error velocities
+    # and the echo intensities of beams 1-4
+    velocities = None
+    echo_intensities = None
+
     def __init__(self, raw_data, *args, **kwargs):
         super(AdcptAcfgmPd8InstrumentDataParticle, self).__init__(
             raw_data, PD8_DATA_MAP, *args, **kwargs)
@@ -227,27 +346,27 @@ class AdcptAcfgmPd8Parser(SimpleParser):
         Open and read the file and parser the data within, and at the end of
         this method self._record_buffer will be filled with all the particles in the file.
         """
+        reader = LineReader(self._stream_handle.read())
 
         while True:  # loop through file looking for beginning of an adcp data burst
 
-            line = self._stream_handle.readline()  # READ NEXT LINE
+            line = reader.readline()  # READ NEXT LINE
 
             if line == "":
                 break
 
             # Check if this is a DCL Log message
-            dcl_log_match = DCL_LOG_MATCHER.match(line)
+            dcl_log_match = match_line(DCL_LOG_MATCHER, line)
             if dcl_log_match:
                 # verified to be a regular DCL Log. Discard & move to next line.
                 continue  # skip to next line in outer loop
 
-            line_match = SENSOR_TIME_MATCHER.match(line)
+            line_match = match_line(SENSOR_TIME_MATCHER, line)
             if line_match is None:
                 self.recov_exception_callback("Expected starting DCL Timestamp, received: %r" % line)
                 continue  # skip to next line in outer loop
 
             matches = line_match.groups()
-            sensor_data_list = []
 
             # Save timestamp from the DCL controller log and it's parts
             parsed_data = list(matches[SENSOR_GROUP_TIMESTAMP:SENSOR_TIME_SENSOR_DATE_TIME])
@@ -256,9 +375,9 @@ class AdcptAcfgmPd8Parser(SimpleParser):
             parsed_data.append(matches[SENSOR_TIME_SENSOR_DATE_TIME])
             parsed_data.append(matches[SENSOR_TIME_ENSEMBLE])
 
-            line = self._stream_handle.readline()  # READ NEXT LINE
+            line = reader.readline()  # READ NEXT LINE
 
-            line_match = SENSOR_HEAD_MATCHER.match(line)
+            line_match = match_line(SENSOR_HEAD_MATCHER, line)
             if line_match is None:
                 self.recov_exception_callback("Expecting Heading, Pitch, & Roll data, received: %r" % line)
                 continue  # skip to next line in outer loop
@@ -269,9 +388,9 @@ class AdcptAcfgmPd8Parser(SimpleParser):
             parsed_data.append(matches[HEAD_PITCH])
             parsed_data.append(matches[HEAD_ROLL])
 
-            line = self._stream_handle.readline()  # READ NEXT LINE
+            line = reader.readline()  # READ NEXT LINE
 
-            line_match = SENSOR_TEMP_MATCHER.match(line)
+            line_match = match_line(SENSOR_TEMP_MATCHER, line)
             if line_match is None:
                 self.recov_exception_callback("Expecting Temperature, Speed of Sound, & BIT data,"
                                               " received: %r" % line)
@@ -287,39 +406,86 @@ class AdcptAcfgmPd8Parser(SimpleParser):
             parsed_data.append(binary_string[4])
             parsed_data.append(binary_string[6])
 
-            line = self._stream_handle.readline()  # READ NEXT LINE
+            line = reader.readline()  # READ NEXT LINE
 
-            line_match = IGNORE_HEADING_MATCHER.match(line)
+            line_match = match_line(IGNORE_HEADING_MATCHER, line)
             if line_match is None:
                 self.recov_exception_callback("Expecting Header, received: %s" % line)
                 continue  # skip to next line in outer loop
 
-            # Start looking for sensor data
-            while True:  # loop through all the velocity and echo data records
+            # Read all the velocity and echo data records, up to the line after them
+            parts, line = self.read_bin_table(reader)
+
+            try:
+                velocities = echo_intensities = None
+
+                # A table of well formed lines is converted together
+                table = None
+                if len(parts) == 1 and not isinstance(parts[0], tuple):
+                    table = decode_bin_block(parts[0])
 
-                line = self._stream_handle.readline()  # READ NEXT LINE
+                if table is not None:
+                    parsed_data.extend(BinColumn(None if value != value else value for value in column)
+                                       for column in table[:, DIR_MAG_COLUMNS].T.tolist())
+
+                    velocities = table[:, VELOCITY_COLUMNS].astype(numpy.int64)
+                    echo_intensities = table[:, ECHO_COLUMNS].astype(numpy.int64)
+                    parsed_data.extend(BinColumn(column) for column in velocities.T.tolist())
+                    parsed_data.extend(BinColumn(column) for column in echo_intensities.T.tolist())
+
+                    # Get number of cells
+                    parsed_data.append(int(table[-1, 0]))
 
-                line_match = SENSOR_DATA_MATCHER.match(line)
-                if line_match is not None:
-                    # Collect velocity data sextets and echo power quartets
-                    sensor_data_list.append(line_match.groups()[SENSOR_DATA_BIN:])
                 else:
-                    try:
-                        # Transpose velocity data sextets and echo power quartets
-                        np_array = numpy.array(sensor_data_list)
-                        parsed_data.extend(np_array.transpose().tolist()[1:])
-
-                        # Get number of cells
-                        parsed_data.append(sensor_data_list[-1][0])
-                        particle = self._extract_sample(self._particle_class,
-                                                        None,
-                                                        parsed_data,
-                                                        None)
-                        if particle is not None:
-                            self._record_buffer.append(particle)
-
-                    except Exception:
-                        self.recov_exception_callback("Error parsing sensor data row,"
-                                                      " received: %s" % line)
-
-                    break  # exit inner loop once a particle has been produced
\ No newline at end of file
+                    sensor_data_list = []
+                    for part in parts:
+                        if isinstance(part, tuple):
+                            sensor_data_list.append(part)
+                        else:
+                            sensor_data_list.extend(split_bin_block(part))
+
+                    # Transpose velocity data sextets and echo power quartets
+                    np_array = numpy.array(sensor_data_list)
+                    parsed_data.extend(np_array.transpose().tolist()[1:])
+
+                    # Get number of cells
+                    parsed_data.append(sensor_data_list[-1][0])
+
+                particle = self._extract_sample(self._particle_class,
+                                                None,
+                                                parsed_data,
+                                                None)
+                if particle is not None:
+                    particle.velocities = velocities
+                    particle.echo_intensities = echo_intensities
+                    self._record_buffer.append(particle)
+
+            except Exception:
+                self.recov_exception_callback("Error parsing sensor data row,"
+                                              " received: %s" % line)
+
+    def read_bin_table(self, reader):
+        """
+        Read the bin table of an ensemble, up to the first line which is not a
+        sensor data record.  Blocks of well formed lines are read together.
+        @param reader: LineReader at the first line of the table
+        @return: (list of the parts of the table, the line after the table).  A part
+                 is the text of a block of well formed lines, or the tuple of bin
+                 values of a line matched on its own.
+        """
+        parts = []
+
+        while True:
+            block_match = BIN_TABLE_MATCHER.match(reader.text, reader.offset)
+            if block_match is not None:
+                parts.append(block_match.group())
+                reader.offset = block_match.end()
+
+            line = reader.readline()  # READ NEXT LINE
+
+            line_match = match_line(SENSOR_DATA_MATCHER, line)
+            if line_match is None:
+                return parts, line
+
+            # Collect velocity data sextets and echo power quartets
+            parts.append(line_match.groups()[SENSOR_DATA_BIN:])
\ No newline at end of file
@@ -11,11 +11,15 @@ initial release
 __author__ = 'Jeff Roy'
 __license__ = 'Apache 2.0'
 
+import string
+
 import ntplib
+import numpy
 
 from mi.dataset.dataset_parser import SimpleParser
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey, DataParticleValue
+from mi.core.time import NTP_UNIX_EPOCH_DELTA
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -25,26 +29,133 @@ from mi.core.exceptions import RecoverableSampleException, \
 
 EARLIEST_TIMESTAMP = 3471292800.0  # Jan 1, 2010 in NTP float format
 
+# The characters of the milliseconds which are converted in bulk
+MILLISECOND_CHARACTERS = ' +-' + string.digits
+
 
-def compute_timestamp(parts):
+class TimestampFields(object):
+    """
+    Computes the timestamp of a record from its mission epoch and, optionally,
+    the milliseconds held in the last three digits of a mission time field.
+    Instances are used as the compute_timestamp item of the auv_message_map
+    passed to the AuvCommonParser constructor, and can also compute the
+    timestamps of many records at once.
     """
-    This method is required as part of the auv_message_map passed to the
-    AuvCommonParser constructor
-    This version uses mission_epoch and mission time from parts items 1 and 4
-    Other instruments may need a different mehtod.
 
-    :param parts: a list of the individual parts of an input record
-    :return: a timestamp in the float64 NTP format.
+    def __init__(self, epoch_index, time_index=None):
+        """
+        :param epoch_index: the index of the mission epoch in the record parts
+        :param time_index: optional index of the mission time in the record parts
+        """
+        self.epoch_index = epoch_index
+        self.time_index = time_index
+
+    def __call__(self, parts):
+        """
+        :param parts: a list of the individual parts of an input record
+        :return: a timestamp in the float64 NTP format.
+        """
+        unix_time = float(parts[self.epoch_index])
+
+        if self.time_index is not None:
+            milliseconds = int(parts[self.time_index][-3:])/1000.0
+            unix_time += milliseconds
+
+        return ntplib.system_to_ntp_time(unix_time)
+
+    def compute_timestamps(self, records):
+        """
+        Compute the timestamps of many records, giving the same values as
+        computing them one at a time
+        :param records: a list of the parts lists of the records
+        :return: numpy array of timestamps in the float64 NTP format.
+        :raises ValueError: if any timestamp cannot be computed
+        """
+        unix_times = numpy.array([parts[self.epoch_index] for parts in records], dtype=numpy.float64)
+
+        if self.time_index is not None:
+            digits = [parts[self.time_index][-3:] for parts in records]
+
+            # numpy takes some strings int() does not, so only signs and digits are converted here
+            if ''.join(digits).translate(None, MILLISECOND_CHARACTERS):
+                raise ValueError('Mission time is not an integer')
+
+            unix_times += numpy.array(digits, dtype=numpy.int64)/1000.0
+
+        return unix_times + NTP_UNIX_EPOCH_DELTA
+
+
+# This version uses mission_epoch and mission time from parts items 1 and 4
+# Other instruments may need a different method.
+compute_timestamp = TimestampFields(1, 4)
+
+
+class AuvMessageBatch(object):
+    """
+    The records of a file for one message type, so their timestamps and fields
+    can be converted together
     """
-    mission_epoch = parts[1]
-    mission_time = parts[4]
 
-    milliseconds = int(mission_time[-3:])/1000.0
+    # numpy types of the encoding functions converted in bulk
+    COLUMN_TYPES = {
+        float: numpy.float64,
+        int: numpy.int64
+    }
 
-    unix_time = float(mission_epoch) + milliseconds
-    timestamp = ntplib.system_to_ntp_time(unix_time)
+    def __init__(self, message_id, field_count, compute_timestamp, particle_class):
+        self.message_id = message_id
+        self.field_count = field_count
+        self.compute_timestamp = compute_timestamp
+        self.particle_class = particle_class
+        self.records = []
 
-    return timestamp
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, parts):
+        """
+        Add a record to the batch
+        :param parts: the individual parts of the record
+        """
+        self.records.append(parts)
+
+    def timestamps(self):
+        """
+        Compute the timestamps of all the records in the batch
+        :return: list of timestamps in the float64 NTP format, or None if they
+                 cannot all be computed together
+        """
+        if not self.records:
+            return []
+
+        compute_timestamps = getattr(self.compute_timestamp, 'compute_timestamps', None)
+        if compute_timestamps is None:
+            return None
+
+        try:
+            return compute_timestamps(self.records).tolist()
+        except (ValueError, TypeError, IndexError) as e:
+            log.debug('Computing %s timestamps one record at a time: %s', self.message_id, e)
+            return None
+
+    def column(self, name):
+        """
+        Get the values of one particle parameter for all the records
+        :param name: the parameter name
+        :return: numpy array of the parameter values
+        :raises KeyError: if the particle class has no such parameter
+        :raises ValueError: if a value cannot be converted
+        """
+        for parameter_name, index, function in self.particle_class._auv_param_map:
+            if parameter_name == name:
+                values = [parts[index] for parts in self.records]
+
+                if function in self.COLUMN_TYPES:
+                    return numpy.array(values, dtype=self.COLUMN_TYPES[function])
+
+                return numpy.array([function(value) for value in values])
+
+        raise KeyError(name)
 
 
 class AuvCommonParticle(DataParticle):
@@ -113,22 +224,46 @@ class AuvCommonParser(SimpleParser):
         """
 
         self._auv_message_map = auv_message_map
+
+        # the positions in the map of the entries for each message id, in map order
+        self._dispatch_table = {}
+        for position, entry in enumerate(auv_message_map):
+            self._dispatch_table.setdefault(entry[0], []).append(position)
+
+        self._message_batches = []
+
         super(AuvCommonParser, self).__init__({},
                                               stream_handle,
                                               exception_callback)
 
+    def get_message_batches(self):
+        """
+        Get the records of the parsed file grouped by message type
+        :return: list of AuvMessageBatch, in the order of the message map
+        """
+        return self._message_batches
+
     def parse_file(self):
         """
-        Entry point into parsing the file, loop over each line and interpret it until the entire file is parsed
+        Entry point into parsing the file, loop over each line and interpret it until the entire file is parsed.
+        The records of each message type are gathered into a batch so their timestamps are computed together,
+        then the particles are extracted in file order.
         """
 
+        batches = [AuvMessageBatch(*entry) for entry in self._auv_message_map]
+
+        # the records and field count errors of the file, in order
+        events = []
+
         for line in self._stream_handle:
 
             line = line.strip()  # remove the line terminator
             line = line.replace('"', '')  # remove the quote characters from string fields
 
-            for message_id, field_count, compute_timestamp, particle_class in self._auv_message_map:
-                # Process records of interest according to map values
+            # only the map entries for the message id of the line can match it
+            for position in self._dispatch_table.get(line.split(',', 1)[0], ()):
+                batch = batches[position]
+                message_id, field_count = batch.message_id, batch.field_count
 
                 # split it up into parts, limit number of splits because fault messages
                 # may contain commas in the last field.
@@ -138,17 +273,36 @@ class AuvCommonParser(SimpleParser):
                     if len(parts) != field_count:
                         msg = 'Expected %d fields but received %d for message id %s' \
                               % (field_count, len(parts), message_id)
-                        log.warn(msg)
-                        self._exception_callback(RecoverableSampleException(msg))
+                        events.append((None, msg))
                     else:
-                        try:
-                            timestamp = compute_timestamp(parts)
-                            if timestamp > EARLIEST_TIMESTAMP:  # Check to make sure the timestamp is OK
+                        events.append((position, len(batch)))
+                        batch.append(parts)
+
+        self._message_batches = batches
+        timestamps = [batch.timestamps() for batch in batches]
+
+        for position, item in events:
+
+            if position is None:
+                log.warn(item)
+                self._exception_callback(RecoverableSampleException(item))
+                continue
+
+            batch = batches[position]
+            parts = batch.records[item]
+            batch_timestamps = timestamps[position]
+
+            try:
+                if batch_timestamps is None:
+                    timestamp = batch.compute_timestamp(parts)
+                else:
+                    timestamp = batch_timestamps[item]
 
-                                particle = self._extract_sample(particle_class, None, parts, timestamp)
-                                self._record_buffer.append(particle)
-                        except Exception:
-                            msg = 'Could not compute timestamp'
-                            log.warn(msg)
-                            self._exception_callback(RecoverableSampleException(msg))
+                if timestamp > EARLIEST_TIMESTAMP:  # Check to make sure the timestamp is OK
 
+                    particle = self._extract_sample(batch.particle_class, None, parts, timestamp)
+                    self._record_buffer.append(particle)
+            except Exception:
+                msg = 'Could not compute timestamp'
+                log.warn(msg)
+                self._exception_callback(RecoverableSampleException(msg))
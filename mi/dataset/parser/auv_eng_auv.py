@@ -11,14 +11,13 @@ initial release
 __author__ = 'Jeff Roy'
 __license__ = 'Apache 2.0'
 
-import ntplib
-
 from mi.core.log import get_logger
 log = get_logger()
 
 from mi.dataset.parser.auv_common import \
     AuvCommonParticle, \
-    AuvCommonParser
+    AuvCommonParser, \
+    TimestampFields
 
 
 # The structure below is a list of tuples
@@ -451,92 +450,82 @@ def compute_timestamp_from_parts(parts, epoch_id, time_id=None):
     :param time_id: optional parameter of time field
     :return: a timestamp in the float64 NTP format.
     """
-    unix_time = float(parts[epoch_id])
-
-    if time_id is not None:
-
-        mission_time = parts[time_id]
-        milliseconds = int(mission_time[-3:])/1000.0
-        unix_time += milliseconds
-
-    timestamp = ntplib.system_to_ntp_time(unix_time)
-
-    return timestamp
+    return TimestampFields(epoch_id, time_id)(parts)
 
 
 AUV_ENG_AUV_TELEMETERED_MESSAGE_MAP = [(AUV_ENG_AUV_IMAGENEX_852_ID,
                                         AUV_ENG_AUV_IMAGENEX_852_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, 4),
+                                        TimestampFields(1, 4),
                                         AuvEngAuvImagenex852TelemParticle),
                                        (AUV_ENG_AUV_DIGITAL_USBL_ID,
                                         AUV_ENG_AUV_DIGITAL_USBL_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, 22),
+                                        TimestampFields(1, 22),
                                         AuvEngAuvDigitalUsblTelemParticle),
                                        (AUV_ENG_AUV_TRI_FIN_MOTOR_ID,
                                         AUV_ENG_AUV_TRI_FIN_MOTOR_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, None),
+                                        TimestampFields(1),
                                         AuvEngAuvTriFinMotorTelemParticle),
                                        (AUV_ENG_AUV_EMERGENCY_BOARD_ID,
                                         AUV_ENG_AUV_EMERGENCY_BOARD_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, None),
+                                        TimestampFields(1),
                                         AuvEngAuvEmergencyBoardTelemParticle),
                                        (AUV_ENG_AUV_OIL_COMPENSATOR_ID,
                                         AUV_ENG_AUV_OIL_COMPENSATOR_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, 7),
+                                        TimestampFields(1, 7),
                                         AuvEngAuvOilCompensatorTelemParticle),
                                        (AUV_ENG_AUV_SMART_BATTERY_ID,
                                         AUV_ENG_AUV_SMART_BATTERY_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 16, None),
+                                        TimestampFields(16),
                                         AuvEngAuvSmartBatteryTelemParticle),
                                        (AUV_ENG_AUV_DIGITAL_TX_BOARD_ID,
                                         AUV_ENG_AUV_DIGITAL_TX_BOARD_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, 20),
+                                        TimestampFields(1, 20),
                                         AuvEngAuvDigitalTxBoardTelemParticle),
                                        (AUV_ENG_AUV_FAULT_MESSAGE_ID,
                                         AUV_ENG_AUV_FAULT_MESSAGE_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 3, None),
+                                        TimestampFields(3),
                                         AuvEngAuvFaultMessageTelemParticle),
                                        (AUV_ENG_AUV_STATE_ID,
                                         AUV_ENG_AUV_STATE_COUNT,
-                                        lambda parts: compute_timestamp_from_parts(parts, 1, 19),
+                                        TimestampFields(1, 19),
                                         AuvEngAuvStateTelemParticle)]
 
 
 AUV_ENG_AUV_RECOVERED_MESSAGE_MAP = [(AUV_ENG_AUV_IMAGENEX_852_ID,
                                       AUV_ENG_AUV_IMAGENEX_852_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, 4),
+                                      TimestampFields(1, 4),
                                       AuvEngAuvImagenex852RecovParticle),
                                      (AUV_ENG_AUV_DIGITAL_USBL_ID,
                                       AUV_ENG_AUV_DIGITAL_USBL_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, 22),
+                                      TimestampFields(1, 22),
                                       AuvEngAuvDigitalUsblRecovParticle),
                                      (AUV_ENG_AUV_TRI_FIN_MOTOR_ID,
                                       AUV_ENG_AUV_TRI_FIN_MOTOR_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, None),
+                                      TimestampFields(1),
                                       AuvEngAuvTriFinMotorRecovParticle),
                                      (AUV_ENG_AUV_EMERGENCY_BOARD_ID,
                                       AUV_ENG_AUV_EMERGENCY_BOARD_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, None),
+                                      TimestampFields(1),
                                       AuvEngAuvEmergencyBoardRecovParticle),
                                      (AUV_ENG_AUV_OIL_COMPENSATOR_ID,
                                       AUV_ENG_AUV_OIL_COMPENSATOR_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, 7),
+                                      TimestampFields(1, 7),
                                       AuvEngAuvOilCompensatorRecovParticle),
                                      (AUV_ENG_AUV_SMART_BATTERY_ID,
                                       AUV_ENG_AUV_SMART_BATTERY_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 16, None),
+                                      TimestampFields(16),
                                       AuvEngAuvSmartBatteryRecovParticle),
                                      (AUV_ENG_AUV_DIGITAL_TX_BOARD_ID,
                                       AUV_ENG_AUV_DIGITAL_TX_BOARD_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, 20),
+                                      TimestampFields(1, 20),
                                       AuvEngAuvDigitalTxBoardRecovParticle),
                                      (AUV_ENG_AUV_FAULT_MESSAGE_ID,
                                       AUV_ENG_AUV_FAULT_MESSAGE_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 3, None),
+                                      TimestampFields(3),
                                       AuvEngAuvFaultMessageRecovParticle),
                                      (AUV_ENG_AUV_STATE_ID,
                                       AUV_ENG_AUV_STATE_COUNT,
-                                      lambda parts: compute_timestamp_from_parts(parts, 1, 19),
+                                      TimestampFields(1, 19),
                                       AuvEngAuvStateRecovParticle)]
 
 
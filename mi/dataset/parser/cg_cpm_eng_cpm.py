@@ -11,7 +11,8 @@ import copy
 import re
 
 from mi.core.log import get_logger
-from mi.core.exceptions import SampleException, UnexpectedDataException
+from mi.core.exceptions import SampleException, UnexpectedDataException, \
+    ConfigurationException
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey, \
     DataParticleValue
@@ -19,6 +20,7 @@ from mi.dataset.dataset_parser import SimpleParser, DataSetDriverConfigKeys
 from mi.dataset.parser.common_regexes import END_OF_LINE_REGEX, \
     DATE_YYYY_MM_DD_REGEX, TIME_HR_MIN_SEC_MSEC_REGEX, FLOAT_REGEX, \
     TIME_HR_MIN_SEC_REGEX, INT_REGEX, ASCII_HEX_CHAR_REGEX
+from mi.dataset.parser.key_dispatch import KeyDispatcher
 
 log = get_logger()
 
@@ -1435,6 +1437,7 @@ PARTICLE_DATA_PARAM_VALUE_INDEX = 1
 
 # The following is a list of regular expressions for lines in the file to ignore.
 IGNORE_REGEX_LIST = [r'CI_SYS_STAT.status=.*', 'CI_SYS_STAT.last_update=.*', END_OF_LINE_REGEX]
+IGNORE_MATCHERS = [re.compile(regex) for regex in IGNORE_REGEX_LIST]
 
 
 class CgCpmEngCpmDataParticle(DataParticle):
@@ -1578,7 +1581,17 @@ class CgCpmEngCpmTelemeteredDataParticle(CgCpmEngCpmDataParticle):
     _data_particle_type = CgCpmEngCpmDataParticleType.CG_CPM_ENG_CPM_TELEMETERED
 
 
+# The particle classes which may be named in the parser configuration
+PARTICLE_CLASSES = dict((particle_class.__name__, particle_class)
+                        for particle_class in (CgCpmEngCpmRecoveredDataParticle,
+                                               CgCpmEngCpmTelemeteredDataParticle))
+
+
 class CgCpmEngCpmParser(SimpleParser):
+
+    # shared by all the parsers, created on first use
+    _dispatcher = None
+
     def __init__(self,
                  config,
                  stream_handle,
@@ -1590,7 +1603,24 @@ class CgCpmEngCpmParser(SimpleParser):
                                                 stream_handle,
                                                 exception_callback)
 
-        self._particle_class = eval(config[DataSetDriverConfigKeys.PARTICLE_CLASS])
+        particle_class_name = config.get(DataSetDriverConfigKeys.PARTICLE_CLASS)
+        if particle_class_name not in PARTICLE_CLASSES:
+            message = "Invalid cg_cpm_eng_cpm particle class %r" % particle_class_name
+            log.error(message)
+            raise ConfigurationException(message)
+
+        self._particle_class = PARTICLE_CLASSES[particle_class_name]
+
+    @classmethod
+    def _get_dispatcher(cls):
+        """
+        Get the dispatcher of lines to the param regex rules, compiling the rules
+        the first time it is needed
+        """
+        if cls._dispatcher is None:
+            cls._dispatcher = KeyDispatcher([regex for regex, _, _ in PARAM_REGEX_RULES_AND_VALUES])
+
+        return cls._dispatcher
 
     def parse_file(self):
         """
@@ -1603,6 +1633,11 @@ class CgCpmEngCpmParser(SimpleParser):
         # Initialize a working copy of the PARAM_REGEX_RULES_AND_VALUES which we will modify
         param_regex_rules_and_values = copy.deepcopy(PARAM_REGEX_RULES_AND_VALUES)
 
+        # The indices of the entries already matched which are expected only once
+        dropped_indices = set()
+
+        dispatcher = self._get_dispatcher()
+
         # Read the first line in the file
         line = self._stream_handle.readline()
 
@@ -1613,18 +1648,18 @@ class CgCpmEngCpmParser(SimpleParser):
 
             match_found = False
 
-            # Init the index at -1, since we will increment it on entry into the loop
-            index = -1
+            # Iterate through the entries of the regex, param rules and values and expected instance
+            # info which can match the key at the start of the line.  Cases where the expected number
+            # of instances is ONE will result in dropping the entry to eliminate unnecessary regex
+            # match checking.
+            for index in dispatcher.candidates(line):
 
-            # Iterate through the list containing the regex, param rules and values and expected instance
-            # info.  The list will be modified within the loop. Cases where the expected number of instances 
-            # is ONE will result in popping the item off the list to eliminate unnecessary regex match checking.
-            for regex, param_rules_and_values, expected_instances in \
-                    param_regex_rules_and_values:
+                if index in dropped_indices:
+                    continue
 
-                index += 1
+                regex, param_rules_and_values, expected_instances = param_regex_rules_and_values[index]
 
-                match = re.match(regex, line)
+                match = dispatcher.matchers[index].match(line)
                 if match:
 
                     # Set a flag indicating we found a match
@@ -1704,8 +1739,8 @@ class CgCpmEngCpmParser(SimpleParser):
                     if expected_instances == ExpectedInstancesEnum.ONE:
 
                         log.trace("Dropping regex, rules and value entry")
-                        # Done with that tuple, remove it
-                        param_regex_rules_and_values.pop(index)
+                        # Done with that tuple, drop it
+                        dropped_indices.add(index)
 
                     # Exit the loop.  We're done iterating through the param_regex_rules_and_values
                     # for this line in the file.
@@ -1714,9 +1749,9 @@ class CgCpmEngCpmParser(SimpleParser):
             # If we did not find a match, let's iterate through the ignore regex list
             if not match_found:
 
-                for regex in IGNORE_REGEX_LIST:
+                for matcher in IGNORE_MATCHERS:
 
-                    if re.match(regex, line):
+                    if matcher.match(line):
                         match_found = True
                         log.trace("Expected data to ignore: %r", line)
 
@@ -1731,8 +1766,9 @@ class CgCpmEngCpmParser(SimpleParser):
 
         # fill in any missing expected values so long as one value was present
         if param_rules_and_values_dict:
-            for regex, param_rules_and_values, expected_instances in param_regex_rules_and_values:
-                if expected_instances == ExpectedInstancesEnum.ONE:
+            for index, (regex, param_rules_and_values, expected_instances) in \
+                    enumerate(param_regex_rules_and_values):
+                if expected_instances == ExpectedInstancesEnum.ONE and index not in dropped_indices:
                     for param_rule_and_value in param_rules_and_values:
                         param_name, encoding, value = param_rule_and_value
                         param_rules_and_values_dict[param_name] = (encoding, value)
@@ -23,6 +23,7 @@ from mi.dataset.parser.common_regexes import END_OF_LINE_REGEX, \
     TIME_HR_MIN_SEC_REGEX, FLOAT_REGEX, ASCII_HEX_CHAR_REGEX
 
 from mi.dataset.parser import utilities
+from mi.dataset.parser.line_classifier import LineClassifier
 
 
 class CgDclEngDclParticleClassTypes(BaseEnum):
@@ -725,6 +726,32 @@ DLOG_AARM_REGEX = r'(?P<' + CgDclEngDclParserDataParticleKey.HEADER_TIMESTAMP +
 IGNORE_REGEX = r'(' + END_OF_LINE_REGEX + '|' + DATE_YYYY_MM_DD_REGEX + '\s+' + \
                TIME_HR_MIN_SEC_MSEC_REGEX + '\s+MSG\s+D_CTL\s+.*' + END_OF_LINE_REGEX + '?)'
 
+# Log types, in the order they are checked
+MSG_LOG_TYPE = 'MSG'
+ERR_ALM_WNG_LOG_TYPE = 'ERR, ALM or WNG'
+DAT_LOG_TYPE = 'DAT'
+
+LOG_TYPE_CLASSIFIER = LineClassifier([(MSG_LOG_TYPE, re.compile(MSG_LOG_TYPE_REGEX)),
+                                      (ERR_ALM_WNG_LOG_TYPE, re.compile(ERR_ALM_WNG_LOG_TYPE_REGEX)),
+                                      (DAT_LOG_TYPE, re.compile(DAT_LOG_TYPE_REGEX))])
+
+# The records of each log type, in the order they are checked, keyed by particle class type
+RECORD_CLASSIFIERS = {
+    MSG_LOG_TYPE: LineClassifier([
+        (CgDclEngDclParticleClassTypes.MSG_COUNTS_PARTICLE_CLASS, re.compile(MSG_COUNTS_REGEX)),
+        (CgDclEngDclParticleClassTypes.CPU_UPTIME_PARTICLE_CLASS, re.compile(CPU_UPTIME_REGEX))]),
+    ERR_ALM_WNG_LOG_TYPE: LineClassifier([
+        (CgDclEngDclParticleClassTypes.ERROR_PARTICLE_CLASS, re.compile(ERROR_REGEX))]),
+    DAT_LOG_TYPE: LineClassifier([
+        (CgDclEngDclParticleClassTypes.GPS_PARTICLE_CLASS, re.compile(GPS_REGEX)),
+        (CgDclEngDclParticleClassTypes.PPS_PARTICLE_CLASS, re.compile(PPS_REGEX)),
+        (CgDclEngDclParticleClassTypes.SUPERV_PARTICLE_CLASS, re.compile(SUPERV_REGEX)),
+        (CgDclEngDclParticleClassTypes.DLOG_MGR_PARTICLE_CLASS, re.compile(DLOG_MGR_REGEX)),
+        (CgDclEngDclParticleClassTypes.DLOG_STATUS_PARTICLE_CLASS, re.compile(DLOG_STATUS_REGEX)),
+        (CgDclEngDclParticleClassTypes.STATUS_PARTICLE_CLASS, re.compile(D_STATUS_NTP_REGEX)),
+        (CgDclEngDclParticleClassTypes.DLOG_AARM_PARTICLE_CLASS, re.compile(DLOG_AARM_REGEX))])
+}
+
 
 class CgDclEngDclDataParticle(DataParticle):
     """
@@ -1035,26 +1062,8 @@ class CgDclEngDclParser(SimpleParser):
 
         try:
             particle_classes_dict = config[DataSetDriverConfigKeys.PARTICLE_CLASSES_DICT]
-            self._msg_counts_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.MSG_COUNTS_PARTICLE_CLASS]
-            self._cpu_uptime_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.CPU_UPTIME_PARTICLE_CLASS]
-            self._error_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.ERROR_PARTICLE_CLASS]
-            self._gps_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.GPS_PARTICLE_CLASS]
-            self._pps_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.PPS_PARTICLE_CLASS]
-            self._superv_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.SUPERV_PARTICLE_CLASS]
-            self._dlog_mgr_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.DLOG_MGR_PARTICLE_CLASS]
-            self._dlog_status_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.DLOG_STATUS_PARTICLE_CLASS]
-            self._status_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.STATUS_PARTICLE_CLASS]
-            self._dlog_aarm_particle_class = particle_classes_dict[
-                CgDclEngDclParticleClassTypes.DLOG_AARM_PARTICLE_CLASS]
+            self._particle_classes = dict((class_type, particle_classes_dict[class_type])
+                                          for class_type in CgDclEngDclParticleClassTypes.list())
 
         except (KeyError, AttributeError):
             message = "Invalid cg_dcl_eng_dcl configuration parameters."
@@ -1077,117 +1086,23 @@ class CgDclEngDclParser(SimpleParser):
 
             log.trace("Line: %s", line)
 
-            # Let's first see if we have a MSG log message
-            if re.match(MSG_LOG_TYPE_REGEX, line):
-
-                msg_counts_match = re.match(MSG_COUNTS_REGEX, line)
-                cpu_uptime_match = re.match(CPU_UPTIME_REGEX, line)
-
-                if msg_counts_match is not None:
-                    log.trace("msg_counts_match: %s", msg_counts_match.groupdict())
-
-                    sample = self._extract_sample(self._msg_counts_particle_class,
-                                                  None,
-                                                  msg_counts_match.groupdict(),
-                                                  None)
-
-                elif cpu_uptime_match is not None:
-                    log.trace("cpu_uptime_match: %s", cpu_uptime_match.groupdict())
-
-                    sample = self._extract_sample(self._cpu_uptime_particle_class,
-                                                  None,
-                                                  cpu_uptime_match.groupdict(),
-                                                  None)
-
-                else:
-                    message = "Invalid MSG Log record, Line: " + line
-                    log.error(message)
-                    self._exception_callback(UnexpectedDataException(message))
-
-            elif re.match(ERR_ALM_WNG_LOG_TYPE_REGEX, line):
-
-                error_match = re.match(ERROR_REGEX, line)
-
-                if error_match is not None:
-                    log.trace("error_match: %s", error_match.groupdict())
-
-                    sample = self._extract_sample(self._error_particle_class,
-                                                  None,
-                                                  error_match.groupdict(),
-                                                  None)
-                else:
-                    message = "Invalid ERR, ALM or WNG Log record, Line: " + line
-                    log.error(message)
-                    self._exception_callback(UnexpectedDataException(message))
-
-            elif re.match(DAT_LOG_TYPE_REGEX, line):
-
-                gps_match = re.match(GPS_REGEX, line)
-                pps_match =  re.match(PPS_REGEX, line)
-                superv_match =  re.match(SUPERV_REGEX, line)
-                dlog_mgr_match = re.match(DLOG_MGR_REGEX, line)
-                dlog_status_match = re.match(DLOG_STATUS_REGEX, line)
-                d_status_ntp_match = re.match(D_STATUS_NTP_REGEX, line)
-                dlog_aarm_match = re.match(DLOG_AARM_REGEX, line)
-
-                if gps_match is not None:
-                    log.trace("gps_match: %s", gps_match.groupdict())
-
-                    sample = self._extract_sample(self._gps_particle_class,
-                                                  None,
-                                                  gps_match.groupdict(),
-                                                  None)
-
-                elif pps_match is not None:
-                    log.trace("pps_match: %s", pps_match.groupdict())
-
-                    sample = self._extract_sample(self._pps_particle_class,
-                                                  None,
-                                                  pps_match.groupdict(),
-                                                  None)
-
-                elif superv_match is not None:
-                    log.trace("superv_match: %s", superv_match.groupdict())
-
-                    sample = self._extract_sample(self._superv_particle_class,
-                                                  None,
-                                                  superv_match.groupdict(),
-                                                  None)
-
-                elif dlog_mgr_match is not None:
-                    log.trace("dlog_mgr_match: %s", dlog_mgr_match.groupdict())
-
-                    sample = self._extract_sample(self._dlog_mgr_particle_class,
-                                                  None,
-                                                  dlog_mgr_match.groupdict(),
-                                                  None)
+            # Let's first see which type of log message we have
+            log_type, _ = LOG_TYPE_CLASSIFIER.classify(line)
 
-                elif dlog_status_match is not None:
-                    log.trace("dlog_status_match: %s", dlog_status_match.groupdict())
+            if log_type is not None:
 
-                    sample = self._extract_sample(self._dlog_status_particle_class,
-                                                  None,
-                                                  dlog_status_match.groupdict(),
-                                                  None)
-
-                elif d_status_ntp_match is not None:
-                    log.trace("d_status_ntp_match: %s", d_status_ntp_match.groupdict())
-
-                    sample = self._extract_sample(self._status_particle_class,
-                                                  None,
-                                                  d_status_ntp_match.groupdict(),
-                                                  None)
+                class_type, match = RECORD_CLASSIFIERS[log_type].classify(line)
 
-                elif dlog_aarm_match is not None:
-                    log.trace("sea_state_match: %s", dlog_aarm_match.groupdict())
+                if class_type is not None:
+                    log.trace("%s match: %s", class_type, match.groupdict())
 
-                    sample = self._extract_sample(self._dlog_aarm_particle_class,
+                    sample = self._extract_sample(self._particle_classes[class_type],
                                                   None,
-                                                  dlog_aarm_match.groupdict(),
+                                                  match.groupdict(),
                                                   None)
 
                 else:
-                    message = "Invalid DAT Log record, Line: " + line
+                    message = "Invalid %s Log record, Line: %s" % (log_type, line)
                     log.error(message)
                     self._exception_callback(UnexpectedDataException(message))
 
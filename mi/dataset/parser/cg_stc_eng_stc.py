@@ -22,7 +22,7 @@ from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.exceptions import SampleException, DatasetParserException, SampleEncodingException
 from mi.dataset.dataset_parser import Parser
-from mi.dataset.param_dict import DatasetParameterDict
+from mi.dataset.param_dict import DatasetParameterDict, RegexParameter
 
 class CgDataParticleType(BaseEnum):
     TELEMETERED = 'cg_stc_eng_stc'
@@ -339,12 +339,29 @@ class CgStcEngStcParserDataParticleKey(BaseEnum):
     CG_ENG_DMGRSTATUS_UPDATE = 'cg_eng_dmgrstatus_update'
 
 
+class _ParamRuleList(list):
+    """
+    Collects the parameters of the cg_stc_eng_stc param dict as (name, regex,
+    value function) rules, in place of a param dict
+    """
+    def add(self, name, pattern, f_getval, f_format, value=None, regex_flags=None):
+        """
+        Add the rule of a parameter, with the same arguments as DatasetParameterDict.add
+        """
+        param = RegexParameter(name, pattern, f_getval, f_format, value=value, regex_flags=regex_flags)
+        self.append((name, param.regex, param.f_getval))
+
+
 class CgStcEngStcParserDataAbstractParticle(DataParticle):
     """
     Abstract Class for parsing data from the cg_stc_eng_stc data set
     """
     _data_particle_type = None
 
+    # The (name, regex, value function) rules of the param dict, built for each
+    # particle class when first needed
+    _param_rules = None
+
     def _build_parsed_values(self):
         """
         Take something in the data format and turn it into
@@ -352,27 +369,57 @@ class CgStcEngStcParserDataAbstractParticle(DataParticle):
         @throws SampleException If there is a problem with sample creation
         """
         result = []
-        # Instantiate the param_dict 
-        params = self._build_param_dict()
-        
-        # Go through the param_dict dictionary for every definition
-        params.update(self.raw_data)
-        encoding_errors = params.get_encoding_errors()
+        encoding_errors = []
+        all_params = {}
+
+        # Many params take their values from the same regex, so each regex is only
+        # searched for once and the match shared
+        matches = {}
+        data = self.raw_data if isinstance(self.raw_data, str) else str(self.raw_data)
+
+        # Go through the param rules for every definition
+        for name, regex, f_getval in self._get_param_rules():
+            try:
+                key = (regex.pattern, regex.flags)
+                if key not in matches:
+                    matches[key] = regex.search(data)
+
+                match = matches[key]
+                all_params[name] = f_getval(match) if match else None
+            except Exception:
+                # set the value to None if we failed
+                all_params[name] = None
+                log.error("Dataset parameter dict error encoding Name:%s, set to None", name)
+                encoding_errors.append({name: None})
+
         self._encoding_errors = encoding_errors
-        all_params = params.get_all()
         for (key, value) in all_params.iteritems():
             result.append({DataParticleKey.VALUE_ID: key, DataParticleKey.VALUE: value})
         log.debug("CgStcEngStcParserDataParticle %s", result)
         return result
 
-    def _build_param_dict(self):
+    def _get_param_rules(self):
+        """
+        Get the rules of the cg_stc_eng_stc parameter dict, compiling them the
+        first time they are needed by the particle class
+        """
+        particle_class = type(self)
+        if particle_class._param_rules is None:
+            particle_class._param_rules = self._build_param_dict(_ParamRuleList())
+
+        return particle_class._param_rules
+
+    def _build_param_dict(self, p=None):
         """
         Populate the parameter dictionary with cg_stc_eng_stc parameters.
         For each parameter key, add match stirng, match lambda function,
         and value formatting function.
+        @param p The dictionary to add the parameters to, a new
+                 DatasetParameterDict if None
         """
         # Add parameter handlers to parameter dict.
-        p = DatasetParameterDict()
+        if p is None:
+            p = DatasetParameterDict()
         p.add(CgStcEngStcParserDataParticleKey.CG_ENG_PLATFORM_UTIME,
               r'Platform.utime=(\d+\.\d+)',
               lambda match : float(match.group(1)),
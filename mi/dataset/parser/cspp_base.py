@@ -11,6 +11,7 @@ initial release
 """
 
 import copy
+import itertools
 import re
 import string
 
@@ -53,6 +54,9 @@ SAMPLE_START_REGEX = FLOAT_REGEX + '\t' + FLOAT_REGEX + '\t' + Y_OR_N_REGEX + '\
 HEX_ASCII_LINE_REGEX = SAMPLE_START_REGEX + ASCII_HEX_CHAR_REGEX + '*' + END_OF_LINE_REGEX
 HEX_ASCII_LINE_MATCHER = re.compile(HEX_ASCII_LINE_REGEX)
 
+# The number of lines read at a time when a column schema splits the data lines
+COLUMN_BLOCK_LINES = 10000
+
 # The following two keys are keys to be used with the PARTICLE_CLASSES_DICT
 # The key for the metadata particle class
 METADATA_PARTICLE_CLASS_KEY = 'metadata_particle_class'
@@ -201,7 +205,8 @@ class CsppParser(SimpleParser):
                  exception_callback,
                  data_record_regex,
                  header_key_list=None,
-                 ignore_matcher=None):
+                 ignore_matcher=None,
+                 column_schema=None):
         """
         This method is a constructor that will instantiate an CsppParser object.
         @param config The configuration for this CsppParser parser
@@ -210,11 +215,14 @@ class CsppParser(SimpleParser):
         @param data_record_regex The data regex that should be used to obtain data records
         @param header_key_list The list of header keys expected within a header
         @param ignore_matcher A matcher from a regex to use to ignore expected junk lines
+        @param column_schema An optional CsppColumnSchema of the columns of a data record
         """
 
         self._data_record_matcher = None
         self._header_and_first_data_record_matcher = None
         self._ignore_matcher = ignore_matcher
+        self._column_schema = column_schema
+        self._column_batch = None
 
         # Ensure that we have a data regex
         if data_record_regex is None:
@@ -353,27 +361,64 @@ class CsppParser(SimpleParser):
             log.warn('got unrecognized row %r', line)
             self._exception_callback(RecoverableSampleException("Found an invalid line: %s" % line))
 
-    def parse_file(self):
+    def get_column_batch(self):
         """
-        Parse through the file, pulling single lines and comparing to the established patterns,
-        generating particles for data lines
+        Parse the file if it has not been done already and get its data records as a batch
+        @returns CsppColumnBatch of the data records, or None if the parser has no column schema
         """
+        if self._file_parsed is False:
+            self.parse_file()
+            self._file_parsed = True
+
+        return self._column_batch
 
-        for line in self._stream_handle:
+    def _process_line(self, line, data_match=None):
+        """
+        Process one line of the file
+        @param line The line
+        @param data_match The data record of the line if it has already been found, or None
+        """
 
+        if data_match is None:
             data_match = self._data_record_matcher.match(line)
 
-            # If we found a data match, let's process it
-            if data_match is not None:
-                self._process_data_match(data_match, self._record_buffer)
+        # If we found a data match, let's process it
+        if data_match is not None:
+            if self._column_batch is not None:
+                self._column_batch.append(data_match)
+
+            self._process_data_match(data_match, self._record_buffer)
+
+        else:
+            # Check for head part match
+            header_part_match = HEADER_PART_MATCHER.match(line)
+
+            if header_part_match is not None:
+                self._process_header_part_match(header_part_match)
 
             else:
-                # Check for head part match
-                header_part_match = HEADER_PART_MATCHER.match(line)
+                self._process_line_not_containing_data_record_or_header_part(line)
+
+    def parse_file(self):
+        """
+        Parse through the file, pulling single lines and comparing to the established patterns,
+        generating particles for data lines
+        """
 
-                if header_part_match is not None:
-                    self._process_header_part_match(header_part_match)
+        if self._column_schema is None:
+            for line in self._stream_handle:
+                self._process_line(line)
+            return
 
-                else:
-                    self._process_line_not_containing_data_record_or_header_part(line)
+        self._column_batch = self._column_schema.new_batch()
+
+        # well formed data lines are split into records a block at a time, the rest are matched one at a time
+        while True:
+            lines = list(itertools.islice(self._stream_handle, COLUMN_BLOCK_LINES))
+            if not lines:
+                break
+
+            column_records = self._column_schema.split_lines(lines)
 
+            for index, line in enumerate(lines):
+                self._process_line(line, column_records.get(index))
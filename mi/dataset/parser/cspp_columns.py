@@ -0,0 +1,277 @@
+"""
+@package mi.dataset.parser.cspp_columns
+@file mi/dataset/parser/cspp_columns.py
+@brief Column schema of the tab separated data records of cspp files
+
+Most cspp instruments write one data record per line as a fixed number of
+tab separated values.  A CsppColumnSchema lists the columns of such a record,
+each with the regex its values must match and the type it converts to.  The
+parser reads the file a block of lines at a time and the schema picks out the
+well formed data lines of each block together: the lines with one value per
+column are split into columns, and the values of each column are checked at
+once.  These lines match the instrument's data regex with the same groups, so
+the parser does not need to run the data regex on them; every other line is
+still handled one at a time.  Either way, each data particle is still built
+from the string values of its own record.
+
+The data records of a file are also gathered into a CsppColumnBatch, which
+gives the values of a column for all the records as a NumPy array.
+"""
+
+import re
+import string
+
+import numpy
+
+from mi.core.log import get_logger
+from mi.dataset.parser.common_regexes import FLOAT_REGEX, INT_REGEX
+from mi.dataset.parser.cspp_base import Y_OR_N_REGEX
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+# The column types, as the regex the values must match and the type they convert to
+FLOAT_COLUMN = (FLOAT_REGEX, numpy.float64)
+INT_COLUMN = (INT_REGEX, numpy.int64)
+Y_OR_N_COLUMN = (Y_OR_N_REGEX, numpy.bool_)
+
+
+def string_column(regex):
+    """
+    Build the type of a column of string values
+    @param regex The regex the values must match
+    @returns The column type
+    """
+    return regex, str
+
+
+def _unsigned(text):
+    """
+    Remove the sign from the start of each newline terminated value
+    @param text The values, each followed by a newline
+    @returns The values with a newline before and after each
+    """
+    return ('\n' + text).replace('\n-', '\n').replace('\n+', '\n')
+
+
+def _float_values_valid(text, count):
+    """
+    Check that every value is digits, a point and digits, with an optional sign
+    """
+    unsigned = _unsigned(text)
+    return unsigned.translate(None, string.digits) == '\n.' * count + '\n' and \
+        '\n.' not in unsigned and '.\n' not in unsigned
+
+
+def _int_values_valid(text, count):
+    """
+    Check that every value is digits with an optional sign
+    """
+    unsigned = _unsigned(text)
+    return unsigned.translate(None, string.digits) == '\n' * (count + 1) and '\n\n' not in unsigned
+
+
+def _y_or_n_values_valid(text, count):
+    """
+    Check that every value is a single y or n
+    """
+    return len(text) == 2 * count and text.translate(None, 'yYnN') == '\n' * count
+
+
+# Checks of a whole column of values which need no regex.  They accept only
+# values the column regex matches, but may reject some it also matches.
+VALUES_VALID_CHECKS = {
+    FLOAT_COLUMN: _float_values_valid,
+    INT_COLUMN: _int_values_valid,
+    Y_OR_N_COLUMN: _y_or_n_values_valid
+}
+
+
+class CsppColumnRecord(tuple):
+    """
+    A data record taken from a well formed line, standing in for the data regex
+    match of the line.  It holds the line followed by the values of the captured
+    columns, so group 0 is the line and group n is the nth captured value.
+    """
+
+    __slots__ = ()
+
+    # looked up as often as a match group, so kept as fast
+    group = tuple.__getitem__
+
+    def groups(self):
+        return self[1:]
+
+
+class CsppColumnSchema(object):
+    """
+    The columns of the data record of a cspp instrument
+    """
+
+    def __init__(self, columns):
+        """
+        @param columns list of (name, column type) tuples, in the order of the
+                       data record.  The name is None for columns which are not
+                       captured by the data regex.
+        """
+        self.columns = list(columns)
+
+        # the positions of the captured columns, in the order of their groups
+        self._captured = [position for position, (name, _) in enumerate(self.columns) if name is not None]
+
+        self.group_indices = dict((self.columns[position][0], index + 1)
+                                  for index, position in enumerate(self._captured))
+
+        self._values_valid_checks = [VALUES_VALID_CHECKS.get(column_type) for _, column_type in self.columns]
+
+        # values without a check of their own are checked as newline separated text.  Each
+        # value is matched in a lookahead, which is not backtracked into, so a bad value
+        # fails the text without retrying the ways the values before it could match.
+        self._column_matchers = [re.compile(r'(?:(?=(?P<value>(?:%s)\n))(?P=value))*\Z' % regex)
+                                 for _, (regex, _) in self.columns]
+        self._value_matchers = [re.compile(r'(?:%s)\Z' % regex) for _, (regex, _) in self.columns]
+
+    def column_type(self, name):
+        """
+        Get the type the values of a captured column convert to
+        @param name The column name
+        @returns The numpy type, or str
+        @throws KeyError if there is no such column
+        """
+        for column_name, (_, column_type) in self.columns:
+            if column_name is not None and column_name == name:
+                return column_type
+
+        raise KeyError(name)
+
+    def new_batch(self):
+        """
+        Create an empty batch for the data records of a file
+        @returns CsppColumnBatch
+        """
+        return CsppColumnBatch(self)
+
+    def _values_valid(self, position, values):
+        """
+        Check that all the values of part of a column are valid
+        @param position The position of the column
+        @param values list of the values
+        @returns True if the values are all valid
+        """
+        text = '\n'.join(values) + '\n'
+
+        values_valid_check = self._values_valid_checks[position]
+        if values_valid_check is not None and isinstance(text, str):
+            return values_valid_check(text, len(values))
+
+        return self._column_matchers[position].match(text) is not None
+
+    def _invalid_values(self, position, values):
+        """
+        Find the invalid values of a column.  Parts of the column which fail to
+        check are halved until the invalid values are found, so a few invalid
+        values do not need every value to be checked on its own.
+        @param position The position of the column
+        @param values list of the values
+        @returns list of the indices of the invalid values
+        """
+        value_matcher = self._value_matchers[position]
+        invalid = []
+        parts = [(0, len(values))]
+
+        while parts:
+            start, end = parts.pop()
+
+            if end - start == 1:
+                if value_matcher.match(values[start]) is None:
+                    invalid.append(start)
+
+            elif not self._values_valid(position, values[start:end]):
+                middle = (start + end) // 2
+                parts.append((middle, end))
+                parts.append((start, middle))
+
+        return invalid
+
+    def split_lines(self, lines):
+        """
+        Find the well formed data lines and split them into records
+        @param lines list of lines of a file
+        @returns dictionary of line index to CsppColumnRecord
+        """
+        num_columns = len(self.columns)
+
+        # only newline terminated lines with one value per column can be well formed
+        indices = [index for index, line in enumerate(lines)
+                   if line.count('\t') == num_columns - 1 and line.endswith('\n')]
+
+        if not indices:
+            return {}
+
+        # split the lines together, giving the values of all the lines in order
+        text = ''.join([lines[index] for index in indices]).replace('\r\n', '\n')
+        values = text.replace('\n', '\t').split('\t')
+        num_values = len(indices) * num_columns
+        columns = [values[position:num_values:num_columns] for position in range(num_columns)]
+
+        # rows with an invalid value are left out of the checks of the columns after
+        rows = range(len(indices))
+
+        for position, column in enumerate(columns):
+            if len(rows) < len(indices):
+                column = [column[row] for row in rows]
+
+            invalid = self._invalid_values(position, column)
+            if invalid:
+                invalid = set(invalid)
+                rows = [row for number, row in enumerate(rows) if number not in invalid]
+
+        records = zip([lines[index] for index in indices], *[columns[position] for position in self._captured])
+
+        if len(rows) < len(indices):
+            indices = [indices[row] for row in rows]
+            records = [records[row] for row in rows]
+
+        records = dict(zip(indices, map(CsppColumnRecord, records)))
+
+        log.debug('Split %d of %d lines into cspp column records', len(records), len(lines))
+        return records
+
+
+class CsppColumnBatch(object):
+    """
+    The data records of a cspp file, with the values of each captured column
+    available together
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, record):
+        """
+        Add a data record to the batch
+        @param record The CsppColumnRecord or data regex match of the record
+        """
+        self.records.append(record)
+
+    def column(self, name):
+        """
+        Get the values of one captured column for all the records
+        @param name The column name
+        @returns numpy array of the column values, converted to the column type
+        @throws KeyError if there is no such column
+        @throws ValueError if a value cannot be converted
+        """
+        column_type = self.schema.column_type(name)
+        group = self.schema.group_indices[name]
+        values = numpy.array([record.group(group) for record in self.records], dtype=str)
+
+        if column_type is numpy.bool_:
+            return numpy.char.upper(values) == 'Y'
+
+        return values.astype(column_type)
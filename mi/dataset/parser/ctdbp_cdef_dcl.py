@@ -201,6 +201,8 @@ class CtdbpCdefDclTelemeteredDataParticle(CtdbpCdefDclDataParticle):
 class CtdbpCdefDclParser(SimpleParser):
     """
     """
+    checkpoint_supported = True
+
     def __init__(self,
                  is_telemetered,
                  stream_handle,
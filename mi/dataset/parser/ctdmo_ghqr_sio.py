@@ -28,7 +28,7 @@ import binascii
 import re
 import struct
 
-from mi.dataset.parser.utilities import zulu_timestamp_to_ntp_time
+from mi.dataset.parser.utilities import time_2000_to_ntp_time
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -114,6 +114,11 @@ TEL_CT_GROUP_ID = 1
 TEL_CT_GROUP_SCIENCE_DATA = 2
 TEL_CT_GROUP_TIME = 3
 
+# Telemetered CT binary fields
+TEL_CT_TEMP_COND_STRUCT = struct.Struct('>Q')  # Temperature and Conductivity, padded to 8 bytes
+TEL_CT_PRESSURE_STRUCT = struct.Struct('<H')   # Pressure (bytes reversed)
+TEL_CT_TIME_STRUCT = struct.Struct('<I')       # Time since Jan 1, 2000 (bytes reversed)
+
 # Recovered and Telemetered CO Data record (binary):
 CO_RECORD_END = b'[\x13|\x0D]'     # records separated by sentinel 0x13 or 0x0D
 CO_SAMPLE_BYTES = 6
@@ -157,18 +162,6 @@ def convert_hex_ascii_to_int(int_val):
     return int(int_val, 16)
 
 
-def generate_particle_timestamp(time_2000):
-    """
-    This function calculates and returns a timestamp in epoch 1900
-    based on an ASCII hex time in epoch 2000.
-    Parameter:
-      time_2000 - number of seconds since Jan 1, 2000
-    Returns:
-      number of seconds since Jan 1, 1900
-    """
-    return int(time_2000, 16) + zulu_timestamp_to_ntp_time("2000-01-01T00:00:00.00Z")
-
-
 class DataParticleType(BaseEnum):
     REC_CO_PARTICLE = 'ctdmo_ghqr_offset_recovered'
     REC_CT_PARTICLE = 'ctdmo_ghqr_instrument_recovered'
@@ -205,7 +198,7 @@ class CtdmoGhqrRecoveredInstrumentDataParticle(DataParticle):
         # This time field is number of seconds since Jan 1, 2000.
         # Convert from epoch in 2000 to epoch in 1900.
         #
-        time_stamp = generate_particle_timestamp(self.raw_data[RAW_INDEX_REC_CT_TIME])
+        time_stamp = time_2000_to_ntp_time(convert_hex_ascii_to_int(self.raw_data[RAW_INDEX_REC_CT_TIME]))
         self.set_internal_timestamp(timestamp=time_stamp)
 
         #
@@ -258,31 +251,31 @@ class CtdmoGhqrSioTelemeteredInstrumentDataParticle(DataParticle):
         @throws SampleException If there is a problem with sample creation
         """
 
-        #
-        # Convert science data time to hex ascii.
-        # The 4 byte time field is in reverse byte order.
-        #
-        hex_time = binascii.b2a_hex(self.raw_data[RAW_INDEX_TEL_CT_TIME])
-        reversed_hex_time = hex_time[6:8] + hex_time[4:6] + hex_time[2:4] + hex_time[0:2]
-
-        # convert from epoch in 2000 to epoch in 1900.
-        time_stamp = generate_particle_timestamp(reversed_hex_time)
-        self.set_internal_timestamp(timestamp=time_stamp)
-
         try:
             #
-            # Convert binary science data to hex ascii string.
-            # 7 binary bytes get turned into 14 hex ascii bytes.
-            # The 2 byte pressure field is in reverse byte order.
+            # The 4 byte science data time field is in reverse byte order.
+            #
+            ctd_time = TEL_CT_TIME_STRUCT.unpack(self.raw_data[RAW_INDEX_TEL_CT_TIME])[0]
+
+            #
+            # Decode the 7 binary bytes of science data directly.
+            # Temperature and conductivity are the first two 20 bit fields
+            # and the 2 byte pressure field is in reverse byte order.
             #
-            science_data = binascii.b2a_hex(self.raw_data[RAW_INDEX_TEL_CT_SCIENCE])
-            pressure = science_data[12:14] + science_data[10:12]
+            science_data = self.raw_data[RAW_INDEX_TEL_CT_SCIENCE]
+            temperature_conductivity = TEL_CT_TEMP_COND_STRUCT.unpack(b'\x00\x00\x00' + science_data[0:5])[0]
+            temperature = temperature_conductivity >> 20
+            conductivity = temperature_conductivity & 0xFFFFF
+            pressure = TEL_CT_PRESSURE_STRUCT.unpack(science_data[5:7])[0]
 
-        except (ValueError, TypeError, IndexError) as ex:
+        except (ValueError, TypeError, IndexError, struct.error) as ex:
             log.warn("Error (%s) while decoding parameters in data: [%s]", ex, self.raw_data)
             raise RecoverableSampleException("Error (%s) while decoding parameters in data: [%s]"
                                              % (ex, self.raw_data))
 
+        # convert from epoch in 2000 to epoch in 1900.
+        self.set_internal_timestamp(timestamp=time_2000_to_ntp_time(ctd_time))
+
         particle = [
             self._encode_value(CtdmoInstrumentDataParticleKey.CONTROLLER_TIMESTAMP,
                                self.raw_data[RAW_INDEX_TEL_CT_SIO_TIMESTAMP],
@@ -292,17 +285,17 @@ class CtdmoGhqrSioTelemeteredInstrumentDataParticle(DataParticle):
                                self.raw_data[RAW_INDEX_TEL_CT_ID])[0],
                                int),
             self._encode_value(CtdmoInstrumentDataParticleKey.TEMPERATURE,
-                               science_data[0:5],
-                               convert_hex_ascii_to_int),
+                               temperature,
+                               int),
             self._encode_value(CtdmoInstrumentDataParticleKey.CONDUCTIVITY,
-                               science_data[5:10],
-                               convert_hex_ascii_to_int),
+                               conductivity,
+                               int),
             self._encode_value(CtdmoInstrumentDataParticleKey.PRESSURE,
                                pressure,
-                               convert_hex_ascii_to_int),
+                               int),
             self._encode_value(CtdmoInstrumentDataParticleKey.CTD_TIME,
-                               reversed_hex_time,
-                               convert_hex_ascii_to_int)
+                               ctd_time,
+                               int)
         ]
 
         return particle
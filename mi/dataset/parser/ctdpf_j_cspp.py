@@ -28,6 +28,7 @@ from mi.dataset.parser.cspp_base import CsppParser, \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, Y_OR_N_COLUMN
 
 
 # regex for the data record
@@ -74,6 +75,17 @@ class CtdpfJCsppParserDataParticleKey(BaseEnum):
     SALINITY = 'salinity'
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (CtdpfJCsppParserDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (CtdpfJCsppParserDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (CtdpfJCsppParserDataParticleKey.TEMPERATURE, FLOAT_COLUMN),
+    (CtdpfJCsppParserDataParticleKey.CONDUCTIVITY, FLOAT_COLUMN),
+    (CtdpfJCsppParserDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (CtdpfJCsppParserDataParticleKey.SALINITY, FLOAT_COLUMN)
+])
+
+
 class CtdpfJCsppMetadataDataParticle(CsppMetadataDataParticle):
     """
     Base Class for building a ctdpf_j_cspp metadata particle
@@ -213,4 +225,5 @@ class CtdpfJCsppParser(CsppParser):
                                                stream_handle,
                                                exception_callback,
                                                DATA_REGEX,
-                                               ignore_matcher=None)
+                                               ignore_matcher=None,
+                                               column_schema=COLUMN_SCHEMA)
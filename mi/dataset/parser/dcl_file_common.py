@@ -14,14 +14,16 @@ import re
 
 from mi.core.log import get_logger
 
-from mi.core.instrument.data_particle import DataParticle
+from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.exceptions import UnexpectedDataException, InstrumentParameterException
 
 from mi.dataset.dataset_parser import SimpleParser, DataSetDriverConfigKeys
 from mi.dataset.parser.common_regexes import END_OF_LINE_REGEX, SPACE_REGEX, \
     ANY_CHARS_REGEX, DATE_YYYY_MM_DD_REGEX, TIME_HR_MIN_SEC_MSEC_REGEX
 
-from mi.dataset.parser.utilities import dcl_controller_timestamp_to_ntp_time
+from mi.dataset.parser.line_classifier import LineClassifier
+from mi.dataset.parser.utilities import dcl_controller_timestamp_to_ntp_time, \
+    dcl_controller_timestamps_to_ntp_time
 
 __author__ = 'Ronald Ronquillo'
 __license__ = 'Apache 2.0'
@@ -68,10 +70,12 @@ class DclInstrumentDataParticle(DataParticle):
         super(DclInstrumentDataParticle, self).__init__(raw_data, *args, **kwargs)
 
         # The particle timestamp is the DCL Controller timestamp.
-        # Convert the DCL controller timestamp string to NTP time (in seconds and microseconds).
-        dcl_controller_timestamp = self.raw_data[SENSOR_GROUP_TIMESTAMP]
-        elapsed_seconds_useconds = dcl_controller_timestamp_to_ntp_time(dcl_controller_timestamp)
-        self.set_internal_timestamp(elapsed_seconds_useconds)
+        # Convert the DCL controller timestamp string to NTP time (in seconds and microseconds),
+        # unless the parser has already converted it.
+        if self.contents[DataParticleKey.INTERNAL_TIMESTAMP] is None:
+            dcl_controller_timestamp = self.raw_data[SENSOR_GROUP_TIMESTAMP]
+            elapsed_seconds_useconds = dcl_controller_timestamp_to_ntp_time(dcl_controller_timestamp)
+            self.set_internal_timestamp(elapsed_seconds_useconds)
 
         self.instrument_particle_map = instrument_particle_map
 
@@ -98,6 +102,8 @@ class DclFileCommonParser(SimpleParser):
     and metadata_matcher
     """
 
+    checkpoint_supported = True
+
     def __init__(self, config,
                  stream_handle,
                  exception_callback,
@@ -132,32 +138,69 @@ class DclFileCommonParser(SimpleParser):
         if self.particle_classes is None:
             self.particle_classes = (self._particle_class,)
 
+        # The sensor data patterns of each particle class, followed by the metadata pattern
+        record_matchers = []
+        for particle_class in self.particle_classes:
+            if hasattr(particle_class, "data_matcher"):
+                self.sensor_data_matcher = particle_class.data_matcher
+            record_matchers.append((particle_class, self.sensor_data_matcher))
+        record_matchers.append((None, self.metadata_matcher))
+        classifier = LineClassifier(record_matchers)
+
+        # Match every line first, so the DCL controller timestamps of the
+        # sensor data records can be converted together.
+        records = []
         for line in self._stream_handle:
 
-            for particle_class in self.particle_classes:
-                if hasattr(particle_class, "data_matcher"):
-                    self.sensor_data_matcher = particle_class.data_matcher
+            particle_class, match = classifier.classify(line)
+
+            # If this is a valid sensor data record,
+            # use the extracted fields to generate a particle.
+            if particle_class is not None:
+                records.append((particle_class, match.groups()))
+
+            # If it's a valid metadata record, ignore it.
+            elif match is None:
+                records.append((None, line))
 
-                # If this is a valid sensor data record,
-                # use the extracted fields to generate a particle.
-                sensor_match = self.sensor_data_matcher.match(line)
-                if sensor_match is not None:
-                    break
+        timestamps = self._convert_timestamps(records)
 
-            if sensor_match is not None:
+        for (particle_class, record), timestamp in zip(records, timestamps):
+
+            if particle_class is not None:
                 particle = self._extract_sample(particle_class,
                                                 None,
-                                                sensor_match.groups(),
-                                                None)
+                                                record,
+                                                timestamp)
                 self._record_buffer.append(particle)
 
-            # It's not a sensor data record, see if it's a metadata record.
+            # Otherwise generate warning for unknown data.
             else:
+                error_message = 'Unknown data found in chunk %s' % record
+                log.warn(error_message)
+                self._exception_callback(UnexpectedDataException(error_message))
+
+    @staticmethod
+    def _convert_timestamps(records):
+        """
+        Convert the DCL controller timestamps of the sensor data records in one step
+        :param records: list of (particle class, match groups or line) tuples
+        :return: list of NTP timestamps, None where the particle converts its own timestamp
+        """
+        timestamps = [None] * len(records)
+
+        indices = [index for index, (particle_class, _) in enumerate(records)
+                   if particle_class is not None and issubclass(particle_class, DclInstrumentDataParticle)]
+
+        if indices:
+            try:
+                converted = dcl_controller_timestamps_to_ntp_time(
+                    [records[index][1][SENSOR_GROUP_TIMESTAMP] for index in indices])
+            except ValueError:
+                # leave the conversion, and the error, to the particles
+                return timestamps
+
+            for index, timestamp in zip(indices, converted.tolist()):
+                timestamps[index] = timestamp
 
-                # If it's a valid metadata record, ignore it.
-                # Otherwise generate warning for unknown data.
-                meta_match = self.metadata_matcher.match(line)
-                if meta_match is None:
-                    error_message = 'Unknown data found in chunk %s' % line
-                    log.warn(error_message)
-                    self._exception_callback(UnexpectedDataException(error_message))
+        return timestamps
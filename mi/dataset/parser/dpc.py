@@ -5,13 +5,13 @@
 @file marine-integrations/mi/dataset/parser/dpc.py
 @author Pete Cable
 """
-import msgpack
 import ntplib
 import struct
 from mi.core.exceptions import SampleException, RecoverableSampleException
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.log import get_logger, get_logging_metaclass
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser import msgpack_batch, optaa_common
 from mi.core.common import BaseEnum
 
 log = get_logger()
@@ -21,7 +21,9 @@ __author__ = 'Peter Cable'
 __license__ = 'Apache 2.0'
 
 
-ACS_STRUCT = struct.Struct('>BB4s7HIBB340H')
+ACS_HEADER_STRUCT = struct.Struct('>BB4s7HIBB')
+ACS_NUM_WAVELENGTHS = 85
+ACS_SIZE = ACS_HEADER_STRUCT.size + ACS_NUM_WAVELENGTHS * optaa_common.COUNTS_PER_WAVELENGTH * 2
 
 
 class DataParticleType(BaseEnum):
@@ -66,9 +68,19 @@ class DeepProfilerParser(SimpleParser):
         self._gen = None
 
     def parse_file(self):
-        for record in msgpack.Unpacker(self._stream_handle):
+        records = list(msgpack_batch.unpack(self._stream_handle))
+
+        # convert the timestamps of each stream together
+        timestamps = [None] * len(records)
+        for batch in msgpack_batch.group_records(records):
+            batch_timestamps = (batch.seconds + msgpack_batch.NTP_UNIX_EPOCH_DELTA) + batch.microseconds/1e6
+            for index, timestamp in zip(batch.indices, batch_timestamps.tolist()):
+                timestamps[index] = timestamp
+
+        for record, timestamp in zip(records, timestamps):
             try:
-                particle = DeepProfilerParticle(record, preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP)
+                particle = DeepProfilerParticle(record, internal_timestamp=timestamp,
+                                                preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP)
                 self._record_buffer.append(particle)
             except (SampleException, RecoverableSampleException) as e:
                 self._exception_callback(e)
@@ -130,7 +142,8 @@ class DeepProfilerParticle(DataParticle):
     def _build_parsed_values(self):
         try:
             seconds, microseconds, data = self.raw_data
-            self.set_internal_timestamp(ntplib.system_to_ntp_time(seconds) + microseconds/1e6)
+            if self.contents[DataParticleKey.INTERNAL_TIMESTAMP] is None:
+                self.set_internal_timestamp(ntplib.system_to_ntp_time(seconds) + microseconds/1e6)
             self.timelist = [
                 {DataParticleKey.VALUE_ID: DeepProfileParticleKey.RAW_SECS, DataParticleKey.VALUE: seconds},
                 {DataParticleKey.VALUE_ID: DeepProfileParticleKey.RAW_MSECS, DataParticleKey.VALUE: microseconds}
@@ -148,22 +161,18 @@ class DeepProfilerParticle(DataParticle):
                                  DataParticleKey.VALUE: v} for k, v in data.iteritems()]
 
     def build_acs_parsed_values(self, data):
-        if not len(data) == ACS_STRUCT.size:
+        if not len(data) == ACS_SIZE:
             raise SampleException('Received invalid ACS data (incorrect length %d, expected %d' %
-                                  (len(data), ACS_STRUCT.size))
+                                  (len(data), ACS_SIZE))
 
-        record = ACS_STRUCT.unpack(data)
         packet_type, _, type_and_serial, aref_dark, pressure, asig_dark, raw_ext_temp,\
-            raw_int_temp, cref_dark, csig_dark, msecs, _, count = record[:13]
+            raw_int_temp, cref_dark, csig_dark, msecs, _, count = ACS_HEADER_STRUCT.unpack_from(data)
 
         meter_type = ord(type_and_serial[0])
         serial_number = struct.unpack('>I', '\x00' + type_and_serial[1:])[0]
 
-        data_records = record[13:]
-        raw_cref = list(data_records[0::4])
-        raw_aref = list(data_records[1::4])
-        raw_csig = list(data_records[2::4])
-        raw_asig = list(data_records[3::4])
+        counts = optaa_common.unpack_counts(data, ACS_NUM_WAVELENGTHS, ACS_HEADER_STRUCT.size)
+        raw_cref, raw_aref, raw_csig, raw_asig = optaa_common.count_lists(counts)
 
         return self.timelist + [
             {DataParticleKey.VALUE_ID: ACSDataParticleKey.PACKET_TYPE, DataParticleKey.VALUE: packet_type},
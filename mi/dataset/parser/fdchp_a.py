@@ -11,6 +11,8 @@ __license__ = 'Apache 2.0'
 import io
 import struct
 import calendar
+import datetime
+import ntplib
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -22,6 +24,9 @@ from mi.dataset.dataset_parser import SimpleParser
 # records are 55 bytes long
 RECORD_SIZE = 55
 
+# the year, month, day, hour, minute, second and millisecond at the start of each record
+RECORD_TIME_STRUCT = struct.Struct('>H5BH')
+
 
 class FdchpADataParticle(DataParticle):
     _data_particle_type = 'fdchp_a_instrument_recovered'
@@ -104,13 +109,61 @@ class FdchpAParser(SimpleParser):
             log.error(msg)
             raise SampleException(msg)
 
-        # seek back to the beginning of the file
-        self._stream_handle.seek(0, io.SEEK_SET)
+        # the records should be in time order, so those in the time window of the parse options are
+        # found from the times of a few records, and the rest of the file is not read
+        first, end = 0, end_offset // RECORD_SIZE
+        if self.parse_options is not None:
+            if not self.parse_options.includes_stream(FdchpADataParticle):
+                return
+            if self.parse_options.has_time_window():
+                first, end = self._time_window_records(end)
 
-        record = self._stream_handle.read(RECORD_SIZE)
+        self._stream_handle.seek(first * RECORD_SIZE, io.SEEK_SET)
 
-        while record:
+        for _ in xrange(first, end):
+            record = self._stream_handle.read(RECORD_SIZE)
             particle = self._extract_sample(FdchpADataParticle, None, record, None)
             self._record_buffer.append(particle)
 
-            record = self._stream_handle.read(RECORD_SIZE)
+    def _time_window_records(self, count):
+        """
+        Find the records in the time window of the parse options by a binary search of the
+        record times.  The first and last records are looked at too, and all the records are
+        read if a record time looked at can not be decoded or the times are out of order.
+        :param count: The number of records in the file
+        :return: tuple of the index of the first record to read, and the index after the last
+        """
+        probed = {}
+
+        def record_time(index):
+            probed[index] = self._record_time(index)
+            return probed[index]
+
+        try:
+            if count > 0:
+                record_time(0)
+                record_time(count - 1)
+            first, end = self.parse_options.record_window(count, record_time)
+        except (ValueError, OverflowError, struct.error) as e:
+            log.warn('Unable to decode a record time, reading all the records: %s', e)
+            return 0, count
+
+        times = [probed[index] for index in sorted(probed)]
+        if any(later < earlier for earlier, later in zip(times, times[1:])):
+            log.warn('Record times are out of order, reading all the records')
+            return 0, count
+
+        return first, end
+
+    def _record_time(self, index):
+        """
+        Read the time of a record
+        :param index: The index of the record in the file
+        :return: The NTP timestamp of the record
+        :raises ValueError: if the record time is not a valid date and time
+        """
+        self._stream_handle.seek(index * RECORD_SIZE, io.SEEK_SET)
+        fields = RECORD_TIME_STRUCT.unpack(self._stream_handle.read(RECORD_TIME_STRUCT.size))
+        record_time = datetime.datetime(*fields[:-1])
+        unix_time = float(calendar.timegm(record_time.timetuple())) + fields[-1] / 1000.0
+        return ntplib.system_to_ntp_time(unix_time)
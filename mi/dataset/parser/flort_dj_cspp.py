@@ -30,6 +30,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     Y_OR_N_REGEX, encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, INT_COLUMN, Y_OR_N_COLUMN, string_column
 
 # A regex to match a date in MM/DD/YY format
 FORMATTED_DATE_REGEX = r'\d{2}/\d{2}/\d{2}'
@@ -122,6 +123,23 @@ INSTRUMENT_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (FlortDjCsppParserDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (FlortDjCsppParserDataParticleKey.DATE, string_column(FORMATTED_DATE_REGEX)),
+    (FlortDjCsppParserDataParticleKey.TIME, string_column(TIME_REGEX)),
+    (FlortDjCsppParserDataParticleKey.BETA, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.RAW_BETA, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.CHLOROPHYLL, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.RAW_CHLOROPHYLL, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.CDOM, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.RAW_CDOM, INT_COLUMN),
+    (FlortDjCsppParserDataParticleKey.TEMP, INT_COLUMN)
+])
+
+
 class FlortDjCsppMetadataDataParticle(CsppMetadataDataParticle):
     """
     Class for building a flort_dj_cspp metadata particle
@@ -227,4 +245,5 @@ class FlortDjCsppParser(CsppParser):
                                                 stream_handle,
                                                 exception_callback,
                                                 DATA_REGEX,
-                                                ignore_matcher=IGNORE_MATCHER)
+                                                ignore_matcher=IGNORE_MATCHER,
+                                                column_schema=COLUMN_SCHEMA)
@@ -11,15 +11,14 @@ initial release
 __author__ = 'Jeff Roy'
 __license__ = 'Apache 2.0'
 
-import ntplib
-
 from mi.core.log import get_logger
 log = get_logger()
 
 from mi.dataset.parser.auv_common import \
     AuvCommonParticle, \
     AuvCommonParser, \
-    compute_timestamp
+    compute_timestamp, \
+    TimestampFields
 
 
 # The structure below is a list of tuples
@@ -42,21 +41,8 @@ FLORT_KN_AUV_METADATA_PARAM_MAP = [
 ]
 
 
-def compute_metadata_timestamp(parts):
-    """
-    This method is required as part of the auv_message_map passed to the
-    AuvCommonParser constructor
-    This version uses just the mission_epoch from parts item 1
-
-    :param parts: a list of the individual parts of an input record
-    :return: a timestamp in the float64 NTP format.
-    """
-    mission_epoch = parts[1]
-
-    unix_time = float(mission_epoch)
-    timestamp = ntplib.system_to_ntp_time(unix_time)
-
-    return timestamp
+# The metadata timestamp uses just the mission_epoch from parts item 1
+compute_metadata_timestamp = TimestampFields(1)
 
 
 class FlortKnAuvMetadataParticle(AuvCommonParticle):
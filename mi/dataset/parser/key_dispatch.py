@@ -0,0 +1,161 @@
+"""
+@package mi.dataset.parser.key_dispatch
+@file mi/dataset/parser/key_dispatch.py
+@brief Dispatch of key=value status lines to the rules which can match them
+
+Engineering status files are made of lines such as 'GPS.lat=41.535588', each
+matched by one of a long list of regexes tried in order.  A KeyDispatcher
+compiles the regexes once and reads each of them to find the key text before
+its separator.  The key at the start of a line then gives the rules which can
+match it, so a line is only tested against those, in the original order.
+The rules for each key are worked out the first time the key is seen and
+cached.
+
+A rule is offered for a key if its key pattern can match the key followed by
+the separator, so the rules which can match a line are never left out.  The
+'.' in keys such as 'GPS.lat' matches any character, so a rule is tested
+character by character when its key pattern is a run of single characters.
+Other key patterns are only checked against the literal text they start with,
+and rules without a separator in their pattern are tried for every line.
+"""
+
+import re
+import sre_compile
+import sre_constants
+import sre_parse
+
+from mi.core.log import get_logger
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+# Parsed regex items which always match exactly one character
+SINGLE_CHARACTER_OPS = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN)
+
+# The number of keys whose rules are cached, so noise in a file cannot grow the cache without limit
+MAX_CACHED_KEYS = 10000
+
+
+class _KeyRule(object):
+    """
+    The key pattern of one rule
+    """
+
+    def __init__(self, matcher, separator):
+        """
+        :param matcher: The compiled regex of the rule
+        :param separator: The character between the key and the value
+        """
+        self.keyed = False
+        self.literal_prefix = ''
+        self.character_matchers = None
+
+        try:
+            parsed = sre_parse.parse(matcher.pattern, matcher.flags)
+        except (sre_constants.error, TypeError, ValueError) as e:
+            log.debug('Unable to read rule pattern %r: %s', matcher.pattern, e)
+            return
+
+        items = list(parsed)
+        separator_item = (sre_constants.LITERAL, ord(separator))
+        if separator_item not in items:
+            return
+
+        self.keyed = True
+        key_items = items[:items.index(separator_item)]
+
+        if all(op in SINGLE_CHARACTER_OPS for op, _ in key_items):
+            self.character_matchers = [_compile_item(parsed, item) for item in key_items]
+
+        elif not matcher.flags & re.IGNORECASE:
+            for op, av in key_items:
+                if op != sre_constants.LITERAL:
+                    break
+                self.literal_prefix += unichr(av) if av > 255 else chr(av)
+
+    def can_match(self, key, separator):
+        """
+        Check whether the rule can match a line starting with a key
+        :param key: The text before the first separator of the line, or None
+                    if the line has no separator
+        :param separator: The character between the key and the value
+        :return: False if the rule cannot match the line
+        """
+        if not self.keyed:
+            return True
+
+        if key is None:
+            return False
+
+        text = key + separator
+
+        if self.character_matchers is None:
+            length = min(len(self.literal_prefix), len(text))
+            return self.literal_prefix[:length] == text[:length]
+
+        # the key pattern ends at the first separator of the line or spans it
+        if len(self.character_matchers) < len(key):
+            return False
+
+        return all(character_matcher.match(character)
+                   for character_matcher, character in zip(self.character_matchers, text))
+
+
+def _compile_item(parsed, item):
+    """
+    Compile one item of a parsed regex on its own, keeping the regex flags
+    :param parsed: The parsed regex
+    :param item: The (op, av) item
+    :return: The compiled item
+    """
+    return sre_compile.compile(sre_parse.SubPattern(parsed.pattern, [item]))
+
+
+class KeyDispatcher(object):
+    """
+    Find the rules a key=value line can match from the key at its start
+    """
+
+    def __init__(self, patterns, separator='='):
+        """
+        :param patterns: list of the rule regexes, in the order they are to be tried
+        :param separator: The character between the key and the value
+        """
+        self.separator = separator
+        self.matchers = [re.compile(pattern) for pattern in patterns]
+        self._rules = [_KeyRule(matcher, separator) for matcher in self.matchers]
+
+        # the rule indices for each key seen so far
+        self._candidates = {}
+
+    def key(self, line):
+        """
+        Get the key at the start of a line
+        :param line: The line
+        :return: The text before the first separator, or None if there is no separator
+        """
+        index = line.find(self.separator)
+        if index < 0:
+            return None
+
+        return line[:index]
+
+    def candidates(self, line):
+        """
+        Get the rules which can match the start of a line
+        :param line: The line
+        :return: tuple of the rule indices, in the order the rules are to be tried
+        """
+        key = self.key(line)
+
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = tuple(index for index, rule in enumerate(self._rules)
+                               if rule.can_match(key, self.separator))
+
+            if len(self._candidates) >= MAX_CACHED_KEYS:
+                self._candidates.clear()
+            self._candidates[key] = candidates
+
+        return candidates
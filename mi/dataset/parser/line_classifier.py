@@ -0,0 +1,180 @@
+"""
+@package mi.dataset.parser.line_classifier
+@file mi/dataset/parser/line_classifier.py
+@brief Single pass classification of text lines against a parser's record patterns
+
+DCL style parsers test each line against several record regexes in turn until
+one matches.  A LineClassifier holds a parser's record patterns in the order
+they are to be tried and returns the record type and match of the first one
+a line matches, so each line is classified in one call.
+
+Most record patterns start with a fixed width timestamp followed by a literal
+tag, such as '$TSPWA' or '[wavss'.  The classifier reads the patterns to find
+the column whose literal character best tells them apart, and builds a
+dispatch table from that character to the patterns which can match a line
+holding it.  A line is then only tested against those patterns, in the
+original order, so the result is the same as testing every pattern in turn.
+Patterns with no literal character in that column are tested for every line.
+
+Each pattern is also skipped, without running the regex, when the line does
+not contain the longest run of literal text the pattern always matches.
+"""
+
+import re
+import sre_constants
+import sre_parse
+
+from mi.core.log import get_logger
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+# Backreferences and conditionals have widths sre_parse does not work out
+GROUP_REFERENCE_MATCHER = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+def _literal_columns(matcher):
+    """
+    Find the literal characters a pattern requires at fixed columns from the
+    start of a match
+    :param matcher: The compiled regex
+    :return: dictionary of column to character
+    """
+    if matcher.flags & re.IGNORECASE or GROUP_REFERENCE_MATCHER.search(matcher.pattern):
+        return {}
+
+    try:
+        parsed = sre_parse.parse(matcher.pattern, matcher.flags)
+    except (sre_constants.error, TypeError, ValueError) as e:
+        log.debug('Unable to read record pattern %r: %s', matcher.pattern, e)
+        return {}
+
+    columns = {}
+    _add_literal_columns(parsed, 0, columns)
+    return columns
+
+
+def _add_literal_columns(parsed, column, columns):
+    """
+    Walk a parsed pattern up to its first variable width item, noting the
+    column of each literal character
+    :param parsed: The parsed (sub)pattern
+    :param column: The column the (sub)pattern starts at
+    :param columns: dictionary of column to character to add to
+    :return: The column after the (sub)pattern, or None if it has a variable width
+    """
+    for op, av in parsed:
+
+        if op == sre_constants.LITERAL:
+            columns[column] = unichr(av) if av > 255 else chr(av)
+            column += 1
+            continue
+
+        if op == sre_constants.SUBPATTERN:
+            column = _add_literal_columns(av[1], column, columns)
+            if column is None:
+                return None
+            continue
+
+        min_width, max_width = sre_parse.SubPattern(parsed.pattern, [(op, av)]).getwidth()
+        if min_width != max_width:
+            return None
+        column += min_width
+
+    return column
+
+
+def _required_text(matcher):
+    """
+    Find the longest run of literal text every match of a pattern contains
+    :param matcher: The compiled regex
+    :return: The text, or an empty string if there is none
+    """
+    if matcher.flags & re.IGNORECASE:
+        return ''
+
+    try:
+        parsed = sre_parse.parse(matcher.pattern, matcher.flags)
+    except (sre_constants.error, TypeError, ValueError):
+        return ''
+
+    runs = ['']
+    _add_literal_runs(parsed, runs)
+    return max(runs, key=len)
+
+
+def _add_literal_runs(parsed, runs):
+    """
+    Collect the runs of literal text in the top level sequence of a parsed pattern
+    :param parsed: The parsed (sub)pattern
+    :param runs: list of runs, the last one being extended, to add to
+    """
+    for op, av in parsed:
+
+        if op == sre_constants.LITERAL:
+            runs[-1] += unichr(av) if av > 255 else chr(av)
+
+        elif op == sre_constants.SUBPATTERN:
+            _add_literal_runs(av[1], runs)
+
+        elif op != sre_constants.AT:
+            runs.append('')
+
+
+class LineClassifier(object):
+    """
+    Find which of an ordered list of record patterns a line matches first
+    """
+
+    def __init__(self, record_matchers):
+        """
+        :param record_matchers: list of (record type, compiled regex) tuples, in
+                                the order the patterns are to be tried
+        """
+        self.record_matchers = list(record_matchers)
+
+        # each pattern is checked as (record type, regex, text the line must contain)
+        checks = [(record_type, matcher, _required_text(matcher)) for record_type, matcher in self.record_matchers]
+
+        literal_columns = [_literal_columns(matcher) for _, matcher in self.record_matchers]
+
+        # the dispatch column is the one with the most distinct literal characters
+        self.column = None
+        most_characters = 1
+        for column in sorted(set().union(*literal_columns)):
+            characters = set(columns[column] for columns in literal_columns if column in columns)
+            if len(characters) > most_characters:
+                self.column = column
+                most_characters = len(characters)
+
+        # patterns without a literal character in the dispatch column can match any line
+        self._default_checks = [check for check, columns in zip(checks, literal_columns)
+                                if self.column not in columns]
+
+        self._dispatch_table = {}
+        if self.column is not None:
+            for character in set(columns[self.column] for columns in literal_columns
+                                 if self.column in columns):
+                self._dispatch_table[character] = [check for check, columns in zip(checks, literal_columns)
+                                                   if columns.get(self.column, character) == character]
+
+    def classify(self, line):
+        """
+        Find the first record pattern the start of a line matches
+        :param line: The line to classify
+        :return: (record type, match) of the first matching pattern, or
+                 (None, None) if no pattern matches
+        """
+        if self.column is None:
+            checks = self._default_checks
+        else:
+            checks = self._dispatch_table.get(line[self.column:self.column + 1], self._default_checks)
+
+        for record_type, matcher, required_text in checks:
+            if required_text in line:
+                match = matcher.match(line)
+                if match is not None:
+                    return record_type, match
+
+        return None, None
@@ -10,14 +10,14 @@ Release notes:
 initial release
 """
 
-import msgpack
 import ntplib
 
 from mi.core.log import get_logger
 from mi.core.common import BaseEnum
-from mi.core.instrument.data_particle import DataParticle
+from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.exceptions import SampleException, NotImplementedException
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser import msgpack_batch
 
 log = get_logger()
 
@@ -86,11 +86,13 @@ class MmpCdsParserDataParticle(DataParticle):
             raw_time_microseconds_encoded = self._encode_value(MmpCdsParserDataParticleKey.RAW_TIME_MICROSECONDS,
                                                                raw_time_microseconds, int)
 
-            ntp_timestamp = ntplib.system_to_ntp_time(raw_time_seconds + raw_time_microseconds/1000000.0)
+            # the parser converts the timestamps of well formed records in batches
+            if self.contents[DataParticleKey.INTERNAL_TIMESTAMP] is None:
+                ntp_timestamp = ntplib.system_to_ntp_time(raw_time_seconds + raw_time_microseconds/1000000.0)
 
-            log.debug("Calculated timestamp from raw %.10f", ntp_timestamp)
+                log.debug("Calculated timestamp from raw %.10f", ntp_timestamp)
 
-            self.set_internal_timestamp(ntp_timestamp)
+                self.set_internal_timestamp(ntp_timestamp)
 
             subclass_particle_params = self._get_mmp_cds_subclass_particle_params(self.raw_data[2])
 
@@ -113,35 +115,49 @@ class MmpCdsParser(SimpleParser):
 
     def parse_file(self):
         """
-        This method parses each chunk and attempts to extract samples to return.
-        @return for each discovered sample, a list of tuples containing each particle and associated state position
-        # information
+        This method unpacks all the chunks, converts the timestamps of the records in batches and attempts to
+        extract samples to return.
         """
 
+        records = []
+        unpack_failed = False
+
         # We need to put the following in a try block just in case the data provided is malformed
         try:
-            # Let's iterate through each unpacked list item
-            for unpacked_data in msgpack.Unpacker(self._stream_handle):
+            for unpacked_data in msgpack_batch.unpack(self._stream_handle):
+                records.append(unpacked_data)
+
+        except TypeError:
+            # reported once the records unpacked before the failure have been processed
+            unpack_failed = True
 
-                # The expectation is that an unpacked list item associated with a McLane Moored Profiler cabled
-                # docking station data chunk consists of a list of three items
-                if isinstance(unpacked_data, tuple) or isinstance(unpacked_data, list) and \
-                        len(unpacked_data) == NUM_MMP_CDS_UNPACKED_ITEMS:
+        timestamps = [None] * len(records)
+        for batch in msgpack_batch.group_records(records):
+            for index, timestamp in zip(batch.indices, batch.ntp_timestamps().tolist()):
+                timestamps[index] = timestamp
 
-                    # Extract the sample an provide the particle class which could be different for each
-                    # derived MmpCdsParser
+        # Let's iterate through each unpacked list item
+        for unpacked_data, timestamp in zip(records, timestamps):
 
-                    try:
-                        data_particle = self._extract_sample(self._particle_class, None, unpacked_data, None)
-                        self._record_buffer.append(data_particle)
-                    except SampleException:
-                        log.debug(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
-                        self._exception_callback(SampleException(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG))
+            # The expectation is that an unpacked list item associated with a McLane Moored Profiler cabled
+            # docking station data chunk consists of a list of three items
+            if isinstance(unpacked_data, tuple) or isinstance(unpacked_data, list) and \
+                    len(unpacked_data) == NUM_MMP_CDS_UNPACKED_ITEMS:
 
-                else:
+                # Extract the sample an provide the particle class which could be different for each
+                # derived MmpCdsParser
+
+                try:
+                    data_particle = self._extract_sample(self._particle_class, None, unpacked_data, timestamp)
+                    self._record_buffer.append(data_particle)
+                except SampleException:
                     log.debug(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
                     self._exception_callback(SampleException(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG))
 
-        except TypeError:
+            else:
+                log.debug(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
+                self._exception_callback(SampleException(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG))
+
+        if unpack_failed:
             log.warn(UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG)
-            self._exception_callback( SampleException(UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG))
+            self._exception_callback(SampleException(UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG))
@@ -11,6 +11,7 @@ initial release
 """
 
 import ntplib
+import os
 import struct
 
 
@@ -36,6 +37,9 @@ RATE_ID = b'\xCF'
 ACCEL_BYTES = 43
 RATE_BYTES = 31
 
+# the format name of the time index of mopak files, see mi.dataset.time_index
+TIME_INDEX_FORMAT = 'mopak'
+
 MAX_TIMER = 4294967296
 TIMER_TO_SECONDS = 62500.0
 TIMER_DIFF_FACTOR = 2.1
@@ -233,21 +237,24 @@ class MopakODclParser(SimpleParser):
         # convert to ntp64
         return float(ntplib.system_to_ntp_time(time_secs))
 
-    def parse_file(self):
-
-        position = 0
+    def _records(self, position=0):
+        """
+        Read the records of the file with valid checksums, keeping track of the timer rolling over
+        :param position: The offset of the record to start reading at
+        :return: generator of (offset, record ID, record bytes, NTP timestamp) of the records
+        """
         last_timer = 0
         bad_data = False
+        self._stream_handle.seek(position)
         record_type = self._stream_handle.read(1)
 
         while record_type:  # will be None when EOF is found
             self._stream_handle.seek(position)  # reset file position to beginning of record
-            particle = None
+            record_position = position
             fields = None
             if record_type == ACCEL_ID:
                 data = self._stream_handle.read(ACCEL_BYTES)
                 if self.compare_checksum(data):
-                    particle = self._extract_sample(self._accel_particle_class, None, data, None)
                     fields = struct.unpack('>I', data[37:41])
                     position += ACCEL_BYTES
                 else:
@@ -259,8 +266,6 @@ class MopakODclParser(SimpleParser):
             elif record_type == RATE_ID:
                 data = self._stream_handle.read(RATE_BYTES)
                 if self.compare_checksum(data):
-                    # particle-ize the data block received, return the record
-                    particle = self._extract_sample(self._rate_particle_class, None, data, None)
                     fields = struct.unpack('>I', data[25:29])
                     position += RATE_BYTES
                 else:
@@ -298,12 +303,8 @@ class MopakODclParser(SimpleParser):
                     log.info("Timer has rolled")
                     self._timer_rollover += 1
 
-                timestamp = self.timer_to_timestamp(timer)
-
-                if particle:
-                    particle.set_internal_timestamp(timestamp)
-                    self._record_buffer.append(particle)
-                    bad_data = False
+                yield record_position, record_type, data, self.timer_to_timestamp(timer)
+                bad_data = False
 
                 # use the timer diff to determine if the timer has been reset instead of rolling over
                 # at the end
@@ -314,3 +315,69 @@ class MopakODclParser(SimpleParser):
 
             self._stream_handle.seek(position)
             record_type = self._stream_handle.read(1)
+
+    def _seek_time_index(self):
+        """
+        Start reading at the last indexed record before the start time, when the file has
+        a time index.  The timer start is read from the first record, and the number of
+        timer roll overs found from the time of the indexed record.
+        :return: The offset to start reading at
+        """
+        time_index_seek = self._time_index_seek(TIME_INDEX_FORMAT)
+        if time_index_seek is None:
+            return 0
+
+        first_entry, seek_entry = time_index_seek
+        self._timer_start = self._read_timer(first_entry.offset)
+        seek_timer = self._read_timer(seek_entry.offset)
+        if self._timer_start is None or seek_timer is None:
+            log.warn('Time index does not match the records of the file, reading it from the start')
+            self._timer_start = None
+            return 0
+
+        counts = (ntplib.ntp_to_system_time(seek_entry.timestamp) - float(self._start_time_utc)) * TIMER_TO_SECONDS
+        self._timer_rollover = int(round((counts + self._timer_start - seek_timer) / MAX_TIMER))
+        return seek_entry.offset
+
+    def _read_timer(self, position):
+        """
+        :param position: The offset of a record
+        :return: The timer of the record, or None if there is no valid record there
+        """
+        self._stream_handle.seek(position)
+        record_type = self._stream_handle.read(1)
+        record_bytes, timer_offset = {ACCEL_ID: (ACCEL_BYTES, 37), RATE_ID: (RATE_BYTES, 25)}.get(record_type, (0, 0))
+        self._stream_handle.seek(position)
+        data = self._stream_handle.read(record_bytes)
+        if not record_bytes or len(data) != record_bytes or not self.compare_checksum(data):
+            return None
+        return struct.unpack('>I', data[timer_offset:timer_offset + 4])[0]
+
+    def parse_file(self):
+
+        position = self._seek_time_index()
+
+        for _, record_type, data, timestamp in self._records(position):
+            if record_type == ACCEL_ID:
+                particle = self._extract_sample(self._accel_particle_class, None, data, timestamp)
+            else:
+                # particle-ize the data block received, return the record
+                particle = self._extract_sample(self._rate_particle_class, None, data, timestamp)
+
+            if particle:
+                self._record_buffer.append(particle)
+
+
+def time_index_entries(file_path):
+    """
+    List the records of a mopak file for its time index
+    :param file_path: The path of the mopak file, named for its start time
+    :return: generator of (offset, record ID, NTP timestamp) of the records
+    """
+    with open(file_path, 'rb') as stream_handle:
+        # bad data is logged as it is found, there are no particles to report it with
+        parser = MopakODclParser({DataSetDriverConfigKeys.PARTICLE_CLASSES_DICT: {}}, stream_handle,
+                                 os.path.basename(file_path), lambda exception: None)
+
+        for position, record_type, _, timestamp in parser._records():
+            yield position, ord(record_type), timestamp
@@ -0,0 +1,138 @@
+"""
+@package mi.dataset.parser.msgpack_batch
+@file mi/dataset/parser/msgpack_batch.py
+@brief Batched ingest of msgpack encoded [seconds, microseconds, data] records
+
+The McLane Moored Profiler cabled docking station and Deep Profiler files are
+streams of msgpack encoded records of a raw time in seconds, the microseconds
+and the instrument data.  The records are unpacked with a large read buffer and
+grouped into batches by the layout of their data, the field names of dictionary
+data or the type of any other data, so there is one batch per stream.  The
+timestamps of a batch are converted together and its fields can be pulled out
+as NumPy arrays.
+"""
+
+import msgpack
+import numpy
+
+from mi.core.time import NTP_UNIX_EPOCH_DELTA
+
+__license__ = 'Apache 2.0'
+
+# The number of bytes read from the file at a time while unpacking
+READ_SIZE = 1024 * 1024
+
+# The number of items in a record: seconds, microseconds and data
+NUM_RECORD_ITEMS = 3
+
+# Record times must be one of these types to be converted in a batch
+TIME_TYPES = (int, long, float)
+
+
+class RecordBatch(object):
+    """
+    The records of a file sharing one layout, with the seconds and microseconds
+    of their times in arrays
+    """
+
+    def __init__(self, layout):
+        self.layout = layout
+        self.indices = []
+        self.records = []
+        self.seconds = None
+        self.microseconds = None
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, index, record):
+        """
+        Add a record to the batch
+        :param index: The position of the record in the file
+        :param record: The unpacked record
+        """
+        self.indices.append(index)
+        self.records.append(record)
+
+    def finish(self):
+        """
+        Build the time arrays once all records have been added
+        """
+        self.seconds = numpy.array([record[0] for record in self.records])
+        self.microseconds = numpy.array([record[1] for record in self.records])
+
+    def ntp_timestamps(self):
+        """
+        Convert the record times to NTP timestamps
+        :return: numpy array of NTP timestamps
+        """
+        return (self.seconds + self.microseconds / 1000000.0) + NTP_UNIX_EPOCH_DELTA
+
+    def column(self, name):
+        """
+        Get the values of one field of dictionary data records
+        :param name: The field name
+        :return: numpy array of the field values of the records
+        """
+        if name not in self._columns:
+            self._columns[name] = numpy.array([record[2][name] for record in self.records])
+
+        return self._columns[name]
+
+
+def unpack(stream_handle):
+    """
+    Iterate over the msgpack records of a file
+    :param stream_handle: The file handle
+    :return: An iterator of unpacked records
+    """
+    return msgpack.Unpacker(stream_handle, read_size=READ_SIZE)
+
+
+def data_layout(data):
+    """
+    Get the layout of the data of a record, the sorted field names of dictionary
+    data or the type of any other data
+    :param data: The data item of a record
+    :return: The layout
+    """
+    if isinstance(data, dict):
+        return tuple(sorted(data.keys()))
+
+    return type(data)
+
+
+def group_records(records):
+    """
+    Group records into batches by the layout of their data and the types of
+    their times.  Records which are not lists of seconds, microseconds and data
+    with numeric times are left out, to be handled on their own.
+    :param records: list of unpacked records
+    :return: list of the batches, in the order their layouts first occur
+    """
+    batches = {}
+    ordered_batches = []
+
+    for index, record in enumerate(records):
+
+        if not isinstance(record, (list, tuple)) or len(record) != NUM_RECORD_ITEMS:
+            continue
+
+        seconds, microseconds, data = record
+        if type(seconds) not in TIME_TYPES or type(microseconds) not in TIME_TYPES:
+            continue
+
+        layout = (type(seconds), type(microseconds), data_layout(data))
+        batch = batches.get(layout)
+
+        if batch is None:
+            batch = batches[layout] = RecordBatch(layout)
+            ordered_batches.append(batch)
+
+        batch.append(index, record)
+
+    for batch in ordered_batches:
+        batch.finish()
+
+    return ordered_batches
@@ -19,6 +19,10 @@ data particles are the same for both recovered and telemetered.
 Only the names of the output particle streams are different.
 
 Input files are ASCII with variable length records.
+
+The 256 spectral channel values of each frame are converted with one NumPy
+call, and the frames of each type are gathered into a batch which gives
+their spectral channel values as a 2-D array.
 """
 
 __author__ = 'mworden'
@@ -29,7 +33,8 @@ log = get_logger()
 
 from mi.core.exceptions import UnexpectedDataException, SampleException
 
-from mi.dataset.parser.nutnr_b_dcl_parser_base import NutnrBDclParser
+from mi.dataset.parser.nutnr_b_dcl_parser_base import NutnrBDclParser, \
+    decode_spectral_channels
 
 from mi.dataset.parser.nutnr_b_dcl_parser_base import \
     InstrumentDataMatchGroups, \
@@ -51,6 +56,13 @@ from mi.dataset.parser.nutnr_b_particles import \
     NutnrBDclFullTelemeteredInstrumentDataParticle, \
     NutnrBDataParticleKey
 
+# The matchers of the lines of a file, in the order they are tried
+LINE_MATCHERS = (NUTR_B_DCL_IGNORE_MATCHER,
+                 IDLE_TIME_MATCHER,
+                 NEXT_WAKEUP_MATCHER,
+                 META_MESSAGE_MATCHER,
+                 INST_FULL_DATA_MATCHER)
+
 
 class NutnrBDclFullParser(NutnrBDclParser):
     """
@@ -107,6 +119,9 @@ class NutnrBDclFullParser(NutnrBDclParser):
             log.error(message)
             raise SampleException(message)
 
+        spectral_channels = decode_spectral_channels(
+            inst_match.group(InstrumentDataMatchGroups.INST_GROUP_SPECTRAL_CHANNELS))
+
         # Create the instrument data list of tuples from the instrument match data
         instrument_data_tuple = [
             (NutnrBDataParticleKey.DCL_CONTROLLER_TIMESTAMP,
@@ -179,7 +194,7 @@ class NutnrBDclFullParser(NutnrBDclParser):
              inst_match.group(InstrumentDataMatchGroups.INST_GROUP_SPEC_CHANNEL_AVERAGE),
              float),
             (spectral_key,
-             map(int, inst_match.group(InstrumentDataMatchGroups.INST_GROUP_SPECTRAL_CHANNELS).split(',')),
+             spectral_channels.tolist(),
              list),
         ]
 
@@ -190,6 +205,9 @@ class NutnrBDclFullParser(NutnrBDclParser):
                                         instrument_data_tuple,
                                         ntp_timestamp)
 
+        if particle is not None:
+            self._add_frame(frame_type, ntp_timestamp, spectral_channels)
+
         return particle
 
     def parse_file(self):
@@ -204,36 +222,42 @@ class NutnrBDclFullParser(NutnrBDclParser):
         # While a new line in the file exists
         while line:
 
-            # Attempt to create a match for each possible line that should
-            # exist in the file
-            idle_match = IDLE_TIME_MATCHER.match(line)
-            next_wakeup_match = NEXT_WAKEUP_MATCHER.match(line)
-            meta_match = META_MESSAGE_MATCHER.match(line)
-            inst_match = INST_FULL_DATA_MATCHER.match(line)
-            ignore_match = NUTR_B_DCL_IGNORE_MATCHER.match(line)
+            # Find the first matcher which matches the line
+            match = None
+            for matcher in LINE_MATCHERS:
+                match = matcher.match(line)
+                if match is not None:
+                    break
+
+            if match is None:
+                # We found a line in the file that was unexpected.  Report a
+                # RecoverableSampleException
+                message = "Unexpected data in file, line: " + line
+                log.warn(message)
+                self._exception_callback(UnexpectedDataException(message))
 
             # Let's first check to see if we have an ignore match
-            if ignore_match is not None:
+            elif matcher is NUTR_B_DCL_IGNORE_MATCHER:
 
                 log.debug("Found ignore match - line: %s", line)
 
             # Did the line match an idle line?
-            elif idle_match is not None:
+            elif matcher is IDLE_TIME_MATCHER:
 
                 log.debug("Found idle match: %s", line)
 
                 # Process the idle state metadata match
-                self._process_idle_metadata_record(idle_match)
+                self._process_idle_metadata_record(match)
 
             # Did the line match a next wakeup record?
-            elif next_wakeup_match is not None:
+            elif matcher is NEXT_WAKEUP_MATCHER:
 
                 log.debug("Found next wakeup match: %s", line)
 
                 self._process_next_wakeup_match()
 
             # Did the line match one of the possible metadata possibilities?
-            elif meta_match is not None:
+            elif matcher is META_MESSAGE_MATCHER:
 
                 log.debug("Found potential metadata part match: %s", line)
 
@@ -241,19 +265,12 @@ class NutnrBDclFullParser(NutnrBDclParser):
                 self._process_metadata_record_part(line)
 
             # Did the line match one of the possible instrument lines?
-            elif inst_match is not None:
+            else:
 
                 log.debug("Found potential instrument match: %s", line)
 
                 # process the instrument record match
-                self._process_instrument_record_match(inst_match)
-
-            else:
-                # We found a line in the file that was unexpected.  Report a
-                # RecoverableSampleException
-                message = "Unexpected data in file, line: " + line
-                log.warn(message)
-                self._exception_callback(UnexpectedDataException(message))
+                self._process_instrument_record_match(match)
 
             # Read the next line in the file
             line = self._stream_handle.readline()
@@ -14,8 +14,10 @@ __author__ = 'Steve Myerson (Raytheon), Mark Worden'
 __license__ = 'Apache 2.0'
 
 import re
+from collections import OrderedDict
 
 import ntplib
+import numpy
 
 from mi.core.log import get_logger, get_logging_metaclass
 log = get_logger()
@@ -171,6 +173,11 @@ INST_FULL_DATA_REGEX += '((?:' + INT_REGEX + SEPARATOR + '){255}' + \
                         INT_REGEX + ')'     # 256 int spectral values
 INST_FULL_DATA_MATCHER = re.compile(INST_FULL_DATA_REGEX)
 
+SPECTRAL_CHANNEL_COUNT = 256   # number of spectral values in a full frame
+
+# NumPy clips int values which do not fit in an int64 to these limits
+INT64_LIMITS = (numpy.iinfo(numpy.int64).min, numpy.iinfo(numpy.int64).max)
+
 
 class InstrumentDataMatchGroups(BaseEnum):
     # The following match groups are applicable to the instrument conc and full
@@ -289,6 +296,57 @@ NUTR_B_DCL_IGNORE_REGEX = \
 NUTR_B_DCL_IGNORE_MATCHER = re.compile(NUTR_B_DCL_IGNORE_REGEX)
 
 
+def decode_spectral_channels(spectral_channels):
+    """
+    Convert the spectral channel values of a full frame with one NumPy call.
+    The values are converted one at a time instead if any may not fit in an int64.
+    @param spectral_channels The comma separated spectral channel values
+    @returns numpy array of the values
+    @throws ValueError if a value is not an int
+    """
+    values = numpy.fromstring(spectral_channels, dtype=numpy.int64, sep=SEPARATOR)
+
+    if len(values) != spectral_channels.count(SEPARATOR) + 1 or \
+            values.min() in INT64_LIMITS or values.max() in INT64_LIMITS:
+        values = numpy.array(map(int, spectral_channels.split(SEPARATOR)), dtype=object)
+
+    return values
+
+
+class NutnrBDclFrameBatch(object):
+    """
+    The full frames of one frame type from a nutnr_b_dcl file, with the
+    spectral channel values of all the frames available as one 2-D array
+    """
+
+    def __init__(self, frame_type):
+        self.frame_type = frame_type
+        self.timestamps = []
+        self._spectral_channels = []
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, ntp_timestamp, spectral_channels):
+        """
+        Add a frame to the batch
+        @param ntp_timestamp The internal timestamp of the frame particle
+        @param spectral_channels numpy array of the spectral channel values
+        """
+        self.timestamps.append(ntp_timestamp)
+        self._spectral_channels.append(spectral_channels)
+
+    def spectral_channels(self):
+        """
+        Get the spectral channel values of all the frames
+        @returns numpy array with a row of spectral channel values per frame
+        """
+        if not self._spectral_channels:
+            return numpy.empty((0, SPECTRAL_CHANNEL_COUNT), dtype=numpy.int64)
+
+        return numpy.vstack(self._spectral_channels)
+
+
 class NutnrBDclParser(Parser):
 
     __metaclass__ = get_logging_metaclass(log_level='debug')
@@ -322,6 +380,7 @@ class NutnrBDclParser(Parser):
         # Initialize the
         self._file_parsed = False
         self._record_buffer = []
+        self._frame_batches = OrderedDict()
         self._metadata_state = 0
         self._metadata_timestamp = 0.0
         self._metadata_particle_generated_for_block = False
@@ -444,6 +503,24 @@ class NutnrBDclParser(Parser):
             if particle is not None:
                 self._record_buffer.append(particle)
 
+    def _add_frame(self, frame_type, ntp_timestamp, spectral_channels):
+        """
+        Add the spectral channel values of a full frame to the batch of its frame type
+        """
+        if frame_type not in self._frame_batches:
+            self._frame_batches[frame_type] = NutnrBDclFrameBatch(frame_type)
+        self._frame_batches[frame_type].append(ntp_timestamp, spectral_channels)
+
+    def get_frame_batches(self):
+        """
+        Parse the file if it has not been done already and get the full frames as batches
+        @returns list of NutnrBDclFrameBatch, one per frame type found
+        """
+        if self._file_parsed is False:
+            self.parse_file()
+
+        return self._frame_batches.values()
+
     def _process_next_wakeup_match(self):
 
         # Clear the metadata state
@@ -512,9 +589,8 @@ class NutnrBDclParser(Parser):
             if self._file_parsed is False:
                 self.parse_file()
 
-            # Iterate through the particles returned, and pop them off from the beginning of the record
-            # buffer to the end
-            while len(particles_to_return) < num_records_requested and len(self._record_buffer) > 0:
-                particles_to_return.append(self._record_buffer.pop(0))
+            # Take the particles from the beginning of the record buffer
+            particles_to_return = self._record_buffer[:num_records_requested]
+            del self._record_buffer[:num_records_requested]
 
         return particles_to_return
@@ -15,6 +15,7 @@ import struct
 from mi.core.log import get_logger
 
 from mi.core.common import BaseEnum
+from mi.dataset.parser import optaa_common
 from mi.dataset.parser.mmp_cds_base import MmpCdsParserDataParticle
 log = get_logger()
 
@@ -141,27 +142,11 @@ class OptaaAcMmpCdsParserDataParticle(MmpCdsParserDataParticle):
                                                            serial_number_int,
                                                            str))
 
-        # Set the offset to the location of the reference and signal counts
-        offset = RAW_REF_AND_SIGNAL_COUNTS_BASE_OFFSET
-        raw_c_ref_counts = []
-        raw_a_ref_counts = []
-        raw_c_sig_counts = []
-        raw_a_sig_counts = []
-
-        # Time to deal with the wavelengths
-        for i in range(1, num_wavelengths+1):
-            # The first param is a "c reference count"
-            raw_c_ref_counts.append(struct.unpack_from('H', subclass_specific_msgpack_unpacked_data, offset)[0])
-            offset += 2
-            # Next is the an "a reference count"
-            raw_a_ref_counts.append(struct.unpack_from('H', subclass_specific_msgpack_unpacked_data, offset)[0])
-            offset += 2
-            # Following that is a "c signal count"
-            raw_c_sig_counts.append(struct.unpack_from('H', subclass_specific_msgpack_unpacked_data, offset)[0])
-            offset += 2
-            # Lastly, an "a signal count"
-            raw_a_sig_counts.append(struct.unpack_from('H', subclass_specific_msgpack_unpacked_data, offset)[0])
-            offset += 2
+        # The reference and signal counts follow, interleaved for each wavelength, decode them all at once
+        counts = optaa_common.unpack_counts(subclass_specific_msgpack_unpacked_data, num_wavelengths,
+                                            RAW_REF_AND_SIGNAL_COUNTS_BASE_OFFSET,
+                                            optaa_common.NATIVE_BYTE_ORDER)
+        raw_c_ref_counts, raw_a_ref_counts, raw_c_sig_counts, raw_a_sig_counts = optaa_common.count_lists(counts)
 
         # Encode each of the count lists and append the encoded param to the list to return
         subclass_particle_params.append(self._encode_value(OptaaAcMmpCdsParserDataParticleKey.C_REFERENCE_COUNTS,
@@ -0,0 +1,75 @@
+"""
+@package mi.dataset.parser.optaa_common
+@file mi/dataset/parser/optaa_common.py
+@brief Decoding of the OPTAA (AC-S) wavelength count arrays shared by the optaa parsers
+
+Each OPTAA sample holds four raw counts per wavelength, stored interleaved as
+c reference, a reference, c signal, a signal for each wavelength in turn.
+The counts are decoded into a 2-D array with one row per wavelength and one
+column per count type.
+"""
+
+import numpy
+
+from mi.core.exceptions import RecoverableSampleException
+
+__license__ = 'Apache 2.0'
+
+# columns of the count array, in the order the counts are stored
+C_REFERENCE_COLUMN = 0
+A_REFERENCE_COLUMN = 1
+C_SIGNAL_COLUMN = 2
+A_SIGNAL_COLUMN = 3
+COUNTS_PER_WAVELENGTH = 4
+
+BIG_ENDIAN = '>'
+LITTLE_ENDIAN = '<'
+NATIVE_BYTE_ORDER = '='
+
+
+def unpack_counts(buf, num_wavelengths, offset=0, byte_order=BIG_ENDIAN):
+    """
+    Decode the interleaved binary counts of a sample in one step
+    :param buf: The buffer (string) holding the sample
+    :param num_wavelengths: The number of wavelengths in the sample
+    :param offset: The offset of the first count in the buffer
+    :param byte_order: The byte order of the 16 bit counts
+    :return: numpy uint16 array of shape (num_wavelengths, COUNTS_PER_WAVELENGTH)
+    :raises ValueError: if the buffer is too short to hold the counts
+    """
+    counts = numpy.frombuffer(buf, dtype=numpy.dtype(byte_order + 'u2'),
+                              count=num_wavelengths * COUNTS_PER_WAVELENGTH, offset=offset)
+
+    return counts.reshape(num_wavelengths, COUNTS_PER_WAVELENGTH)
+
+
+def parse_counts(c_reference, a_reference, c_signal, a_signal, separator='\t'):
+    """
+    Build the count array from the four separated ASCII count lists of a sample
+    :param c_reference: The c reference counts string
+    :param a_reference: The a reference counts string
+    :param c_signal: The c signal counts string
+    :param a_signal: The a signal counts string
+    :param separator: The separator between counts
+    :return: numpy int64 array of shape (num_wavelengths, COUNTS_PER_WAVELENGTH)
+    :raises RecoverableSampleException: if the lists hold different numbers of counts
+    """
+    columns = [numpy.array(text.strip(separator).split(separator), dtype=numpy.int64)
+               for text in (c_reference, a_reference, c_signal, a_signal)]
+
+    # a truncated record can leave the lists with different numbers of counts
+    lengths = [len(column) for column in columns]
+    if len(set(lengths)) != 1:
+        raise RecoverableSampleException('OPTAA count lists have different lengths %s' % lengths)
+
+    return numpy.column_stack(columns)
+
+
+def count_lists(counts):
+    """
+    Split a count array into the c reference, a reference, c signal and a signal
+    count lists used as particle values
+    :param counts: numpy array of shape (num_wavelengths, COUNTS_PER_WAVELENGTH)
+    :return: tuple of four lists of ints
+    """
+    return tuple(counts.T.tolist())
@@ -28,6 +28,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser import optaa_common
 
 log = get_logger()
 
@@ -203,6 +204,13 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
         for name, group, function in INSTRUMENT_PARTICLE_ENCODING_RULES_BEGIN:
             results.append(self._encode_value(name, self.raw_data.group(group), function))
 
+        # Decode the four arrays of counts together
+        counts = optaa_common.parse_counts(self.raw_data.group(DataMatchesGroupNumber.C_REF_COUNTS),
+                                           self.raw_data.group(DataMatchesGroupNumber.A_REF_COUNTS),
+                                           self.raw_data.group(DataMatchesGroupNumber.C_SIG_COUNTS),
+                                           self.raw_data.group(DataMatchesGroupNumber.A_SIG_COUNTS))
+        c_ref_counts, a_ref_counts, c_sig_counts, a_sig_counts = optaa_common.count_lists(counts)
+
         # The following is a mix if int, followed by a list.
 
         # C-channel reference dark counts, used for diagnostic purposes.
@@ -212,7 +220,7 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
 
         # Array of raw c-channel reference counts
         results.append(self._encode_value(OptaaDjCsppParserDataParticleKey.C_REFERENCE_COUNTS,
-                                          self._build_list_for_encoding(DataMatchesGroupNumber.C_REF_COUNTS),
+                                          c_ref_counts,
                                           list))
 
         # C-signal reference dark counts, used for diagnostic purposes.
@@ -222,7 +230,7 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
 
         # Array of raw c-channel signal counts
         results.append(self._encode_value(OptaaDjCsppParserDataParticleKey.C_SIGNAL_COUNTS,
-                                          self._build_list_for_encoding(DataMatchesGroupNumber.C_SIG_COUNTS),
+                                          c_sig_counts,
                                           list))
 
         # A-channel reference dark counts, used for diagnostic purposes.
@@ -232,7 +240,7 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
 
         # Array of raw a-channel reference counts
         results.append(self._encode_value(OptaaDjCsppParserDataParticleKey.A_REFERENCE_COUNTS,
-                                          self._build_list_for_encoding(DataMatchesGroupNumber.A_REF_COUNTS),
+                                          a_ref_counts,
                                           list))
 
         # A-signal reference dark counts, used for diagnostic purposes.
@@ -242,7 +250,7 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
 
         # Array of raw a-channel signal counts
         results.append(self._encode_value(OptaaDjCsppParserDataParticleKey.A_SIGNAL_COUNTS,
-                                          self._build_list_for_encoding(DataMatchesGroupNumber.A_SIG_COUNTS),
+                                          a_sig_counts,
                                           list))
 
         # Process each of the non-list instrument particle parameters that occur last
@@ -256,22 +264,6 @@ class OptaaDjCsppInstrumentDataParticle(DataParticle):
 
         return results
 
-    def _build_list_for_encoding(self, group_num):
-        """
-        Helper method for building the list that is needed for encoding
-        @param group_num the group number of the match
-        @return the list of counts
-        """
-
-        # Load the tab separated string
-        tab_str = self.raw_data.group(group_num)
-        # Strip off the ending tab
-        tab_str_stripped = tab_str.strip('\t')
-        counts_list = tab_str_stripped.split('\t')
-
-        # return a list of integers
-        return map(int, counts_list)
-
 
 class OptaaDjCsppInstrumentRecoveredDataParticle(OptaaDjCsppInstrumentDataParticle):
     """
@@ -24,13 +24,10 @@ Initial release
 """
 
 import calendar
-from ctypes import BigEndianStructure, c_ushort, c_uint, c_ubyte
-from _ctypes import sizeof
-
-from io import BytesIO
-from collections import OrderedDict, namedtuple
+from collections import namedtuple
 import re
 import ntplib
+import numpy
 import struct
 
 from mi.core.log import get_logger
@@ -42,6 +39,7 @@ from mi.core.exceptions import \
 
 from mi.core.instrument.data_particle import DataParticle
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser import optaa_common
 
 log = get_logger()
 
@@ -134,40 +132,37 @@ class DataParticleType(BaseEnum):
     TEL_METADATA_PARTICLE = 'optaa_dj_dcl_metadata'
 
 
+# fields of the sample header, in the order they occur in the input
+SAMPLE_HEADER_FIELDS = [
+    Keys.PACKET_MARKER,
+    Keys.RECORD_LENGTH,
+    Keys.PACKET_TYPE,
+    Keys.RESERVED,
+    Keys.METER_TYPE,
+    Keys.SERIAL_NUMBER_HIGH,
+    Keys.SERIAL_NUMBER_LOW,
+    Keys.A_REFERENCE_DARK_COUNTS,
+    Keys.PRESSURE_COUNTS,
+    Keys.A_SIGNAL_DARK_COUNTS,
+    Keys.EXTERNAL_TEMP_RAW,
+    Keys.INTERNAL_TEMP_RAW,
+    Keys.C_REFERENCE_DARK_COUNTS,
+    Keys.C_SIGNAL_DARK_COUNTS,
+    Keys.TIME_HIGH,
+    Keys.TIME_LOW,
+    Keys.RESERVED2,
+    Keys.NUM_WAVELENGTHS
+]
+
+SAMPLE_HEADER_STRUCT = struct.Struct('>I H 4B H 9H 2B')
+
+
 # helper class for simple unpacking of data
-class OptaaSampleHeader(BigEndianStructure):
-    _fields_ = [
-        (Keys.PACKET_MARKER, c_uint),
-        (Keys.RECORD_LENGTH, c_ushort),
-        (Keys.PACKET_TYPE, c_ubyte),
-        (Keys.RESERVED, c_ubyte),
-        (Keys.METER_TYPE, c_ubyte),
-        (Keys.SERIAL_NUMBER_HIGH, c_ubyte),
-        (Keys.SERIAL_NUMBER_LOW, c_ushort),
-        (Keys.A_REFERENCE_DARK_COUNTS, c_ushort),
-        (Keys.PRESSURE_COUNTS, c_ushort),
-        (Keys.A_SIGNAL_DARK_COUNTS, c_ushort),
-        (Keys.EXTERNAL_TEMP_RAW, c_ushort),
-        (Keys.INTERNAL_TEMP_RAW, c_ushort),
-        (Keys.C_REFERENCE_DARK_COUNTS, c_ushort),
-        (Keys.C_SIGNAL_DARK_COUNTS, c_ushort),
-        (Keys.TIME_HIGH, c_ushort),
-        (Keys.TIME_LOW, c_ushort),
-        (Keys.RESERVED2, c_ubyte),
-        (Keys.NUM_WAVELENGTHS, c_ubyte),
-    ]
+class OptaaSampleHeader(namedtuple('OptaaSampleHeader', SAMPLE_HEADER_FIELDS)):
 
     @staticmethod
     def from_string(input_str):
-        header = OptaaSampleHeader()
-        BytesIO(input_str).readinto(header)
-        return header
-
-    def __str__(self):
-        d = OrderedDict()
-        for name, _ in self._fields_:
-            d[name] = getattr(self, name)
-        return str(d)
+        return OptaaSampleHeader._make(SAMPLE_HEADER_STRUCT.unpack_from(input_str))
 
 
 class OptaaDjDclInstrumentDataParticle(DataParticle):
@@ -303,35 +298,38 @@ class OptaaDjDclParser(SimpleParser):
         position = 0
         metadata_generated = False
 
-        packet_id_bytes = self._stream_handle.read(MARKER_SIZE)  # read the first four bytes of the file
+        data = self._stream_handle.read()
+        data_length = len(data)
+
+        # running sums of the file bytes, the checksum of a packet is the difference of two of them
+        byte_sums = numpy.zeros(data_length + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.frombuffer(data, dtype=numpy.uint8), out=byte_sums[1:])
+
+        while position < data_length:
 
-        while packet_id_bytes:  # will be None when EOF is found
+            packet_id_bytes = data[position:position + MARKER_SIZE]  # the next four bytes of the file
 
             if packet_id_bytes == START_MARKER:  # we found the marker
-                length_bytes = self._stream_handle.read(2)
-                packet_length = struct.unpack('>H', length_bytes)[0]
+                packet_length = struct.unpack_from('>H', data, position + MARKER_SIZE)[0]
 
-                self._stream_handle.seek(position)  # reset to beginning of packet
-                # read entire packet
-                packet_buffer = self._stream_handle.read(packet_length + SIZE_CHECKSUM + SIZE_PAD)
+                # the entire packet
+                packet_end = min(position + packet_length + SIZE_CHECKSUM + SIZE_PAD, data_length)
+                packet_buffer = data[position:packet_end]
 
                 # first check that the packet passes the checksum
                 expected_checksum = struct.unpack_from('>H', packet_buffer, packet_length)[0]
 
-                actual_checksum = sum(bytearray(packet_buffer[:-(SIZE_CHECKSUM + SIZE_PAD)])) & 0xFFFF
+                checksum_end = max(packet_end - (SIZE_CHECKSUM + SIZE_PAD), position)
+                actual_checksum = int(byte_sums[checksum_end] - byte_sums[position]) & 0xFFFF
 
                 if actual_checksum == expected_checksum:
 
-                    # unpack the header part of the packet using BigEndianStructure utility
+                    # unpack the header part of the packet
                     packet_header = OptaaSampleHeader.from_string(packet_buffer)
                     # unpack the rest of the packet data now that we have num_wavelengths
-                    packet_data = struct.unpack_from('>%dH' % (packet_header.num_wavelengths*4),
-                                                     packet_buffer, sizeof(packet_header))
-
-                    cref = packet_data[::4]  # slice the data up using a step of 4
-                    aref = packet_data[1::4]
-                    csig = packet_data[2::4]
-                    asig = packet_data[3::4]
+                    counts = optaa_common.unpack_counts(packet_buffer, packet_header.num_wavelengths,
+                                                        SAMPLE_HEADER_STRUCT.size)
+                    cref, aref, csig, asig = optaa_common.count_lists(counts)
 
                     # Extract the number of milliseconds since power-up.
                     elapsed_milli = (packet_header.time_high << 16) + packet_header.time_low
@@ -385,10 +383,11 @@ class OptaaDjDclParser(SimpleParser):
                         'Checksum error.  Actual %d vs Expected %d' %
                         (actual_checksum, expected_checksum)))
 
+                position = packet_end
+
             else:  # packet_id did not match, unexpected data
 
                 self._exception_callback(UnexpectedDataException(
                     'Invalid OPTAA Packet ID found, checking next 4 bytes'))
 
-            position = self._stream_handle.tell()  # set the new file position
-            packet_id_bytes = self._stream_handle.read(MARKER_SIZE)  # read the next two bytes of the file
+                position += len(packet_id_bytes)
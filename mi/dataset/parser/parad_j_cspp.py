@@ -32,6 +32,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, INT_COLUMN, Y_OR_N_COLUMN, string_column
 
 # Date is in format MM/DD/YY, example 04/17/14
 DATE_REGEX = r'\d{2}/\d{2}/\d{2}'
@@ -94,6 +95,17 @@ class ParadJCsppParserDataParticleKey(BaseEnum):
     PAR = 'par'
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (ParadJCsppParserDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (ParadJCsppParserDataParticleKey.PRESSURE_DEPTH, FLOAT_COLUMN),
+    (ParadJCsppParserDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (ParadJCsppParserDataParticleKey.DATE_STRING, string_column(DATE_REGEX)),
+    (ParadJCsppParserDataParticleKey.TIME_STRING, string_column(TIME_REGEX)),
+    (ParadJCsppParserDataParticleKey.PAR, INT_COLUMN)
+])
+
+
 class ParadJCsppMetadataDataParticle(CsppMetadataDataParticle):
     """
     Base Class for building a parad_j_cspp metadata particle
@@ -233,4 +245,5 @@ class ParadJCsppParser(CsppParser):
                                                stream_handle,
                                                exception_callback,
                                                DATA_REGEX,
-                                               ignore_matcher=IGNORE_MATCHER)
\ No newline at end of file
+                                               ignore_matcher=IGNORE_MATCHER,
+                                               column_schema=COLUMN_SCHEMA)
\ No newline at end of file
@@ -12,7 +12,7 @@ __license__ = 'Apache 2.0'
 
 import re
 from mi.dataset.parser.utilities import dcl_controller_timestamp_to_utc_time, \
-    dcl_controller_timestamp_to_ntp_time
+    dcl_controller_timestamp_to_ntp_time, hex_byte_sum, hex_to_int_list
 
 import ntplib
 
@@ -254,18 +254,10 @@ class Pco2wAbcDclParser(Pco2wAbcParser):
         :return: dict filled in normal or blank light measurements
         """
 
-        end_range = num_chars = 4
-        last_light_measurement_start_index = len(light_measurements)-3
-        for x in range(0, last_light_measurement_start_index, num_chars):
-            light_measurement = light_measurements[x: end_range]
-            log.trace("ascii-hex light_measurement: %s", light_measurement)
-            # convert to int
-            int_light_measurement = int(light_measurement, 16)
-
-            # append int value to instrument_dict
-            instrument_dict[dict_key].append(int_light_measurement)
-
-            end_range += num_chars
+        # decode all the whole 4 character measurements at once
+        num_chars = 4
+        measurements_length = len(light_measurements) - len(light_measurements) % num_chars
+        instrument_dict[dict_key].extend(hex_to_int_list(light_measurements[:measurements_length]))
 
         return instrument_dict[dict_key]
 
@@ -280,7 +272,6 @@ class Pco2wAbcDclParser(Pco2wAbcParser):
 
         log.trace("_calculate_passed_checksum(): string_length is %s, record is %s",
                   len(line), line)
-        checksum = 0
 
         # Strip off the leading DCL Controller Timestamp, * and ID characters of the log line (27 characters) and
         # Strip off the trailing Checksum characters and newline (3 characters)
@@ -290,10 +281,7 @@ class Pco2wAbcDclParser(Pco2wAbcParser):
 
         log.trace("_calculate_passed_checksum(): stripped record length is %s",
                   stripped_record_length)
-        for x in range(0, stripped_record_length, 2):
-            value = stripped_record[x:x+2]
-            log.trace("value: %s", value)
-            checksum += int(value, 16)
+        checksum = hex_byte_sum(stripped_record)
 
         # module of the checksum will give us the low order byte
         log.trace("modulo of calculated checksum: %s", checksum % 256)
@@ -13,7 +13,7 @@ from mi.dataset.parser.pco2w_abc_particles import Pco2wAbcDataParticleKey, \
     Pco2wAbcParticleClassKey
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, ASCII_HEX_CHAR_REGEX
 from mi.dataset.parser.utilities import formatted_timestamp_utc_time, \
-    sum_hex_digits
+    hex_to_int_list, sum_hex_digits
 
 """
 Example file contents:
@@ -280,8 +280,6 @@ class Pco2wAbcImodemParser(SimpleParser):
                                             len_hex_data,
                                             record_data,
                                             instrument_data_dict):
-            light_measurements = []
-
             """
             The offset into the light measurements is 12 ASCII HEX characters into
             record buffer.
@@ -290,11 +288,9 @@ class Pco2wAbcImodemParser(SimpleParser):
             offset = 12
             num_light_measurements = 14
             num_ascii_hex_chars = 4
-            for index in range(offset,
-                               offset+(num_light_measurements*num_ascii_hex_chars),
-                               num_ascii_hex_chars):
-                light_measurements.append(
-                    int(record_data[index:index+num_ascii_hex_chars], 16))
+            light_measurements = hex_to_int_list(
+                record_data[offset:offset+(num_light_measurements*num_ascii_hex_chars)],
+                num_ascii_hex_chars // 2)
 
             offset += num_light_measurements*num_ascii_hex_chars
 
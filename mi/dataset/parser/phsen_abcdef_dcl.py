@@ -19,7 +19,8 @@ from mi.core.exceptions import RecoverableSampleException
 from mi.dataset.dataset_parser import SimpleParser
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.parser.common_regexes import ONE_OR_MORE_WHITESPACE_REGEX
-from mi.dataset.parser.utilities import convert_to_signed_int_16_bit, dcl_controller_timestamp_to_ntp_time
+from mi.dataset.parser.utilities import convert_to_signed_int_16_bit, dcl_controller_timestamp_to_ntp_time, \
+    hex_checksum, hex_to_int_list
 
 __author__ = 'Nick Almonte'
 __license__ = 'Apache 2.0'
@@ -36,21 +37,11 @@ def _calculate_working_record_checksum(working_record):
     Calculates the checksum of the argument ascii-hex string
     @retval int - modulo integer checksum value of argument ascii-hex string
     """
-    checksum = 0
-
     # strip off the leading * and ID characters of the log line (3 characters) and
     # strip off the trailing Checksum characters (2 characters)
     star_and_checksum_stripped_working_record = working_record[3:-2]
 
-    working_record_length = len(star_and_checksum_stripped_working_record)
-
-    for x in range(0, working_record_length, 2):
-        value = star_and_checksum_stripped_working_record[x:x+2]
-        checksum += int(value, 16)
-
-    modulo_checksum = checksum % 256
-
-    return modulo_checksum
+    return hex_checksum(star_and_checksum_stripped_working_record)
 
 
 class DataParticleType(BaseEnum):
@@ -287,24 +278,27 @@ class PhsenAbcdefDclMetadataDataParticleKey(BaseEnum):
 class PhsenAbcdefDclInstrumentDataParticle(DataParticle):
     measurement_num_of_chars = 4
 
+    def _convert_measurements(self, measurements_chunk):
+        """
+        Converts a chunk of 4 character ascii hex measurements into 16 bit signed values
+        @returns list a list of measurement values
+        """
+        try:
+            return hex_to_int_list(measurements_chunk, self.measurement_num_of_chars // 2, signed=True)
+        except ValueError:
+            # the chunk can't be decoded in one step, convert the measurements one at a time
+            return [convert_to_signed_int_16_bit(measurements_chunk[i:i+self.measurement_num_of_chars])
+                    for i in range(0, len(measurements_chunk), self.measurement_num_of_chars)]
+
     def _create_light_measurements_array(self, working_record):
         """
         Creates a light measurement array from raw data for a PHSEN DCL Instrument record
         @returns list a list of light measurement values.  From the IDD: (an) array of 92 light measurements
                       (23 sets of 4 measurements)
         """
-        light_measurements_list_int = []
-
         light_measurements_chunk = working_record[83:-14]
-        light_measurements_ascii_hex = [light_measurements_chunk[i:i+self.measurement_num_of_chars]
-                                        for i in range(0, len(light_measurements_chunk),
-                                                       self.measurement_num_of_chars)]
-
-        for ascii_hex_value in light_measurements_ascii_hex:
-            light_measurements_int = convert_to_signed_int_16_bit(ascii_hex_value)
-            light_measurements_list_int.append(light_measurements_int)
 
-        return light_measurements_list_int
+        return self._convert_measurements(light_measurements_chunk)
 
     def _create_reference_light_measurements_array(self, working_record):
         """
@@ -312,18 +306,9 @@ class PhsenAbcdefDclInstrumentDataParticle(DataParticle):
         @returns list a list of light measurement values.  From the IDD: (an) array of 16 measurements
                       (4 sets of 4 measurements)
         """
-        reference_light_measurements_list_int = []
-
         reference_light_measurements_chunk = working_record[19:-382]
-        reference_light_measurements_ascii_hex = [reference_light_measurements_chunk[i:i+self.measurement_num_of_chars]
-                                                  for i in range(0, len(reference_light_measurements_chunk),
-                                                                 self.measurement_num_of_chars)]
-
-        for ascii_hex_value in reference_light_measurements_ascii_hex:
-            reference_light_measurements_int = convert_to_signed_int_16_bit(ascii_hex_value)
-            reference_light_measurements_list_int.append(reference_light_measurements_int)
 
-        return reference_light_measurements_list_int
+        return self._convert_measurements(reference_light_measurements_chunk)
 
     def _build_parsed_values(self):
         """
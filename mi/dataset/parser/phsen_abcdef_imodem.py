@@ -26,6 +26,8 @@ from mi.dataset.parser.phsen_abcdef_imodem_particles import \
     PhsenAbcdefImodemDataParticleKey
 from mi.dataset.parser.utilities import \
     formatted_timestamp_utc_time, \
+    hex_byte_sum, \
+    hex_to_int_list, \
     mac_timestamp_to_utc_timestamp
 
 # The following constants are used to index into the string array of flag bit values
@@ -276,18 +278,10 @@ class PhsenAbcdefImodemParser(SimpleParser):
         :return: dict filled in light or reference light measurements
         """
         log.trace("entered _populate_light_measurements()")
-        end_range = num_chars = 4
-        last_light_measurement_start_index = len(light_measurements)-3
-        for x in range(0, last_light_measurement_start_index, num_chars):
-            light_measurement = light_measurements[x: end_range]
-            log.trace("ascii-hex light_measurement[%s]: %s", x+1, light_measurement)
-            # convert to int
-            int_light_measurement = int(light_measurement, 16)
-
-            # append int value to instrument_dict
-            instrument_dict[dict_key].append(int_light_measurement)
-
-            end_range += num_chars
+        # decode all the whole 4 character measurements at once
+        num_chars = 4
+        measurements_length = len(light_measurements) - len(light_measurements) % num_chars
+        instrument_dict[dict_key].extend(hex_to_int_list(light_measurements[:measurements_length]))
 
         return instrument_dict[dict_key]
 
@@ -302,7 +296,6 @@ class PhsenAbcdefImodemParser(SimpleParser):
 
         log.trace("_calculate_passed_checksum(): string_length is %s, record is %s, record_checksum is %s",
                   len(line), line, record_checksum)
-        checksum = 0
 
         # Strip off the leading part of the record, including the ID characters. This
         # will vary as some lines start with Record, and others don't. Also the
@@ -319,10 +312,7 @@ class PhsenAbcdefImodemParser(SimpleParser):
 
         log.trace("_calculate_passed_checksum(): stripped record length is %s",
                   stripped_record_length)
-        for x in range(0, stripped_record_length, 2):
-            value = stripped_record[x:x+2]
-            log.trace("value: %s", value)
-            checksum += int(value, 16)
+        checksum = hex_byte_sum(stripped_record)
 
         # module of the checksum will give us the low order byte
         log.trace("modulo of calculated checksum: %s", checksum % 256)
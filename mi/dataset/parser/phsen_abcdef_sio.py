@@ -23,6 +23,7 @@ from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.exceptions import SampleException, RecoverableSampleException, UnexpectedDataException
 from mi.dataset.parser.common_regexes import ASCII_HEX_CHAR_REGEX
 from mi.dataset.parser.sio_mule_common import SioParser, SIO_HEADER_MATCHER, SIO_BLOCK_END
+from mi.dataset.parser.utilities import hex_byte_sum, hex_to_int_list
 
 # match the ascii hex ph records
 # the data should be ascii hex, but may have non hex ascii characters, if this happens the
@@ -90,6 +91,27 @@ def encode_int_16(val_str):
     return int(val_str, 16)
 
 
+def decode_measurements(data, start_idx, num_measurements):
+    """
+    Decode a run of 4 character ascii hex measurements, any measurement
+    containing a non hex ascii character is set to None
+    @param data string containing the measurements
+    @param start_idx index of the first measurement in the string
+    @param num_measurements number of measurements to decode
+    """
+    measurements = data[start_idx:start_idx + num_measurements * MEASUREMENT_BYTES]
+    try:
+        return hex_to_int_list(measurements, MEASUREMENT_BYTES // 2)
+    except ValueError:
+        # there is a non hex ascii character somewhere, decode one at a time
+        values = []
+        for idx in range(0, len(measurements), MEASUREMENT_BYTES):
+            value = measurements[idx:idx + MEASUREMENT_BYTES]
+            # don't send an exception if a non ascii hex char is in this value
+            values.append(int(value, 16) if HEX_INT_MATCHER.match(value) else None)
+        return values
+
+
 def encode_timestamp(timestamp_str):
     """
     Encode a hex value into an int if it matches the timestamp
@@ -123,42 +145,17 @@ class PhsenAbcdefSioDataParticle(DataParticle):
         sec_since_1970 = int(ts, 16)
         self.set_internal_timestamp(unix_time=sec_since_1970)
 
-        ref_meas = []
-        previous_record_bytes = 4
         # 4 sets of 4 reference light measurements (16 total)
-        for i in range(0, 16):
-            start_idx = previous_record_bytes + i * MEASUREMENT_BYTES
-            # confirm this contains only ascii hex chars
-            if HEX_INT_MATCHER.match(data_match.group(4)[start_idx:start_idx + MEASUREMENT_BYTES]):
-                this_ref = int(data_match.group(4)[start_idx:start_idx + MEASUREMENT_BYTES], 16)
-                ref_meas.append(this_ref)
-            else:
-                # don't send an exception if a non ascii hex char is in this value
-                ref_meas.append(None)
+        ref_meas = decode_measurements(data_match.group(4), 4, 16)
 
-        light_meas = []
-        n_outer_sets = 23
-        n_inner_sets = 4
-        previous_record_bytes = 68
         # 23 sets of 4 light measurements
-        for i in range(0, n_outer_sets):
-            for s in range(0, n_inner_sets):
-                start_idx = previous_record_bytes + i * n_inner_sets * MEASUREMENT_BYTES + s * MEASUREMENT_BYTES
-                # confirm this contains only ascii hex chars
-                if HEX_INT_MATCHER.match(data_match.group(4)[start_idx:start_idx + MEASUREMENT_BYTES]):
-                    this_meas = int(data_match.group(4)[start_idx:start_idx + MEASUREMENT_BYTES], 16)
-                    light_meas.append(this_meas)
-                else:
-                    # don't send an exception if a non ascii hex char is in this value
-                    light_meas.append(None)
+        light_meas = decode_measurements(data_match.group(4), 68, 23 * 4)
 
         # calculate the checksum and compare with the received checksum
         passed_checksum = True
         try:
             chksum = int(data_match.group(0)[-3:-1], 16)
-            sum_bytes = 0
-            for i in range(7, 467, 2):
-                sum_bytes += int(data_match.group(0)[i:i + 2], 16)
+            sum_bytes = hex_byte_sum(data_match.group(0)[7:467])
             calc_chksum = sum_bytes & 255
             if calc_chksum != chksum:
                 passed_checksum = False
@@ -242,11 +239,10 @@ class PhsenAbcdefSioControlDataParticle(DataParticle):
         passed_checksum = True
         try:
             chksum = int(data_match.group(0)[-3:-1], 16)
-            sum_bytes = 0
             # subtract the 3 bytes for the '*' and unique ID, 2 for the checksum, and 1 for the last \r
             control_len = data_len - 6
-            for i in range(3, control_len, 2):
-                sum_bytes += int(data_match.group(0)[i:i + 2], 16)
+            # the last byte summed is the one starting just before control_len
+            sum_bytes = hex_byte_sum(data_match.group(0)[3:control_len + 1])
             calc_chksum = sum_bytes & 255
             if calc_chksum != chksum:
                 passed_checksum = False
@@ -30,6 +30,10 @@ Wave Burst End record: 'FFFFFFFFFFFFFFFFFF'
 Only sensor data records produce particles if properly formed.
 Mal-formed sensor data records and all status records produce no particles.
 
+Runs of tide data records and of wave burst records are read as one block of
+text and converted together, so a wave burst of thousands of pressure
+measurements is decoded in a single step.
+
 Release notes:
 
 Initial Release
@@ -37,6 +41,8 @@ Initial Release
 
 import re
 
+import numpy
+
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import \
     DataParticle, \
@@ -48,6 +54,7 @@ from mi.core.exceptions import RecoverableSampleException
 from mi.dataset.dataset_parser import SimpleParser
 
 from mi.dataset.parser import utilities
+from mi.dataset.parser.utilities import LineReader, hex_to_int_columns
 
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, \
     SCIENTIFIC_REGEX, END_OF_LINE_REGEX, ASCII_HEX_CHAR_REGEX, \
@@ -113,6 +120,15 @@ WAVE_BURST_DATA_MATCHER = re.compile(WAVE_BURST_DATA_REGEX)
 WAVE_DATA_END_REGEX = r'F{18}' + END_OF_LINE_REGEX
 WAVE_DATA_END_MATCHER = re.compile(WAVE_DATA_END_REGEX)
 
+# Runs of tide data and wave burst records, read together.  The tide data
+# records do not include the 18 digit logging session and wave data flags.
+TIDE_DATA_BLOCK_REGEX = r'(?:(?!F{9}[BC]F{8}\r?\n|0{18}\r?\n)'
+TIDE_DATA_BLOCK_REGEX += ASCII_HEX_CHAR_REGEX + r'{18}\r?\n)+'
+TIDE_DATA_BLOCK_MATCHER = re.compile(TIDE_DATA_BLOCK_REGEX)
+
+WAVE_BURST_BLOCK_REGEX = r'(?:' + ASCII_HEX_CHAR_REGEX + r'{12}\r?\n)+'
+WAVE_BURST_BLOCK_MATCHER = re.compile(WAVE_BURST_BLOCK_REGEX)
+
 # Data end pattern
 FILE_DATA_END_REGEX = 'S>'
 FILE_DATA_END_REGEX += END_OF_LINE_REGEX
@@ -140,6 +156,10 @@ WAVE_GROUP_NUM_SAMPLES_LSB = 2
 WAVE_BURST_GROUP_PRESSURE_NUM_1 = 1
 WAVE_BURST_GROUP_PRESSURE_NUM_2 = 2
 
+# The number of bytes in each field of the tide data and wave burst records
+TIDE_DATA_FIELD_BYTES = (3, 2, 4)   # pressure number, temperature number, start time
+WAVE_BURST_FIELD_BYTES = (3,)       # pressure number, two per record
+
 
 class PresfAbcSessionKey(BaseEnum):
     TIDE_SAMPLE_START_TIME = 'tide_sample_start_timestamp'
@@ -226,6 +246,9 @@ class PresfAbcWaveDataParticle(DataParticle):
 
     _data_particle_type = DataParticleType.WAVE_RECOVERED
 
+    # numpy array of the burst pressure numbers of the particle
+    burst_pressure_numbers = None
+
     def __init__(self, raw_data,
                  port_timestamp=None,
                  internal_timestamp=None,
@@ -477,6 +500,9 @@ class PresfAbcParser(SimpleParser):
                                                 None,
                                                 wave_data,
                                                 None)
+                if particle is not None:
+                    particle.burst_pressure_numbers = numpy.array(
+                        wave_data[PresfAbcWaveParticleKey.WM_BURST_PRESSURE_NUM], dtype=numpy.int64)
                 self._record_buffer.append(particle)
 
             else:
@@ -489,6 +515,51 @@ class PresfAbcParser(SimpleParser):
             self._exception_callback(RecoverableSampleException(
                 "Unexpected format for wave data: %s" % line))
 
+    def parse_tide_data_block(self, block, tide_data):
+        """
+        Description:
+
+            This function parses a run of tide data records of the presf_abc
+            hex file, converting the records together.  Each record produces
+            a particle, as from parse_tide_data.
+
+        Parameters:
+            block: tide data lines to parse
+            tide_data: tide data structure for particle creation
+        """
+
+        pressure_nums, temperature_nums, start_times = hex_to_int_columns(
+            block.translate(None, '\r\n'), TIDE_DATA_FIELD_BYTES)
+
+        for tm_start_time, p_dec_tide, t_dec_tide in zip(start_times.tolist(),
+                                                           pressure_nums.tolist(),
+                                                           temperature_nums.tolist()):
+            tide_data[PresfAbcTideParticleKey.TM_START_TIME] = tm_start_time
+            tide_data[PresfAbcTideParticleKey.TM_PRESSURE_NUM] = p_dec_tide
+            tide_data[PresfAbcTideParticleKey.TM_TEMPERATURE_NUM] = t_dec_tide
+
+            particle = self._extract_sample(self._tide_particle_class,
+                                            None,
+                                            tide_data,
+                                            None)
+            self._record_buffer.append(particle)
+
+    @staticmethod
+    def parse_wave_burst_block(block, wave_data):
+        """
+        Description:
+
+            This function parses a run of wave burst records of the presf_abc
+            hex file, converting the pressure number measurements together.
+
+        Parameters:
+            block: wave burst lines to parse
+            wave_data: wave data structure for particle creation
+        """
+
+        p_dec_wave, = hex_to_int_columns(block.translate(None, '\r\n'), WAVE_BURST_FIELD_BYTES)
+        wave_data[PresfAbcWaveParticleKey.WM_BURST_PRESSURE_NUM].extend(p_dec_wave.tolist())
+
     def parse_file(self):
         """
         The main parsing function which loops over each line in the file and
@@ -501,7 +572,29 @@ class PresfAbcParser(SimpleParser):
         # # First, parse the header
         # self.parse_header()
 
-        for line in self._stream_handle:
+        reader = LineReader(self._stream_handle.read())
+
+        while True:
+            #####
+            # Read any run of records of the current data section which can
+            # be converted together.
+            #####
+            if self._current_data_section == DataSection.TIDE:
+                block = TIDE_DATA_BLOCK_MATCHER.match(reader.text, reader.offset)
+                if block:
+                    self.parse_tide_data_block(block.group(), tide_data)
+                    reader.offset = block.end()
+
+            elif self._current_data_section == DataSection.WAVE:
+                block = WAVE_BURST_BLOCK_MATCHER.match(reader.text, reader.offset)
+                if block:
+                    self.parse_wave_burst_block(block.group(), wave_data)
+                    reader.offset = block.end()
+
+            line = reader.readline()
+            if not line:
+                break
+
             #####
             # Check for a header line and ignore it.
             #####
@@ -54,6 +54,7 @@ from mi.dataset.parser.common_regexes import FLOAT_REGEX, \
     ANY_CHARS_REGEX, END_OF_LINE_REGEX
 
 from mi.dataset.parser.dcl_file_common import TIMESTAMP
+from mi.dataset.parser.line_classifier import LineClassifier
 
 # Basic patterns
 FLOAT = r'(' + FLOAT_REGEX + ')'    # generic float
@@ -114,6 +115,21 @@ WAVE_END_REGEX += 'wave: end burst'                                 # record typ
 WAVE_END_REGEX += END_OF_LINE_REGEX
 WAVE_END_MATCHER = re.compile(WAVE_END_REGEX)
 
+# All the line types, in the order they are checked
+STATUS_LINE = 'status'
+TIDE_LINE = 'tide'
+WAVE_START_LINE = 'wave start'
+WAVE_PTFREQ_LINE = 'wave ptfreq'
+WAVE_CONT_LINE = 'wave continuation'
+WAVE_END_LINE = 'wave end'
+
+LINE_CLASSIFIER = LineClassifier([(STATUS_LINE, STATUSDATA_MATCHER),
+                                  (TIDE_LINE, TIDE_MATCHER),
+                                  (WAVE_START_LINE, WAVE_START_MATCHER),
+                                  (WAVE_PTFREQ_LINE, WAVE_PTFREQ_MATCHER),
+                                  (WAVE_CONT_LINE, WAVE_CONT_MATCHER),
+                                  (WAVE_END_LINE, WAVE_END_MATCHER)])
+
 # TIDE_DATA_MATCHER produces the following groups:
 TIDE_GROUP_DCL_TIMESTAMP = 1
 TIDE_GROUP_YEAR = 2
@@ -315,6 +331,8 @@ class PresfAbcDclTelemeteredWaveDataParticle(PresfAbcDclParserWaveDataParticle):
 class PresfAbcDclParser(SimpleParser):
     """
     """
+    checkpoint_supported = True
+
     def __init__(self,
                  stream_handle,
                  exception_callback,
@@ -329,6 +347,9 @@ class PresfAbcDclParser(SimpleParser):
             self._wave_particle_class = PresfAbcDclRecoveredWaveDataParticle
             self._tide_particle_class = PresfAbcDclRecoveredTideDataParticle
 
+        # the wave burst being read, which spans several lines
+        self._wave_data = self.empty_wave_data()
+
         super(PresfAbcDclParser, self).__init__({},
                                                 stream_handle,
                                                 exception_callback)
@@ -350,92 +371,87 @@ class PresfAbcDclParser(SimpleParser):
         format is found.
         """
 
-        wave_data = self.empty_wave_data()  # start with an empty wave data raw data dictionary
-
         for line in self._stream_handle:
+            line_type, match = LINE_CLASSIFIER.classify(line)
+
             # first check for status lines
-            test_status = STATUSDATA_MATCHER.match(line)
-            if test_status:
+            if line_type == STATUS_LINE:
                 #  we have a status line, do nothing
                 continue  # read next line
 
             # check for a single line tide record
-            test_tide = TIDE_MATCHER.match(line)
-            if test_tide:
+            if line_type == TIDE_LINE:
                 # we have a tide record, create a particle
                 particle = self._extract_sample(self._tide_particle_class,
                                                 None,
-                                                test_tide,
+                                                match,
                                                 None)
                 self._record_buffer.append(particle)
                 continue  # read next line
 
             # check for a wave burst start
-            test_wstart = WAVE_START_MATCHER.match(line)
-            if test_wstart:
+            if line_type == WAVE_START_LINE:
                 # we got the start of a wave burst, make sure we expected it
-                if wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is None:
+                if self._wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is None:
                     # fill in initial values
-                    wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] = \
-                        test_wstart.group(WAVE_START_GROUP_DCL_TIMESTAMP)
-                    wave_data[PresfAbcDclWaveParticleKey.DATE_TIME_STRING] = \
-                        test_wstart.group(WAVE_START_GROUP_DATE_TIME_STRING)
+                    self._wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] = \
+                        match.group(WAVE_START_GROUP_DCL_TIMESTAMP)
+                    self._wave_data[PresfAbcDclWaveParticleKey.DATE_TIME_STRING] = \
+                        match.group(WAVE_START_GROUP_DATE_TIME_STRING)
                 else:
                     # something went wrong
                     log.debug("got unexpected wave start ")
                     self._exception_callback(RecoverableSampleException(
                         "got unexpected wave start on line %s"
                         % line))
-                    wave_data = self.empty_wave_data()  # reset the wave data
+                    self._wave_data = self.empty_wave_data()  # reset the wave data
 
                 continue  # read next line
 
             # check for a wave ptfreq
-            test_ptfreq = WAVE_PTFREQ_MATCHER.match(line)
-            if test_ptfreq:
+            if line_type == WAVE_PTFREQ_LINE:
                 # we got the ptfreq line, make sure we expected it
-                if wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is not None and \
-                        wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] is None:
+                if self._wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is not None and \
+                        self._wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] is None:
                     # save value
-                    wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] = \
-                        test_ptfreq.group(WAVE_PTFREQ_GROUP_PTEMP_FREQUENCY)
+                    self._wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] = \
+                        match.group(WAVE_PTFREQ_GROUP_PTEMP_FREQUENCY)
                 else:
                     # something went wrong
                     log.debug("got unexpected ptfreq ")
                     self._exception_callback(RecoverableSampleException(
                         "got unexpected ptfreq on line %s"
                         % line))
-                    wave_data = self.empty_wave_data()  # reset the wave data
+                    self._wave_data = self.empty_wave_data()  # reset the wave data
                 continue  # read next line
 
             # check for a wave pressure
-            test_wcont = WAVE_CONT_MATCHER.match(line)
-            if test_wcont:
+            if line_type == WAVE_CONT_LINE:
                 # we got a wave burst continuation, make sure we expected one
-                if wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is not None and \
-                        wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] is not None:
+                if self._wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_START_TIMESTAMP] is not None and \
+                        self._wave_data[PresfAbcDclWaveParticleKey.PTEMP_FREQUENCY] is not None:
                     # append the value to the data
-                    wave_data[PresfAbcDclWaveParticleKey.ABSOLUTE_PRESSURE_BURST].append(
-                        test_wcont.group(WAVE_CONT_GROUP_ABSOLUTE_PRESSURE))
+                    self._wave_data[PresfAbcDclWaveParticleKey.ABSOLUTE_PRESSURE_BURST].append(
+                        match.group(WAVE_CONT_GROUP_ABSOLUTE_PRESSURE))
                 else:
                     # something went wrong
                     log.debug("got unexpected wave pressure data")
                     self._exception_callback(RecoverableSampleException(
                         "got unexpected wave pressure data on line %s"
                         % line))
-                    wave_data = self.empty_wave_data()  # reset the wave data
+                    self._wave_data = self.empty_wave_data()  # reset the wave data
                 continue  # read next line
 
             # check for a wave end burst
-            test_wend = WAVE_END_MATCHER.match(line)
-            if test_wend:
+            if line_type == WAVE_END_LINE:
                 # found the wave end line, save data and try to create a particle
-                wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_END_TIMESTAMP] = \
-                    test_wend.group(WAVE_END_GROUP_DCL_TIMESTAMP)
+                self._wave_data[PresfAbcDclWaveParticleKey.DCL_CONTROLLER_END_TIMESTAMP] = \
+                    match.group(WAVE_END_GROUP_DCL_TIMESTAMP)
 
                 # check to make sure we have all the parts of a wave burst
-                wave_data_values = wave_data.values()
-                if None in wave_data_values or wave_data[PresfAbcDclWaveParticleKey.ABSOLUTE_PRESSURE_BURST] == []:
+                wave_data_values = self._wave_data.values()
+                if None in wave_data_values or \
+                        self._wave_data[PresfAbcDclWaveParticleKey.ABSOLUTE_PRESSURE_BURST] == []:
 
                     log.debug("got wave end burst without complete burst data")
                     self._exception_callback(RecoverableSampleException(
@@ -445,20 +461,20 @@ class PresfAbcDclParser(SimpleParser):
 
                     particle = self._extract_sample(self._wave_particle_class,
                                                     None,
-                                                    wave_data,
+                                                    self._wave_data,
                                                     None)
 
                     self._record_buffer.append(particle)
 
-                wave_data = self.empty_wave_data()  # reset the wave data
+                self._wave_data = self.empty_wave_data()  # reset the wave data
 
                 continue  # read next line
 
             # if we got here the line does not match any of the expected patterns
             self._exception_callback(RecoverableSampleException("Found unexpected data in line  %s" % line))
 
+    def _get_checkpoint_state(self):
+        return self._wave_data
 
-
-
-
-
+    def _set_checkpoint_state(self, state):
+        self._wave_data = state
@@ -31,6 +31,7 @@ from mi.dataset.parser.cspp_base import \
     DATA_MATCHES_GROUP_NUMBER_INDEX, \
     TYPE_ENCODING_INDEX, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, INT_COLUMN, Y_OR_N_COLUMN, string_column
 
 from mi.dataset.parser.common_regexes import INT_REGEX, \
     FLOAT_REGEX, \
@@ -158,6 +159,30 @@ NON_COMMON_METADATA_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (SpkirAbjCsppParserDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.INSTRUMENT_ID, string_column(INSTRUMENT_ID_REGEX)),
+    (SpkirAbjCsppParserDataParticleKey.SERIAL_NUMBER, INT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.TIMER, FLOAT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.SAMPLE_DELAY, INT_COLUMN),
+    ('channel_1', INT_COLUMN),
+    ('channel_2', INT_COLUMN),
+    ('channel_3', INT_COLUMN),
+    ('channel_4', INT_COLUMN),
+    ('channel_5', INT_COLUMN),
+    ('channel_6', INT_COLUMN),
+    ('channel_7', INT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.VIN_SENSE, INT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.VA_SENSE, INT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.INTERNAL_TEMPERATURE, INT_COLUMN),
+    (SpkirAbjCsppParserDataParticleKey.FRAME_COUNTER, INT_COLUMN),
+    ('checksum', string_column(CHECKSUM_REGEX))
+])
+
+
 class SpkirAbjCsppMetadataDataParticle(CsppMetadataDataParticle):
     """
     Base Class for building a spkir_abj_cspp metadata particle
@@ -314,4 +339,5 @@ class SpkirAbjCsppParser(CsppParser):
                                                  stream_handle,
                                                  exception_callback,
                                                  DATA_REGEX,
-                                                 ignore_matcher=IGNORE_MATCHER)
+                                                 ignore_matcher=IGNORE_MATCHER,
+                                                 column_schema=COLUMN_SCHEMA)
@@ -18,7 +18,8 @@ import yaml
 from nose.plugins.attrib import attr
 
 from mi.core.log import get_logger
-from mi.dataset.dataset_parser import DataSetDriverConfigKeys
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.dataset.dataset_parser import DataSetDriverConfigKeys, ParseOptions
 from mi.dataset.driver.adcps_jln.stc.resource import RESOURCE_PATH
 from mi.dataset.parser.adcp_pd0 import AdcpPd0Parser, AdcpDataParticleType
 from mi.dataset.test.test_parser import ParserUnitTestCase
@@ -203,6 +204,29 @@ class AdcpsJlnParserUnitTestCase(ParserUnitTestCase):
             self.assert_particles(particles, 'ADCP_CCE1T_20.yml', RESOURCE_PATH)
             self.assertEqual(self.exception_callback_value, [])
 
+    def test_parse_options(self):
+        """
+        Verify only the velocity particles of the ensembles in a time window are returned
+        """
+        with open(os.path.join(RESOURCE_PATH, 'ADCP_CCE1T_20.000'), 'rb') as stream_handle:
+            particles = AdcpPd0Parser(self.config, stream_handle, self.exception_callback).get_records(47)
+
+        velocity = [particle for particle in particles
+                    if particle.data_particle_type() == AdcpDataParticleType.VELOCITY_EARTH]
+        times = [particle.get_value(DataParticleKey.INTERNAL_TIMESTAMP) for particle in velocity]
+        parse_options = ParseOptions(times[5], times[10], [AdcpDataParticleType.VELOCITY_EARTH])
+
+        with open(os.path.join(RESOURCE_PATH, 'ADCP_CCE1T_20.000'), 'rb') as stream_handle:
+            parser = AdcpPd0Parser(self.config, stream_handle, self.exception_callback, parse_options)
+            window_particles = parser.get_records(47)
+
+        # the raw data of the particles are separately decoded ensembles, so compare the times
+        self.assertEqual([particle.data_particle_type() for particle in window_particles],
+                         [AdcpDataParticleType.VELOCITY_EARTH] * 6)
+        self.assertEqual([particle.get_value(DataParticleKey.INTERNAL_TIMESTAMP) for particle in window_particles],
+                         times[5:11])
+        self.assertEqual(self.exception_callback_value, [])
+
     def test_bug_10136(self):
         """
         Ensure that bad ensembles are skipped and all valid ensembles are returned.
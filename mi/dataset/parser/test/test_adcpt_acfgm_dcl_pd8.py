@@ -9,6 +9,7 @@
 
 from nose.plugins.attrib import attr
 import os
+from StringIO import StringIO
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -249,3 +250,43 @@ class AdcptAcfgmPd8ParserUnitTestCase(ParserUnitTestCase):
         self.assertListEqual(self.exception_callback_value, [])
         in_file.close()
 
+    def test_bin_table_arrays(self):
+        """
+        Verify that the bin table of each ensemble is also available as 2-D arrays,
+        and that a table line with trailing text is still read the same way.
+        """
+        in_file = self.open_file('20131201.adcp_mod.log')
+        text = in_file.read()
+        in_file.close()
+
+        parser = self.create_parser(ADCPT_ACFGM_DCL_PD8_TELEMETERED_PARTICLE_CLASS, StringIO(text))
+        result = parser.get_records(23)
+
+        self.assertEqual(len(result), 23)
+        self.assertListEqual(self.exception_callback_value, [])
+
+        columns = (('water_velocity_east', 'velocities', 0), ('error_velocity', 'velocities', 3),
+                   ('echo_intensity_beam1', 'echo_intensities', 0),
+                   ('echo_intensity_beam4', 'echo_intensities', 3))
+
+        for particle in result:
+            values = dict((value['value_id'], value['value']) for value in particle.generate_dict()['values'])
+
+            self.assertEqual(particle.velocities.shape, (values['num_cells'], 4))
+            self.assertEqual(particle.echo_intensities.shape, (values['num_cells'], 4))
+
+            for name, array, column in columns:
+                self.assertEqual(getattr(particle, array)[:, column].tolist(), values[name])
+
+        # text after the last value is not part of a well formed line, so the
+        # table is matched line by line and has no arrays
+        lines = text.splitlines(True)
+        index = next(i for i, line in enumerate(lines) if ' Bin ' in line) + 1
+        lines[index] = lines[index].rstrip('\n') + 'x\n'
+
+        parser = self.create_parser(ADCPT_ACFGM_DCL_PD8_TELEMETERED_PARTICLE_CLASS, StringIO(''.join(lines)))
+        modified = parser.get_records(23)
+
+        self.assertEqual(len(modified), 23)
+        self.assertIsNone(modified[0].velocities)
+        self.assertEqual(modified[0].generate_dict()['values'], result[0].generate_dict()['values'])
@@ -19,7 +19,8 @@ from nose.plugins.attrib import attr
 from mi.core.exceptions import RecoverableSampleException
 from mi.core.log import get_logger
 from mi.dataset.driver.auv_eng.auv.resource import RESOURCE_PATH
-from mi.dataset.parser.auv_eng_auv import AuvEngAuvParser
+from mi.dataset.parser.auv_common import EARLIEST_TIMESTAMP, TimestampFields
+from mi.dataset.parser.auv_eng_auv import AuvEngAuvParser, AUV_ENG_AUV_STATE_ID
 from mi.dataset.test.test_parser import ParserUnitTestCase
 
 log = get_logger()
@@ -549,4 +550,44 @@ class AuvEngAuvTestCase(ParserUnitTestCase):
 
             self.assertEqual(self.exception_callback_value, [])
 
+    def test_message_batches(self):
+        """
+        Read test data holding all message types and check the records are
+        grouped by message type, with the timestamps computed together matching
+        the particle timestamps.
+        """
+
+        with open(os.path.join(RESOURCE_PATH, 'subset2_reduced.csv'), 'rU') as stream_handle:
+            parser = AuvEngAuvParser(stream_handle,
+                                     self.exception_callback,
+                                     is_telemetered=True)
+
+            particles = parser.get_records(200)
+
+            batches = parser.get_message_batches()
+
+            # records from before the earliest timestamp do not give particles
+            timestamps = sorted(timestamp for batch in batches for timestamp in batch.timestamps()
+                                if timestamp > EARLIEST_TIMESTAMP)
+            self.assertEqual(timestamps, sorted(particle.get_value('internal_timestamp') for particle in particles))
+
+            state_batch = [batch for batch in batches if batch.message_id == AUV_ENG_AUV_STATE_ID][0]
+            self.assertEqual(state_batch.column('mission_epoch').tolist(),
+                             [int(parts[1]) for parts in state_batch.records])
+
+            self.assertEqual(self.exception_callback_value, [])
+
+    def test_compute_timestamps(self):
+        """
+        Check timestamps computed together match those computed one at a time,
+        and that a bad mission time fails the whole batch
+        """
+        compute_timestamp = TimestampFields(1, 2)
+        records = [['1', '1402944061', '0:01:02.123'], ['1', '1402944062', '+456']]
+
+        self.assertEqual(compute_timestamp.compute_timestamps(records).tolist(),
+                         [compute_timestamp(parts) for parts in records])
 
+        records.append(['1', '1402944063', '12L'])
+        self.assertRaises(ValueError, compute_timestamp.compute_timestamps, records)
+        self.assertRaises(ValueError, compute_timestamp, records[-1])
@@ -11,11 +11,12 @@ import pprint
 
 from nose.plugins.attrib import attr
 
-from mi.core.exceptions import SampleException
+from mi.core.exceptions import SampleException, ConfigurationException
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.driver.cg_cpm_eng.cpm.resource import RESOURCE_PATH
-from mi.dataset.parser.cg_cpm_eng_cpm import CgCpmEngCpmParser
+from mi.dataset.parser.cg_cpm_eng_cpm import CgCpmEngCpmParser, PARAM_REGEX_RULES_AND_VALUES
+from mi.dataset.parser.key_dispatch import KeyDispatcher
 from mi.dataset.test.test_parser import ParserUnitTestCase
 
 log = get_logger()
@@ -107,3 +108,38 @@ class CgParserUnitTestCase(ParserUnitTestCase):
                 self.assertTrue(len(result) == 0)
 
         log.debug('===== END TEST NO PARTICLES =====')
+
+    def test_bad_particle_class(self):
+        """
+        Verify that a particle class name which is not a cg_cpm_eng_cpm
+        particle class is rejected.
+        """
+        self.config[DataSetDriverConfigKeys.PARTICLE_CLASS] = 'SampleException'
+
+        with open(os.path.join(RESOURCE_PATH, 'cpm_status.20140817_1255.txt')) as file_handle:
+            with self.assertRaises(ConfigurationException):
+                CgCpmEngCpmParser(self.config, file_handle, self.exception_callback)
+
+    def test_key_dispatch(self):
+        """
+        Verify that lines are dispatched to the rules which can match their key,
+        including keys the '.' of a rule matches as any character.
+        """
+        dispatcher = KeyDispatcher([regex for regex, _, _ in PARAM_REGEX_RULES_AND_VALUES])
+
+        def matching_rules(line):
+            return [index for index, matcher in enumerate(dispatcher.matchers) if matcher.match(line)]
+
+        lines = ['GPS.lat=41.535588\n',
+                 'GPS_lat=41.535588\n',
+                 'ALARM.C_POWER_SYS=ts=2014/08/17 12:53:58.217  severity=Warning  at=4  pc=3  err= NO PSC DATA\n',
+                 'Sched.cpm.wake=started 10,3,6,9,12,15,18,21:53:33   Remaining: 1857 sec\n',
+                 'CI_SYS_STAT.status=\n',
+                 'no separator\n']
+
+        for line in lines:
+            candidates = dispatcher.candidates(line)
+            self.assertTrue(set(matching_rules(line)) <= set(candidates))
+            self.assertTrue(len(candidates) <= 1)
+
+        self.assertEqual(len(dispatcher.candidates('GPS_lat=41.535588\n')), 1)
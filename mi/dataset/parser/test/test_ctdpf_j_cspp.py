@@ -13,6 +13,8 @@ base parser.  That level of testing is omitted from this test suite
 
 import os
 
+import numpy
+from mock import patch
 from nose.plugins.attrib import attr
 from mi.core.common import BaseEnum
 from mi.core.log import get_logger
@@ -228,3 +230,61 @@ class CtdpfJCsppParserUnitTestCase(ParserUnitTestCase):
 
         self.assertEqual(len(self.exception_callback_value), 12)
         stream_handle.close()
+
+    def test_column_batch(self):
+        """
+        Read the data records of a file with bad data as a column batch and
+        check that the columns hold the particle values, while the bad data
+        is still reported.
+        """
+        file_path = os.path.join(RESOURCE_PATH, '11079364_BAD_PPB_CTD.txt')
+        stream_handle = open(file_path, 'rU')
+
+        parser = CtdpfJCsppParser(self.config.get(DataTypeKey.CTDPF_J_CSPP_RECOVERED),
+                                  stream_handle,
+                                  self.exception_callback)
+
+        batch = parser.get_column_batch()
+        particles = parser.get_records(len(batch) + 1)
+
+        self.assertEqual(len(self.exception_callback_value), 12)
+
+        data_particles = [particle for particle in particles
+                          if isinstance(particle, CtdpfJCsppInstrumentRecoveredDataParticle)]
+        self.assertEqual(len(data_particles), len(batch))
+
+        values = [dict((value['value_id'], value['value']) for value in particle.generate_dict()['values'])
+                  for particle in data_particles]
+
+        for name in ('profiler_timestamp', 'temperature', 'conductivity', 'pressure', 'salinity'):
+            numpy.testing.assert_array_equal(batch.column(name), [value[name] for value in values])
+
+        numpy.testing.assert_array_equal(batch.column('suspect_timestamp'),
+                                         [value['suspect_timestamp'] == 1 for value in values])
+
+        stream_handle.close()
+
+    def test_column_blocks(self):
+        """
+        Read a file with bad data a few lines at a time and check that it gives
+        the same particles and batch as reading it as one block.
+        """
+        file_path = os.path.join(RESOURCE_PATH, '11079364_BAD_PPB_CTD.txt')
+        config = self.config.get(DataTypeKey.CTDPF_J_CSPP_RECOVERED)
+
+        with open(file_path, 'rU') as stream_handle:
+            parser = CtdpfJCsppParser(config, stream_handle, self.exception_callback)
+            batch = parser.get_column_batch()
+            particles = parser.get_records(len(batch) + 1)
+
+        self.assertEqual(len(self.exception_callback_value), 12)
+        self.exception_callback_value = []
+
+        with patch('mi.dataset.parser.cspp_base.COLUMN_BLOCK_LINES', 7), open(file_path, 'rU') as stream_handle:
+            parser = CtdpfJCsppParser(config, stream_handle, self.exception_callback)
+            block_batch = parser.get_column_batch()
+            block_particles = parser.get_records(len(block_batch) + 1)
+
+        self.assertEqual(len(self.exception_callback_value), 12)
+        self.assertEqual(block_particles, particles)
+        numpy.testing.assert_array_equal(block_batch.column('pressure'), batch.column('pressure'))
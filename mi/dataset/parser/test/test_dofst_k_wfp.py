@@ -15,7 +15,8 @@ from nose.plugins.attrib import attr
 
 from mi.core.exceptions import SampleException
 from mi.core.log import get_logger
-from mi.dataset.dataset_parser import DataSetDriverConfigKeys
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.dataset.dataset_parser import DataSetDriverConfigKeys, ParseOptions
 from mi.dataset.driver.dofst_k.wfp.resource import RESOURCE_PATH
 from mi.dataset.parser.dofst_k_wfp import DofstKWfpParser
 from mi.dataset.parser.dofst_k_wfp_particles import DofstKWfpRecoveredDataParticle
@@ -402,6 +403,32 @@ class DofstKWfpParserUnitTestCase(ParserUnitTestCase):
         self.assertEqual(self.state_callback_value[StateKey.RECORDS_READ], 270)
         self.assertEqual(self.publish_callback_value[-1], self.telem_particle_last)
 
+    def test_time_window(self):
+        """
+        Test that only the records in the time window of the parse options are read
+        """
+        filepath = os.path.join(RESOURCE_PATH, 'C0000038.DAT')
+        filesize = os.path.getsize(filepath)
+
+        with open(filepath, 'rb') as stream_handle:
+            parser = DofstKWfpParser(self.config_recovered, None, stream_handle, self.state_callback,
+                                     self.pub_callback, self.exception_callback, filesize)
+            particles = parser.get_records(271)
+
+        # the metadata particle comes first
+        times = [particle.get_value(DataParticleKey.INTERNAL_TIMESTAMP) for particle in particles[1:]]
+
+        with open(filepath, 'rb') as stream_handle:
+            parser = DofstKWfpParser(self.config_recovered, None, stream_handle, self.state_callback,
+                                     self.pub_callback, self.exception_callback, filesize)
+            parser.parse_options = ParseOptions(start_time=times[10], end_time=times[19])
+            window_particles = parser.get_records(271)
+
+        self.assertEqual(window_particles, particles[11:21])
+        self.assertEqual(parser._state[StateKey.POSITION], 220)
+        self.assertEqual(parser._state[StateKey.RECORDS_READ], 20)
+        self.assertEqual(self.exception_callback_value, [])
+
     def test_bad_time_data(self):
         """
         If the timestamps are missing, raise a sample exception and do not parse the file
@@ -2,6 +2,7 @@ import glob
 import os
 from mock import Mock
 from nose.plugins.attrib import attr
+from mi.dataset.parser import msgpack_batch
 from mi.dataset.parser.dpc import DeepProfilerParticle, DeepProfilerParser
 from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.core.log import get_logger
@@ -250,3 +251,22 @@ class DeepProfilerUnitTestCase(ParserUnitTestCase):
                 yml_file = f.replace('.mpk', '.yml')
                 self.assert_particles(particles[:1], yml_file)
 
+
+    def test_record_batches(self):
+        with open(os.path.join(RESOURCE_DIR, 'ctd_1_20140105T015004_6400.mpk'), 'rb') as fh:
+            records = list(msgpack_batch.unpack(fh))
+
+        batches = msgpack_batch.group_records(records)
+        self.assertEqual(len(batches), 1)
+        batch = batches[0]
+        self.assertEqual(len(batch), len(records))
+
+        with open(os.path.join(RESOURCE_DIR, 'ctd_1_20140105T015004_6400.mpk'), 'rb') as fh:
+            parser = DeepProfilerParser({}, fh, Mock())
+            particles = parser.get_records(len(records))
+
+        self.assertEqual(len(particles), len(records))
+        for timestamp, particle in zip(batch.ntp_timestamps(), particles):
+            self.assertAlmostEqual(timestamp, particle.get_value('internal_timestamp'), places=6)
+
+        self.assertEqual(batch.column('preswat').tolist(), [record[2]['preswat'] for record in records])
@@ -5,12 +5,15 @@
 @brief A test parser for the fdchp series a instrument directly recovered
 """
 
+import io
 import os
 from nose.plugins.attrib import attr
 
 from mi.core.exceptions import SampleException
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.dataset.dataset_parser import ParseOptions
 from mi.dataset.test.test_parser import ParserUnitTestCase, BASE_RESOURCE_PATH
-from mi.dataset.parser.fdchp_a import FdchpAParser
+from mi.dataset.parser.fdchp_a import FdchpAParser, RECORD_SIZE
 
 __author__ = 'Emily Hahn'
 __license__ = 'Apache 2.0'
@@ -70,6 +73,48 @@ class FdchpAParserUnitTestCase(ParserUnitTestCase):
 
             self.assertEqual(self.exception_callback_value, [])
 
+    def test_time_window(self):
+        """
+        Test that only the records in the time window of the parse options are returned
+        """
+        with open(os.path.join(RESOURCE_PATH, 'fdchp_20141201_000000.dat'), 'rb') as file_handle:
+            particles = FdchpAParser(file_handle, self.exception_callback).get_records(12020)
+
+        times = [particle.get_value(DataParticleKey.INTERNAL_TIMESTAMP) for particle in particles]
+        parse_options = ParseOptions(start_time=times[100], end_time=times[200])
+
+        with open(os.path.join(RESOURCE_PATH, 'fdchp_20141201_000000.dat'), 'rb') as file_handle:
+            parser = FdchpAParser(file_handle, self.exception_callback)
+            parser.parse_options = parse_options
+            window_particles = parser.get_records(12020)
+
+        self.assertEqual(window_particles, particles[100:201])
+        self.assertEqual(self.exception_callback_value, [])
+
+    def test_time_window_corrupt_time(self):
+        """
+        Test that all the records are read for a time window when a record time looked at by
+        the search for the window is corrupt or out of order
+        """
+        with open(os.path.join(RESOURCE_PATH, 'fdchp_20141201_000000.dat'), 'rb') as file_handle:
+            original = file_handle.read()
+        middle = len(original) // RECORD_SIZE // 2
+
+        # a day of 99, and a year of 1990 in the middle record
+        for corrupted_bytes in [{3: 99}, {0: 7, 1: 198}]:
+            data = bytearray(original)
+            for offset, value in corrupted_bytes.iteritems():
+                data[middle * RECORD_SIZE + offset] = value
+
+            particles = FdchpAParser(io.BytesIO(data), self.exception_callback).get_records(12020)
+            times = [particle.get_value(DataParticleKey.INTERNAL_TIMESTAMP) for particle in particles]
+
+            parser = FdchpAParser(io.BytesIO(data), self.exception_callback)
+            parser.parse_options = ParseOptions(start_time=times[100], end_time=times[200])
+            self.assertEqual(parser.get_records(12020), particles[100:201])
+
+        self.assertEqual(self.exception_callback_value, [])
+
     def test_bad_size(self):
         """
         Test that a file with a bad size (not evenly divisible by the record size) does not return any records and
@@ -35,11 +35,14 @@ import os
 from nose.plugins.attrib import attr
 
 from mi.core.log import get_logger
+from mi.core.time import string_to_ntp_date_time, string_array_to_ntp_date_time
 
 from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 
 from mi.dataset.parser.metbk_a_dcl import MetbkADclParser
+from mi.dataset.parser.utilities import dcl_controller_timestamp_to_ntp_time, \
+    dcl_controller_timestamps_to_ntp_time
 from mi.dataset.driver.metbk_a.dcl.metbk_dcl_a_driver import MODULE_NAME, \
     RECOVERED_PARTICLE_CLASS, TELEMETERED_PARTICLE_CLASS
 
@@ -230,3 +233,30 @@ class MetbkADclParserUnitTestCase(ParserUnitTestCase):
         self.assertListEqual(self.exception_callback_value, [])
         in_file.close()
 
+
+    def test_timestamp_batch(self):
+        """
+        Verify the DCL controller timestamps converted together match those
+        converted one at a time
+        """
+        timestamps = ['2014/08/05 00:00:05.123', '2014/08/05 23:59:60.999', '2016/02/29 12:00:00.5']
+        converted = dcl_controller_timestamps_to_ntp_time(timestamps)
+        self.assertListEqual(converted.tolist(),
+                             [dcl_controller_timestamp_to_ntp_time(timestamp) for timestamp in timestamps])
+
+        self.assertRaises(ValueError, dcl_controller_timestamps_to_ntp_time, ['2014/02/30 00:00:00.000'])
+
+        timestamps = ['2014-01-01T00:00:00.5Z', '2014-08-05T23:59:59.1Z']
+        self.assertListEqual(string_array_to_ntp_date_time(timestamps).tolist(),
+                             [string_to_ntp_date_time(timestamp) for timestamp in timestamps])
+
+        # a single character where the fraction goes is not a fraction
+        timestamps = ['2014-01-01T00:00:00XZ', '2014-01-01T00:00:00.Z']
+        for timestamp in timestamps:
+            self.assertRaises(ValueError, string_to_ntp_date_time, timestamp)
+        self.assertRaises(ValueError, string_array_to_ntp_date_time, timestamps)
+
+        timestamps = ['2014/08/05 00:00:05X', '2014/08/05 00:00:05.']
+        for timestamp in timestamps:
+            self.assertRaises(ValueError, dcl_controller_timestamp_to_ntp_time, timestamp)
+        self.assertRaises(ValueError, dcl_controller_timestamps_to_ntp_time, timestamps)
@@ -14,6 +14,8 @@ from nose.plugins.attrib import attr
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.driver.nutnr_b.dcl_full.resource import RESOURCE_PATH
+from mi.dataset.parser.nutnr_b_dcl_parser_base import decode_spectral_channels, \
+    NITRATE_DARK_FULL, NITRATE_LIGHT_FULL
 from mi.dataset.parser.nutnr_b_dcl_full import NutnrBDclFullRecoveredParser, \
     NutnrBDclFullTelemeteredParser
 from mi.dataset.parser.nutnr_b_particles import \
@@ -346,4 +348,39 @@ class NutnrBDclFullParserUnitTestCase(ParserUnitTestCase):
         self.assertEqual(self.tel_exceptions_detected, 0)
         in_file.close()
 
-        log.debug('===== END TEST NO PARTICLES =====')
\ No newline at end of file
+        log.debug('===== END TEST NO PARTICLES =====')
+
+    def test_frame_batches(self):
+        """
+        Verify that the spectral channels of the light and dark frames are
+        gathered into 2-D arrays matching the instrument particles.
+        """
+        in_file = self.open_file(HAPPY_PATH_FILE_1)
+        parser = self.create_rec_parser(in_file)
+        particles = parser.get_records(HAPPY_PATH_EXPECTED_PARTICLES_1)
+        in_file.close()
+
+        spectra = {}
+        for particle in particles:
+            values = dict((value['value_id'], value['value'])
+                          for value in particle.generate_dict()['values'])
+            if 'spectral_channels' in values:
+                spectra.setdefault(NITRATE_LIGHT_FULL, []).append(values['spectral_channels'])
+            elif 'dark_frame_spectral_channels' in values:
+                spectra.setdefault(NITRATE_DARK_FULL, []).append(values['dark_frame_spectral_channels'])
+
+        batches = parser.get_frame_batches()
+        self.assertEqual(sorted(batch.frame_type for batch in batches), sorted(spectra))
+
+        for batch in batches:
+            frames = batch.spectral_channels()
+            self.assertEqual(frames.shape, (len(spectra[batch.frame_type]), 256))
+            self.assertEqual(len(batch.timestamps), len(batch))
+            self.assertEqual(frames.tolist(), spectra[batch.frame_type])
+
+        self.assertEqual(self.rec_exceptions_detected, 0)
+
+        # values which do not fit in an int64 are kept exactly
+        self.assertEqual(decode_spectral_channels('+5,-0,007').tolist(), [5, 0, 7])
+        self.assertEqual(decode_spectral_channels('99999999999999999999,1').tolist(),
+                         [99999999999999999999, 1])
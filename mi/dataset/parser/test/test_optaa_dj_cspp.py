@@ -21,6 +21,7 @@ from mi.core.exceptions import RecoverableSampleException
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 
+from mi.dataset.parser import optaa_common
 from mi.dataset.parser.cspp_base import \
     METADATA_PARTICLE_CLASS_KEY, \
     DATA_PARTICLE_CLASS_KEY
@@ -426,3 +427,14 @@ class OptaaDjCsppParserUnitTestCase(ParserUnitTestCase):
         stream_handle.close()
 
         log.debug('===== END TEST NO TRAILING TAB =====')
+
+    def test_count_lengths(self):
+        """
+        Ensure count lists of different lengths, as in a truncated record, raise
+        a RecoverableSampleException rather than a numpy error.
+        """
+        counts = optaa_common.parse_counts('1\t2\t', '3\t4\t', '5\t6\t', '7\t8\t')
+        self.assertEqual(optaa_common.count_lists(counts), ([1, 2], [3, 4], [5, 6], [7, 8]))
+
+        with self.assertRaises(RecoverableSampleException):
+            optaa_common.parse_counts('1\t2\t', '3\t4\t', '5\t6\t', '7\t')
@@ -29,6 +29,7 @@ Files used for testing:
 """
 
 import os
+import struct
 
 from nose.plugins.attrib import attr
 
@@ -36,7 +37,8 @@ from mi.core.exceptions import DatasetParserException, RecoverableSampleExceptio
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.driver.optaa_dj.dcl.resource import RESOURCE_PATH
-from mi.dataset.parser.optaa_dj_dcl import OptaaDjDclParser
+from mi.dataset.parser import optaa_common
+from mi.dataset.parser.optaa_dj_dcl import OptaaDjDclParser, OptaaSampleHeader, SAMPLE_HEADER_STRUCT
 from mi.dataset.test.test_parser import ParserUnitTestCase
 
 log = get_logger()
@@ -191,3 +193,24 @@ class OptaaDjDclParserUnitTestCase(ParserUnitTestCase):
             self.assertEqual(len(result), 180)
             self.assertEqual(self.exception_callback_value, [])
 
+
+    def test_unpack_counts(self):
+        """
+        Verify the counts decoded in one step match the counts unpacked one at a time
+        """
+        in_file = self.open_file(FILE3)
+        data = in_file.read()
+        in_file.close()
+
+        packet_header = OptaaSampleHeader.from_string(data)
+        self.assertEqual(packet_header.num_wavelengths, 50)
+
+        counts = optaa_common.unpack_counts(data, packet_header.num_wavelengths, SAMPLE_HEADER_STRUCT.size)
+        self.assertEqual(counts.shape, (50, optaa_common.COUNTS_PER_WAVELENGTH))
+
+        unpacked = struct.unpack_from('>200H', data, SAMPLE_HEADER_STRUCT.size)
+        cref, aref, csig, asig = optaa_common.count_lists(counts)
+        self.assertEqual(cref, list(unpacked[0::4]))
+        self.assertEqual(aref, list(unpacked[1::4]))
+        self.assertEqual(csig, list(unpacked[2::4]))
+        self.assertEqual(asig, list(unpacked[3::4]))
@@ -15,7 +15,8 @@ log = get_logger()
 from mi.core.exceptions import SampleException, UnexpectedDataException, RecoverableSampleException
 from mi.dataset.test.test_parser import ParserUnitTestCase, BASE_RESOURCE_PATH
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
-from mi.dataset.parser.phsen_abcdef_sio import PhsenAbcdefSioParser
+from mi.dataset.parser.phsen_abcdef_sio import PhsenAbcdefSioParser, decode_measurements
+from mi.dataset.parser.utilities import hex_byte_sum, hex_checksum, hex_to_int_list
 
 RESOURCE_PATH = os.path.join(BASE_RESOURCE_PATH, 'phsen_abcdef', 'sio', 'resource')
 
@@ -224,4 +225,18 @@ class PhsenAbcdefSioParserUnitTestCase(ParserUnitTestCase):
 
             result = parser.get_records(2)
             self.assert_particles(result, 'node59p1_control_batt.yml', RESOURCE_PATH)
-            self.assertEqual(self.exception_callback_value, [])
\ No newline at end of file
+            self.assertEqual(self.exception_callback_value, [])
+    def test_hex_decoding(self):
+        """
+        Test decoding ascii hex measurements and checksums in one step
+        """
+        self.assertEqual(hex_to_int_list('00010A0BFFFF'), [1, 2571, 65535])
+        self.assertEqual(hex_to_int_list('00010A0BFFFF', signed=True), [1, 2571, -1])
+        self.assertEqual(hex_to_int_list('0100', byte_order='<'), [1])
+        self.assertEqual(hex_byte_sum('FF0102'), 258)
+        self.assertEqual(hex_checksum('FF0102'), 2)
+        self.assertRaises(ValueError, hex_to_int_list, '000')
+
+        # measurements containing a non hex ascii character are replaced with None
+        self.assertEqual(decode_measurements('xx00010G020003', 2, 3), [1, None, 3])
+        self.assertEqual(decode_measurements('xx000100020003', 2, 3), [1, 2, 3])
@@ -18,7 +18,10 @@ from mi.dataset.test.test_parser import \
     ParserUnitTestCase, \
     BASE_RESOURCE_PATH
 
-from mi.dataset.parser.presf_abc import PresfAbcParser
+from mi.dataset.parser.presf_abc import PresfAbcParser, \
+    PresfAbcWaveDataParticle
+
+from mi.dataset.parser.utilities import hex_to_int_columns
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -270,3 +273,40 @@ class PresfAbcParserUnitTestCase(ParserUnitTestCase):
             self.assertTrue(len(self.exception_callback_value) == 1)
             self.assert_(isinstance(self.exception_callback_value[0],
                                     RecoverableSampleException))
+
+    def test_burst_pressure_numbers(self):
+        """
+        Verify that the wave burst pressure numbers are also available as an
+        array, and the conversion of tide and wave burst records together.
+        """
+
+        with open(os.path.join(RESOURCE_PATH, 'presf_abc_test_3.hex'), 'rU') \
+                as file_handle:
+
+            parser = PresfAbcParser(file_handle, self.exception_callback)
+
+            particles = parser.get_records(20)
+
+            self.assertTrue(len(self.exception_callback_value) == 0)
+
+            wave_particles = [particle for particle in particles
+                              if isinstance(particle, PresfAbcWaveDataParticle)]
+            self.assertTrue(len(wave_particles) > 0)
+
+            for particle in wave_particles:
+                values = dict((value['value_id'], value['value']) for value
+                              in particle.generate_dict()['values'])
+                self.assertEqual(particle.burst_pressure_numbers.tolist(),
+                                 values['presf_wave_burst_pressure_number'])
+
+        # tide data record: pressure number, temperature number, start time
+        columns = hex_to_int_columns('3767D13C5E1CB96588' * 2, (3, 2, 4))
+        self.assertEqual([column.tolist() for column in columns],
+                         [[0x3767D1] * 2, [0x3C5E] * 2, [0x1CB96588] * 2])
+
+        # wave burst record: two pressure numbers
+        columns = hex_to_int_columns('8A808F8A8091', (3,))
+        self.assertEqual([column.tolist() for column in columns],
+                         [[0x8A808F, 0x8A8091]])
+
+        self.assertRaises(ValueError, hex_to_int_columns, '8A808F8A80', (3,))
@@ -9,6 +9,8 @@
 """
 
 import os
+import shutil
+import tempfile
 
 from nose.plugins.attrib import attr
 
@@ -114,6 +116,54 @@ class PresfAbcDclParserUnitTestCase(ParserUnitTestCase):
 
         log.debug('===== END TEST MANY =====')
 
+    def test_resume(self):
+        """
+        Parse a log file as it grows, resuming each parse from the checkpoint
+        of the one before.  The first part of the file ends part way through
+        a wave burst and a line.
+        """
+        with open(os.path.join(RESOURCE_PATH, '20140105_trim.presf.log'), 'rb') as file_handle:
+            data = file_handle.read()
+        split = data.index('wave: end burst') - 10
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        file_path = os.path.join(temp_dir, '20140105.presf.log')
+
+        # the drivers open files with universal newlines, which the checkpoint offsets
+        # must not depend on, as the log has CRLF line endings
+        for mode in ('rb', 'rU'):
+            with open(file_path, 'wb') as file_handle:
+                file_handle.write(data[:split])
+
+            with open(file_path, mode) as file_handle:
+                parser = PresfAbcDclParser(file_handle, self.exception_callback, True)
+                parser.resume()
+                particles = parser.get_records(30)
+                checkpoint = parser.get_checkpoint()
+
+            # only the tide record is complete
+            self.assertEqual(len(particles), 1)
+            self.assertEqual(data[checkpoint['offset'] - 1], '\n')
+
+            with open(file_path, 'ab') as file_handle:
+                file_handle.write(data[split:])
+
+            with open(file_path, mode) as file_handle:
+                parser = PresfAbcDclParser(file_handle, self.exception_callback, True)
+                parser.resume(checkpoint)
+                particles.extend(parser.get_records(30))
+                self.assertEqual(parser.get_checkpoint()['offset'], len(data))
+
+            self.assertEqual(self.exception_callback_value, [])
+            self.assert_particles(particles, '20140105_trim.presf_telem.yml', RESOURCE_PATH)
+
+        # a replaced file is parsed from the start
+        with open(os.path.join(RESOURCE_PATH, '20140417.presf3.log'), 'rb') as file_handle:
+            parser = PresfAbcDclParser(file_handle, self.exception_callback, True)
+            parser.resume(checkpoint)
+            self.assertEqual(len(parser.get_records(30)), 2)
+
     def test_long_stream(self):
         """
         Test a long stream
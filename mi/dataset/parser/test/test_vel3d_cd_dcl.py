@@ -10,13 +10,16 @@ __license__ = 'Apache 2.0'
 
 import os
 from nose.plugins.attrib import attr
+import numpy
 import re
+import struct
 
 from mi.core.log import get_logger
 log = get_logger()
 from mi.core.exceptions import UnexpectedDataException, SampleException
 from mi.dataset.test.test_parser import ParserUnitTestCase, BASE_RESOURCE_PATH
-from mi.dataset.parser.vel3d_cd_dcl import Vel3dCdDclParser
+from mi.dataset.parser import vel3d_velpt_common
+from mi.dataset.parser.vel3d_cd_dcl import Vel3dCdDclParser, RECORD_SIZE_DICT, VELOCITY_ID, SYSTEM_ID
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, END_OF_LINE_REGEX
 
 RESOURCE_PATH = os.path.join(BASE_RESOURCE_PATH, 'vel3d_cd', 'dcl', 'resource')
@@ -200,6 +203,33 @@ class Vel3dCdDclParserUnitTestCase(ParserUnitTestCase):
             # Exception from not being able to calculate timestamps
             self.assertIsInstance(self.exception_callback_value[0], SampleException)
 
+    def test_bulk_decode(self):
+        """
+        Test the bulk decoded velocity and system records match the records unpacked one at a time
+        """
+        with open(os.path.join(RESOURCE_PATH, '20141007.vel3d.log'), 'rb') as file_handle:
+            data = file_handle.read()
+
+        table = vel3d_velpt_common.scan_records(data, RECORD_SIZE_DICT, accept_all_ids=True)
+        vel3d_velpt_common.verify_checksums(data, table)
+        self.assertTrue(numpy.all(table['status'] != vel3d_velpt_common.RECORD_BAD_CHECKSUM))
+
+        indices, records = Vel3dCdDclParser.decode_records(data, table, VELOCITY_ID,
+                                                           vel3d_velpt_common.VECTOR_VELOCITY_DTYPE)
+        self.assertEqual(len(indices), 1440)
+        for offset, record in zip(table['offset'][indices], records):
+            self.assertEqual(record.tolist(), struct.unpack_from('<6B 2H 3h 6B H', data, offset))
+
+        indices, records = Vel3dCdDclParser.decode_records(data, table, SYSTEM_ID,
+                                                           vel3d_velpt_common.VECTOR_SYSTEM_DTYPE)
+        timestamps = vel3d_velpt_common.bcd_timestamps(records).tolist()
+        date_time_strings = vel3d_velpt_common.bcd_date_time_strings(records)
+        for index, offset in enumerate(table['offset'][indices]):
+            record = data[offset:offset + 28]
+            self.assertEqual(records[index].tolist()[9:], struct.unpack_from('<2H 4h 2B H', record, 10))
+            self.assertEqual(timestamps[index], vel3d_velpt_common.get_timestamp(record))
+            self.assertEqual(date_time_strings[index], vel3d_velpt_common.get_date_time_string(record))
+
     def fix_yml_float_params(self):
         """
         This helper tool was used to modify the yml files in response to ticket #8564
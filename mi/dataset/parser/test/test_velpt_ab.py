@@ -11,15 +11,18 @@ __author__ = 'Chris Goodrich'
 
 import os
 import re
+import struct
+from StringIO import StringIO
 
 from nose.plugins.attrib import attr
 
-from mi.core.exceptions import ConfigurationException
+from mi.core.exceptions import ConfigurationException, RecoverableSampleException
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.driver.velpt_ab.resource import RESOURCE_PATH
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, END_OF_LINE_REGEX
+from mi.dataset.parser import vel3d_velpt_common
 from mi.dataset.parser.velpt_ab import VelptAbParser, VelptAbParticleClassKey
-from mi.dataset.parser.velpt_ab_particles import VelptAbInstrumentDataParticle,\
+from mi.dataset.parser.velpt_ab_particles import VelptAbDataParticle, VelptAbInstrumentDataParticle,\
     VelptAbDiagnosticsHeaderParticle, VelptAbDiagnosticsDataParticle, VelptAbInstrumentMetadataParticle
 from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.logging import log
@@ -632,6 +635,87 @@ class VelptAbParserUnitTestCase(ParserUnitTestCase):
 
         log.debug('===== END TEST FOUND BAD DIAG HDR CHECKSUM AND TOO MANY RECS =====')
 
+    def test_record_table(self):
+        """
+        Scan a file with extra bytes and a bad velocity checksum into a record table
+        and verify the status of the entries. Verify the bulk decoded velocity records
+        match the record by record decoding.
+        """
+        log.debug('===== START TEST RECORD TABLE =====')
+
+        with open(os.path.join(RESOURCE_PATH, 'extra_bytes_VELPT_SN_11402_2014-07-02.aqd'), 'rb') as file_handle:
+            data = file_handle.read()
+
+        table = vel3d_velpt_common.scan_records(data, VelptAbParser.RECORD_SIZES)
+        vel3d_velpt_common.verify_checksums(data, table)
+
+        # the 9 extra bytes are collected in runs of invalid sync bytes
+        bad_sync = table[table['status'] == vel3d_velpt_common.RECORD_BAD_SYNC]
+        self.assertEquals(bad_sync['length'].sum(), 9)
+        # three configuration records and the diagnostics headers do not map one to one to particles
+        self.assertEquals(len(table[table['status'] == vel3d_velpt_common.RECORD_VALID]), 74)
+
+        velocity = table[table['id'] == ord(VelptAbParser.VELOCITY_DATA_ID)]
+        records = vel3d_velpt_common.decode_aquadopp_velocity_records(data, velocity['offset'])
+        data_dicts = VelptAbDataParticle.generate_data_dicts(
+            records, vel3d_velpt_common.bcd_date_time_strings(records))
+        timestamps = vel3d_velpt_common.bcd_timestamps(records)
+
+        for entry, data_dict, timestamp in zip(velocity, data_dicts, timestamps):
+            record = data[entry['offset']:entry['offset'] + entry['length']]
+            self.assertEquals(data_dict, VelptAbDataParticle.generate_data_dict(record))
+            self.assertEquals(timestamp, VelptAbDataParticle.get_timestamp(record))
+
+        with open(os.path.join(RESOURCE_PATH, 'bad_velocity_checksum_VELPT_SN_11402_2014-07-02.aqd'), 'rb') as \
+                file_handle:
+            data = file_handle.read()
+
+        table = vel3d_velpt_common.scan_records(data, VelptAbParser.RECORD_SIZES)
+        vel3d_velpt_common.verify_checksums(data, table)
+
+        self.assertEquals(len(table[table['status'] == vel3d_velpt_common.RECORD_BAD_CHECKSUM]), 1)
+
+        log.debug('===== END TEST RECORD TABLE =====')
+
+    def test_bad_time(self):
+        """
+        Velocity records with BCD date and time fields that are not a valid time,
+        a month of 13 and a day digit of 0xA, are not turned into particles and
+        are reported through the exception callback.
+        """
+        log.debug('===== START TEST BAD TIME =====')
+
+        with open(os.path.join(RESOURCE_PATH, 'VELPT_SN_11402_2014-07-02.aqd'), 'rb') as file_handle:
+            data = bytearray(file_handle.read())
+
+        table = vel3d_velpt_common.scan_records(str(data), VelptAbParser.RECORD_SIZES)
+        velocity = table[table['id'] == ord(VelptAbParser.VELOCITY_DATA_ID)]
+        timestamps = vel3d_velpt_common.bcd_timestamps(
+            vel3d_velpt_common.decode_aquadopp_velocity_records(str(data), velocity['offset'])).tolist()
+
+        # the month of one record and the day of another, the time fields start at byte 4
+        data[velocity['offset'][10] + 9] = 0x13
+        data[velocity['offset'][20] + 6] = 0x1A
+        checksums = vel3d_velpt_common.calculate_checksums(str(data), velocity['offset'], velocity['length'] - 2)
+        for entry, checksum in zip(velocity, checksums):
+            data[entry['offset'] + entry['length'] - 2:entry['offset'] + entry['length']] = \
+                struct.pack('<H', checksum)
+
+        parser = VelptAbParser(self._parser_config, StringIO(str(data)), self.exception_callback)
+        particles = parser.get_records(72)
+
+        self.assertEquals(len(particles), 70)
+        self.assertEquals(len(self.exception_callback_value), 2)
+        for exception in self.exception_callback_value:
+            self.assertIsInstance(exception, RecoverableSampleException)
+
+        particle_times = [particle.get_value('internal_timestamp') for particle in particles]
+        self.assertNotIn(timestamps[10], particle_times)
+        self.assertNotIn(timestamps[20], particle_times)
+        self.assertIn(timestamps[11], particle_times)
+
+        log.debug('===== END TEST BAD TIME =====')
+
     def fix_yml_pressure_params(self):
         """
         This helper tool was used to modify the yml files in response to ticket #4341
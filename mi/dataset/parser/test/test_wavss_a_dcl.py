@@ -6,12 +6,13 @@
 """
 
 import os
+import numpy as np
 from nose.plugins.attrib import attr
 
 from mi.core.log import get_logger
 from mi.core.exceptions import RecoverableSampleException
 from mi.dataset.test.test_parser import ParserUnitTestCase, BASE_RESOURCE_PATH
-from mi.dataset.parser.wavss_a_dcl import WavssADclParser
+from mi.dataset.parser.wavss_a_dcl import WavssADclParser, LINE_CLASSIFIER
 log = get_logger()
 
 __author__ = 'Emily Hahn'
@@ -183,3 +184,55 @@ class WavssADclParserUnitTestCase(ParserUnitTestCase):
 
             self.assertEqual(len(particles), 120)
             self.assertEqual(self.exception_callback_value, [])
+
+    def test_line_classifier(self):
+        """
+        Verify the line classifier finds the same record type as trying each pattern in turn
+        """
+        # the $TSP tags differ in the fifth character after the timestamp
+        self.assertEqual(LINE_CLASSIFIER.column, 28)
+
+        for file_name in ('20140825.wavss.log', '20150314.wavss.log', 'bad_num_samples.wavss.log'):
+            with open(os.path.join(RESOURCE_PATH, file_name), 'r') as file_handle:
+                for line in file_handle:
+                    expected = (None, None)
+                    for record_type, matcher in LINE_CLASSIFIER.record_matchers:
+                        match = matcher.match(line)
+                        if match is not None:
+                            expected = (record_type, match.groups())
+                            break
+
+                    record_type, match = LINE_CLASSIFIER.classify(line)
+                    self.assertEqual((record_type, match and match.groups()), expected)
+
+    def test_record_batches(self):
+        """
+        Test the records of each type are batched with columns matching the particle values
+        """
+        with open(os.path.join(RESOURCE_PATH, '20140825.wavss.log'), 'r') as file_handle:
+            parser = WavssADclParser(file_handle, self.exception_callback, is_telemetered=True)
+
+            particles = parser.get_records(20)
+            batches = dict((batch.record_type, batch) for batch in parser.get_record_batches())
+
+            self.assertEqual(sorted(batches.keys()), ['TSPFB', 'TSPHA', 'TSPMA', 'TSPNA', 'TSPWA'])
+            self.assertEqual(sum(len(batch) for batch in batches.values()), len(particles))
+
+            values = {}
+            for particle in particles:
+                particle_dict = particle.generate_dict()
+                for value in particle_dict['values']:
+                    values.setdefault(particle_dict['stream_name'], {}).setdefault(
+                        value['value_id'], []).append(value['value'])
+
+            mean_directional = batches['TSPMA']
+            self.assertEqual(mean_directional.column('psd_mean_directional').shape, (len(mean_directional), 123))
+            for name in ('number_bands', 'psd_mean_directional', 'directional_spread_array'):
+                np.testing.assert_array_equal(mean_directional.column(name),
+                                              values['wavss_a_dcl_mean_directional'][name])
+
+            fourier = batches['TSPFB']
+            np.testing.assert_array_equal(fourier.column('fourier_coefficient_2d_array'),
+                                          values['wavss_a_dcl_fourier']['fourier_coefficient_2d_array'])
+
+            self.assertEqual(self.exception_callback_value, [])
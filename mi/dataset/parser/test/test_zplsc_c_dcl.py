@@ -14,7 +14,7 @@ from nose.plugins.attrib import attr
 from mi.core.log import get_logger
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.dataset.driver.zplsc_c.dcl.resource import RESOURCE_PATH
-from mi.dataset.parser.zplsc_c_dcl import ZplscCDclParser
+from mi.dataset.parser.zplsc_c_dcl import ZplscCDclParser, decode_channel_blocks, MISSING_BIN_VALUE
 from mi.dataset.test.test_parser import ParserUnitTestCase
 
 log = get_logger()
@@ -208,3 +208,45 @@ class ZplscCDclParserUnitTestCase(ParserUnitTestCase):
             self.assertEqual(len(result), 3)
             self.assertListEqual(self.exception_callback_value, [])
 
+    def test_profiles(self):
+        """
+        Verify that the bin values of each particle are also available as a 2-D
+        array with a row per channel, padded where a channel has fewer bins
+        """
+        with open(self.file_path('20150407.zplsc_var_channels.log')) as in_file:
+
+            parser = self.create_zplsc_c_dcl_parser(in_file)
+            result = parser.get_records(15)
+
+            self.assertEqual(len(result), 15)
+
+            for particle in result:
+                values = dict((value['value_id'], value['value'])
+                              for value in particle.generate_dict()['values'])
+
+                for row, key in enumerate(('zplsc_c_values_channel_1', 'zplsc_c_values_channel_2',
+                                           'zplsc_c_values_channel_3', 'zplsc_c_values_channel_4')):
+                    # channels beyond the number of frequencies have no row
+                    if row >= particle.profiles.shape[0]:
+                        self.assertIsNone(values[key])
+                        continue
+
+                    channel = values[key] or []
+                    bins = particle.profiles[row].tolist()
+                    self.assertEqual(bins[:len(channel)], channel)
+                    self.assertTrue(all(value == MISSING_BIN_VALUE for value in bins[len(channel):]))
+
+    def test_decode_channel_blocks(self):
+        """
+        Verify the conversion of the channel blocks of a record together
+        """
+        profiles = decode_channel_blocks(['1', '38', '10', '11', '12', '2', '125', '20', '21'], [3, 2])
+        self.assertEqual(profiles.tolist(), [[10, 11, 12], [20, 21, MISSING_BIN_VALUE]])
+
+        profiles = decode_channel_blocks(['1', '38', '10', '11', '2', '125', '20', '21'], [2, 2])
+        self.assertEqual(profiles.tolist(), [[10, 11], [20, 21]])
+
+        # values which are not unsigned integers are left to the particle to convert
+        self.assertIsNone(decode_channel_blocks(['1', '38', '10', '1x', '2', '125', '20', '21'], [2, 2]))
+        self.assertIsNone(decode_channel_blocks(['1', '38', '10', '', '2', '125', '20', '21'], [2, 2]))
+        self.assertIsNone(decode_channel_blocks(['1', '38', '10', '99999999999999999999'], [2]))
@@ -12,12 +12,15 @@ __author__ = 'Joe Padula'
 __license__ = 'Apache 2.0'
 
 from datetime import datetime
+import binascii
 import time
-import ntplib
+import numpy
 import calendar
+import re
 import string
 
 from mi.core.log import get_logger
+from mi.core.time import NTP_UNIX_EPOCH_DELTA, fixed_format_to_unix_time, utc_date_seconds
 log = get_logger()
 
 # Format of DCL Controller Timestamp in records
@@ -28,6 +31,14 @@ ZULU_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 # Example: 2014/08/17 00:57:10.648
 DCL_CONTROLLER_TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M:%S.%f"
 
+# Zulu and DCL Controller timestamps in their usual form are converted
+# without strptime, anything else goes through strptime as before
+ZULU_TIMESTAMP_MATCHER = re.compile(r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})\.(\d{1,6})Z\Z')
+DCL_CONTROLLER_TIMESTAMP_MATCHER = re.compile(r'(\d{4})/(\d{2})/(\d{2}) (\d{2}):(\d{2}):(\d{2})\.(\d+)\Z')
+
+# The difference between the unix and mac (1904) epochs in seconds
+UNIX_MINUS_MAC_SECS = (datetime(1970, 1, 1) - datetime(1904, 1, 1)).total_seconds()
+
 
 def formatted_timestamp_utc_time(timestamp_str, format_str):
     """
@@ -51,6 +62,21 @@ def zulu_timestamp_to_utc_time(zulu_timestamp_str):
     :return: UTC time in seconds and microseconds precision
     """
 
+    match = ZULU_TIMESTAMP_MATCHER.match(zulu_timestamp_str)
+
+    if match:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        hour = int(hour)
+        minute = int(minute)
+        second = int(second)
+
+        if hour < 24 and minute < 60 and second < 60:
+            try:
+                utc_time = utc_date_seconds(year, month, day) + hour * 3600 + minute * 60 + second
+                return utc_time + (int(fraction.ljust(6, '0')) / 1000000.0)
+            except ValueError:
+                pass
+
     return formatted_timestamp_utc_time(zulu_timestamp_str,
                                         ZULU_TIMESTAMP_FORMAT)
 
@@ -64,7 +90,11 @@ def zulu_timestamp_to_ntp_time(zulu_timestamp_str):
 
     utc_time = zulu_timestamp_to_utc_time(zulu_timestamp_str)
 
-    return float(ntplib.system_to_ntp_time(utc_time))
+    return float(utc_time + NTP_UNIX_EPOCH_DELTA)
+
+
+# The NTP time of the start of Jan 1, 2000
+NTP_TIME_2000 = zulu_timestamp_to_ntp_time("2000-01-01T00:00:00.00Z")
 
 
 def time_2000_to_ntp_time(time_2000):
@@ -72,11 +102,12 @@ def time_2000_to_ntp_time(time_2000):
     This function calculates and returns a timestamp in epoch 1900
     based on an integer timestamp in epoch 2000.
     Parameter:
-      time_2000 - timestamp in number of seconds since Jan 1, 2000
+      time_2000 - timestamp in number of seconds since Jan 1, 2000,
+                  or a numpy array of them
     Returns:
       timestamp in number of seconds since Jan 1, 1900
     """
-    return time_2000 + zulu_timestamp_to_ntp_time("2000-01-01T00:00:00.00Z")
+    return time_2000 + NTP_TIME_2000
 
 
 def dcl_controller_timestamp_to_utc_time(dcl_controller_timestamp_str):
@@ -86,6 +117,22 @@ def dcl_controller_timestamp_to_utc_time(dcl_controller_timestamp_str):
     :return: UTC time in seconds and microseconds precision
     """
 
+    match = DCL_CONTROLLER_TIMESTAMP_MATCHER.match(dcl_controller_timestamp_str)
+
+    if match:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        hour = int(hour)
+        minute = int(minute)
+        second = int(second)
+
+        # time.strptime allows for up to 2 leap seconds
+        if hour < 24 and minute < 60 and second < 62:
+            try:
+                utc_time = utc_date_seconds(year, month, day) + hour * 3600 + minute * 60 + second
+                return utc_time + float('.' + fraction)
+            except ValueError:
+                pass
+
     no_frac_timestamp_str, frac_timestamp_str = dcl_controller_timestamp_str.split('.')
     no_frac_format_str, frac_format_str = DCL_CONTROLLER_TIMESTAMP_FORMAT.split('.')
 
@@ -105,32 +152,75 @@ def dcl_controller_timestamp_to_ntp_time(dcl_controller_timestamp_str):
 
     utc_time = dcl_controller_timestamp_to_utc_time(dcl_controller_timestamp_str)
 
-    return float(ntplib.system_to_ntp_time(utc_time))
+    return float(utc_time + NTP_UNIX_EPOCH_DELTA)
+
+
+def zulu_timestamps_to_ntp_time(zulu_timestamp_strs):
+    """
+    Converts a column of zulu formatted timestamp strings to NTP time.
+    :param zulu_timestamp_strs: sequence of zulu formatted timestamp strings
+    :return: numpy float64 array of NTP times
+    """
+
+    utc_times = fixed_format_to_unix_time(zulu_timestamp_strs, '-', 'T', suffix='Z',
+                                          min_fraction_digits=1, max_fraction_digits=6)
+
+    if utc_times is None:
+        return numpy.array([zulu_timestamp_to_ntp_time(timestamp) for timestamp in zulu_timestamp_strs],
+                           dtype=numpy.float64)
+
+    return utc_times + NTP_UNIX_EPOCH_DELTA
+
+
+def dcl_controller_timestamps_to_ntp_time(dcl_controller_timestamp_strs):
+    """
+    Converts a column of DCL controller timestamp strings to NTP time.
+    :param dcl_controller_timestamp_strs: sequence of DCL controller timestamp strings
+    :return: numpy float64 array of NTP times
+    """
+
+    utc_times = fixed_format_to_unix_time(dcl_controller_timestamp_strs, '/', ' ',
+                                          min_fraction_digits=1, max_fraction_digits=15, max_second=61)
+
+    if utc_times is None:
+        return numpy.array([dcl_controller_timestamp_to_ntp_time(timestamp)
+                            for timestamp in dcl_controller_timestamp_strs], dtype=numpy.float64)
+
+    return utc_times + NTP_UNIX_EPOCH_DELTA
 
 
 def mac_timestamp_to_utc_timestamp(mac_timestamp):
     """
-    :param mac_timestamp: A mac based timestamp
+    :param mac_timestamp: A mac based timestamp, or a numpy array of them
     :return: The mac timestamp converted to unix time
     """
 
-    unix_minus_mac_secs = (datetime(1970, 1, 1) - datetime(1904, 1, 1)).total_seconds()
-
-    secs_since_1970 = mac_timestamp - unix_minus_mac_secs
+    secs_since_1970 = mac_timestamp - UNIX_MINUS_MAC_SECS
 
     return secs_since_1970
 
 
+def convert_to_signed_int(input, num_bits):
+    """
+    Utility function to convert a hex string into a signed integer value of the given number of bits
+    :param input: hex String
+    :param num_bits: the number of bits in the signed integer
+    :return: signed integer
+    """
+    val = int(input, 16)
+    sign_bit = 1 << (num_bits - 1)
+    if val >= sign_bit:
+        val = ((val + sign_bit) & ((1 << num_bits) - 1)) - sign_bit
+    return val
+
+
 def convert_to_signed_int_32_bit(input):
     """
     Utility function to convert a hex string into a 32 bit signed hex integer value
     :param input: hex String
     :return: signed 32 bit integer
     """
-    val = int(input, 16)
-    if val > 0x7FFFFFFF:
-        val = ((val+0x80000000)&0xFFFFFFFF) - 0x80000000
-    return val
+    return convert_to_signed_int(input, 32)
 
 
 def convert_to_signed_int_16_bit(input):
@@ -139,10 +229,7 @@ def convert_to_signed_int_16_bit(input):
     :param input: hex String
     :return: signed 16 bit integer
     """
-    val = int(input, 16)
-    if val > 0x7FFF:
-        val = ((val+0x8000)&0xFFFF) - 0x8000
-    return val
+    return convert_to_signed_int(input, 16)
 
 
 def convert_to_signed_int_8_bit(input):
@@ -151,10 +238,110 @@ def convert_to_signed_int_8_bit(input):
     :param input: hex String
     :return: signed 8 bit integer
     """
-    val = int(input, 16)
-    if val > 0x7F:
-        val = ((val+0x80)&0xFF) - 0x80
-    return val
+    return convert_to_signed_int(input, 8)
+
+
+def hex_to_bytes(ascii_hex_str):
+    """
+    Converts an ascii hex string into the binary string it encodes
+    :param ascii_hex_str: The ascii hex string, two hex characters per byte
+    :return: binary string
+    :raises ValueError: if the string has an odd length or a non hex character
+    """
+    try:
+        return binascii.unhexlify(ascii_hex_str)
+    except (TypeError, binascii.Error) as e:
+        raise ValueError("Unable to decode ASCII Hex string: %s" % e)
+
+
+def hex_to_int_array(ascii_hex_str, num_bytes=2, signed=False, byte_order='>'):
+    """
+    Converts an ascii hex string of fixed width values into an array of integers
+    :param ascii_hex_str: The ascii hex string, 2 * num_bytes hex characters per value
+    :param num_bytes: The number of bytes in each value, 1, 2, 4 or 8
+    :param signed: True if the values are two's complement signed integers
+    :param byte_order: '>' for big endian (most significant digits first) or '<' for little endian
+    :return: numpy integer array of the values
+    :raises ValueError: if the string does not hold a whole number of values
+    """
+    data = hex_to_bytes(ascii_hex_str)
+
+    if len(data) % num_bytes != 0:
+        raise ValueError("The ASCII Hex string is not divisible by %d." % (num_bytes * 2))
+
+    dtype = numpy.dtype('%s%s%d' % (byte_order, 'i' if signed else 'u', num_bytes))
+
+    return numpy.frombuffer(data, dtype=dtype)
+
+
+def hex_to_int_list(ascii_hex_str, num_bytes=2, signed=False, byte_order='>'):
+    """
+    Converts an ascii hex string of fixed width values into a list of integers,
+    ready to be used as a particle value
+    :param ascii_hex_str: The ascii hex string, 2 * num_bytes hex characters per value
+    :param num_bytes: The number of bytes in each value, 1, 2, 4 or 8
+    :param signed: True if the values are two's complement signed integers
+    :param byte_order: '>' for big endian (most significant digits first) or '<' for little endian
+    :return: list of ints
+    """
+    return hex_to_int_array(ascii_hex_str, num_bytes, signed, byte_order).tolist()
+
+
+def hex_to_int_columns(ascii_hex_str, field_bytes):
+    """
+    Converts an ascii hex string of fixed width records into a column of integers
+    for each field of the records
+    :param ascii_hex_str: The ascii hex string of the records, one after another
+    :param field_bytes: list of the number of bytes in each field of a record,
+                        each field an unsigned big endian integer of up to 8 bytes
+    :return: list of numpy integer arrays, the values of each field
+    :raises ValueError: if the string does not hold a whole number of records
+    """
+    data = hex_to_bytes(ascii_hex_str)
+    record_bytes = sum(field_bytes)
+
+    if len(data) % record_bytes != 0:
+        raise ValueError("The ASCII Hex string is not divisible by %d." % (record_bytes * 2))
+
+    records = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, record_bytes)
+
+    columns = []
+    start = 0
+    for num_bytes in field_bytes:
+        column = numpy.zeros(len(records), dtype=numpy.uint64 if num_bytes == 8 else numpy.int64)
+        for index in range(start, start + num_bytes):
+            column <<= 8
+            column |= records[:, index]
+        columns.append(column)
+        start += num_bytes
+
+    return columns
+
+
+def hex_byte_sum(ascii_hex_str):
+    """
+    Sums the bytes of an ascii hex string.  Strings which can not be decoded in
+    one step, with an odd length or characters such as signs or spaces, are
+    summed two characters at a time, a trailing single character counting as a
+    byte on its own.
+    :param ascii_hex_str: The ascii hex string to sum
+    :return: int sum of the bytes
+    :raises ValueError: if a pair of characters is not a hex value
+    """
+    try:
+        return int(numpy.frombuffer(hex_to_bytes(ascii_hex_str), dtype=numpy.uint8).sum())
+    except ValueError:
+        return sum(int(ascii_hex_str[index:index+2], 16) for index in range(0, len(ascii_hex_str), 2))
+
+
+def hex_checksum(ascii_hex_str):
+    """
+    Calculates the low order byte of the sum of the bytes of an ascii hex string,
+    the checksum used by the SAMI (pco2w, phsen) instruments
+    :param ascii_hex_str: The ascii hex string to sum
+    :return: int checksum
+    """
+    return hex_byte_sum(ascii_hex_str) & 0xFF
 
 
 def sum_hex_digits(ascii_hex_str):
@@ -165,17 +352,29 @@ def sum_hex_digits(ascii_hex_str):
     :return:
     """
 
-    len_of_ascii_hex = len(ascii_hex_str)
-
-    if len_of_ascii_hex % 2 != 0:
+    if len(ascii_hex_str) % 2 != 0:
         raise ValueError("The ASCII Hex string is not divisible by 2.")
 
-    x = 0
+    # Return the resultant summation as hex
+    return hex(hex_byte_sum(ascii_hex_str))
 
-    # Iterate through each byte of ascii hex
-    for index in range(0, len_of_ascii_hex, 2):
-        # Convert each byte to an int and add it to the existing summation
-        x += int(ascii_hex_str[index:index+2], 16)
 
-    # Return the resultant summation as hex
-    return hex(x)
\ No newline at end of file
+class LineReader(object):
+    """
+    Reads the lines of the text of a file, keeping the offset of the next line so
+    runs of lines can also be matched in the text as one block
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.offset = 0
+
+    def readline(self):
+        """
+        Read the next line
+        :return: The line with its newline, or an empty string at the end of the text
+        """
+        end = self.text.find('\n', self.offset) + 1 or len(self.text)
+        line = self.text[self.offset:end]
+        self.offset = end
+        return line
@@ -13,6 +13,7 @@ import struct
 import re
 import binascii
 import base64
+import numpy
 from mi.core.log import get_logger
 log = get_logger()
 from mi.core.common import BaseEnum
@@ -51,6 +52,21 @@ BIT_MASK_DICT = {
 }
 
 
+def build_data_dicts(records, parameter_names):
+    """
+    Build the raw data dictionaries of bulk decoded records which have a date and time,
+    holding the date time string and the named parameters
+    :param records: numpy structured array of decoded records
+    :param parameter_names: The names of the record fields to include
+    :return: list of dictionaries of parameters
+    """
+    names = ('date_time_string',) + parameter_names
+    columns = [vel3d_velpt_common.bcd_date_time_strings(records)]
+    columns += [records[name].tolist() for name in parameter_names]
+
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
 class Vel3dCdDclDataParticleType(BaseEnum):
     USER_CONFIG = 'vel3d_cd_dcl_user_configuration'
     USER_CONFIG_RECOV = 'vel3d_cd_dcl_user_configuration_recovered'
@@ -270,32 +286,35 @@ class Vel3dCdDclHeadConfigRecoveredParticle(Vel3dCdDclHeadConfigCommonParticle):
 
 class Vel3dCdDclDataHeaderCommonParticle(DataParticle):
 
-    # store index into unpacked raw data by parameter name, starting from byte 9, all are ints
-    UNPACK_DICT = {
-        'number_velocity_records': 0,
-        'noise_amp_beam1': 1,
-        'noise_amp_beam2': 2,
-        'noise_amp_beam3': 3,
-        # index 4 is spare
-        'noise_correlation_beam1': 5,
-        'noise_correlation_beam2': 6,
-        'noise_correlation_beam3': 7,
-    }
+    # parameters decoded from the record by name, all are ints
+    PARAMETER_NAMES = (
+        'number_velocity_records',
+        'noise_amp_beam1',
+        'noise_amp_beam2',
+        'noise_amp_beam3',
+        'noise_correlation_beam1',
+        'noise_correlation_beam2',
+        'noise_correlation_beam3',
+    )
+
+    @classmethod
+    def generate_data_dicts(cls, records):
+        """
+        Build the raw data dictionaries for many data header records at once
+        :param records: numpy structured array of vel3d_velpt_common.VECTOR_DATA_HEADER_DTYPE
+        :return: list of dictionaries of parameters
+        """
+        return build_data_dicts(records, cls.PARAMETER_NAMES)
 
     def _build_parsed_values(self):
         """
         Return an array of dictionaries containing parameters for the data header particle
         :return: array of dictionary of parameters
         """
-        # unpack the raw data starting at byte 9
-        unpacked_data = struct.unpack_from('<H 7B', self.raw_data, 10)
+        parameters = [self._encode_value('date_time_string', self.raw_data['date_time_string'], str)]
 
-        # get the date time string
-        date_time_string = vel3d_velpt_common.get_date_time_string(self.raw_data)
-        parameters = [self._encode_value('date_time_string', date_time_string, str)]
-
-        for name, index in self.UNPACK_DICT.iteritems():
-            parameters.append(self._encode_value(name, unpacked_data[index], int))
+        for name in self.PARAMETER_NAMES:
+            parameters.append(self._encode_value(name, self.raw_data[name], int))
 
         return parameters
 
@@ -310,49 +329,46 @@ class Vel3dCdDclDataHeaderRecoveredParticle(Vel3dCdDclDataHeaderCommonParticle):
 
 class Vel3dCdDclVelocityCommonParticle(DataParticle):
 
-    # store index into unpacked raw data by parameter name, all are ints
-    UNPACK_DICT = {
-        'ensemble_counter': 3,
-        'analog_input_1': 7,
-        'turbulent_velocity_east': 8,
-        'turbulent_velocity_north': 9,
-        'turbulent_velocity_vertical': 10,
-        'amplitude_beam_1': 11,
-        'amplitude_beam_2': 12,
-        'amplitude_beam_3': 13,
-        'correlation_beam_1': 14,
-        'correlation_beam_2': 15,
-        'correlation_beam_3': 16,
-    }
+    # parameters decoded from the record by name, all are ints
+    PARAMETER_NAMES = (
+        'ensemble_counter',
+        'analog_input_1',
+        'turbulent_velocity_east',
+        'turbulent_velocity_north',
+        'turbulent_velocity_vertical',
+        'amplitude_beam_1',
+        'amplitude_beam_2',
+        'amplitude_beam_3',
+        'correlation_beam_1',
+        'correlation_beam_2',
+        'correlation_beam_3',
+        'analog_input_2',
+        'seawater_pressure_mbar',
+    )
 
-    def _build_parsed_values(self):
+    @classmethod
+    def generate_data_dicts(cls, records):
         """
-        Return an array of dictionaries containing parameters for the velocity particle
-        :return: array of dictionary of parameters
+        Build the raw data dictionaries for many velocity records at once
+        :param records: numpy structured array of vel3d_velpt_common.VECTOR_VELOCITY_DTYPE
+        :return: list of dictionaries of parameters
         """
-        parameters = []
-        # unpack binary raw data string into an array of individual values
-        unpacked_data = struct.unpack('<6B 2H 3h 6B H', self.raw_data)
+        # combine the most and least significant byte
+        analog_2 = (records['analog_input_2_msb'].astype(numpy.int64) << 8) + records['analog_input_2_lsb']
+        # combine the most significant byte and least significant word
+        pressure = (records['pressure_msb'].astype(numpy.int64) << 16) + records['pressure_lsw']
 
-        # unpack the data into parameters and values using the dictionary
-        for name, index in self.UNPACK_DICT.iteritems():
-            parameters.append(self._encode_value(name, unpacked_data[index], int))
-
-        # some parameters need extra calculations
+        columns = [records[name].tolist() for name in cls.PARAMETER_NAMES[:-2]]
+        columns += [analog_2.tolist(), pressure.tolist()]
 
-        analog_2_lsb = unpacked_data[2]
-        analog_2_msb = unpacked_data[5]
-        # combine least and most significant byte
-        analog_2 = (analog_2_msb << 8) + analog_2_lsb
-        parameters.append(self._encode_value('analog_input_2', analog_2, int))
+        return [dict(zip(cls.PARAMETER_NAMES, values)) for values in zip(*columns)]
 
-        pressure_msb = unpacked_data[4]
-        pressure_lsw = unpacked_data[6]
-        # combine least significant word and byte,
-        pressure = (pressure_msb << 16) + pressure_lsw
-        parameters.append(self._encode_value('seawater_pressure_mbar', pressure, int))
-
-        return parameters
+    def _build_parsed_values(self):
+        """
+        Return an array of dictionaries containing parameters for the velocity particle
+        :return: array of dictionary of parameters
+        """
+        return [self._encode_value(name, self.raw_data[name], int) for name in self.PARAMETER_NAMES]
 
 
 class Vel3dCdDclVelocityTelemeteredParticle(Vel3dCdDclVelocityCommonParticle):
@@ -365,26 +381,37 @@ class Vel3dCdDclVelocityRecoveredParticle(Vel3dCdDclVelocityCommonParticle):
 
 class Vel3dCdDclSystemCommonParticle(DataParticle):
 
+    # parameters decoded from the record by name, all are ints
+    PARAMETER_NAMES = (
+        'battery_voltage_dV',
+        'sound_speed_dms',
+        'heading_decidegree',
+        'pitch_decidegree',
+        'roll_decidegree',
+        'temperature_centidegree',
+        'error_code',
+        'status_code',
+        'analog_input',
+    )
+
+    @classmethod
+    def generate_data_dicts(cls, records):
+        """
+        Build the raw data dictionaries for many system records at once
+        :param records: numpy structured array of vel3d_velpt_common.VECTOR_SYSTEM_DTYPE
+        :return: list of dictionaries of parameters
+        """
+        return build_data_dicts(records, cls.PARAMETER_NAMES)
+
     def _build_parsed_values(self):
         """
         Return an array of dictionaries containing parameters for the system particle
         :return: array of dictionary of parameters
         """
-        unpacked_data = struct.unpack_from('<2H 4h 2B H', self.raw_data, 10)
-
-        # get the date time string from the raw data
-        date_time_string = vel3d_velpt_common.get_date_time_string(self.raw_data)
+        parameters = [self._encode_value('date_time_string', self.raw_data['date_time_string'], str)]
 
-        parameters = [self._encode_value('date_time_string', date_time_string, str),
-                      self._encode_value('battery_voltage_dV', unpacked_data[0], int),
-                      self._encode_value('sound_speed_dms', unpacked_data[1], int),
-                      self._encode_value('heading_decidegree', unpacked_data[2], int),
-                      self._encode_value('pitch_decidegree', unpacked_data[3] , int),
-                      self._encode_value('roll_decidegree', unpacked_data[4], int),
-                      self._encode_value('temperature_centidegree', unpacked_data[5], int),
-                      self._encode_value('error_code', unpacked_data[6], int),
-                      self._encode_value('status_code', unpacked_data[7], int),
-                      self._encode_value('analog_input', unpacked_data[8], int)]
+        for name in self.PARAMETER_NAMES:
+            parameters.append(self._encode_value(name, self.raw_data[name], int))
 
         return parameters
 
@@ -436,58 +463,16 @@ class Vel3dCdDclParser(SimpleParser):
 
     def parse_file(self):
         """
-        Main parsing function which loops through the file and interprets it by building particles
+        Main parsing function which interprets the file by building particles.  The file is framed
+        into a table of records in one pass, checksums are verified and the velocity, system and
+        data header records are decoded in bulk, then the table is walked in file order.
         """
-        end_of_file = False
-
-        # loop until the entire file is read
-        while not end_of_file:
-
-            # read up to the start of a record by finding the sync marker
-            end_of_file = self.find_record_start()
-            if end_of_file:
-                # make sure we break out of this loop if there are no more bytes in the file
-                continue
-
-            # now that the sync marker has been found, get the record type which follows
-            record_type = self._file_handle.read(1)
-
-            if record_type in RECORD_SIZE_DICT.keys():
-                # this record type does not contain the record size, get it from the dictionary
-                record_size_bytes = RECORD_SIZE_DICT.get(record_type)
-                full_record = vel3d_velpt_common.SYNC_MARKER + record_type
-            else:
-                # this record type does contain the record size, read it from the file
-                record_size_words = self._file_handle.read(2)
-
-                # unpack and convert from words to bytes
-                record_size_bytes = struct.unpack('<H', record_size_words)[0] * 2
-                full_record = vel3d_velpt_common.SYNC_MARKER + record_type + record_size_words
-
-            # based on the obtained record size, read the rest of the record
-            remain_bytes = record_size_bytes - len(full_record)
-            remain_record = self._file_handle.read(remain_bytes)
-            # store the full record
-            full_record += remain_record
-
-            if len(remain_record) < remain_bytes:
-                # if we did not read as many bytes as were requested, we ran into the end of the file
-                msg = 'Incomplete record 0x%s' % binascii.hexlify(full_record)
-                log.warning(msg)
-                self._exception_callback(SampleException(msg))
-                end_of_file = True
-                continue
-
-            # compare checksums
-            if not vel3d_velpt_common.match_checksum(full_record):
-                # checksums did not match, do not process this record further
-                msg = 'Checksums do not match for record type 0x%s' % binascii.hexlify(record_type)
-                log.warn(msg)
-                self._exception_callback(SampleException(msg))
-                continue
+        data, start = vel3d_velpt_common.map_file(self._file_handle)
 
-            # process record based on the type
-            self.process_records(record_type, full_record)
+        try:
+            self.parse_records(data, start)
+        finally:
+            vel3d_velpt_common.unmap_file(data)
 
         if self.stored_velocity_records:
             # If stored velocity records are present here, we only got a partial set at the end of the file
@@ -500,39 +485,115 @@ class Vel3dCdDclParser(SimpleParser):
                 log.warn(msg)
                 self._exception_callback(SampleException(msg))
 
-    def find_record_start(self):
-        """
-        Find the start of the next record by looking for the sync marker
-        :return: True if the end of the file was found, False if it was not
-        """
-        end_of_file = False
-        read_buffer = ''
-
-        # read one byte at a time until the sync marker is found
-        one_byte = self._file_handle.read(1)
-        while one_byte != vel3d_velpt_common.SYNC_MARKER:
-            # store anything we find before the sync marker in the read buffer
-            read_buffer += one_byte
-            one_byte = self._file_handle.read(1)
-            if one_byte == '':
-                # no more bytes to read, break out of this loop
-                end_of_file = True
-                break
-
-        if len(read_buffer) > 1 and not DATE_TIME_MATCHER.match(read_buffer):
-            # we expect a version of the file to have ascii date time strings prior to each record, if this
-            # is something other than that call the exception
-            msg = 'Found unexpected data 0x%s' % binascii.hexlify(read_buffer)
-            log.warning(msg)
-            self._exception_callback(UnexpectedDataException(msg))
+    @staticmethod
+    def decode_records(data, table, record_type, dtype):
+        """
+        Decode all the valid records of one type in bulk
+        :param data: The file data the record table was built from
+        :param table: The record table
+        :param record_type: The record type to decode
+        :param dtype: The numpy dtype of the record, or of the start of the record
+        :return: tuple of the table indices of the decoded records and the decoded records
+        """
+        indices = numpy.flatnonzero((table['status'] == vel3d_velpt_common.RECORD_VALID) &
+                                    (table['id'] == ord(record_type)) &
+                                    (table['length'] >= dtype.itemsize))
+
+        return indices, vel3d_velpt_common.decode_records(data, table['offset'][indices], dtype)
+
+    def parse_records(self, data, start):
+        """
+        Build the record table for the file data and process the records
+        :param data: The file data
+        :param start: The offset in the data to start parsing from
+        """
+        table = vel3d_velpt_common.scan_records(data, RECORD_SIZE_DICT, start, accept_all_ids=True)
+        calculated_checksums = vel3d_velpt_common.verify_checksums(data, table)
+
+        velocity_indices, velocity_records = self.decode_records(data, table, VELOCITY_ID,
+                                                                 vel3d_velpt_common.VECTOR_VELOCITY_DTYPE)
+        velocity_dicts = Vel3dCdDclVelocityCommonParticle.generate_data_dicts(velocity_records)
+
+        # decoded system and data header records and their timestamps, by table index,
+        # and the table indices of those records whose date and time are not a valid time
+        timed_records = {}
+        bad_times = set()
+        for record_type, dtype, particle_class in (
+                (SYSTEM_ID, vel3d_velpt_common.VECTOR_SYSTEM_DTYPE, Vel3dCdDclSystemCommonParticle),
+                (HEADER_DATA_ID, vel3d_velpt_common.VECTOR_DATA_HEADER_DTYPE, Vel3dCdDclDataHeaderCommonParticle)):
+            indices, records = self.decode_records(data, table, record_type, dtype)
+            valid_time = vel3d_velpt_common.valid_bcd_times(records)
+            bad_times.update(indices[~valid_time].tolist())
+            indices, records = indices[valid_time], records[valid_time]
+            timed_records.update(zip(indices.tolist(),
+                                     zip(particle_class.generate_data_dicts(records),
+                                         vel3d_velpt_common.bcd_timestamps(records).tolist())))
+
+        is_velocity = numpy.zeros(len(table), dtype=bool)
+        is_velocity[velocity_indices] = True
+        run_boundaries = numpy.flatnonzero(is_velocity[1:] != is_velocity[:-1]) + 1
+
+        n_stored = 0
+        for segment in numpy.split(numpy.arange(len(table)), run_boundaries):
+
+            if len(segment) == 0:
+                continue
 
-        return end_of_file
+            if is_velocity[segment[0]]:
+                # velocity records are collected until the timestamp can be calculated
+                self.stored_velocity_records.extend(velocity_dicts[n_stored:n_stored + len(segment)])
+                n_stored += len(segment)
+                continue
 
-    def process_records(self, record_type, full_record):
+            for index in segment:
+                entry = table[index]
+                record = data[entry['offset']:entry['offset'] + entry['length']]
+                record_type = chr(entry['id'])
+
+                if entry['status'] == vel3d_velpt_common.RECORD_BAD_SYNC:
+                    if len(record) > 1 and not DATE_TIME_MATCHER.match(record):
+                        # we expect a version of the file to have ascii date time strings prior to each
+                        # record, if this is something other than that call the exception
+                        msg = 'Found unexpected data 0x%s' % binascii.hexlify(record)
+                        log.warning(msg)
+                        self._exception_callback(UnexpectedDataException(msg))
+
+                elif entry['status'] == vel3d_velpt_common.RECORD_TRUNCATED:
+                    # the end of the file was reached before the end of the record
+                    msg = 'Incomplete record 0x%s' % binascii.hexlify(record)
+                    log.warning(msg)
+                    self._exception_callback(SampleException(msg))
+                    return
+
+                elif entry['status'] == vel3d_velpt_common.RECORD_BAD_CHECKSUM:
+                    # checksums did not match, do not process this record further
+                    log.warning('Invalid checksum: %d, expected %d',
+                                struct.unpack('<H', record[-2:])[0], calculated_checksums[index])
+                    msg = 'Checksums do not match for record type 0x%s' % binascii.hexlify(record_type)
+                    log.warn(msg)
+                    self._exception_callback(SampleException(msg))
+
+                elif index in bad_times:
+                    msg = 'Invalid date and time in record 0x%s' % binascii.hexlify(record)
+                    log.warning(msg)
+                    self._exception_callback(SampleException(msg))
+
+                elif record_type in (SYSTEM_ID, HEADER_DATA_ID) and index not in timed_records:
+                    # the record size is too small to hold all the parameters
+                    msg = 'Incomplete record 0x%s' % binascii.hexlify(record)
+                    log.warning(msg)
+                    self._exception_callback(SampleException(msg))
+
+                else:
+                    # process record based on the type
+                    self.process_records(record_type, record, timed_records.get(index))
+
+    def process_records(self, record_type, full_record, timed_record=None):
         """
         based on the record type process the data, if the record type is not mentioned here it is ignored
         :param record_type: the record type associated with this record
         :param full_record: the full data string associated with this record
+        :param timed_record: tuple of the decoded data dictionary and timestamp of system and data header records
         """
         if record_type == vel3d_velpt_common.USER_CONFIGURATION_ID:
             self.process_user_config(full_record)
@@ -543,15 +604,11 @@ class Vel3dCdDclParser(SimpleParser):
         elif record_type == vel3d_velpt_common.HEAD_CONFIGURATION_ID:
             self.process_head_config(full_record)
 
-        elif record_type == VELOCITY_ID:
-            # append velocity record to buffer, these are collected until the timestamp can be calculated
-            self.stored_velocity_records.append(full_record)
-
         elif record_type == SYSTEM_ID:
-            self.process_system(full_record)
+            self.process_system(*timed_record)
 
         elif record_type == HEADER_DATA_ID:
-            self.process_header_data(full_record)
+            self.process_header_data(*timed_record)
 
     def process_user_config(self, full_record):
         """
@@ -593,12 +650,13 @@ class Vel3dCdDclParser(SimpleParser):
         else:
             self.stored_head_config = full_record
 
-    def process_system(self, full_record):
+    def process_system(self, data_dict, timestamp):
         """
         Extract a system record, and if there is a pair of system records with velocities in between determine
         the time offset between velocity timestamps and extract the velocity records.  Also if the first timestamp
         has not been set yet, set it
-        :param full_record: The raw data string to pass into the system particle
+        :param data_dict: The decoded parameters to pass into the system particle
+        :param timestamp: The timestamp of the system record
         """
 
         if self.previous_system_timestamp is not None and self.stored_velocity_records != []:
@@ -612,11 +670,8 @@ class Vel3dCdDclParser(SimpleParser):
 
             self.stored_n_velocity_records = n_vel_records
 
-        # get the timestamp associated with this system record
-        timestamp = vel3d_velpt_common.get_timestamp(full_record)
-
         # extract the system record
-        self.simple_extract(self.system_class, full_record, timestamp)
+        self.simple_extract(self.system_class, data_dict, timestamp)
 
         self.previous_system_timestamp = float(timestamp)
 
@@ -649,14 +704,12 @@ class Vel3dCdDclParser(SimpleParser):
             self.simple_extract(self.head_config_class, self.stored_head_config, self.first_timestamp)
             self.stored_head_config = None
 
-    def process_header_data(self, full_record):
+    def process_header_data(self, data_dict, timestamp):
         """
         Extract the header data particle, and set the first timestamp if it has not been set
-        :param full_record: The raw data string to pass into the header data particle
+        :param data_dict: The decoded parameters to pass into the header data particle
+        :param timestamp: The timestamp of the data header record
         """
-        # get the timestamp for this particle
-        timestamp = vel3d_velpt_common.get_timestamp(full_record)
-
         # check if the first timestamp has been set, if not set it
         if self.first_timestamp is None:
             self.first_timestamp = timestamp
@@ -664,7 +717,7 @@ class Vel3dCdDclParser(SimpleParser):
             self.extract_h_config()
 
         # extract the data header particle
-        self.simple_extract(self.data_header_class, full_record, timestamp)
+        self.simple_extract(self.data_header_class, data_dict, timestamp)
 
     def simple_extract(self, class_type, data, timestamp):
         """
@@ -23,6 +23,7 @@ Initial Release
 #
 
 import ntplib
+import numpy
 import re
 import struct
 
@@ -36,6 +37,7 @@ from mi.core.exceptions import \
     UnexpectedDataException
 
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser import vel3d_velpt_common
 
 log = get_logger()
 
@@ -308,111 +310,158 @@ class Vel3dKWfpParser(SimpleParser):
 
         return format_string
 
-    def parse_file(self):
-
-        # Read the Time record which is at the very end of the file.
-        # Check for end of file.
-        # If not reached, parse the Time record.
-        # 2 = from end of file
-
-        payload_format = self.build_payload_format()
-
-        self._stream_handle.seek(0 - TIME_RECORD_SIZE, 2)
-        time_record = self._stream_handle.read(TIME_RECORD_SIZE)
+    def _frame_records(self, data):
+        """
+        Walk the data headers of the file, from the end of the file header to the
+        time record, building a list of (header offset, header id, data size)
+        entries.  Framing stops at the first invalid header or at the end of the data.
+        :param data: The file data
+        :return: a tuple of the entry list and the offset framing stopped at
+        """
+        entries = []
+        data_end = len(data)
+        position = FILE_HEADER_RECORD_SIZE
 
-        if len(time_record) != TIME_RECORD_SIZE:
-            self.report_error(SampleException, 'EOF reading time record')
-            # if there was less than 8 bytes exit
-            return
+        while data_end - position >= DATA_HEADER_SIZE:
+            header_match = DATA_HEADER_MATCHER.match(data, position)
+            if not header_match:
+                break
 
-        times = struct.unpack(TIME_FORMAT, time_record)
+            data_size = struct.unpack('<H', header_match.group('data_size'))[0]
+            entries.append((position, ord(header_match.group('header_id')), data_size))
+            position = min(position + DATA_HEADER_SIZE + data_size, data_end)
 
-        # go back to beginning of file, skip the file header
-        self._stream_handle.seek(FILE_HEADER_RECORD_SIZE, 0)
+        return entries, position
 
-        record_count = 0
+    def parse_file(self):
 
-        while True:
+        # The whole file is mapped, data header offsets are absolute
+        self._stream_handle.seek(0)
+        data, _ = vel3d_velpt_common.map_file(self._stream_handle)
 
-            header = self._stream_handle.read(DATA_HEADER_SIZE)
+        try:
+            self._parse_data(data)
+        finally:
+            vel3d_velpt_common.unmap_file(data)
 
-            if len(header) != DATA_HEADER_SIZE:
-                # must have hit the time record or EOF
-                if len(header) == TIME_RECORD_SIZE:
-                    record_time = times[INDEX_TIME_ON]
-                    ntp_time = ntplib.system_to_ntp_time(record_time)
+    def _parse_data(self, data):
+        """
+        Parse the data records of the file.  The data headers are framed first, then
+        the header and payload checksums are verified and the instrument payloads
+        decoded in bulk before generating the particles in file order.
+        :param data: The file data
+        """
+        if len(data) < TIME_RECORD_SIZE:
+            self.report_error(SampleException, 'EOF reading time record')
+            # if there was less than 8 bytes exit
+            return
 
-                    particle = self._extract_sample(Vel3dKWfpMetadataParticle, None, times, ntp_time)
-                    self._record_buffer.append(particle)
-                    break
+        # The Time record is at the very end of the file
+        times = struct.unpack(TIME_FORMAT, data[-TIME_RECORD_SIZE:])
 
-                else:
-                    # must have hit EOF
-                    # all timestamps are suspect
-                    self.report_error(UnexpectedDataException,
-                                      'Unexpectedly hit EOF, when expecting time record '
-                                      'All particle timestamps from this file are suspect')
-                    break
-
-            header_match = DATA_HEADER_MATCHER.match(header)
-            if header_match:  # validate the header checksum before going further
-                expected_checksum = struct.unpack('<H', header_match.group('header_checksum'))[0]
-
-                actual_checksum = self.calculate_checksum(header,
-                                                          DATA_HEADER_CHECKSUM_LENGTH)
-
-                if actual_checksum != expected_checksum:
-                    self.report_error(SampleException,
-                                      'Invalid Data Header checksum. '
-                                      'Actual 0x%04X. Expected 0x%04X.' %
-                                      (actual_checksum, expected_checksum))
-                    # if the checksum fails need to stop processing data
-                    break
-
-                # header checks out, read body of data record
-                data_size = struct.unpack('<H', header_match.group('data_size'))[0]
-                expected_checksum = struct.unpack('<H', header_match.group('data_checksum'))[0]
-
-                payload = self._stream_handle.read(data_size)
+        entries, end_position = self._frame_records(data)
 
-                actual_checksum = self.calculate_checksum(payload, data_size/2)
+        header_offsets = numpy.array([entry[0] for entry in entries], dtype=numpy.int64)
+        header_ids = [entry[1] for entry in entries]
+        data_sizes = numpy.array([entry[2] for entry in entries], dtype=numpy.int64)
+        payload_offsets = header_offsets + DATA_HEADER_SIZE
 
-                if actual_checksum != expected_checksum:
-                    self.report_error(RecoverableSampleException,
-                                      'Invalid Data Header checksum. '
-                                      'Actual 0x%04X. Expected 0x%04X.' %
-                                      (actual_checksum, expected_checksum))
-                    # if the header was good but data is bad, try the next header record
-                    continue
+        header_checksums = vel3d_velpt_common.calculate_checksums(
+            data, header_offsets,
+            numpy.full(len(entries), DATA_HEADER_CHECKSUM_LENGTH * 2, dtype=numpy.int64))
+        expected_header_checksums = vel3d_velpt_common.read_words(data, header_offsets + 8)
 
-                # payload checks out process the data
-                header_id = struct.unpack('<B', header_match.group('header_id'))[0]
+        # a payload cut short by the end of the file is summed below as before
+        complete = payload_offsets + data_sizes <= len(data)
+        payload_checksums = vel3d_velpt_common.calculate_checksums(
+            data, payload_offsets[complete], (data_sizes[complete] / 2) * 2)
+        expected_payload_checksums = vel3d_velpt_common.read_words(data, header_offsets + 6)
 
-                record_time = times[INDEX_TIME_ON] + record_count * SAMPLE_RATE
-                ntp_time = ntplib.system_to_ntp_time(record_time)
+        payload_format = self.build_payload_format()
+        payload_size = struct.calcsize(payload_format)
+
+        # decode the instrument payloads which have the expected size in one pass
+        is_instrument = numpy.array([header_id in (DATA_HEADER_ID_BURST_DATA, DATA_HEADER_ID_CP_DATA)
+                                     for header_id in header_ids], dtype=bool)
+        is_decoded = is_instrument & complete & (data_sizes == payload_size)
+        instrument_fields = vel3d_velpt_common.decode_records(
+            data, payload_offsets[is_decoded],
+            vel3d_velpt_common.struct_dtype(payload_format)).tolist()
+        decoded_index = numpy.cumsum(is_decoded) - 1
+        complete_index = numpy.cumsum(complete) - 1
 
-                if header_id == DATA_HEADER_ID_BURST_DATA or header_id == DATA_HEADER_ID_CP_DATA:
-                    data_fields = struct.unpack(payload_format, payload)
-                    particle_fields = data_fields + (header_id,)
-                    particle_type = Vel3dKWfpInstrumentParticle
-                    record_count += 1
+        record_count = 0
 
-                else:
-                    string_format = '<B%ds' % (data_size - 2)
-                    # ignore the terminating 0 from the string record
-                    particle_fields = struct.unpack_from(string_format, payload)
-                    particle_type = Vel3dKWfpStringParticle
+        for index, header_id in enumerate(header_ids):
 
-                particle = self._extract_sample(particle_type, None, particle_fields, ntp_time)
-                self._record_buffer.append(particle)
+            actual_checksum = header_checksums[index]
+            expected_checksum = expected_header_checksums[index]
 
-            else:  # invalid header
+            if actual_checksum != expected_checksum:
                 self.report_error(SampleException,
-                                  'Invalid Data Header encountered')
+                                  'Invalid Data Header checksum. '
+                                  'Actual 0x%04X. Expected 0x%04X.' %
+                                  (actual_checksum, expected_checksum))
                 # if the checksum fails need to stop processing data
-                break
+                return
 
-        # end of while
+            data_size = data_sizes[index]
+            payload_start = payload_offsets[index]
+            payload = data[payload_start:payload_start + data_size]
 
-        return
+            if complete[index]:
+                actual_checksum = payload_checksums[complete_index[index]]
+            else:
+                actual_checksum = self.calculate_checksum(payload, data_size/2)
+            expected_checksum = expected_payload_checksums[index]
+
+            if actual_checksum != expected_checksum:
+                self.report_error(RecoverableSampleException,
+                                  'Invalid Data Header checksum. '
+                                  'Actual 0x%04X. Expected 0x%04X.' %
+                                  (actual_checksum, expected_checksum))
+                # if the header was good but data is bad, try the next header record
+                continue
+
+            # payload checks out process the data
+            record_time = times[INDEX_TIME_ON] + record_count * SAMPLE_RATE
+            ntp_time = ntplib.system_to_ntp_time(record_time)
+
+            if is_instrument[index]:
+                if is_decoded[index]:
+                    data_fields = tuple(instrument_fields[decoded_index[index]])
+                else:
+                    data_fields = struct.unpack(payload_format, payload)
+                particle_fields = data_fields + (header_id,)
+                particle_type = Vel3dKWfpInstrumentParticle
+                record_count += 1
 
+            else:
+                string_format = '<B%ds' % (data_size - 2)
+                # ignore the terminating 0 from the string record
+                particle_fields = struct.unpack_from(string_format, payload)
+                particle_type = Vel3dKWfpStringParticle
+
+            particle = self._extract_sample(particle_type, None, particle_fields, ntp_time)
+            self._record_buffer.append(particle)
+
+        remaining = len(data) - end_position
+
+        if remaining >= DATA_HEADER_SIZE:
+            self.report_error(SampleException,
+                              'Invalid Data Header encountered')
+
+        elif remaining == TIME_RECORD_SIZE:
+            # must have hit the time record
+            record_time = times[INDEX_TIME_ON]
+            ntp_time = ntplib.system_to_ntp_time(record_time)
+
+            particle = self._extract_sample(Vel3dKWfpMetadataParticle, None, times, ntp_time)
+            self._record_buffer.append(particle)
+
+        else:
+            # must have hit EOF
+            # all timestamps are suspect
+            self.report_error(UnexpectedDataException,
+                              'Unexpectedly hit EOF, when expecting time record '
+                              'All particle timestamps from this file are suspect')
@@ -1,7 +1,10 @@
 
+import re
 import struct
+import mmap
 import ntplib
 import calendar
+import numpy
 from mi.core.log import get_logger
 log = get_logger()
 
@@ -15,6 +18,450 @@ HEAD_CONFIGURATION_ID = b'\x04'
 USER_CONFIGURATION_ID = b'\x00'
 
 
+# Nortek checksums start from this base value, given in the IDD as 0xB58C
+CHECKSUM_BASE = 46476
+
+# Status values stored in the record table built by scan_records
+RECORD_VALID = 0
+RECORD_BAD_SYNC = 1
+RECORD_BAD_ID = 2
+RECORD_BAD_CHECKSUM = 3
+RECORD_TRUNCATED = 4
+
+# One row per framed record (or per run of skipped bytes) in a Nortek file
+RECORD_TABLE_DTYPE = numpy.dtype([
+    ('offset', numpy.int64),
+    ('id', numpy.uint8),
+    ('length', numpy.int64),
+    ('status', numpy.int8)
+])
+
+# Layout of the Aquadopp velocity (0x01) and diagnostics data (0x80) records
+AQUADOPP_VELOCITY_DTYPE = numpy.dtype([
+    ('sync', 'u1'),
+    ('id', 'u1'),
+    ('record_size', '<u2'),
+    ('minute', 'u1'),
+    ('second', 'u1'),
+    ('day', 'u1'),
+    ('hour', 'u1'),
+    ('year', 'u1'),
+    ('month', 'u1'),
+    ('error_code', '<u2'),
+    ('analog1', '<u2'),
+    ('battery_voltage', '<u2'),
+    ('sound_speed_analog2', '<u2'),
+    ('heading', '<i2'),
+    ('pitch', '<i2'),
+    ('roll', '<i2'),
+    ('pressure_msb', 'u1'),
+    ('status', 'u1'),
+    ('pressure_lsw', '<u2'),
+    ('temperature', '<i2'),
+    ('velocity_beam1', '<i2'),
+    ('velocity_beam2', '<i2'),
+    ('velocity_beam3', '<i2'),
+    ('amplitude_beam1', 'u1'),
+    ('amplitude_beam2', 'u1'),
+    ('amplitude_beam3', 'u1'),
+    ('fill', 'u1'),
+    ('checksum', '<u2')
+])
+
+# Layout of the Vector velocity data (0x10) records
+VECTOR_VELOCITY_DTYPE = numpy.dtype([
+    ('sync', 'u1'),
+    ('id', 'u1'),
+    ('analog_input_2_lsb', 'u1'),
+    ('ensemble_counter', 'u1'),
+    ('pressure_msb', 'u1'),
+    ('analog_input_2_msb', 'u1'),
+    ('pressure_lsw', '<u2'),
+    ('analog_input_1', '<u2'),
+    ('turbulent_velocity_east', '<i2'),
+    ('turbulent_velocity_north', '<i2'),
+    ('turbulent_velocity_vertical', '<i2'),
+    ('amplitude_beam_1', 'u1'),
+    ('amplitude_beam_2', 'u1'),
+    ('amplitude_beam_3', 'u1'),
+    ('correlation_beam_1', 'u1'),
+    ('correlation_beam_2', 'u1'),
+    ('correlation_beam_3', 'u1'),
+    ('checksum', '<u2')
+])
+
+# Layout of the start of the Vector system data (0x11) records, up to the checksum
+VECTOR_SYSTEM_DTYPE = numpy.dtype([
+    ('sync', 'u1'),
+    ('id', 'u1'),
+    ('record_size', '<u2'),
+    ('minute', 'u1'),
+    ('second', 'u1'),
+    ('day', 'u1'),
+    ('hour', 'u1'),
+    ('year', 'u1'),
+    ('month', 'u1'),
+    ('battery_voltage_dV', '<u2'),
+    ('sound_speed_dms', '<u2'),
+    ('heading_decidegree', '<i2'),
+    ('pitch_decidegree', '<i2'),
+    ('roll_decidegree', '<i2'),
+    ('temperature_centidegree', '<i2'),
+    ('error_code', 'u1'),
+    ('status_code', 'u1'),
+    ('analog_input', '<u2')
+])
+
+# Layout of the start of the Vector velocity data header (0x12) records
+VECTOR_DATA_HEADER_DTYPE = numpy.dtype([
+    ('sync', 'u1'),
+    ('id', 'u1'),
+    ('record_size', '<u2'),
+    ('minute', 'u1'),
+    ('second', 'u1'),
+    ('day', 'u1'),
+    ('hour', 'u1'),
+    ('year', 'u1'),
+    ('month', 'u1'),
+    ('number_velocity_records', '<u2'),
+    ('noise_amp_beam1', 'u1'),
+    ('noise_amp_beam2', 'u1'),
+    ('noise_amp_beam3', 'u1'),
+    ('spare', 'u1'),
+    ('noise_correlation_beam1', 'u1'),
+    ('noise_correlation_beam2', 'u1'),
+    ('noise_correlation_beam3', 'u1')
+])
+
+# numpy equivalents of the struct format characters, without byte order
+STRUCT_NUMPY_CODES = {
+    'b': 'i1', 'B': 'u1',
+    'h': 'i2', 'H': 'u2',
+    'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+    'q': 'i8', 'Q': 'u8',
+    'f': 'f4', 'd': 'f8'
+}
+
+# Number of records gathered at once when verifying checksums or decoding,
+# bounds the size of the temporary 2-D byte arrays
+GATHER_BLOCK_SIZE = 65536
+
+# NTP time of the unix epoch
+NTP_UNIX_EPOCH_DELTA = float(ntplib.system_to_ntp_time(0))
+
+
+def map_file(file_handle):
+    """
+    Memory map an open file so it can be scanned without copying it.  Handles which
+    are not backed by a file on disk (or empty files) are read into memory instead.
+    :param file_handle: The file handle, positioned at the start of the data
+    :return: a tuple of the mapped (or read) data and the offset to start parsing from
+    """
+    try:
+        start = file_handle.tell()
+        data = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, IOError, ValueError, EnvironmentError, mmap.error):
+        return file_handle.read(), 0
+
+    return data, start
+
+
+def unmap_file(data):
+    """
+    Release data returned by map_file
+    :param data: The mapped or read data
+    """
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+def scan_records(data, record_sizes, start=0, accept_all_ids=False):
+    """
+    Frame the Nortek records in a buffer in one pass, building a table of record
+    offsets, ids, lengths and status.  Checksums are not verified here, see
+    verify_checksums.  Runs of bytes that are not a sync byte are stored as a single
+    RECORD_BAD_SYNC entry whose length is the number of bytes skipped, a bad id
+    consumes the sync and id bytes, and scanning stops at a truncated record.
+    :param data: The buffer to scan (a string or memory map)
+    :param record_sizes: dictionary of valid id bytes mapped to the fixed size of
+        the record in bytes, or None if the size is stored in the record
+    :param start: The offset in the buffer to start scanning from
+    :param accept_all_ids: If True, ids missing from record_sizes are not bad ids,
+        their size is read from the record
+    :return: the record table, a numpy array of RECORD_TABLE_DTYPE
+    """
+    table = []
+    data_length = len(data)
+    position = start
+
+    while position < data_length:
+
+        next_sync = data.find(SYNC_MARKER, position)
+
+        if next_sync != position:
+            if next_sync == -1:
+                next_sync = data_length
+            table.append((position, 0, next_sync - position, RECORD_BAD_SYNC))
+            position = next_sync
+            continue
+
+        id_byte = data[position + 1:position + 2]
+
+        if id_byte == '':
+            table.append((position, 0, data_length - position, RECORD_TRUNCATED))
+            break
+
+        if id_byte not in record_sizes and not accept_all_ids:
+            table.append((position, ord(id_byte), 2, RECORD_BAD_ID))
+            position += 2
+            continue
+
+        record_length = record_sizes.get(id_byte)
+
+        if record_length is None:
+            if position + 4 > data_length:
+                table.append((position, ord(id_byte), data_length - position, RECORD_TRUNCATED))
+                break
+            # the record size is stored in words
+            record_length = struct.unpack_from('<H', data, position + 2)[0] * 2
+
+        if position + record_length > data_length:
+            table.append((position, ord(id_byte), data_length - position, RECORD_TRUNCATED))
+            break
+
+        if record_length < 4:
+            # too short to hold a checksum, skip over the record header
+            table.append((position, ord(id_byte), 4, RECORD_BAD_CHECKSUM))
+            position += 4
+            continue
+
+        table.append((position, ord(id_byte), record_length, RECORD_VALID))
+        position += record_length
+
+    return numpy.array(table, dtype=RECORD_TABLE_DTYPE)
+
+
+def gather_records(data, offsets, length):
+    """
+    Copy equal length records out of a buffer into a 2-D array of bytes
+    :param data: The buffer holding the records
+    :param offsets: numpy array of record start offsets
+    :param length: The length of each record in bytes
+    :return: numpy uint8 array of shape (len(offsets), length)
+    """
+    data_bytes = numpy.frombuffer(data, dtype=numpy.uint8)
+    return data_bytes[offsets[:, numpy.newaxis] + numpy.arange(length)]
+
+
+def calculate_checksums(data, offsets, lengths):
+    """
+    Calculate the Nortek checksum, the sum of the 16 bit words plus the
+    checksum base value, of many regions of a buffer.  Regions of the same
+    length are summed in bulk.
+    :param data: The buffer holding the regions
+    :param offsets: numpy array of region start offsets
+    :param lengths: numpy array of region lengths in bytes, must be even
+    :return: numpy array of the calculated 16 bit checksums
+    """
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    lengths = numpy.asarray(lengths, dtype=numpy.int64)
+    checksums = numpy.empty(len(offsets), dtype=numpy.uint32)
+
+    for length in numpy.unique(lengths):
+        indices = numpy.flatnonzero(lengths == length)
+
+        for block_start in xrange(0, len(indices), GATHER_BLOCK_SIZE):
+            block = indices[block_start:block_start + GATHER_BLOCK_SIZE]
+            words = gather_records(data, offsets[block], length).view('<u2')
+
+            # Modulo 65536 is applied to the checksum to keep it a 16 bit value
+            checksums[block] = (words.sum(axis=1, dtype=numpy.uint32) + CHECKSUM_BASE) % 65536
+
+    return checksums
+
+
+def verify_checksums(data, table):
+    """
+    Verify the checksums of all valid records in a record table, the checksum
+    being the last word of each record.  The status of records failing the
+    check is changed to RECORD_BAD_CHECKSUM in place.
+    :param data: The buffer the table was built from
+    :param table: The record table from scan_records
+    :return: numpy array of the calculated checksums (0 for unchecked entries)
+    """
+    calculated = numpy.zeros(len(table), dtype=numpy.uint32)
+    indices = numpy.flatnonzero(table['status'] == RECORD_VALID)
+
+    offsets = table['offset'][indices]
+    lengths = table['length'][indices]
+
+    calculated[indices] = calculate_checksums(data, offsets, lengths - 2)
+    stored = read_words(data, offsets + lengths - 2)
+
+    table['status'][indices[calculated[indices] != stored]] = RECORD_BAD_CHECKSUM
+
+    return calculated
+
+
+def read_words(data, offsets):
+    """
+    Read the little endian unsigned 16 bit word at each offset of a buffer
+    :param data: The buffer
+    :param offsets: numpy array of offsets
+    :return: numpy array of the words
+    """
+    return gather_records(data, offsets, 2).view('<u2')[:, 0]
+
+
+def struct_dtype(format_string, names=None):
+    """
+    Build a numpy dtype from a little or big endian struct format string, with one
+    field for each value struct.unpack would return, so records decoded with it
+    convert to the same tuples with tolist().  Only numeric format characters and
+    pad bytes are supported.
+    :param format_string: struct format string, starting with '<' or '>'
+    :param names: optional list of field names, defaults to f0, f1, ...
+    :return: the numpy dtype
+    """
+    byte_order = format_string[0]
+    if byte_order not in '<>':
+        raise ValueError('struct_dtype format %s must start with < or >' % format_string)
+
+    formats = []
+    offsets = []
+    offset = 0
+    for count, code in re.findall(r'(\d*)([xbBhHiIlLqQfd])', format_string):
+        count = int(count) if count else 1
+        size = struct.calcsize(byte_order + code)
+
+        if code != 'x':
+            for _ in xrange(count):
+                formats.append(byte_order + STRUCT_NUMPY_CODES[code])
+                offsets.append(offset)
+                offset += size
+        else:
+            offset += count
+
+    if offset != struct.calcsize(format_string):
+        raise ValueError('struct_dtype does not support all of format %s' % format_string)
+
+    if names is None:
+        names = ['f%d' % index for index in xrange(len(formats))]
+
+    return numpy.dtype({'names': list(names), 'formats': formats, 'offsets': offsets, 'itemsize': offset})
+
+
+def decode_records(data, offsets, dtype):
+    """
+    Decode records in bulk into a numpy structured array.  The dtype may only
+    describe the beginning of the records, only that many bytes are decoded.
+    :param data: The buffer holding the records
+    :param offsets: numpy array of record start offsets
+    :param dtype: numpy structured dtype describing the records
+    :return: numpy structured array
+    """
+    offsets = numpy.asarray(offsets, dtype=numpy.int64)
+    records = numpy.empty(len(offsets), dtype=dtype)
+
+    for block_start in xrange(0, len(offsets), GATHER_BLOCK_SIZE):
+        block = offsets[block_start:block_start + GATHER_BLOCK_SIZE]
+        records[block_start:block_start + len(block)] = \
+            gather_records(data, block, dtype.itemsize).view(dtype)[:, 0]
+
+    return records
+
+
+def bcd_to_decimal(bcd_bytes):
+    """
+    Vectorized conversion of Binary Coded Decimal bytes to decimal values
+    :param bcd_bytes: numpy array of BCD bytes
+    :return: numpy array of decimal values
+    """
+    bcd_bytes = bcd_bytes.astype(numpy.int64)
+    return (bcd_bytes >> 4) * 10 + (bcd_bytes & 0x0F)
+
+
+def valid_bcd_times(records):
+    """
+    Check the BCD date and time fields of decoded records, which are only
+    converted correctly when every digit is 0-9 and the date and time exist
+    :param records: numpy structured array with BCD date and time fields
+    :return: numpy bool array, True for the records with a valid date and time
+    """
+    valid = numpy.ones(len(records), dtype=bool)
+    for field in ('year', 'month', 'day', 'hour', 'minute', 'second'):
+        valid &= ((records[field] >> 4) <= 9) & ((records[field] & 0x0F) <= 9)
+
+    month = bcd_to_decimal(records['month'])
+    day = bcd_to_decimal(records['day'])
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & \
+        (bcd_to_decimal(records['hour']) < 24) & \
+        (bcd_to_decimal(records['minute']) < 60) & \
+        (bcd_to_decimal(records['second']) < 60)
+
+    # the last day of the month, for the months that are valid
+    months = numpy.array(bcd_to_decimal(records['year']) + 30, dtype='datetime64[Y]').astype('datetime64[M]') + \
+        numpy.clip(month - 1, 0, 11)
+    days_in_month = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(numpy.int64)
+
+    return valid & (day <= days_in_month)
+
+
+def bcd_timestamps(records):
+    """
+    Convert the minute, second, day, hour, year and month BCD fields of decoded
+    records to NTP timestamps.  Records that fail valid_bcd_times get a meaningless
+    timestamp, and must be rejected by the caller.
+    :param records: numpy structured array with BCD date and time fields
+    :return: numpy float64 array of NTP timestamps
+    """
+    year = bcd_to_decimal(records['year'])
+    month = bcd_to_decimal(records['month'])
+    day = bcd_to_decimal(records['day'])
+
+    # year is stored without the century, so offset from 2000
+    dates = (numpy.array(year + 30, dtype='datetime64[Y]').astype('datetime64[M]') + (month - 1)).\
+        astype('datetime64[D]') + (day - 1)
+
+    elapsed_seconds = dates.astype(numpy.int64) * 86400 + \
+        bcd_to_decimal(records['hour']) * 3600 + \
+        bcd_to_decimal(records['minute']) * 60 + \
+        bcd_to_decimal(records['second'])
+
+    return elapsed_seconds + NTP_UNIX_EPOCH_DELTA
+
+
+def bcd_date_time_strings(records):
+    """
+    Convert the BCD date and time fields of decoded records to the standard
+    YYYY/MM/DD HH:MM:SS string, one character per BCD digit
+    :param records: numpy structured array with BCD date and time fields
+    :return: list of date time strings
+    """
+    chars = numpy.empty((len(records), 19), dtype=numpy.uint8)
+    chars[:, :2] = [ord('2'), ord('0')]
+    chars[:, [4, 7]] = ord('/')
+    chars[:, 10] = ord(' ')
+    chars[:, [13, 16]] = ord(':')
+
+    for field, position in (('year', 2), ('month', 5), ('day', 8),
+                            ('hour', 11), ('minute', 14), ('second', 17)):
+        chars[:, position] = (records[field] >> 4) + 48
+        chars[:, position + 1] = (records[field] & 0x0F) + 48
+
+    return chars.view('S19')[:, 0].tolist()
+
+
+def decode_aquadopp_velocity_records(data, offsets):
+    """
+    Decode Aquadopp velocity or diagnostics data records in bulk
+    :param data: The buffer holding the records
+    :param offsets: numpy array of record start offsets
+    :return: numpy structured array of AQUADOPP_VELOCITY_DTYPE
+    """
+    return decode_records(data, offsets, AQUADOPP_VELOCITY_DTYPE)
+
+
 def _convert_bcd_to_decimal(in_val):
     """
     Converts Binary Coded Decimal to a decimal value
@@ -13,11 +13,13 @@ __author__ = 'Chris Goodrich'
 __license__ = 'Apache 2.0'
 
 import struct
+import numpy
 
 from mi.core.exceptions import RecoverableSampleException
 from mi.core.log import get_logger
 log = get_logger()
-from mi.dataset.parser.velpt_ab_particles import VelptAbDataParticle
+from mi.dataset.parser.velpt_ab_particles import VelptAbDataParticle, VelptAbDataParticleKey
+from mi.dataset.parser import vel3d_velpt_common
 from mi.dataset.dataset_parser import SimpleParser
 from mi.dataset.dataset_parser import DataSetDriverConfigKeys
 from mi.core.common import BaseEnum
@@ -120,6 +122,10 @@ B1F7    -> Checksum             F7B1
 """
 
 
+# the format name of the time index of velpt_ab files, see mi.dataset.time_index
+TIME_INDEX_FORMAT = 'velpt'
+
+
 class VelptAbParticleClassKey (BaseEnum):
     """
     An enum for the keys application to the pco2w abc particle classes
@@ -146,6 +152,16 @@ class VelptAbParser(SimpleParser):
     HEAD_CONFIGURATION_ID = b'\x04'
     USER_CONFIGURATION_ID = b'\x00'
 
+    # The record types handled by this parser, all of which store their size
+    RECORD_SIZES = {
+        VELOCITY_DATA_ID: None,
+        DIAGNOSTIC_HEADER_ID: None,
+        DIAGNOSTIC_DATA_ID: None,
+        HARDWARE_CONFIGURATION_ID: None,
+        HEAD_CONFIGURATION_ID: None,
+        USER_CONFIGURATION_ID: None
+    }
+
     # This is used if the Diagnostics Header record is
     # bad or not present. The number of diagnostics records
     # expected is defaulted to 20 as that number seems common
@@ -162,34 +178,19 @@ class VelptAbParser(SimpleParser):
                  exception_callback):
 
         self._record_buffer = []
-        self._calculated_checksum = 0
-        self._current_record = ''
-        self._velocity_data = False
-        self._diagnostic_header = False
         self._diagnostic_header_published = False
-        self._diagnostic_data = False
-        self._build_hardware_config_data = False
-        self._build_head_config_data = False
-        self._build_user_config_data = False
-        self._end_of_file = False
         self._sending_diagnostics = False
-        self._build_hardware_config_data = False
         self._config_metadata_built = False
         self._hardware_config_dict_generated = False
         self._head_config_dict_generated = False
         self._user_config_dict_generated = False
         self._bad_diagnostic_header = False
-        self._build_config_metadata = False
         self._first_diagnostics_record = False
         self._diagnostics_count = 0
         self._total_diagnostic_records = 0
-        self._velocity_data_dict = {}
-        self._diagnostics_header_dict = {}
-        self._diagnostics_data_dict = {}
         self._hardware_config_dict = VelptAbDataParticle.generate_empty_hardware_config_dict()
         self._head_config_dict = VelptAbDataParticle.generate_empty_head_config_dict()
         self._user_config_dict = VelptAbDataParticle.generate_empty_user_config_dict()
-        self._instrument_metadata_dict = {}
         self._diagnostics_header_record = ''
         self._file_handle = file_handle
 
@@ -223,155 +224,57 @@ class VelptAbParser(SimpleParser):
 
         super(VelptAbParser, self).__init__(config, file_handle, exception_callback)
 
-    def good_record_type(self, id_byte):
+    def _report_invalid_bytes(self, data, entry):
         """
-        Determine the record type and let the caller now if
-        a good record type was found or not.
-        :param id_byte: The ID byte from the record
-        :return: boolean indicating success or failure
+        Report the problem with a record table entry which does not hold a
+        complete record.
+        :param data: The file data the record table was built from
+        :param entry: The record table entry
         """
-        status = True
-        self._velocity_data = False
-        self._diagnostic_header = False
-        self._diagnostic_data = False
-        self._build_hardware_config_data = False
-        self._build_head_config_data = False
-        self._build_user_config_data = False
-
-        # Determine the type of processing based on the ID byte
-        if id_byte == self.VELOCITY_DATA_ID:
-            self._velocity_data = True
-        elif id_byte == self.DIAGNOSTIC_HEADER_ID:
-            self._diagnostic_header = True
-            self._diagnostic_header_published = False
-            self._bad_diagnostic_header = False
-        elif id_byte == self.DIAGNOSTIC_DATA_ID:
-            self._diagnostic_data = True
-        elif id_byte == self.HARDWARE_CONFIGURATION_ID:
-            self._build_hardware_config_data = True
-        elif id_byte == self.HEAD_CONFIGURATION_ID:
-            self._build_head_config_data = True
-        elif id_byte == self.USER_CONFIGURATION_ID:
-            self._build_user_config_data = True
-        else:
-            status = False
-
-        return status
-
-    def _bad_checksum(self, record, length, checksum):
-        """
-        Calculate the record checksum and compare it to
-        the checksum stored in the record. A bad checksum
-        will cause the record to be ignored. A warning
-        will be issued. Parsing continues.
-        :param record: the read-in record
-        :record_checksum: the checksum from the record
-        :return: boolean
-        """
-        # 46476 is the base value of the checksum given in the IDD as 0xB58C
-        self._calculated_checksum = 46476
-
-        for x in range(0, length-3, 2):
-            self._calculated_checksum += struct.unpack('<H', record[x:x+2])[0]
+        if entry['status'] == vel3d_velpt_common.RECORD_BAD_SYNC:
+            # each skipped byte is reported, as when reading a byte at a time
+            for offset in xrange(entry['offset'], entry['offset'] + entry['length']):
+                log.warning('Found invalid sync byte: %d at %d , skipping to next byte',
+                            struct.unpack_from('B', data, offset)[0], offset)
+                self._exception_callback(
+                    RecoverableSampleException('Found Invalid Sync Byte, skipping to next byte'))
 
-        # Modulo 65536 is applied to the checksum to keep it a 16 bit value
-        self._calculated_checksum %= 65536
+        elif entry['status'] == vel3d_velpt_common.RECORD_BAD_ID:
+            log.warning('Found invalid ID byte: %d, at %d skipping to next byte',
+                        entry['id'], entry['offset'] + 1)
+            self._exception_callback(
+                RecoverableSampleException('Found Invalid ID Byte, skipping to next byte'))
 
-        if self._calculated_checksum != checksum:
-            return True
-        else:
-            return False
+        elif entry['status'] == vel3d_velpt_common.RECORD_TRUNCATED:
+            log.warning('Last record in file was malformed')
+            self._exception_callback(
+                RecoverableSampleException('Last record in file malformed, no particle generated'))
 
-    def load_record(self, fh):
+    def _report_bad_checksum(self, id_byte, stored_checksum, calculated_checksum):
         """
-        Attempt to load a data record.
-        :param fh: The file handle
-        :return: boolean indicating success or failure
+        A bad checksum will cause the record to be ignored. A warning
+        will be issued. Parsing continues.
+        :param id_byte: The ID byte from the record
+        :param stored_checksum: The checksum stored in the record
+        :param calculated_checksum: The checksum calculated from the record
         """
-        record_start = 0
-
-        # Assume the operation will be successful
-        status = True
-
-        # Read the Sync byte
-        sync_byte = fh.read(1)
-
-        # If the first byte is a valid sync byte
-        # determine the record type and the record length.
-        if sync_byte == self.SYNC_MARKER:
-
-            # Need to capture the record start address for reading the entire record later
-            record_start = fh.tell() - 1
-
-            # Get the ID byte and see if it's a valid record
-            id_byte = fh.read(1)
-
-            if not self.good_record_type(id_byte):
-                status = False
-                log.warning('Found invalid ID byte: %d, at %d skipping to next byte',
-                            struct.unpack('B', id_byte)[0], fh.tell()-1)
-                self._exception_callback(
-                    RecoverableSampleException('Found Invalid ID Byte, skipping to next byte'))
-
-        elif sync_byte == '':  # Found the end of the file
-            self._end_of_file = True
-            status = False
-        else:
-            status = False
-            log.warning('Found invalid sync byte: %d at %d , skipping to next byte',
-                        struct.unpack('B', sync_byte)[0], fh.tell()-1)
+        # Did the checksum fail on a diagnostic header record?
+        if id_byte == self.DIAGNOSTIC_HEADER_ID:
+            self._total_diagnostic_records = self.DEFAULT_DIAGNOSTICS_COUNT  # Use the default diag count
+            self._bad_diagnostic_header = True
+            self._sending_diagnostics = True  # The header is bad, the records may be okay
+            log.warning('Diagnostic Header Invalid')
             self._exception_callback(
-                RecoverableSampleException('Found Invalid Sync Byte, skipping to next byte'))
-
-        # If the record is valid, read it
-        if status:
-            record_length = struct.unpack('<H', fh.read(2))[0]*2
-            fh.seek(record_start, 0)
-            self._current_record = fh.read(record_length)
-
-            # If the length of what was read matches what we asked for,
-            # update the next record start position. Otherwise we found
-            # a malformed record at the end of the file. 
-            if len(self._current_record) == record_length:
-
-                # Check that the checksum of this record is good
-                stored_checksum = struct.unpack('<H', self._current_record[(record_length-2):record_length])[0]
-
-                if self._bad_checksum(self._current_record, record_length, stored_checksum):
-
-                    # Did the checksum fail on a config record?
-                    # If so, don't try to generate that part of
-                    # the instrument metadata particle
-                    self._build_hardware_config_data = False
-                    self._build_head_config_data = False
-                    self._build_user_config_data = False
-
-                    # Did the checksum fail on a diagnostic header record?
-                    if self._diagnostic_header:
-                        self._total_diagnostic_records = self.DEFAULT_DIAGNOSTICS_COUNT  # Use the default diag count
-                        self._bad_diagnostic_header = True
-                        self._sending_diagnostics = True  # The header is bad, the records may be okay
-                        log.warning('Diagnostic Header Invalid')
-                        self._exception_callback(
-                            RecoverableSampleException('Diagnostic Header Invalid, no particle generated'))
-
-                    log.warning('Invalid checksum: %d, expected %d - record will not be processed',
-                                stored_checksum, self._calculated_checksum)
-                    self._exception_callback(
-                        RecoverableSampleException('Invalid checksum, no particle generated'))
-
-                    status = False
-
-            else:
-                self._end_of_file = True
-                status = False
-                log.warning('Last record in file was malformed')
-                self._exception_callback(
-                    RecoverableSampleException('Last record in file malformed, no particle generated'))
+                RecoverableSampleException('Diagnostic Header Invalid, no particle generated'))
 
-        return status
+        # If the checksum failed on a config record, that part of the
+        # instrument metadata particle is not generated
+        log.warning('Invalid checksum: %d, expected %d - record will not be processed',
+                    stored_checksum, calculated_checksum)
+        self._exception_callback(
+            RecoverableSampleException('Invalid checksum, no particle generated'))
 
-    def build_instrument_metadata_particle(self, timestamp):
+    def build_instrument_metadata_particle(self, timestamp, date_time_group):
         """
         The instrument metadata particle is built from three separate records:
         the hardware configuration record, the head configuration record and the
@@ -393,8 +296,6 @@ class VelptAbParser(SimpleParser):
         """
         self._config_metadata_built = True
 
-        date_time_group = VelptAbDataParticle.get_date_time_string(self._current_record)
-
         instrument_metadata_dict = VelptAbDataParticle.generate_instrument_metadata_dict\
             (date_time_group, self._hardware_config_dict, self._head_config_dict,
              self._user_config_dict)
@@ -426,19 +327,20 @@ class VelptAbParser(SimpleParser):
             self._exception_callback(RecoverableSampleException(
                 'User configuration record invalid or not present in recovered data'))
 
-    def process_velocity_data(self):
+    def process_velocity_data(self, velocity_data_dicts, timestamps):
         """
-        Handles the processing of velocity data particles and handles error processing if events
-        which should have occurred prior to receiving a velocity record did not happen.
+        Handles the processing of a run of consecutive velocity data particles and handles
+        error processing if events which should have occurred prior to receiving a velocity
+        record did not happen. Only the first record of a run can trigger those events.
+        :param velocity_data_dicts: The data dictionaries of the velocity records
+        :param timestamps: The timestamps of the velocity records
         """
-        # Get the timestamp of the velocity record in case we need it for the metadata particle.
-        timestamp = VelptAbDataParticle.get_timestamp(self._current_record)
-
         # Check to see if the instrument metadata particle has been produced yet
         # If not, produce it now as this is the first velocity record. This assumes
         # that velocity data records will occur BEFORE diagnostics data records.
         if not self._config_metadata_built:
-            self.build_instrument_metadata_particle(timestamp)
+            self.build_instrument_metadata_particle(
+                timestamps[0], velocity_data_dicts[0][VelptAbDataParticleKey.DATE_TIME_STRING])
 
         # If this flag is still indicating TRUE, it means we found NO diagnostic records.
         # That's an error!
@@ -471,33 +373,30 @@ class VelptAbParser(SimpleParser):
                     self._diagnostics_count = 0
                     self._total_diagnostic_records = 0
 
-        velocity_data_dict = VelptAbDataParticle.generate_data_dict(self._current_record)
-
-        particle = self._extract_sample(self._velocity_data_class,
-                                        None,
-                                        velocity_data_dict,
-                                        timestamp)
+        for velocity_data_dict, timestamp in zip(velocity_data_dicts, timestamps):
+            particle = self._extract_sample(self._velocity_data_class,
+                                            None,
+                                            velocity_data_dict,
+                                            timestamp)
 
-        self._record_buffer.append(particle)
+            self._record_buffer.append(particle)
 
-    def process_diagnostic_data(self):
+    def process_diagnostic_data(self, diagnostics_data_dict, timestamp):
         """
         Handles the processing of diagnostic data particles and handles error processing if events
         which should have occurred prior to receiving a diagnostic record did not happen.
+        :param diagnostics_data_dict: The data dictionary of the diagnostics record
+        :param timestamp: The timestamp of the diagnostics record
         """
         # As diagnostics records have the same format as velocity records
-        # you can use the same routine used to break down the velocity data
-
-        timestamp = VelptAbDataParticle.get_timestamp(self._current_record)
-        date_time_group = VelptAbDataParticle.get_date_time_string(self._current_record)
-
-        self._diagnostics_data_dict = VelptAbDataParticle.generate_data_dict(self._current_record)
+        # the same routine used to break down the velocity data was used
+        date_time_group = diagnostics_data_dict[VelptAbDataParticleKey.DATE_TIME_STRING]
 
         # Check to see if the instrument metadata particle has been produced yet
         # If not, produce it now as this is the first diagnostics record. This assumes
         # that diagnostics data records will occur BEFORE velocity data records.
         if not self._config_metadata_built:
-            self.build_instrument_metadata_particle(timestamp)
+            self.build_instrument_metadata_particle(timestamp, date_time_group)
 
         # Upon encountering the first diagnostics record, grab its timestamp
         # for use in the diagnostics metadata particle. Produce that metadata
@@ -528,65 +427,187 @@ class VelptAbParser(SimpleParser):
 
         particle = self._extract_sample(self._diagnostics_class,
                                         None,
-                                        self._diagnostics_data_dict,
+                                        diagnostics_data_dict,
                                         timestamp)
 
         self._record_buffer.append(particle)
 
         self._diagnostics_count += 1
 
+    def _process_record(self, id_byte, record, data_dict, timestamp):
+        """
+        Run a single valid record which is not part of a run of velocity records
+        through the configuration and diagnostics state handling.
+        :param id_byte: The ID byte from the record
+        :param record: The record bytes
+        :param data_dict: The decoded data dictionary for velocity and diagnostics records
+        :param timestamp: The timestamp for velocity and diagnostics records
+        """
+        if id_byte == self.VELOCITY_DATA_ID:
+            self.process_velocity_data([data_dict], [timestamp])
+
+        elif id_byte == self.DIAGNOSTIC_DATA_ID:
+            self.process_diagnostic_data(data_dict, timestamp)
+
+        # Finding a diagnostic header in the data requires some
+        # extra processing as the header record has no time tag
+        # we need to get that from the first diagnostic record.
+        # We also have to check that the number of following
+        # diagnostic data records matches what is in the header.
+        elif id_byte == self.DIAGNOSTIC_HEADER_ID:
+            self._first_diagnostics_record = True
+            self._diagnostics_count = 0
+            self._diagnostics_header_record = record
+            self._sending_diagnostics = True
+
+        # This record and the following two are instrument configuration
+        # records. We only expect one of each and we expect to get all
+        # three. One instrument metadata particle is built from these
+        # three records. Keep track of which ones we have and note which
+        # ones are missing. Once a velocity record is received the
+        # assumption is that we are done with the config data.
+        elif id_byte == self.HARDWARE_CONFIGURATION_ID:
+            self._hardware_config_dict = VelptAbDataParticle.generate_hardware_config_dict(record)
+            self._hardware_config_dict_generated = True
+
+        elif id_byte == self.HEAD_CONFIGURATION_ID:
+            self._head_config_dict = VelptAbDataParticle.generate_head_config_dict(record)
+            self._head_config_dict_generated = True
+
+        elif id_byte == self.USER_CONFIGURATION_ID:
+            self._user_config_dict = VelptAbDataParticle.generate_user_config_dict(record)
+            self._user_config_dict_generated = True
+
+    def _scan_records(self, data, start):
+        """
+        Frame the records of the file.  When the file has a time index, only the
+        configuration records before the first velocity record and the records from
+        the last indexed velocity record before the start time on are framed.
+        :param data: The file data
+        :param start: The offset to start framing at
+        :return: the record table
+        """
+        time_index_seek = self._time_index_seek(TIME_INDEX_FORMAT)
+        if time_index_seek is None or start > time_index_seek[0].offset:
+            return vel3d_velpt_common.scan_records(data, self.RECORD_SIZES, start)
+
+        first_entry, seek_entry = time_index_seek
+        return numpy.concatenate([
+            vel3d_velpt_common.scan_records(data[:first_entry.offset], self.RECORD_SIZES, start),
+            vel3d_velpt_common.scan_records(data, self.RECORD_SIZES, seek_entry.offset)])
+
     def parse_file(self):
         """
-        Parser for velpt_ab data.
+        Parser for velpt_ab data. The file is framed into a table of records in
+        one pass, checksums are verified and the velocity and diagnostics data
+        records are decoded in bulk, then the table is walked in file order.
+        Runs of consecutive velocity records are handed over as a whole, so the
+        configuration and diagnostics state handling only runs for the other records.
         """
-        while not self._end_of_file:
+        data, start = vel3d_velpt_common.map_file(self._file_handle)
 
-            # Determine the type of record and load it for processing.
-            good_record = self.load_record(self._file_handle)
+        try:
+            table = self._scan_records(data, start)
+            calculated_checksums = vel3d_velpt_common.verify_checksums(data, table)
 
-            # Sequence through the various expected record types
-            if good_record:
+            valid = table['status'] == vel3d_velpt_common.RECORD_VALID
+            is_data = valid & ((table['id'] == ord(self.VELOCITY_DATA_ID)) |
+                               (table['id'] == ord(self.DIAGNOSTIC_DATA_ID)))
+            is_decoded = is_data & (table['length'] == vel3d_velpt_common.AQUADOPP_VELOCITY_DTYPE.itemsize)
 
-                if self._velocity_data:
-                    self.process_velocity_data()
+            # index of each table entry into the bulk decoded records, -1 if not decoded
+            decoded_index = numpy.cumsum(is_decoded) - 1
+            decoded_index[~is_decoded] = -1
 
-                elif self._diagnostic_data:
-                    self.process_diagnostic_data()
+            records = vel3d_velpt_common.decode_aquadopp_velocity_records(data, table['offset'][is_decoded])
+            timestamps = vel3d_velpt_common.bcd_timestamps(records).tolist()
 
-                # Finding a diagnostic header in the data requires some
-                # extra processing as the header record has no time tag
-                # we need to get that from the first diagnostic record.
-                # We also have to check that the number of following
-                # diagnostic data records matches what is in the header.
-                elif self._diagnostic_header:
-                    self._first_diagnostics_record = True
-                    self._diagnostics_count = 0
-                    self._diagnostics_header_record = self._current_record
-                    self._sending_diagnostics = True
-
-                # This record and the following two are instrument configuration
-                # records. We only expect one of each and we expect to get all
-                # three. One instrument metadata particle is built from these
-                # three records. Keep track of which ones we have and note which
-                # ones are missing. Once a velocity record is received the
-                # assumption is that we are done with the config data.
-                elif self._build_hardware_config_data:
-                    self._hardware_config_dict = VelptAbDataParticle.\
-                        generate_hardware_config_dict(self._current_record)
-                    self._hardware_config_dict_generated = True
-                    self._build_hardware_config_data = False
-
-                elif self._build_head_config_data:
-                    self._head_config_dict = VelptAbDataParticle.\
-                        generate_head_config_dict(self._current_record)
-                    self._head_config_dict_generated = True
-                    self._build_head_config_data = False
-
-                elif self._build_user_config_data:
-                    self._user_config_dict = VelptAbDataParticle.\
-                        generate_user_config_dict(self._current_record)
-                    self._user_config_dict_generated = True
-                    self._build_user_config_data = False
-                    self._build_config_metadata = True
+            # decoded records whose date and time fields are not a valid time get no particle
+            has_bad_time = numpy.zeros(len(table), dtype=bool)
+            has_bad_time[is_decoded] = ~vel3d_velpt_common.valid_bcd_times(records)
+            data_dicts = VelptAbDataParticle.generate_data_dicts(
+                records, vel3d_velpt_common.bcd_date_time_strings(records))
+
+            is_velocity_run = is_decoded & ~has_bad_time & (table['id'] == ord(self.VELOCITY_DATA_ID))
+            run_boundaries = numpy.flatnonzero(is_velocity_run[1:] != is_velocity_run[:-1]) + 1
+
+            for segment in numpy.split(numpy.arange(len(table)), run_boundaries):
+
+                if len(segment) == 0:
+                    continue
+
+                if is_velocity_run[segment[0]]:
+                    first = decoded_index[segment[0]]
+                    last = decoded_index[segment[-1]] + 1
+                    self.process_velocity_data(data_dicts[first:last], timestamps[first:last])
+                    continue
+
+                for index in segment:
+                    entry = table[index]
+                    id_byte = chr(entry['id'])
+
+                    if entry['status'] == vel3d_velpt_common.RECORD_BAD_ID:
+                        self._report_invalid_bytes(data, entry)
+                        continue
+
+                    if id_byte == self.DIAGNOSTIC_HEADER_ID:
+                        self._diagnostic_header_published = False
+                        self._bad_diagnostic_header = False
+
+                    if entry['status'] == vel3d_velpt_common.RECORD_BAD_CHECKSUM:
+                        stored_checksum = struct.unpack_from(
+                            '<H', data, entry['offset'] + entry['length'] - 2)[0]
+                        self._report_bad_checksum(id_byte, stored_checksum, calculated_checksums[index])
+
+                    elif entry['status'] != vel3d_velpt_common.RECORD_VALID:
+                        self._report_invalid_bytes(data, entry)
+
+                    elif has_bad_time[index]:
+                        log.warning('Invalid date and time in record ID 0x%02x', entry['id'])
+                        self._exception_callback(
+                            RecoverableSampleException('Invalid date and time, no particle generated'))
+
+                    elif decoded_index[index] >= 0:
+                        self._process_record(id_byte, None, data_dicts[decoded_index[index]],
+                                             timestamps[decoded_index[index]])
+
+                    else:
+                        record = data[entry['offset']:entry['offset'] + entry['length']]
+                        data_dict = timestamp = None
+
+                        if is_data[index]:
+                            data_dict = VelptAbDataParticle.generate_data_dict(record)
+                            timestamp = VelptAbDataParticle.get_timestamp(record)
+
+                        self._process_record(id_byte, record, data_dict, timestamp)
+
+        finally:
+            vel3d_velpt_common.unmap_file(data)
 
         log.debug('File has been completely processed')
+
+
+def time_index_entries(file_path):
+    """
+    List the valid velocity data records of a velpt_ab file for its time index
+    :param file_path: The path of the velpt_ab file
+    :return: list of (offset, record ID, NTP timestamp) of the records
+    """
+    with open(file_path, 'rb') as file_handle:
+        data, start = vel3d_velpt_common.map_file(file_handle)
+
+        try:
+            table = vel3d_velpt_common.scan_records(data, VelptAbParser.RECORD_SIZES, start)
+            vel3d_velpt_common.verify_checksums(data, table)
+
+            table = table[(table['status'] == vel3d_velpt_common.RECORD_VALID) &
+                          (table['id'] == ord(VelptAbParser.VELOCITY_DATA_ID)) &
+                          (table['length'] == vel3d_velpt_common.AQUADOPP_VELOCITY_DTYPE.itemsize)]
+            records = vel3d_velpt_common.decode_aquadopp_velocity_records(data, table['offset'])
+            valid_time = vel3d_velpt_common.valid_bcd_times(records)
+            table = table[valid_time]
+            timestamps = vel3d_velpt_common.bcd_timestamps(records[valid_time])
+        finally:
+            vel3d_velpt_common.unmap_file(data)
+
+    return zip(table['offset'].tolist(), table['id'].tolist(), timestamps.tolist())
@@ -230,6 +230,56 @@ class VelptAbDclDataParticle(DataParticle):
                 VelptAbDclDataParticleKey.AMPLITUDE_BEAM2: amplitude_beam_2,
                 VelptAbDclDataParticleKey.AMPLITUDE_BEAM3: amplitude_beam_3}
 
+    @staticmethod
+    def generate_data_dicts(records, date_time_strings):
+        """
+        Bulk version of generate_data_dict, building the dictionaries for many
+        records at once from their decoded fields
+        :param records: numpy structured array of records decoded by
+            vel3d_velpt_common.decode_aquadopp_velocity_records
+        :param date_time_strings: list of the date time strings of the records
+        :return: list of dictionaries
+        """
+        pressure_mbar = (records['pressure_msb'].astype('i8') << 16) + records['pressure_lsw']
+
+        columns = zip(date_time_strings,
+                      records['error_code'].tolist(),
+                      records['analog1'].tolist(),
+                      records['battery_voltage'].tolist(),
+                      records['sound_speed_analog2'].tolist(),
+                      records['heading'].tolist(),
+                      records['pitch'].tolist(),
+                      records['roll'].tolist(),
+                      pressure_mbar.tolist(),
+                      records['status'].tolist(),
+                      records['temperature'].tolist(),
+                      records['velocity_beam1'].tolist(),
+                      records['velocity_beam2'].tolist(),
+                      records['velocity_beam3'].tolist(),
+                      records['amplitude_beam1'].tolist(),
+                      records['amplitude_beam2'].tolist(),
+                      records['amplitude_beam3'].tolist())
+
+        keys = (VelptAbDclDataParticleKey.DATE_TIME_STRING,
+                VelptAbDclDataParticleKey.ERROR_CODE,
+                VelptAbDclDataParticleKey.ANALOG1,
+                VelptAbDclDataParticleKey.BATTERY_VOLTAGE_DV,
+                VelptAbDclDataParticleKey.SOUND_SPEED_DMS,
+                VelptAbDclDataParticleKey.HEADING_DECIDEGREE,
+                VelptAbDclDataParticleKey.PITCH_DECIDEGREE,
+                VelptAbDclDataParticleKey.ROLL_DECIDEGREE,
+                VelptAbDclDataParticleKey.PRESSURE_MBAR,
+                VelptAbDclDataParticleKey.STATUS,
+                VelptAbDclDataParticleKey.TEMPERATURE_CENTIDEGREE,
+                VelptAbDclDataParticleKey.VELOCITY_BEAM1,
+                VelptAbDclDataParticleKey.VELOCITY_BEAM2,
+                VelptAbDclDataParticleKey.VELOCITY_BEAM3,
+                VelptAbDclDataParticleKey.AMPLITUDE_BEAM1,
+                VelptAbDclDataParticleKey.AMPLITUDE_BEAM2,
+                VelptAbDclDataParticleKey.AMPLITUDE_BEAM3)
+
+        return [dict(zip(keys, values)) for values in columns]
+
     @staticmethod
     def generate_diagnostics_header_dict(date_time_string, record):
         """
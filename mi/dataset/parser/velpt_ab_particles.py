@@ -353,6 +353,56 @@ class VelptAbDataParticle(DataParticle):
                 VelptAbDataParticleKey.AMPLITUDE_BEAM2: amplitude_beam_2,
                 VelptAbDataParticleKey.AMPLITUDE_BEAM3: amplitude_beam_3}
 
+    @staticmethod
+    def generate_data_dicts(records, date_time_strings):
+        """
+        Bulk version of generate_data_dict, building the dictionaries for many
+        records at once from their decoded fields
+        :param records: numpy structured array of records decoded by
+            vel3d_velpt_common.decode_aquadopp_velocity_records
+        :param date_time_strings: list of the date time strings of the records
+        :return: list of dictionaries
+        """
+        pressure_mbar = (records['pressure_msb'].astype('i8') << 16) + records['pressure_lsw']
+
+        columns = zip(date_time_strings,
+                      records['error_code'].tolist(),
+                      records['analog1'].tolist(),
+                      records['battery_voltage'].tolist(),
+                      records['sound_speed_analog2'].tolist(),
+                      records['heading'].tolist(),
+                      records['pitch'].tolist(),
+                      records['roll'].tolist(),
+                      pressure_mbar.tolist(),
+                      records['status'].tolist(),
+                      records['temperature'].tolist(),
+                      records['velocity_beam1'].tolist(),
+                      records['velocity_beam2'].tolist(),
+                      records['velocity_beam3'].tolist(),
+                      records['amplitude_beam1'].tolist(),
+                      records['amplitude_beam2'].tolist(),
+                      records['amplitude_beam3'].tolist())
+
+        keys = (VelptAbDataParticleKey.DATE_TIME_STRING,
+                VelptAbDataParticleKey.ERROR_CODE,
+                VelptAbDataParticleKey.ANALOG1,
+                VelptAbDataParticleKey.BATTERY_VOLTAGE_DV,
+                VelptAbDataParticleKey.SOUND_SPEED_DMS,
+                VelptAbDataParticleKey.HEADING_DECIDEGREE,
+                VelptAbDataParticleKey.PITCH_DECIDEGREE,
+                VelptAbDataParticleKey.ROLL_DECIDEGREE,
+                VelptAbDataParticleKey.PRESSURE_MBAR,
+                VelptAbDataParticleKey.STATUS,
+                VelptAbDataParticleKey.TEMPERATURE_CENTIDEGREE,
+                VelptAbDataParticleKey.VELOCITY_BEAM1,
+                VelptAbDataParticleKey.VELOCITY_BEAM2,
+                VelptAbDataParticleKey.VELOCITY_BEAM3,
+                VelptAbDataParticleKey.AMPLITUDE_BEAM1,
+                VelptAbDataParticleKey.AMPLITUDE_BEAM2,
+                VelptAbDataParticleKey.AMPLITUDE_BEAM3)
+
+        return [dict(zip(keys, values)) for values in columns]
+
     @staticmethod
     def generate_diagnostics_header_dict(date_time_string, record):
         """
@@ -23,6 +23,7 @@ from mi.core.instrument.data_particle import DataParticle
 from mi.dataset.parser.common_regexes import FLOAT_REGEX, INT_REGEX, MULTIPLE_TAB_REGEX, END_OF_LINE_REGEX
 from mi.dataset.parser.cspp_base import CsppParser, CsppMetadataDataParticle, MetadataRawDataKey, \
     Y_OR_N_REGEX, encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, INT_COLUMN, Y_OR_N_COLUMN
 
 
 # A regular expression that should match a velpt_j data record
@@ -115,6 +116,26 @@ INSTRUMENT_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (VelptJCsppParserDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.PRESSURE_DEPTH, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (VelptJCsppParserDataParticleKey.SOUND_SPEED, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.HEADING, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.PITCH, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.ROLL, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.TEMPERATURE, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.VELOCITY_BEAM_1, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.VELOCITY_BEAM_2, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.VELOCITY_BEAM_3, FLOAT_COLUMN),
+    (VelptJCsppParserDataParticleKey.AMPLITUDE_BEAM_1, INT_COLUMN),
+    (VelptJCsppParserDataParticleKey.AMPLITUDE_BEAM_2, INT_COLUMN),
+    (VelptJCsppParserDataParticleKey.AMPLITUDE_BEAM_3, INT_COLUMN)
+])
+
+
 class VelptJCsppMetadataDataParticle(CsppMetadataDataParticle):
     """
     Class for building a velpt_j_cspp metadata particle
@@ -218,4 +239,5 @@ class VelptJCsppParser(CsppParser):
         super(VelptJCsppParser, self).__init__(config,
                                                stream_handle,
                                                exception_callback,
-                                               DATA_REGEX)
+                                               DATA_REGEX,
+                                               column_schema=COLUMN_SCHEMA)
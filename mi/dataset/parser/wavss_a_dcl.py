@@ -7,6 +7,8 @@
 
 
 import re
+from collections import OrderedDict
+
 import numpy as np
 
 from mi.core.common import BaseEnum
@@ -17,7 +19,9 @@ from mi.core.exceptions import SampleException, RecoverableSampleException
 from mi.dataset.dataset_parser import SimpleParser
 
 from mi.dataset.parser.common_regexes import INT_REGEX
-from mi.dataset.parser.utilities import dcl_controller_timestamp_to_utc_time
+from mi.dataset.parser.line_classifier import LineClassifier
+from mi.dataset.parser.utilities import dcl_controller_timestamp_to_utc_time, \
+    dcl_controller_timestamps_to_ntp_time
 log = get_logger()
 
 __author__ = 'Emily Hahn'
@@ -117,6 +121,15 @@ TSPSA_MATCHER = re.compile(TSPSA_REGEX)
 LOG_STATUS_REGEX = DCL_TIMESTAMP_REGEX + ' \[wavss:DLOGP\d+\]:.*' + END_OF_LINE_REGEX
 LOG_STATUS_MATCHER = re.compile(LOG_STATUS_REGEX)
 
+# all the line types, in the order they are checked
+LINE_CLASSIFIER = LineClassifier([('TSPWA', TSPWA_MATCHER),
+                                  ('TSPMA', TSPMA_MATCHER),
+                                  ('TSPNA', TSPNA_MATCHER),
+                                  ('TSPHA', TSPHA_MATCHER),
+                                  ('TSPFB', TSPFB_MATCHER),
+                                  ('LOG_STATUS', LOG_STATUS_MATCHER),
+                                  ('TSPSA', TSPSA_MATCHER)])
+
 
 class DataParticleType(BaseEnum):
     WAVSS_A_DCL_STATISTICS = "wavss_a_dcl_statistics"
@@ -184,8 +197,48 @@ class WavssADclCommonDataParticle(DataParticle):
         @param input_string a string containing a set of comma separated floats
         @return returns an array of floating point values
         """
-        string_array = input_string.split(',')
-        return map(float, string_array)
+        return string_to_float_ndarray(input_string).tolist()
+
+
+def string_to_float_ndarray(input_string):
+    """
+    Convert a string of comma separated floats to a numpy array in one pass
+    @param input_string a string containing a set of comma separated floats
+    @return returns a numpy float64 array
+    @throws ValueError if a value is not a float
+    """
+    values = np.fromstring(input_string, sep=',')
+
+    # fromstring stops at the first value it cannot read, convert those one
+    # at a time to raise the same error as float
+    if values.size != input_string.count(',') + 1:
+        values = np.array(input_string.split(','), dtype=np.float64)
+
+    return values
+
+
+def band_string(match, start_group, end_group):
+    """
+    Get the comma separated values of a record which follow one regex group,
+    up to the end of another
+    @param match the record regex match
+    @param start_group the group the values follow
+    @param end_group the group of the last value
+    @return returns the string of comma separated values
+    """
+    return match.string[match.end(start_group) + 1:match.end(end_group)]
+
+
+def band_values(match, start_group, end_group):
+    """
+    Parse the comma separated values of a record which follow one regex group,
+    up to the end of another
+    @param match the record regex match
+    @param start_group the group the values follow
+    @param end_group the group of the last value
+    @return returns a numpy float64 array
+    """
+    return string_to_float_ndarray(band_string(match, start_group, end_group))
 
 
 # --------------- Statistics Data Particles -------------------------------------------------------------
@@ -235,6 +288,16 @@ class WavssADclStatisticsRecoveredDataParticle(WavssADclStatisticsDataParticle):
 END_NON_DIR_ARRAY_GROUP = 9
 
 
+def non_directional_arrays(match):
+    """
+    Extract the non directional psd array of a TSPNA record
+    @param match the TSPNA regex match
+    @return list of (parameter name, numpy array) tuples
+    """
+    # the array runs from the end of the frequency spacing group to the last floating point match
+    return [(ArrayParticleKeys.PSD_NON_DIRECTIONAL, band_values(match, FREQ_SPACING_GROUP, END_NON_DIR_ARRAY_GROUP))]
+
+
 class WavssADclNonDirectionalDataParticle(WavssADclCommonDataParticle):
 
     def _build_parsed_values(self):
@@ -250,8 +313,7 @@ class WavssADclNonDirectionalDataParticle(WavssADclCommonDataParticle):
 
         # append the non-directional PSD array, from the end of the frequency spacing group to the last floating point
         #  match
-        non_dir_data = self.raw_data.group(0)[self.raw_data.end(FREQ_SPACING_GROUP) + 1:
-                                              self.raw_data.end(END_NON_DIR_ARRAY_GROUP)]
+        non_dir_data = band_string(self.raw_data, FREQ_SPACING_GROUP, END_NON_DIR_ARRAY_GROUP)
         particle_parameters.append(self._encode_value(ArrayParticleKeys.PSD_NON_DIRECTIONAL,
                                                       non_dir_data,
                                                       WavssADclCommonDataParticle.string_to_float_array))
@@ -280,6 +342,29 @@ MEAN_DIRECTION_PARTICLE_MAP = [
 ]
 
 
+def mean_directional_arrays(match):
+    """
+    Extract the 3 mean directional arrays of a TSPMA record, padded with NaNs to MEAN_DIR_NUMBER_BANDS
+    @param match the TSPMA regex match
+    @return list of (parameter name, numpy array) tuples
+    """
+    number_bands = int(match.group(NUMBER_COUNT_GROUP))
+
+    # the values are psd, mean direction and spread for each band in turn, size of array checked in wavss parser
+    values = band_values(match, SPREAD_DIR_GROUP, END_MEAN_DIR_ARRAY_GROUP)[:number_bands*3].reshape(-1, 3)
+
+    # to match with non-directional data, the mean directional arrays must be padded with NaNs so they are
+    # the same size
+    if number_bands < MEAN_DIR_NUMBER_BANDS:
+        padding = np.empty((MEAN_DIR_NUMBER_BANDS - number_bands, 3))
+        padding.fill(np.nan)
+        values = np.vstack((values, padding))
+
+    return [(ArrayParticleKeys.PSD_MEAN_DIRECTIONAL, values[:, 0]),
+            (ArrayParticleKeys.MEAN_DIRECTION_ARRAY, values[:, 1]),
+            (ArrayParticleKeys.DIRECTIONAL_SPREAD_ARRAY, values[:, 2])]
+
+
 class WavssADclMeanDirectionalDataParticle(WavssADclCommonDataParticle):
 
     def _build_parsed_values(self):
@@ -297,31 +382,9 @@ class WavssADclMeanDirectionalDataParticle(WavssADclCommonDataParticle):
         for name, group, function in MEAN_DIRECTION_PARTICLE_MAP:
             particle_parameters.append(self._encode_value(name, self.raw_data.group(group), function))
 
-        number_bands = int(self.raw_data.group(NUMBER_COUNT_GROUP))
-
-        # split the array of floats
-        data_str = self.raw_data.group(0)[self.raw_data.end(SPREAD_DIR_GROUP) + 1:
-                                          self.raw_data.end(END_MEAN_DIR_ARRAY_GROUP)]
-        flt_array = WavssADclCommonDataParticle.string_to_float_array(data_str)
-
-        # split up the array into 3 arrays each number of bands in length, taking each 3rd item, size of array
-        # checked in wavss parser
-        psd = flt_array[0:number_bands*3:3]
-        mean_dir = flt_array[1:number_bands*3:3]
-        dir_spread = flt_array[2:number_bands*3:3]
-
-        # to match with non-directional data, the mean directional arrays must be padded with NaNs so they are
-        # the same size
-        for i in range(number_bands, MEAN_DIR_NUMBER_BANDS):
-            psd.append(np.nan)
-            mean_dir.append(np.nan)
-            dir_spread.append(np.nan)
-
         # append and encode the particle mean directional arrays
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.PSD_MEAN_DIRECTIONAL, psd, list))
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.MEAN_DIRECTION_ARRAY, mean_dir, list))
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.DIRECTIONAL_SPREAD_ARRAY, dir_spread,
-                                                      list))
+        for name, values in mean_directional_arrays(self.raw_data):
+            particle_parameters.append(self._encode_value(name, values.tolist(), list))
 
         return particle_parameters
 
@@ -346,6 +409,23 @@ MOTION_PARTICLE_MAP = [
 ]
 
 
+def motion_arrays(match):
+    """
+    Extract the 3 motion offset arrays of a TSPHA record
+    @param match the TSPHA regex match
+    @return list of (parameter name, numpy array) tuples
+    """
+    number_samples = int(match.group(NUMBER_COUNT_GROUP))
+
+    # the values are heave1, north1, east1, heave2, north2, east2, etc.
+    # size of array is pre-checked in wavss parser
+    values = band_values(match, SOLUTION_FOUND_GROUP, END_MOTION_ARRAY_GROUP)[:number_samples*3].reshape(-1, 3)
+
+    return [(ArrayParticleKeys.HEAVE_OFFSET_ARRAY, values[:, 0]),
+            (ArrayParticleKeys.NORTH_OFFSET_ARRAY, values[:, 1]),
+            (ArrayParticleKeys.EAST_OFFSET_ARRAY, values[:, 2])]
+
+
 class WavssADclMotionDataParticle(WavssADclCommonDataParticle):
 
     def _build_parsed_values(self):
@@ -359,22 +439,9 @@ class WavssADclMotionDataParticle(WavssADclCommonDataParticle):
         for name, group, function in MOTION_PARTICLE_MAP:
             particle_parameters.append(self._encode_value(name, self.raw_data.group(group), function))
 
-        number_samples = int(self.raw_data.group(NUMBER_COUNT_GROUP))
-
-        data_array = self.raw_data.group(0)[self.raw_data.end(SOLUTION_FOUND_GROUP) + 1:
-                                            self.raw_data.end(END_MOTION_ARRAY_GROUP)]
-        flt_array = WavssADclCommonDataParticle.string_to_float_array(data_array)
-
-        # split up the large array into 3 smaller arrays, heave1, north1, east1, heave2, north2, east2, etc.
-        # size of array is pre-checked in wavss parser
-        heave = flt_array[0:number_samples*3:3]
-        north = flt_array[1:number_samples*3:3]
-        east = flt_array[2:number_samples*3:3]
-
         # append and encode the motion offset arrays
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.HEAVE_OFFSET_ARRAY, heave, list))
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.NORTH_OFFSET_ARRAY, north, list))
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.EAST_OFFSET_ARRAY, east, list))
+        for name, values in motion_arrays(self.raw_data):
+            particle_parameters.append(self._encode_value(name, values.tolist(), list))
 
         return particle_parameters
 
@@ -398,6 +465,20 @@ FOURIER_PARTICLE_MAP = [
 ]
 
 
+def fourier_arrays(match):
+    """
+    Extract the fourier coefficients of a TSPFB record as a number_bands-2 x 4 array
+    @param match the TSPFB regex match
+    @return list of (parameter name, numpy array) tuples
+    """
+    number_bands = int(match.group(NUMBER_COUNT_GROUP))
+
+    # size of array is checked in wavss parser
+    values = band_values(match, DIR_FREQ_SPACING_GROUP, END_FOURIER_ARRAY_GROUP)
+
+    return [(ArrayParticleKeys.FOURIER_COEFFICIENT_2D_ARRAY, values.reshape((number_bands - 2), 4))]
+
+
 class WavssADclFourierDataParticle(WavssADclCommonDataParticle):
 
     def _build_parsed_values(self):
@@ -415,23 +496,10 @@ class WavssADclFourierDataParticle(WavssADclCommonDataParticle):
         for name, group, function in FOURIER_PARTICLE_MAP:
             particle_parameters.append(self._encode_value(name, self.raw_data.group(group), function))
 
-        number_bands = int(self.raw_data.group(NUMBER_COUNT_GROUP))
-
-        data_array = self.raw_data.group(0)[self.raw_data.end(DIR_FREQ_SPACING_GROUP) + 1:
-                                            self.raw_data.end(END_FOURIER_ARRAY_GROUP)]
-        flt_array = WavssADclCommonDataParticle.string_to_float_array(data_array)
-
-        # reshape the fourier array to 4 x number_bands-2, size of array is checked in wavss parser
-        np_flt_array = np.vstack(flt_array)
-        flt_array = np_flt_array.reshape((number_bands - 2), 4)
-        # convert each array back to a list for json since it will not recognize numpy arrays
-        list_flt_array = []
-        for i in range(0, len(flt_array)):
-            list_flt_array.append(list(flt_array[i]))
-
-        # append and encode the fourier coefficients array
-        particle_parameters.append(self._encode_value(ArrayParticleKeys.FOURIER_COEFFICIENT_2D_ARRAY,
-                                                      list_flt_array, list))
+        # append and encode the fourier coefficients array, as lists for json since it will not recognize
+        # numpy arrays
+        for name, values in fourier_arrays(self.raw_data):
+            particle_parameters.append(self._encode_value(name, values.tolist(), list))
 
         return particle_parameters
 
@@ -444,7 +512,88 @@ class WavssADclFourierRecoveredDataParticle(WavssADclFourierDataParticle):
     _data_particle_type = DataParticleType.WAVSS_A_DCL_FOURIER_RECOVERED
 
 
+# --------------- Record Batches -------------------------------------------------------------
+
+# the scalar parameters of each record type
+RECORD_PARTICLE_MAPS = {
+    'TSPWA': COMMON_PARTICLE_MAP + STATISTICS_PARTICLE_MAP,
+    'TSPNA': COMMON_PARTICLE_MAP + BANDS_PARTICLE_MAP,
+    'TSPMA': COMMON_PARTICLE_MAP + BANDS_PARTICLE_MAP + MEAN_DIRECTION_PARTICLE_MAP,
+    'TSPHA': COMMON_PARTICLE_MAP + MOTION_PARTICLE_MAP,
+    'TSPFB': COMMON_PARTICLE_MAP + BANDS_PARTICLE_MAP + FOURIER_PARTICLE_MAP
+}
+
+# the function extracting the array parameters of each record type
+RECORD_ARRAY_FUNCTIONS = {
+    'TSPWA': lambda match: [],
+    'TSPNA': non_directional_arrays,
+    'TSPMA': mean_directional_arrays,
+    'TSPHA': motion_arrays,
+    'TSPFB': fourier_arrays
+}
+
+
+class WavssADclRecordBatch(object):
+    """
+    The records of one type from a wavss file, with each parameter available
+    as a column holding its value for every record
+    """
+
+    def __init__(self, record_type):
+        self.record_type = record_type
+        self.matches = []
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.matches)
+
+    def append(self, match):
+        """
+        Add a record to the batch
+        @param match: The record regex match
+        """
+        self.matches.append(match)
+        self._arrays = None
+
+    def timestamps(self):
+        """
+        Convert the DCL controller timestamps of the records to NTP time together
+        @return numpy array of NTP timestamps
+        """
+        return dcl_controller_timestamps_to_ntp_time([match.group(DCL_TIMESTAMP_GROUP) for match in self.matches])
+
+    def column(self, name):
+        """
+        Get the values of one parameter for all the records.  Array parameters
+        are stacked into one array with a row per record when all the records
+        have the same number of values, otherwise they are returned as a ragged
+        object array holding the array of each record.
+        @param name: The parameter name
+        @return numpy array of the parameter values of the records
+        @throws KeyError if the record type has no such parameter
+        @throws ValueError if a value of the parameter cannot be converted
+        """
+        for parameter_name, group, function in RECORD_PARTICLE_MAPS[self.record_type]:
+            if parameter_name == name:
+                return np.array([function(match.group(group)) for match in self.matches])
+
+        if self._arrays is None:
+            self._arrays = [dict(RECORD_ARRAY_FUNCTIONS[self.record_type](match)) for match in self.matches]
+
+        rows = [arrays[name] for arrays in self._arrays]
+
+        if len(set(row.shape for row in rows)) <= 1:
+            return np.array(rows)
+
+        ragged = np.empty(len(rows), dtype=object)
+        ragged[:] = rows
+        return ragged
+
+
 class WavssADclParser(SimpleParser):
+
+    checkpoint_supported = True
+
     def __init__(self,
                  stream_handle,
                  exception_callback,
@@ -465,6 +614,9 @@ class WavssADclParser(SimpleParser):
             self.motion_particle_class = WavssADclMotionRecoveredDataParticle
             self.fourier_particle_class = WavssADclFourierRecoveredDataParticle
 
+        # the batch of the records of each type, in the order the types are first found
+        self._record_batches = OrderedDict()
+
         # no config for this parser, pass in empty dict
         super(WavssADclParser, self).__init__({},
                                               stream_handle,
@@ -477,80 +629,90 @@ class WavssADclParser(SimpleParser):
 
         while line:
 
-            tspwa_match = TSPWA_MATCHER.match(line)
-            tspma_match = TSPMA_MATCHER.match(line)
-            tspna_match = TSPNA_MATCHER.match(line)
-            tspha_match = TSPHA_MATCHER.match(line)
-            tspfb_match = TSPFB_MATCHER.match(line)
-            num_csv = len(line.split(','))
+            line_type, match = LINE_CLASSIFIER.classify(line)
+            num_csv = line.count(',') + 1
 
-            if tspwa_match:
+            if line_type == 'TSPWA':
                 # this is a wave statistics sample
-                self.extract_particle(self.statistics_particle_class, tspwa_match)
+                self.extract_particle(self.statistics_particle_class, match, line_type)
 
-            elif tspma_match:
+            elif line_type == 'TSPMA':
                 # this is a mean directional sample
-                num_bands = int(tspma_match.group(NUMBER_COUNT_GROUP))
+                num_bands = int(match.group(NUMBER_COUNT_GROUP))
 
                 if num_csv != (12 + 3*num_bands):
                     self.recov_exception("TSPMA does not contain 12 + 3*%d comma separated values, has %d" %
                                          (num_bands, num_csv))
 
                 else:
-                    self.extract_particle(self.mean_directional_particle_class, tspma_match)
+                    self.extract_particle(self.mean_directional_particle_class, match, line_type)
 
-            elif tspna_match:
+            elif line_type == 'TSPNA':
                 # this is a non directional sample
-                num_bands = int(tspna_match.group(NUMBER_COUNT_GROUP))
+                num_bands = int(match.group(NUMBER_COUNT_GROUP))
 
                 if num_csv != (10 + num_bands):
                     self.recov_exception("TSPNA does not contain 10 + %d comma separated values, has %d" %
                                          (num_bands, num_csv))
 
                 else:
-                    self.extract_particle(self.non_directional_particle_class, tspna_match)
+                    self.extract_particle(self.non_directional_particle_class, match, line_type)
 
-            elif tspha_match:
+            elif line_type == 'TSPHA':
                 # this is a heave north east / motion sample
-                num_time = int(tspha_match.group(NUMBER_COUNT_GROUP))
+                num_time = int(match.group(NUMBER_COUNT_GROUP))
 
                 if num_csv != (11 + 3*num_time):
                     self.recov_exception("TSPHA doesn't contain 11 + 3*%d comma separated values, has %d" %
                                          (num_time, num_csv))
 
                 else:
-                    self.extract_particle(self.motion_particle_class, tspha_match)
+                    self.extract_particle(self.motion_particle_class, match, line_type)
 
-            elif tspfb_match:
+            elif line_type == 'TSPFB':
                 # this is a fourier sample
-                num_bands = int(tspfb_match.group(NUMBER_COUNT_GROUP))
+                num_bands = int(match.group(NUMBER_COUNT_GROUP))
 
                 if num_csv != (13 + 4*(num_bands - 2)):
                     self.recov_exception("TSPFB doesn't contain 13 + 4*(%d - 2) comma separated values, has %d" %
                                          (num_bands, num_csv))
 
                 else:
-                    self.extract_particle(self.fourier_particle_class, tspfb_match)
-
-            else:
-                log_match = LOG_STATUS_MATCHER.match(line)
-                tspsa_match = TSPSA_MATCHER.match(line)
+                    self.extract_particle(self.fourier_particle_class, match, line_type)
 
-                if not (log_match or tspsa_match):
-                    self.recov_exception("Wavss encountered unexpected data line '%s'" % line)
+            # log status and TSPSA status lines are ignored, anything else is unexpected
+            elif line_type is None:
+                self.recov_exception("Wavss encountered unexpected data line '%s'" % line)
 
             # read the next line in the file
             line = self._stream_handle.readline()
 
-    def extract_particle(self, particle_class, match):
+    def extract_particle(self, particle_class, match, record_type):
         """
-        Extract a particle of the specified class and append it to the record buffer
+        Extract a particle of the specified class and append it to the record buffer,
+        and add the record to the batch of its type
         @param particle_class: particle class to extract
         @param match: regex match to pass in as raw data
+        @param record_type: the record type of the match
         """
         particle = self._extract_sample(particle_class, None, match, None)
         self._record_buffer.append(particle)
 
+        if record_type not in self._record_batches:
+            self._record_batches[record_type] = WavssADclRecordBatch(record_type)
+        self._record_batches[record_type].append(match)
+
+    def get_record_batches(self):
+        """
+        Parse the file if it has not been done already and get the records as batches
+        @return list of WavssADclRecordBatch, one per record type found
+        """
+        if self._file_parsed is False:
+            self.parse_file()
+            self._file_parsed = True
+
+        return self._record_batches.values()
+
     def recov_exception(self, error_message):
         """
         Add a warning log message and use the exception callback to pass a recoverable exception
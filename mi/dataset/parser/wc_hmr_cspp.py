@@ -28,6 +28,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, Y_OR_N_COLUMN
 
 from mi.dataset.parser.common_regexes import MULTIPLE_TAB_REGEX, \
     FLOAT_REGEX, \
@@ -98,6 +99,17 @@ ENGINEERING_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (WcHmrEngDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (WcHmrEngDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (WcHmrEngDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (WcHmrEngDataParticleKey.HEADING, FLOAT_COLUMN),
+    (WcHmrEngDataParticleKey.PITCH, FLOAT_COLUMN),
+    (WcHmrEngDataParticleKey.ROLL, FLOAT_COLUMN)
+])
+
+
 class WcHmrMetadataDataParticle(CsppMetadataDataParticle):
     """
     Class for building a wc hmr metadata particle
@@ -218,4 +230,5 @@ class WcHmrCsppParser(CsppParser):
                                               stream_handle,
                                               exception_callback,
                                               DATA_REGEX,
-                                              ignore_matcher=None)
+                                              ignore_matcher=None,
+                                              column_schema=COLUMN_SCHEMA)
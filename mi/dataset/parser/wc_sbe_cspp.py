@@ -29,6 +29,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, Y_OR_N_COLUMN
 
 from mi.dataset.parser.common_regexes import \
     FLOAT_REGEX, \
@@ -89,6 +90,15 @@ ENGINEERING_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (WcSbeEngDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (WcSbeEngDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (WcSbeEngDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (WcSbeEngDataParticleKey.VELOCITY, FLOAT_COLUMN)
+])
+
+
 class WcSbeMetadataDataParticle(CsppMetadataDataParticle):
     """
     Class for building a wc sbe metadata particle
@@ -209,4 +219,5 @@ class WcSbeCsppParser(CsppParser):
                                               stream_handle,
                                               exception_callback,
                                               DATA_REGEX,
-                                              ignore_matcher=None)
+                                              ignore_matcher=None,
+                                              column_schema=COLUMN_SCHEMA)
@@ -29,6 +29,7 @@ from mi.dataset.parser.cspp_base import \
     CsppMetadataDataParticle, \
     MetadataRawDataKey, \
     encode_y_or_n
+from mi.dataset.parser.cspp_columns import CsppColumnSchema, FLOAT_COLUMN, INT_COLUMN, Y_OR_N_COLUMN, string_column
 
 from mi.dataset.parser.common_regexes import INT_REGEX, \
     FLOAT_REGEX, \
@@ -125,6 +126,23 @@ ENGINEERING_PARTICLE_ENCODING_RULES = [
 ]
 
 
+# The columns of a data record, used to split well formed data lines into records together
+COLUMN_SCHEMA = CsppColumnSchema([
+    (WcWmEngDataParticleKey.PROFILER_TIMESTAMP, FLOAT_COLUMN),
+    (WcWmEngDataParticleKey.PRESSURE, FLOAT_COLUMN),
+    (WcWmEngDataParticleKey.SUSPECT_TIMESTAMP, Y_OR_N_COLUMN),
+    (WcWmEngDataParticleKey.ENCODER_COUNTS, INT_COLUMN),
+    (WcWmEngDataParticleKey.WINCH_CURRENT, FLOAT_COLUMN),
+    (WcWmEngDataParticleKey.WINCH_STATUS, string_column(STRING_REGEX)),
+    (WcWmEngDataParticleKey.WINCH_VELOCITY, INT_COLUMN),
+    (WcWmEngDataParticleKey.TEMPERATURE, INT_COLUMN),
+    (WcWmEngDataParticleKey.WINCH_VOLTAGE, FLOAT_COLUMN),
+    (None, INT_COLUMN),
+    (None, INT_COLUMN),
+    (WcWmEngDataParticleKey.ROPE_ON_DRUM, FLOAT_COLUMN)
+])
+
+
 class WcWmMetadataDataParticle(CsppMetadataDataParticle):
     """
     Class for building a wc wm metadata particle
@@ -245,4 +263,5 @@ class WcWmCsppParser(CsppParser):
                                              stream_handle,
                                              exception_callback,
                                              DATA_REGEX,
-                                             ignore_matcher=None)
+                                             ignore_matcher=None,
+                                             column_schema=COLUMN_SCHEMA)
@@ -57,7 +57,10 @@ class WfpCFileCommonParser(BufferLoadingParser):
                  *args, **kwargs):
         self._start_time = 0.0
         self._time_increment = 0.0
+        self._number_samples = 0
         self._filesize = filesize
+        # the file position to stop reading at, found once the parse options are known
+        self._end_position = None
         if filesize < FOOTER_BYTES:
             raise SampleException('File must be at least %d bytes to read the timestamp' % FOOTER_BYTES)
         self._read_state = {StateKey.POSITION: 0,
@@ -158,6 +161,7 @@ class WfpCFileCommonParser(BufferLoadingParser):
 
             if not number_samples.is_integer():
                 raise SampleException("File does not evenly fit into number of samples")
+            self._number_samples = int(number_samples)
             if not self._read_state[StateKey.METADATA_SENT]:
                 self.footer_data = (match.group(2), number_samples)
             # reset the file handle to the beginning of the file
@@ -184,6 +188,38 @@ class WfpCFileCommonParser(BufferLoadingParser):
         self._read_state = state_obj
         self._stream_handle.seek(state_obj[StateKey.POSITION])
 
+    def get_block(self, size=1024):
+        """
+        Get a block of data records.  The sample records are evenly spaced in time,
+        so only the records in the time window of the parse options are read.
+        @param size The size of the block to try to read
+        @retval The length of data retrieved
+        @throws EOFError when the end of the file or time window is reached
+        """
+        if self._end_position is None:
+            self._end_position = self._filesize
+            if self.parse_options is not None and self.parse_options.has_time_window():
+                self._skip_to_time_window()
+
+        size = min(size, self._end_position - self._stream_handle.tell())
+        return super(WfpCFileCommonParser, self).get_block(max(size, 0))
+
+    def _skip_to_time_window(self):
+        """
+        Seek to the first sample record in the time window of the parse options,
+        and stop reading after the last one
+        """
+        first, end = self.parse_options.record_window(self._number_samples, self.calc_timestamp)
+
+        if first > self._read_state[StateKey.RECORDS_READ]:
+            self._read_state[StateKey.RECORDS_READ] = first
+            self._read_state[StateKey.POSITION] = first * DATA_RECORD_BYTES
+            self._stream_handle.seek(first * DATA_RECORD_BYTES)
+
+        if end < self._number_samples:
+            # the end of profile marker and timestamps are not needed
+            self._end_position = max(end, first) * DATA_RECORD_BYTES
+
     def _increment_state(self, increment, records_read):
         """
         Increment the parser state
@@ -68,6 +68,9 @@ __license__ = 'Apache 2.0'
 
 import ntplib
 import re
+import string
+
+import numpy
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -77,6 +80,7 @@ from mi.core.exceptions import RecoverableSampleException
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.core.log import get_logging_metaclass
 from mi.dataset.dataset_parser import SimpleParser
+from mi.dataset.parser.line_classifier import LineClassifier
 from mi.dataset.parser.utilities import dcl_controller_timestamp_to_ntp_time
 from mi.dataset.parser.common_regexes import UNSIGNED_INT_REGEX, END_OF_LINE_REGEX, \
     DATE_YYYY_MM_DD_REGEX, TIME_HR_MIN_SEC_MSEC_REGEX
@@ -87,6 +91,13 @@ MAX_NUM_FREQS = 4
 # Values below referenced from ZPLSG_Specifications_AZFP-2013_2.pdf
 VALID_FREQUENCIES = ('38', '70', '125', '200', '455', '770', None)
 
+# The number of fields before the bin values in each channel block: board number and frequency
+CHANNEL_HEADER_FIELDS = 2
+# Fills the profiles of channels with fewer bins than the others
+MISSING_BIN_VALUE = -1
+# Values too large for the profile arrays are read as this value
+INT64_MAX = numpy.iinfo(numpy.int64).max
+
 
 class ZplscCParticleKey(BaseEnum):
     """
@@ -161,6 +172,31 @@ SENSOR_DATA_MATCHER = re.compile(r"""
     %(END_OF_LINE_REGEX)s
     """ % common_matches, re.VERBOSE)
 
+# All the record types, in the order they are checked
+LINE_CLASSIFIER = LineClassifier([('DCL_LOG', DCL_LOG_MATCHER),
+                                  ('PHASE_STATUS', PHASE_STATUS_MATCHER),
+                                  ('SENSOR_DATA', SENSOR_DATA_MATCHER)])
+
+
+class BinValues(list):
+    """
+    The bin values of a channel, already converted to integers by the parser
+    """
+    pass
+
+
+def encode_bin_values(values):
+    """
+    Encode the bin values of a channel
+    @param values: BinValues, or the list of bin value strings of the channel
+    @return: list of the integer bin values
+    """
+    if isinstance(values, BinValues):
+        return list(values)
+
+    return map(int, values)
+
+
 # The following is used to parse and encode values and is defined as below:
 # (parameter name, count (or count reference), encoding function)
 ZPLSC_C_DATA_RULES = [
@@ -186,19 +222,19 @@ ZPLSC_C_DATA_RULES = [
 
     (ZplscCParticleKey.BOARD_NUM_CHAN_1, 1,              str),
     (ZplscCParticleKey.FREQ_CHAN_1,      1,              int),
-    (ZplscCParticleKey.VALS_CHAN_1,      ZplscCParticleKey.NUM_BINS_FREQ_1, lambda x: map(int, x)),
+    (ZplscCParticleKey.VALS_CHAN_1,      ZplscCParticleKey.NUM_BINS_FREQ_1, encode_bin_values),
 
     (ZplscCParticleKey.BOARD_NUM_CHAN_2, 1,              str),
     (ZplscCParticleKey.FREQ_CHAN_2,      1,              int),
-    (ZplscCParticleKey.VALS_CHAN_2,      ZplscCParticleKey.NUM_BINS_FREQ_2, lambda x: map(int, x)),
+    (ZplscCParticleKey.VALS_CHAN_2,      ZplscCParticleKey.NUM_BINS_FREQ_2, encode_bin_values),
 
     (ZplscCParticleKey.BOARD_NUM_CHAN_3, 1,              str),
     (ZplscCParticleKey.FREQ_CHAN_3,      1,              int),
-    (ZplscCParticleKey.VALS_CHAN_3,      ZplscCParticleKey.NUM_BINS_FREQ_3, lambda x: map(int, x)),
+    (ZplscCParticleKey.VALS_CHAN_3,      ZplscCParticleKey.NUM_BINS_FREQ_3, encode_bin_values),
 
     (ZplscCParticleKey.BOARD_NUM_CHAN_4, 1,              str),
     (ZplscCParticleKey.FREQ_CHAN_4,      1,              int),
-    (ZplscCParticleKey.VALS_CHAN_4,      ZplscCParticleKey.NUM_BINS_FREQ_4, lambda x: map(int, x))
+    (ZplscCParticleKey.VALS_CHAN_4,      ZplscCParticleKey.NUM_BINS_FREQ_4, encode_bin_values)
 ]
 
 
@@ -206,6 +242,39 @@ class DataParticleType(BaseEnum):
     ZPLSC_C_DCL_SAMPLE = 'zplsc_c_instrument'
 
 
+def decode_channel_blocks(fields, bin_counts):
+    """
+    Convert the channel blocks of a condensed data record to integers in one step.
+    Each block holds the board number, the frequency and the bin values of a channel.
+    @param fields: list of the condensed data fields of the channel blocks
+    @param bin_counts: list of the number of bins of each channel
+    @return: 2-D array of the bin values with a row per channel, padded with
+             MISSING_BIN_VALUE where a channel has fewer bins than the others,
+             or None if the fields are not all unsigned integers
+    """
+    text = ','.join(fields)
+    if not fields or '' in fields or text.translate(None, string.digits) != ',' * (len(fields) - 1):
+        return None
+
+    values = numpy.fromstring(text, dtype=numpy.int64, sep=',')
+    if len(values) != len(fields) or (values == INT64_MAX).any():
+        return None
+
+    # channels with the same number of bins are rows of the blocks, without copying
+    if len(set(bin_counts)) == 1:
+        return values.reshape(len(bin_counts), -1)[:, CHANNEL_HEADER_FIELDS:]
+
+    profiles = numpy.empty((len(bin_counts), max(bin_counts)), dtype=numpy.int64)
+    profiles.fill(MISSING_BIN_VALUE)
+
+    offset = CHANNEL_HEADER_FIELDS
+    for row, count in enumerate(bin_counts):
+        profiles[row, :count] = values[offset:offset + count]
+        offset += count + CHANNEL_HEADER_FIELDS
+
+    return profiles
+
+
 class ZplscCInstrumentDataParticle(DataParticle):
     """
     Class for generating the zplsc_c instrument particle.
@@ -214,6 +283,10 @@ class ZplscCInstrumentDataParticle(DataParticle):
     _data_particle_type = DataParticleType.ZPLSC_C_DCL_SAMPLE
     __metaclass__ = get_logging_metaclass(log_level='trace')
 
+    # 2-D array of the bin values of the particle, with a row per frequency
+    # channel, or None if the values could not be decoded together
+    profiles = None
+
     def _build_parsed_values(self):
         """
         Build parsed values for Instrument Data Particle.
@@ -248,27 +321,26 @@ class ZplscCDclParser(SimpleParser):
         # Loop over all lines in the data file and parse the data to generate particles
         for number, line in enumerate(self._stream_handle, start=1):
 
+            record_type, match = LINE_CLASSIFIER.classify(line)
+
             # Check if this is the dcl status log
-            match = DCL_LOG_MATCHER.match(line)
-            if match is not None:
+            if record_type == 'DCL_LOG':
                 log.trace("MATCHED DCL_LOG_MATCHER: %s: %s", number, match.groups())
                 # No data to extract, move on to the next line
                 continue
 
             # Check if this is the instrument phase status log
-            match = PHASE_STATUS_MATCHER.match(line)
-            if match is not None:
+            if record_type == 'PHASE_STATUS':
                 log.trace("MATCHED PHASE_STATUS_MATCHER: %s: %s", number, match.groups())
                 # No data to extract, move on to the next line
                 continue
 
             # Check if this is the instrument condensed ASCII data
-            match = SENSOR_DATA_MATCHER.match(line)
-            if match is not None:
+            if record_type == 'SENSOR_DATA':
                 log.trace("MATCHED SENSOR_DATA_MATCHER: %s: %s", number, match.groups())
 
                 # Extract the condensed ASCII data from this line
-                data_dict = self.parse_line(match)
+                data_dict, profiles = self.parse_line(match)
                 if data_dict is None:
                     log.error('Erroneous data found in line %s: %s', number, line)
                     continue
@@ -280,6 +352,7 @@ class ZplscCDclParser(SimpleParser):
                 particle = self._extract_sample(
                     ZplscCInstrumentDataParticle, None, data_dict, time_stamp)
                 if particle is not None:
+                    particle.profiles = profiles
                     log.trace('Parsed particle: %s' % particle.generate_dict())
                     self._record_buffer.append(particle)
 
@@ -295,7 +368,8 @@ class ZplscCDclParser(SimpleParser):
         Parse a line from the zplsc_c log file (averaged condensed data).
         If erroneous data is detected return None so the line will be skipped.
         @param matches: MatchObject containing regex matches for ZPLSC_C condensed ASCII data
-        @return: dictionary of values with the particle names as keys or None
+        @return: (dictionary of values with the particle names as keys or None,
+                 2-D array of the bin values of the channels or None)
         """
         data = [matches.group('transmission_timestamp')] + matches.group('condensed_data').split(',')
         num_freqs = matches.group('num_of_freqs')
@@ -303,11 +377,15 @@ class ZplscCDclParser(SimpleParser):
         # Number of frequencies should be a number from 1 through 4 only
         if not num_freqs.isdigit() or not (1 <= int(num_freqs) <= MAX_NUM_FREQS):
             log.error("Invalid data: Number of frequencies out of range(1-4): %s", num_freqs)
-            return None
+            return None, None
 
         data_dict = {}
         index = 0
 
+        # The start of the channel blocks and the number of bins of each channel
+        channel_index = None
+        bin_counts = []
+
         # Iterate through the ZPLSC_C data rules to parse out the individual condensed ASCII data
         for key, counter, encoder in ZPLSC_C_DATA_RULES:
             # Skip channels beyond the expected number of frequencies (from 1-4)
@@ -316,6 +394,9 @@ class ZplscCDclParser(SimpleParser):
                 data_dict[key] = None
                 continue
 
+            if key == ZplscCParticleKey.BOARD_NUM_CHAN_1:
+                channel_index = index
+
             # Retrieve the expected length of data for this key
             count = counter
             if type(counter) is str:
@@ -323,15 +404,16 @@ class ZplscCDclParser(SimpleParser):
                 if not count.isdigit():
                     log.error("Invalid data: %s value %s %s is not a valid count integer.",
                               counter, type(count), count)
-                    return None
+                    return None, None
                 count = int(count)
+                bin_counts.append(count)
 
             # Check if position and length are within array bounds
             if not 0 <= (len(data) - index) >= count:
                 log.error("Invalid data: Expected data count(%s) out of bounds for %s"
                           ", length:%s, index: %s",
                           count, key, len(data), index)
-                return None
+                return None, None
 
             try:
                 if count > 1:
@@ -343,7 +425,7 @@ class ZplscCDclParser(SimpleParser):
             except IndexError, e:
                 log.error("IndexError %s: %s: %s >= data length %s, index: %s",
                           e, key, count, (len(data)-index), index)
-                return None
+                return None, None
 
             index += count
 
@@ -353,7 +435,7 @@ class ZplscCDclParser(SimpleParser):
             if data_dict[name] not in (str(value), None):
                 log.error("Invalid data: %s should always be \'%s\' or None: %s %s",
                           name, value, data_dict[name], type(data_dict[name]))
-                return None
+                return None, None
 
         # Check for valid frequency value per channel
         for name in (ZplscCParticleKey.FREQ_CHAN_1, ZplscCParticleKey.FREQ_CHAN_2,
@@ -361,6 +443,18 @@ class ZplscCDclParser(SimpleParser):
             if data_dict[name] not in VALID_FREQUENCIES:
                 log.error("Invalid data: %s: %s (Valid values %s)",
                           name, data_dict[name], VALID_FREQUENCIES)
-                return None
+                return None, None
+
+        # Convert the bin values of all the channels together.  If they cannot all be
+        # converted, the particle converts the values of each channel on its own.
+        profiles = decode_channel_blocks(data[channel_index:index], bin_counts)
+
+        if profiles is not None:
+            for row, (key, count) in enumerate(zip((ZplscCParticleKey.VALS_CHAN_1, ZplscCParticleKey.VALS_CHAN_2,
+                                                    ZplscCParticleKey.VALS_CHAN_3, ZplscCParticleKey.VALS_CHAN_4),
+                                                   bin_counts)):
+                # a single value is left as it was found
+                if count > 1:
+                    data_dict[key] = BinValues(profiles[row, :count].tolist())
 
-        return data_dict
\ No newline at end of file
+        return data_dict, profiles
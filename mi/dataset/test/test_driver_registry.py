@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_driver_registry
+@file mi/dataset/test/test_driver_registry.py
+@brief Test code for the driver manifest and registry
+"""
+
+import json
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.driver_registry import DriverRegistry, build_manifest, MANIFEST_PATH
+
+NUTNR_DRIVER = 'mi.dataset.driver.nutnr_b.dcl_full.nutnr_b_dcl_full_recovered_driver'
+
+
+@attr('UNIT', group='mi')
+class DriverRegistryUnitTestCase(MiUnitTest):
+
+    def setUp(self):
+        MiUnitTest.setUp(self)
+        self.registry = DriverRegistry()
+
+    def test_manifest_up_to_date(self):
+        """
+        The installed manifest must match the source, so rebuild it with
+        utils/build_driver_manifest.py whenever a driver changes
+        """
+        with open(MANIFEST_PATH) as manifest_file:
+            manifest = json.load(manifest_file)
+
+        self.assertEqual(manifest, json.loads(json.dumps(build_manifest())))
+
+    def test_entry(self):
+        entry = self.registry.get(NUTNR_DRIVER)
+
+        self.assertEqual(entry.version, '15.7.1')
+        self.assertEqual(entry.parsers, ['mi.dataset.parser.nutnr_b_dcl_full.NutnrBDclFullRecoveredParser'])
+        self.assertEqual(entry.particle_streams, ['nutnr_b_dcl_dark_full_instrument_recovered',
+                                                  'nutnr_b_dcl_full_instrument_recovered',
+                                                  'nutnr_b_dcl_full_metadata_recovered'])
+        self.assertTrue(entry.matches_file('/data/20140101.nutnr_b_dcl_full.log'))
+        self.assertFalse(entry.matches_file('20140101.nutnr_b_dcl_full.mpk'))
+
+    def test_find(self):
+        found = self.registry.find(stream='nutnr_b_dcl_full_instrument_recovered')
+        self.assertEqual([entry.module for entry in found], [NUTNR_DRIVER])
+
+        found = self.registry.find(parser='NutnrBDclFullRecoveredParser', file_path='a.log')
+        self.assertEqual([entry.module for entry in found], [NUTNR_DRIVER])
+
+        self.assertEqual(self.registry.find(version='15.7.1', file_path='a.unknown'), [])
+
+    def test_resolve_and_load(self):
+        for name in (NUTNR_DRIVER,
+                     'nutnr_b_dcl_full_recovered_driver',
+                     'mi/dataset/driver/nutnr_b/dcl_full/nutnr_b_dcl_full_recovered_driver.py'):
+            self.assertEqual(self.registry.resolve(name).module, NUTNR_DRIVER)
+
+        self.assertIsNone(self.registry.resolve('no_such_driver'))
+
+        module = self.registry.load(NUTNR_DRIVER)
+        self.assertEqual(module.__name__, NUTNR_DRIVER)
+        self.assertEqual(self.registry.parse_function(NUTNR_DRIVER).version, '15.7.1')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_file_sniffer
+@file mi/dataset/test/test_file_sniffer.py
+@brief Test code for recognizing the family of raw data files
+"""
+
+import os
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.driver import RESOURCE_PATH
+from mi.dataset.file_sniffer import sniff, sniff_sample, candidate_drivers, FileSample
+
+SAMPLE_FAMILIES = [
+    ('nutnr_b/dcl_full/resource/20130424.nutnr_b_dcl_full.log', 'dcl'),
+    ('ctdmo_ghqr/sio/resource/CTD02000.DAT', 'sio'),
+    ('adcps_jln/stc/resource/ADCP_CCE1T_20.PD0', 'pd0'),
+    ('dpc/resource/acm_1_20140105T015004_6400.mpk', 'msgpack'),
+    ('ctdpf_j/cspp/resource/11079364_PPB_CTD.txt', 'cspp'),
+    ('moas/gl/ctdgv/resource/unit_364_2013_192_1_0.mrg', 'glider'),
+    ('WFP_ENG/STC_IMODEM/resource/E0000039.DAT', 'wfp_e'),
+    ('ctdpf_ckl/wfp/resource/C0000058.DAT', 'wfp_c'),
+]
+
+
+@attr('UNIT', group='mi')
+class FileSnifferUnitTestCase(MiUnitTest):
+
+    def test_families(self):
+        for sample_path, family_name in SAMPLE_FAMILIES:
+            family = sniff(os.path.join(RESOURCE_PATH, sample_path))
+            self.assertIsNotNone(family, sample_path)
+            self.assertEqual(family.name, family_name, sample_path)
+
+    def test_unrecognized(self):
+        file_path = os.path.join(RESOURCE_PATH, 'auv_eng/auv/resource/subset_state.csv')
+        self.assertIsNone(sniff(file_path))
+        self.assertEqual(candidate_drivers(file_path), [])
+
+        self.assertIsNone(sniff_sample(FileSample('', '', 0)))
+
+    def test_candidates(self):
+        file_path = os.path.join(RESOURCE_PATH, 'ctdbp_cdef/dcl/resource/20131123.ctdbp1.log')
+        modules = [entry.module for entry in candidate_drivers(file_path)]
+
+        # the drivers of the instrument in the file name come first
+        self.assertEqual(modules[:2], ['mi.dataset.driver.ctdbp_cdef.dcl.ctdbp_cdef_dcl_recovered_driver',
+                                       'mi.dataset.driver.ctdbp_cdef.dcl.ctdbp_cdef_dcl_telemetered_driver'])
+        self.assertNotIn('mi.dataset.driver.ctdpf_j.cspp.ctdpf_j_cspp_recovered_driver', modules)
+
+        # nothing in the name of this msgpack file says which of the msgpack drivers reads it
+        file_path = os.path.join(RESOURCE_PATH, 'dpc/resource/acm_1_20140105T015004_6400.mpk')
+        self.assertEqual(sniff(file_path).name, 'msgpack')
+        candidates = candidate_drivers(file_path)
+        self.assertIn('mi.dataset.driver.dpc.dpc_driver', [entry.module for entry in candidates])
+        self.assertFalse(candidates.ambiguous)
+        self.assertIsNone(candidates.best)
+
+    def test_instance_numbers(self):
+        # pco2w1 names the pco2w instrument, and drivers of other instruments come after them
+        file_path = os.path.join(RESOURCE_PATH, 'pco2w_abc/dcl/resource/20140817.pco2w1.log')
+        candidates = candidate_drivers(file_path)
+        modules = [entry.module for entry in candidates]
+        self.assertEqual(modules[:2], ['mi.dataset.driver.pco2w_abc.dcl.pco2w_abc_dcl_recovered_driver',
+                                       'mi.dataset.driver.pco2w_abc.dcl.pco2w_abc_dcl_telemetered_driver'])
+        self.assertIn('mi.dataset.driver.ctdbp_cdef.dcl.ctdbp_cdef_dcl_recovered_driver', modules[2:])
+
+        # recovered and telemetered drivers are equally likely
+        self.assertTrue(candidates.ambiguous)
+        self.assertIsNone(candidates.best)
+
+        file_path = os.path.join(RESOURCE_PATH, 'zplsc_c/dcl/resource/20150407A.zplsc.log')
+        candidates = candidate_drivers(file_path)
+        self.assertFalse(candidates.ambiguous)
+        self.assertEqual(candidates.best.module, 'mi.dataset.driver.zplsc_c.dcl.zplsc_c_dcl_telemetered_driver')
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_harvester
+@file mi/dataset/test/test_harvester.py
+@brief Test code for harvesting data files from a directory
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.exceptions import ConfigurationException
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.dataset_driver import ParticleDataHandler
+from mi.dataset.dataset_parser import DataSetDriverConfigKeys
+from mi.dataset.driver import RESOURCE_PATH
+from mi.dataset.driver.presf_abc.dcl import presf_abc_dcl_telemetered_driver
+from mi.dataset.harvester import Harvester, LEDGER_FILE_NAME
+
+NUTNR_DRIVER = 'mi.dataset.driver.nutnr_b.dcl_full.nutnr_b_dcl_full_recovered_driver'
+NUTNR_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'nutnr_b', 'dcl_full', 'resource')
+PRESF_DRIVER = 'mi.dataset.driver.presf_abc.dcl.presf_abc_dcl_telemetered_driver'
+PRESF_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'presf_abc', 'dcl', 'resource')
+ZPLSC_DRIVER = 'mi.dataset.driver.zplsc_c.dcl.zplsc_c_dcl_telemetered_driver'
+ZPLSC_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'zplsc_c', 'dcl', 'resource')
+
+
+@attr('UNIT', group='mi')
+class HarvesterUnitTestCase(MiUnitTest):
+
+    def setUp(self):
+        MiUnitTest.setUp(self)
+        self.temp_directory = tempfile.mkdtemp()
+        self.data_directory = os.path.join(self.temp_directory, 'data')
+        self.storage_directory = os.path.join(self.temp_directory, 'storage')
+        os.makedirs(os.path.join(self.data_directory, 'sub'))
+
+        self.config = {
+            DataSetDriverConfigKeys.DIRECTORY: self.data_directory,
+            DataSetDriverConfigKeys.STORAGE_DIRECTORY: self.storage_directory,
+            DataSetDriverConfigKeys.PATTERN: '*.log',
+            DataSetDriverConfigKeys.FILE_MOD_WAIT_TIME: 30,
+            DataSetDriverConfigKeys.MODULE: NUTNR_DRIVER
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_directory)
+
+    def add_file(self, file_name, directory='', age=100, resource_path=NUTNR_RESOURCE_PATH, target_name=None):
+        """
+        Copy a sample file into the data directory, last modified age seconds ago
+        """
+        path = os.path.join(self.data_directory, directory, target_name or file_name)
+        shutil.copy(os.path.join(resource_path, file_name), path)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def test_harvest(self):
+        first = self.add_file('20130424.nutnr_b_dcl_full.log')
+        second = self.add_file('20040901.nutnr_b_dcl_full.log', directory='sub')
+        modifying = self.add_file('20031129.nutnr_b_dcl_full.log', age=0)
+
+        harvester = Harvester(self.config)
+        results = harvester.poll()
+
+        self.assertEqual(sorted(result.harvested_file.path for result in results), sorted([first, second]))
+        for result in results:
+            self.assertEqual(result.driver, NUTNR_DRIVER)
+            self.assertIsNone(result.error)
+            self.assertIn('nutnr_b_dcl_full_instrument_recovered', result.handler._samples)
+
+        # harvested files are not harvested again, and the file being modified is not ready yet
+        self.assertEqual(harvester.poll(), [])
+
+        results = harvester.poll(now=time.time() + 60)
+        self.assertEqual([result.harvested_file.path for result in results], [modifying])
+
+    def test_restart(self):
+        self.add_file('20130424.nutnr_b_dcl_full.log')
+        self.assertEqual(len(Harvester(self.config).poll()), 1)
+
+        harvester = Harvester(self.config)
+        self.assertEqual(len(harvester.ledger), 1)
+        self.assertEqual(harvester.poll(), [])
+
+        # a partly written last line of the ledger is ignored
+        with open(os.path.join(self.storage_directory, LEDGER_FILE_NAME), 'a') as ledger_file:
+            ledger_file.write('{"path": "/data/x.log", "si')
+
+        added = self.add_file('20040901.nutnr_b_dcl_full.log', directory='sub')
+        harvester = Harvester(self.config)
+        self.assertEqual([result.harvested_file.path for result in harvester.poll()], [added])
+
+    def parse_in_parts(self, path, data, splits):
+        """
+        Write a file in parts, harvesting it after each one
+        :return: the samples of each harvest, by stream
+        """
+        harvester = Harvester(self.config)
+        samples = {}
+        written = 0
+        for part, split in enumerate(splits + [len(data)]):
+            with open(path, 'ab') as data_file:
+                data_file.write(data[written:split])
+            written = split
+            mtime = time.time() - 100 + part
+            os.utime(path, (mtime, mtime))
+
+            results = harvester.poll()
+            self.assertEqual([result.harvested_file.path for result in results], [path])
+            self.assertFalse(results[0].failure)
+            for stream, stream_samples in results[0].handler._samples.iteritems():
+                samples.setdefault(stream, []).extend(stream_samples)
+
+        self.assertEqual(harvester.ledger.checkpoint(path)['offset'], len(data))
+        self.assertEqual(harvester.poll(), [])
+        return samples
+
+    def test_changed_file(self):
+        self.config[DataSetDriverConfigKeys.MODULE] = PRESF_DRIVER
+        with open(os.path.join(PRESF_RESOURCE_PATH, '20140105_trim.presf.log'), 'rb') as resource_file:
+            data = resource_file.read()
+        path = os.path.join(self.data_directory, '20140105.presf.log')
+
+        # a file appended to is parsed from where the last harvest ended, the first part
+        # ends part way through a wave burst and a line
+        samples = self.parse_in_parts(path, data, [data.index('wave: end burst') - 10])
+
+        whole = presf_abc_dcl_telemetered_driver.parse(None, path, ParticleDataHandler())
+        self.assertEqual(sorted(samples), sorted(whole._samples))
+        for stream in samples:
+            self.assertEqual([json.loads(sample)['values'] for sample in samples[stream]],
+                             [json.loads(sample)['values'] for sample in whole._samples[stream]])
+
+        # the checkpoint is known to a restarted harvester
+        self.assertEqual(Harvester(self.config).poll(), [])
+
+    def test_changed_file_not_resumable(self):
+        path = self.add_file('20130424.nutnr_b_dcl_full.log')
+        harvester = Harvester(self.config)
+        self.assertEqual(len(harvester.poll()), 1)
+
+        # nutnr_b_dcl_full can not be resumed, so its particles are not delivered again
+        with open(path, 'ab') as data_file:
+            data_file.write('\n')
+        mtime = time.time() - 100
+        os.utime(path, (mtime, mtime))
+        self.assertEqual(harvester.poll(), [])
+
+    def test_retry(self):
+        del self.config[DataSetDriverConfigKeys.MODULE]
+        unknown = self.add_file('20040901.nutnr_b_dcl_full.log', target_name='20040901.unknown.log')
+
+        harvester = Harvester(self.config, max_attempts=2)
+        for attempt in (1, 2):
+            results = harvester.poll()
+            self.assertEqual([result.harvested_file.path for result in results], [unknown])
+            self.assertEqual(harvester.ledger.records[unknown]['attempts'], attempt)
+
+        # tried as many times as allowed while unchanged, and again once it changes
+        self.assertEqual(harvester.poll(), [])
+        mtime = time.time() - 50
+        os.utime(unknown, (mtime, mtime))
+        self.assertEqual(len(harvester.poll()), 1)
+        self.assertEqual(harvester.ledger.records[unknown]['attempts'], 1)
+
+    def test_workers(self):
+        paths = [self.add_file('20130424.nutnr_b_dcl_full.log'), self.add_file('20040901.nutnr_b_dcl_full.log')]
+
+        with Harvester(self.config, workers=2, batch_size=1) as harvester:
+            results = harvester.poll()
+
+        self.assertEqual(sorted(result.harvested_file.path for result in results), sorted(paths))
+        self.assertFalse(any(result.error for result in results))
+
+    def test_routing(self):
+        del self.config[DataSetDriverConfigKeys.MODULE]
+        zplsc = self.add_file('20150407A.zplsc.log', resource_path=ZPLSC_RESOURCE_PATH)
+        # the recovered and telemetered nutnr drivers are equally likely
+        nutnr = self.add_file('20130424.nutnr_b_dcl_full.log')
+        # a name which matches no driver
+        unknown = self.add_file('20040901.nutnr_b_dcl_full.log', target_name='20040901.unknown.log')
+
+        results = dict((result.harvested_file.path, result) for result in Harvester(self.config).poll())
+
+        self.assertEqual(results[zplsc].driver, ZPLSC_DRIVER)
+        self.assertIsNone(results[zplsc].error)
+        for path in (nutnr, unknown):
+            self.assertIsNone(results[path].driver)
+            self.assertIsNone(results[path].handler)
+            self.assertTrue(results[path].failure)
+
+    def test_missing_configuration(self):
+        del self.config[DataSetDriverConfigKeys.STORAGE_DIRECTORY]
+        with self.assertRaises(ConfigurationException):
+            Harvester(self.config)
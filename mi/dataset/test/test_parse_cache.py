@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_parse_cache
+@file mi/dataset/test/test_parse_cache.py
+@brief Test code for the cache of the particles parsed from raw data files
+"""
+
+import os
+import shutil
+import tempfile
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.dataset_driver import ParticleDataHandler
+from mi.dataset.driver import RESOURCE_PATH
+from mi.dataset.driver.camhd_a import camhd_a_telemetered_driver
+from mi.dataset.driver.metbk_a.dcl import metbk_a_dcl_recovered_driver
+from mi.dataset.driver.presf_abc.dcl import presf_abc_dcl_telemetered_driver
+from mi.dataset.parse_cache import ParseCache, set_parse_cache, ENTRY_EXTENSION
+
+PRESF_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'presf_abc', 'dcl', 'resource')
+METBK_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'metbk_a', 'dcl', 'resource')
+CAMHD_FILE_PATH = os.path.join(RESOURCE_PATH, 'camhd_a', 'resource', 'RS03ASHS-PN03B-06-CAMHDA301',
+                               '2015', '11', '19', 'CAMHDA301-20151119T210000Z.mp4')
+
+
+@attr('UNIT', group='mi')
+class ParseCacheUnitTestCase(MiUnitTest):
+
+    def setUp(self):
+        MiUnitTest.setUp(self)
+        self.cache_directory = tempfile.mkdtemp()
+        self.cache = ParseCache(self.cache_directory)
+        set_parse_cache(self.cache)
+
+    def tearDown(self):
+        set_parse_cache(None)
+        shutil.rmtree(self.cache_directory)
+
+    @staticmethod
+    def parse(file_name):
+        particle_data_handler = ParticleDataHandler()
+        presf_abc_dcl_telemetered_driver.parse(None, os.path.join(PRESF_RESOURCE_PATH, file_name),
+                                                particle_data_handler)
+        return particle_data_handler
+
+    def test_replay(self):
+        for file_name in ['20140105_trim.presf.log', '20140105_invts.presf.log']:
+            parsed = self.parse(file_name)
+            replayed = self.parse(file_name)
+
+            self.assertEqual(replayed._samples, parsed._samples)
+            self.assertEqual(replayed._failure, parsed._failure)
+
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 2)
+        # the second file has an invalid tide record
+        self.assertTrue(replayed._failure)
+
+    def test_failure_replay(self):
+        # the metbk exception callback sets the failure on the handler the driver was given
+        file_path = os.path.join(METBK_RESOURCE_PATH, '20140805.metbk2_bad_sensor.log')
+        parsed = metbk_a_dcl_recovered_driver.parse(None, file_path, ParticleDataHandler())
+        replayed = metbk_a_dcl_recovered_driver.parse(None, file_path, ParticleDataHandler())
+
+        self.assertEqual(self.cache.hits, 1)
+        self.assertTrue(parsed._failure)
+        self.assertTrue(replayed._failure)
+        self.assertEqual(replayed._samples, parsed._samples)
+
+    def test_failed_handler_not_cached(self):
+        # a handler which failed on an earlier file can not show whether this one failed
+        particle_data_handler = ParticleDataHandler()
+        particle_data_handler.setParticleDataCaptureFailure()
+        presf_abc_dcl_telemetered_driver.parse(None, os.path.join(PRESF_RESOURCE_PATH, '20140105_trim.presf.log'),
+                                                particle_data_handler)
+
+        self.assertEqual(os.listdir(self.cache_directory), [])
+
+    def test_file_name(self):
+        # the camhd_a particle holds the path and time from the file name, not the file contents
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        samples = []
+        for date in ['2015/11/19', '2016/01/02']:
+            file_path = os.path.join(directory, 'CAMHDA301', date,
+                                     'CAMHDA301-%sT210000Z.mp4' % date.replace('/', ''))
+            os.makedirs(os.path.dirname(file_path))
+            shutil.copy(CAMHD_FILE_PATH, file_path)
+
+            particle_data_handler = camhd_a_telemetered_driver.parse(None, file_path, ParticleDataHandler())
+            self.assertFalse(particle_data_handler._failure)
+            samples.append(particle_data_handler._samples)
+
+        self.assertEqual(self.cache.hits, 0)
+        self.assertNotEqual(samples[0], samples[1])
+        self.assertIn('2016/01/02', str(samples[1]))
+
+    def test_evict(self):
+        self.parse('20140105_trim.presf.log')
+        self.parse('20140417.presf3.log')
+        paths = [os.path.join(self.cache_directory, name) for name in os.listdir(self.cache_directory)]
+        self.assertEqual(len(paths), 2)
+
+        # make the first entry the least recently used and leave room for one entry
+        os.utime(paths[0], (0, 0))
+        self.cache.max_bytes = max(os.path.getsize(path) for path in paths)
+        self.cache.evict()
+
+        self.assertFalse(os.path.exists(paths[0]))
+        self.assertTrue(os.path.exists(paths[1]))
+        self.assertTrue(paths[1].endswith(ENTRY_EXTENSION))
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_time_index
+@file mi/dataset/test/test_time_index.py
+@brief Test code for the sidecar time index of raw data files
+"""
+
+import os
+import shutil
+import tempfile
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.dataset.dataset_parser import DataSetDriverConfigKeys, ParseOptions
+from mi.dataset.driver import RESOURCE_PATH
+from mi.dataset.parser.adcp_pd0 import AdcpPd0Parser, VelocityEarth
+from mi.dataset.parser.mopak_o_dcl import MopakODclParser, MopakParticleClassType, \
+    MopakODclAccelParserRecoveredDataParticle, MopakODclRateParserRecoveredDataParticle
+from mi.dataset.time_index import build_index, load_index, index_path
+
+MOPAK_FILE_NAME = '20140120_140004_extradata.mopak.log'
+MOPAK_RESOURCE_PATH = os.path.join(RESOURCE_PATH, 'cg_stc_eng', 'stc', 'resource')
+PD0_FILE_PATH = os.path.join(RESOURCE_PATH, 'adcps_jln', 'stc', 'resource', 'ADCP_CCE1T_20.000')
+
+
+@attr('UNIT', group='mi')
+class TimeIndexUnitTestCase(MiUnitTest):
+
+    def setUp(self):
+        MiUnitTest.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, MOPAK_FILE_NAME)
+        shutil.copy(os.path.join(MOPAK_RESOURCE_PATH, MOPAK_FILE_NAME), self.file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def parse(self, parse_options=None):
+        config = {
+            DataSetDriverConfigKeys.PARTICLE_CLASSES_DICT: {
+                MopakParticleClassType.ACCEL_PARTICLE_CLASS: MopakODclAccelParserRecoveredDataParticle,
+                MopakParticleClassType.RATE_PARTICLE_CLASS: MopakODclRateParserRecoveredDataParticle
+            }
+        }
+        with open(self.file_path, 'rb') as stream_handle:
+            parser = MopakODclParser(config, stream_handle, MOPAK_FILE_NAME, self.fail)
+            parser.parse_options = parse_options
+            # the driver timestamp is the time each particle is made, so it is left out
+            return [(particle.data_particle_type(), particle.get_value('internal_timestamp'),
+                     particle.generate_dict()['values']) for particle in parser.get_records(20000)]
+
+    def test_seek(self):
+        particles = self.parse()
+        index = build_index(self.file_path, 'mopak', 100)
+
+        self.assertEqual(len(index), (len(particles) + 99) // 100)
+        self.assertEqual(index.entry(1).timestamp, particles[100][1])
+
+        start_time = particles[5000][1]
+        seek_options = ParseOptions(start_time=start_time, use_time_index=True)
+        self.assertEqual(self.parse(seek_options), particles[5000:])
+
+        # start times before the second entry read the file from its start
+        self.assertEqual(index.seek_position(particles[150][1]), 1)
+        self.assertEqual(index.seek_position(particles[0][1]), 0)
+
+    def test_stale_index(self):
+        build_index(self.file_path, 'mopak', 100)
+        self.assertIsNotNone(load_index(self.file_path, 'mopak'))
+        self.assertIsNone(load_index(self.file_path, 'pd0'))
+
+        stat = os.stat(self.file_path)
+        os.utime(self.file_path, (stat.st_atime, stat.st_mtime + 10))
+        self.assertIsNone(load_index(self.file_path, 'mopak'))
+
+    def test_pd0_index(self):
+        file_path = os.path.join(self.directory, os.path.basename(PD0_FILE_PATH))
+        shutil.copy(PD0_FILE_PATH, file_path)
+        index = build_index(file_path, 'pd0', 1)
+        self.assertTrue(os.path.exists(index_path(file_path)))
+
+        config = {
+            DataSetDriverConfigKeys.PARTICLE_CLASSES_DICT: {
+                'velocity': 'VelocityEarth',
+                'engineering': 'AdcpsEngineering',
+                'config': 'AdcpsConfig',
+                'bottom_track': 'EarthBottom',
+                'bottom_track_config': 'BottomConfig',
+            }
+        }
+        with open(file_path, 'rb') as stream_handle:
+            parser = AdcpPd0Parser(config, stream_handle, self.fail)
+            timestamps = [particle.get_value('internal_timestamp') for particle in parser.get_records(100)
+                          if isinstance(particle, VelocityEarth)]
+
+        self.assertEqual(index.entries['timestamp'].tolist(), timestamps)
@@ -0,0 +1,191 @@
+"""
+@package mi.dataset.time_index
+@file mi/dataset/time_index.py
+@brief Sidecar time index files for seeking into large raw data files by time
+
+Finding the records of an hour in a large PD0, velpt or mopak file means
+parsing it from the beginning.  A time index holds the byte offset, record
+type and timestamp of every stride-th record of a file, so a parser asked
+for records from a start time can begin at the last indexed record before
+it.  The index is kept next to the file, with the size and modification
+time of the file it was built from, and is ignored once the file changes.
+
+The records of each format are listed by a function of its parser module,
+found in ENTRY_FUNCTIONS, returning (offset, record type, timestamp) tuples
+in file order.  Timestamps are NTP seconds, as the internal timestamps of
+the particles.
+"""
+
+import importlib
+import itertools
+import os
+import tempfile
+from collections import namedtuple
+
+import numpy
+
+from mi.core.log import get_logger
+
+__license__ = 'Apache 2.0'
+
+log = get_logger()
+
+INDEX_SUFFIX = '.time_index.npz'
+
+DEFAULT_STRIDE = 100
+
+ENTRY_DTYPE = numpy.dtype([
+    ('offset', numpy.int64),
+    ('record_type', numpy.uint8),
+    ('timestamp', numpy.float64)
+])
+
+# the functions listing the records of a file of each format, imported when an index is built
+ENTRY_FUNCTIONS = {
+    'pd0': 'mi.dataset.parser.adcp_pd0.time_index_entries',
+    'velpt': 'mi.dataset.parser.velpt_ab.time_index_entries',
+    'mopak': 'mi.dataset.parser.mopak_o_dcl.time_index_entries',
+}
+
+TimeIndexEntry = namedtuple('TimeIndexEntry', ['offset', 'record_type', 'timestamp'])
+
+
+def index_path(file_path):
+    """
+    :param file_path: The path of a raw data file
+    :return: The path of the time index of the file
+    """
+    return file_path + INDEX_SUFFIX
+
+
+class TimeIndex(object):
+    """
+    The indexed records of a file, and the file they were read from
+    """
+
+    def __init__(self, entries, file_format, stride, file_size, file_mtime):
+        """
+        :param entries: numpy array of ENTRY_DTYPE, in file order
+        :param file_format: The format name, a key of ENTRY_FUNCTIONS
+        :param stride: The number of records per index entry
+        :param file_size: The size of the indexed file in bytes
+        :param file_mtime: The modification time of the indexed file
+        """
+        self.entries = entries
+        self.file_format = file_format
+        self.stride = stride
+        self.file_size = file_size
+        self.file_mtime = file_mtime
+
+    def __len__(self):
+        return len(self.entries)
+
+    def entry(self, position):
+        """
+        :param position: The position of an entry in the index
+        :return: The TimeIndexEntry
+        """
+        offset, record_type, timestamp = self.entries[position].tolist()
+        return TimeIndexEntry(offset, record_type, timestamp)
+
+    def seek_position(self, timestamp):
+        """
+        Find the entry to start reading at for the records from a time on.  The records
+        between entries are taken to be in time order, so the entry is the last one
+        before the time which follows no later indexed record.
+        :param timestamp: The NTP timestamp
+        :return: The position of the entry, 0 if the time is before the second entry
+        """
+        latest = numpy.maximum.accumulate(self.entries['timestamp'])
+        return max(int(numpy.searchsorted(latest, timestamp, side='left')) - 1, 0)
+
+    def is_current(self, file_path):
+        """
+        :param file_path: The path of the indexed file
+        :return: True if the file has the size and modification time it was indexed with
+        """
+        stat = os.stat(file_path)
+        return stat.st_size == self.file_size and stat.st_mtime == self.file_mtime
+
+    def save(self, path):
+        """
+        Write the index, replacing any existing one
+        :param path: The index file path
+        """
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as index_file:
+                numpy.savez(index_file, entries=self.entries, file_format=self.file_format,
+                            stride=self.stride, file_size=self.file_size, file_mtime=self.file_mtime)
+            os.rename(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def read(cls, path):
+        """
+        :param path: The index file path
+        :return: The TimeIndex
+        """
+        with numpy.load(path) as index_file:
+            return cls(index_file['entries'], str(index_file['file_format']), int(index_file['stride']),
+                       int(index_file['file_size']), float(index_file['file_mtime']))
+
+
+def build_index(file_path, file_format, stride=DEFAULT_STRIDE):
+    """
+    Index the records of a file and write the index next to it
+    :param file_path: The path of the raw data file
+    :param file_format: The format name, a key of ENTRY_FUNCTIONS
+    :param stride: The number of records per index entry
+    :return: The TimeIndex
+    """
+    if file_format not in ENTRY_FUNCTIONS:
+        raise ValueError('No time index format %r, expected one of %s' %
+                         (file_format, ', '.join(sorted(ENTRY_FUNCTIONS))))
+    if stride < 1:
+        raise ValueError('Time index stride must be at least 1')
+
+    module_name, function_name = ENTRY_FUNCTIONS[file_format].rsplit('.', 1)
+    entry_function = getattr(importlib.import_module(module_name), function_name)
+
+    # the file is looked at before it is read, so a file changed while it is read is not current
+    stat = os.stat(file_path)
+    entries = numpy.array(list(itertools.islice(entry_function(file_path), 0, None, stride)), dtype=ENTRY_DTYPE)
+
+    index = TimeIndex(entries, file_format, stride, stat.st_size, stat.st_mtime)
+    index.save(index_path(file_path))
+    log.info('Indexed %d records of %s every %d records', len(entries), file_path, stride)
+    return index
+
+
+def load_index(file_path, file_format):
+    """
+    Read the time index of a file, if it is current
+    :param file_path: The path of the raw data file
+    :param file_format: The format name the file is parsed as
+    :return: The TimeIndex, or None if there is no usable index
+    """
+    path = index_path(file_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        index = TimeIndex.read(path)
+    except (IOError, KeyError, ValueError) as e:
+        log.warn('Ignoring unreadable time index %s: %s', path, e)
+        return None
+
+    if index.file_format != file_format:
+        log.warn('Ignoring time index %s of %s files', path, index.file_format)
+        return None
+
+    if not index.is_current(file_path):
+        log.warn('Ignoring time index %s, %s has changed since it was indexed', path, file_path)
+        return None
+
+    if len(index) == 0:
+        return None
+
+    return index
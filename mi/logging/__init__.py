@@ -5,6 +5,9 @@
     Most users should get everything they need from right here:
         from mi.logging import log, config, CRITICAL,FATAL,ERROR,WARNING,WARN,INFO,DEBUG,TRACE
 
+    Code which logs on every record can check the level first through a LevelGuard, which caches the level checks:
+        from mi.logging import LevelGuard
+
     Within logging.yml files, classes in format and handler packages may also be used.
 
     The replay package is a stand-alone utility used with the RawRecordFormat.  See package documentation.
@@ -14,7 +17,7 @@
     Incorrect usage has been associated with higher rates of dementia, seepage and loss of fur in laboratory animals.
 """
 from mi.logging.configure import _LoggingConfiguration
-from mi.logging.logger import TRACE, _ScopedLogger
+from mi.logging.logger import TRACE, LevelGuard, _ScopedLogger
 
 # HACK: Timer (and possibly other places in utilties project)
 # fail to import built-in python logging module,
@@ -22,14 +22,19 @@
 from logging import NOTSET
 import logging.config
 import errno
-import yaml
 import collections
-from pkg_resources import resource_string
+import hashlib
+import json
+import os
 import mi.logging
 import logger
 import sys
 import traceback
 
+# yaml configuration is parsed once and cached as json, which loads without importing yaml.
+# the cache is per user, and keyed by a hash of the yaml text so it cannot go stale.
+CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'mi-logging')
+
 class _LoggingConfiguration(object):
 
     def __init__(self):
@@ -72,7 +77,7 @@ class _LoggingConfiguration(object):
             contents = self._read_file(configuration) or self._read_resource(configuration)
             if not contents:
                 raise IOError('failed to locate logging configuration: ' + configuration)
-            parsed = yaml.load(contents)
+            parsed = self.parse_configuration(contents)
             self.add_configuration(parsed, initial)
         elif isinstance(configuration, list) or isinstance(configuration, tuple):
             for item in configuration:
@@ -112,6 +117,37 @@ class _LoggingConfiguration(object):
         dynamic = configuration['context']['thread-local'] if 'thread-local' in configuration['context'] else {}
         self.set_logging_fields(dynamic, static, attribute_name)
 
+    def parse_configuration(self, contents):
+        """ parse yaml configuration text, or load it from the cache if the same text was parsed before """
+        cache_path = os.path.join(CACHE_DIRECTORY, hashlib.md5(contents).hexdigest() + '.json')
+        try:
+            with open(cache_path, 'r') as infile:
+                return _to_str(json.load(infile))
+        except (IOError, ValueError):
+            pass
+
+        import yaml     # slow to import, so only when the configuration is not cached
+        parsed = yaml.load(contents)
+
+        if not _json_safe(parsed):
+            self._debug('DEBUG LOGGING: not caching configuration, it does not survive a json round trip')
+            return parsed
+        if not _writable(CACHE_DIRECTORY):
+            return parsed
+
+        temporary_path = '%s.%d' % (cache_path, os.getpid())
+        try:
+            if not os.path.isdir(CACHE_DIRECTORY):
+                os.makedirs(CACHE_DIRECTORY, 0700)
+            with open(temporary_path, 'w') as outfile:
+                json.dump(parsed, outfile)
+            os.rename(temporary_path, cache_path)
+        except (IOError, OSError, TypeError, ValueError), e:
+            self._debug('DEBUG LOGGING: unable to cache configuration: %s' % e)
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        return parsed
+
     def replace_configuration(self, configuration):
         self.current_config.clear()
         self.add_configuration(configuration, initial=True)
@@ -159,6 +195,7 @@ class _LoggingConfiguration(object):
         return None
 
     def _read_resource(self, resource_name):
+        from pkg_resources import resource_string  # slow to import, so only when needed
         try:
             return resource_string('', resource_name)
         except IOError, e:
@@ -183,3 +220,36 @@ class _LoggingConfiguration(object):
         """WARNING: calling multiple times is currently additive -- will not replace fields"""
         filter = logger.AddFields(attribute_name, thread_local_fields, constant_fields)
         self.add_filter(filter)
+
+
+def _json_safe(value):
+    """ true if json gives back the same value: string keys, lists rather than tuples, and plain scalars """
+    if isinstance(value, dict):
+        return all(isinstance(k, basestring) and _json_safe(v) for k, v in value.iteritems())
+    if isinstance(value, list):
+        return all(_json_safe(item) for item in value)
+    return value is None or isinstance(value, (basestring, bool, int, long, float))
+
+
+def _writable(directory):
+    """ true if the directory, or the closest existing directory above it, can be written to """
+    while not os.path.isdir(directory):
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return False
+        directory = parent
+    return os.access(directory, os.W_OK | os.X_OK)
+
+
+def _to_str(value):
+    """ json gives unicode strings, where yaml gives str for the ascii ones """
+    if isinstance(value, dict):
+        return dict((_to_str(k), _to_str(v)) for k, v in value.iteritems())
+    if isinstance(value, list):
+        return [_to_str(item) for item in value]
+    if isinstance(value, unicode):
+        try:
+            return value.encode('ascii')
+        except UnicodeEncodeError:
+            return value
+    return value
@@ -1,7 +1,11 @@
 
+import copy
 import logging.handlers
+import Queue
+import re
 import StringIO
 import threading
+import time
 import sys
 import os
 
@@ -146,3 +150,225 @@ class PIDFileHandler(logging.handlers.RotatingFileHandler):
     """
     def __init__(self, filename, mode='a', maxBytes=0, backupCount=0, encoding=None, delay=0):
         super(BlockIOFileHandler,self).__init__(filename % os.getpid(), mode, maxBytes, backupCount, encoding, delay)
+
+
+class QueueHandler(logging.Handler):
+    """ passes records through a queue to a QueueListener thread, which hands them to other handlers,
+        so the code logging a message does not wait for the log I/O
+        - the handlers are given by name, and must be configured in the same logging.yml
+        - records with the same message template (the unformatted message) are rate limited:
+          only rateLimit of them are passed on in each ratePeriod seconds, the rest are counted
+          and replaced by one "N similar messages suppressed" record
+        - when the queue is full, records are dropped and counted in the same way
+
+        configure in logging.yml with:
+            handlers:
+              queue:
+                class: mi.logging.handler.QueueHandler
+                handlers: [console, file]
+                queueSize: 10000
+                rateLimit: 10
+                ratePeriod: 60
+            root:
+              handlers: [queue]
+
+        handlers are created in the order of their names, and closed in the reverse order at exit,
+        so give the queue handler a name after those of its handlers to have it drained before they close.
+    """
+    def __init__(self, handlers, queueSize=10000, rateLimit=10, ratePeriod=60.0):
+        logging.Handler.__init__(self)
+        self._handler_names = list(handlers)
+        self._queue = Queue.Queue(queueSize)
+        self._rate_limiter = MessageRateLimiter(rateLimit, ratePeriod)
+        self._dropped = None
+        self._listener = QueueListener(self._queue, self._get_handlers)
+        self._listener.start()
+
+    def _get_handlers(self):
+        """ find the handlers by name, once they have all been configured """
+        handlers = [logging._handlers.get(name) for name in self._handler_names]
+        missing = [name for name, handler in zip(self._handler_names, handlers) if handler is None]
+        if missing:
+            print >> sys.stderr, 'WARNING: QueueHandler is missing handlers %r' % missing
+        return [handler for handler in handlers if handler is not None]
+
+    def emit(self, record):
+        try:
+            allowed, summaries = self._rate_limiter.check(record)
+            for summary in summaries:
+                self._enqueue(summary)
+            if allowed:
+                self._enqueue(record)
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            self.handleError(record)
+
+    def _enqueue(self, record):
+        self.acquire()
+        try:
+            if self._dropped is not None:
+                dropped, first = self._dropped
+                summary = _summary_record(first, '%d messages dropped, log queue was full', (dropped,))
+                try:
+                    self._queue.put_nowait(summary)
+                except Queue.Full:
+                    self._dropped = (dropped + 1, first)
+                    return
+                self._dropped = None
+            try:
+                self._queue.put_nowait(self._prepare(record))
+            except Queue.Full:
+                self._dropped = (1, record)
+        finally:
+            self.release()
+
+    def _prepare(self, record):
+        """ format the message and exception now, as the arguments may change before the listener handles it.
+            the record is copied, as the other handlers of the logger are given the same record
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging._defaultFormatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def flush(self):
+        """ pass on any suppressed message counts and wait for the listener to handle the queued records """
+        for summary in self._rate_limiter.flush():
+            self._enqueue(summary)
+        if self._listener.is_alive():
+            self._queue.join()
+
+    def close(self):
+        self.flush()
+        self._listener.stop()
+        logging.Handler.close(self)
+
+
+class QueueListener(object):
+    """ thread taking records from a queue and passing them to handlers
+        - handlers is a list of handlers, or a function returning the list when the first record arrives
+    """
+    _sentinel = None
+
+    def __init__(self, queue, handlers):
+        self.queue = queue
+        self._handlers = handlers
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._monitor, name='QueueListener')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """ handle the records already queued, then end the thread """
+        if self.is_alive():
+            self.queue.put(self._sentinel)
+            self._thread.join()
+        self._thread = None
+
+    def _monitor(self):
+        handlers = None
+        while True:
+            record = self.queue.get()
+            try:
+                if record is self._sentinel:
+                    break
+                if handlers is None:
+                    handlers = self._handlers() if callable(self._handlers) else self._handlers
+                for handler in handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except:
+                print >> sys.stderr, 'ERROR: QueueListener failed to handle a record'
+            finally:
+                self.queue.task_done()
+
+
+class MessageRateLimiter(object):
+    """ count the records of each message template in periods of fixed length,
+        allowing only the first few of each in a period
+        - the template is the logger name, level and unformatted message.  messages formatted before
+          they were logged are grouped by their text up to the first digit, quote, bracket or colon
+        - the suppressed records of a template are summarized once its period has ended
+    """
+    def __init__(self, limit, period):
+        self.limit = limit
+        self.period = period
+        self._lock = threading.Lock()
+        # template -> [period start, records in period, first suppressed record]
+        self._templates = {}
+        self._next_sweep = time.time() + period
+
+    def check(self, record):
+        """ returns whether to pass the record on, and a list of summary records to pass on before it """
+        if self.limit <= 0:
+            return True, []
+        key = (record.name, record.levelno, _template(record))
+        with self._lock:
+            summaries = self._end_periods(record.created, key)
+            entry = self._templates.get(key)
+            if entry is None:
+                self._templates[key] = [record.created, 1, None]
+                return True, summaries
+            entry[1] += 1
+            if entry[1] <= self.limit:
+                return True, summaries
+            if entry[2] is None:
+                entry[2] = record
+            return False, summaries
+
+    def flush(self):
+        """ end every period, returning the summary records """
+        with self._lock:
+            return self._end_periods(time.time(), None, force=True)
+
+    def _end_periods(self, now, key, force=False):
+        """ end the period of the template if it is over, and every period which is over once each period """
+        if force or now >= self._next_sweep:
+            self._next_sweep = now + self.period
+            keys = [k for k, entry in self._templates.iteritems() if force or now - entry[0] >= self.period]
+        elif key in self._templates and now - self._templates[key][0] >= self.period:
+            keys = [key]
+        else:
+            return []
+
+        summaries = []
+        for k in keys:
+            start, count, first = self._templates.pop(k)
+            if first is not None:
+                summaries.append(_summary_record(first, '%d similar messages suppressed: %s',
+                                                 (count - self.limit, k[2])))
+        return summaries
+
+
+# text of a preformatted message up to its first digit, quote, bracket or colon
+TEMPLATE_PREFIX_MATCHER = re.compile(r'[^0-9:=\'"\[\(]{1,64}')
+
+def _template(record):
+    """ the message template of a record """
+    if record.args:
+        return record.msg
+    msg = record.msg if isinstance(record.msg, basestring) else str(record.msg)
+    match = TEMPLATE_PREFIX_MATCHER.match(msg)
+    return match.group() if match else msg
+
+
+def _summary_record(first, msg, args):
+    """ a record reporting on suppressed records, like the first of them """
+    summary = logging.makeLogRecord(first.__dict__)
+    summary.msg = msg
+    summary.args = args
+    summary.exc_info = None
+    summary.exc_text = None
+    summary.created = time.time()
+    return summary
@@ -57,8 +57,9 @@ EVOLUTION / CREATION:
 
 
 import logging
-import inspect
+import sys
 import threading
+import weakref
 
 # invent a new log level called "trace".  hope that people will use it.
 # lifted from http://stackoverflow.com/questions/2183233/how-to-add-a-custom-loglevel-to-pythons-logging-facility
@@ -72,6 +73,62 @@ def trace(self, message, *args, **kws):
 logging.Logger.trace = trace
 
 
+# cached level checks for hot paths
+#
+# a LevelGuard keeps whether each level is enabled for one logger as plain attributes,
+# so code logging on every record can skip a disabled message with one attribute lookup:
+#     from mi.logging import LevelGuard
+#     log_level = LevelGuard(__name__)
+#     ...
+#     if log_level.debug:
+#         log.debug('record: %r', record)
+#
+# the guards are refreshed whenever a logger level is set or logging is disabled,
+# which includes every change of the logging configuration.
+#
+LEVEL_NAMES = {
+    'trace': TRACE,
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warn': logging.WARNING,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL
+}
+
+class LevelGuard(object):
+    """ whether each level is enabled for a logger, cached as the attributes trace, debug, info, etc. """
+
+    _guards = weakref.WeakSet()
+
+    def __init__(self, name):
+        self.name = name
+        self.refresh()
+        LevelGuard._guards.add(self)
+
+    def refresh(self):
+        """ check the levels again, after the logging configuration changed """
+        logger = logging.getLogger(self.name)
+        for level_name, level in LEVEL_NAMES.iteritems():
+            setattr(self, level_name, bool(logger.isEnabledFor(level)))
+
+def refresh_level_guards():
+    for guard in list(LevelGuard._guards):
+        guard.refresh()
+
+_set_level = logging.Logger.setLevel
+def set_level(self, level):
+    _set_level(self, level)
+    refresh_level_guards()
+logging.Logger.setLevel = set_level
+
+_disable = logging.disable
+def disable(level):
+    _disable(level)
+    refresh_level_guards()
+logging.disable = disable
+
+
 ## next bit filched from 1.5.2's inspect.py
 #def currentframe():
 #    """Return the frame object for the caller's stack frame."""
@@ -114,17 +171,16 @@ class _ScopedLogger(object):
         name = "UNKNOWN_MODULE_NAME"
         module = None
 
-        stack = inspect.stack()
-        # stack[0]: call to inspect.stack() on the line above
-        # stack[1]: call to _install_logger() by one of the delegate methods below
-        frame=stack[2] # call to the delegate method from some outside calling module
-        if frame and frame[0]:
-            module = inspect.getmodule(frame[0])
-            if module:
-                name = module.__name__
-            elif frame[1]:
-                name = frame[1]
-            true_caller_tuple = (name, frame[2], frame[3])
+        # frame 0: this call to _install_logger()
+        # frame 1: call to _install_logger() by one of the delegate methods below
+        frame = sys._getframe(2) # call to the delegate method from some outside calling module
+        module_name = frame.f_globals.get('__name__')
+        module = sys.modules.get(module_name) if module_name else None
+        if module:
+            name = module.__name__
+        elif frame.f_code.co_filename:
+            name = frame.f_code.co_filename
+        true_caller_tuple = (name, frame.f_lineno, frame.f_code.co_name)
         logger = logging.getLogger(name)
 
         # fix bug -- first message logged was reporting line number from this file
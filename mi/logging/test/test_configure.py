@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+@package mi.logging.test.test_configure
+@file mi/logging/test/test_configure.py
+@brief Test code for the cache of parsed logging configuration
+"""
+
+import os
+import shutil
+import tempfile
+
+from mock import patch
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.logging import configure
+
+CONFIGURATION = """
+version: 1
+root:
+    level: INFO
+loggers:
+    mi.dataset:
+        level: DEBUG
+"""
+
+
+@attr('UNIT', group='mi')
+class ConfigureUnitTestCase(MiUnitTest):
+
+    def setUp(self):
+        MiUnitTest.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, 'cache', 'mi-logging')
+        patcher = patch.object(configure, 'CACHE_DIRECTORY', self.cache_directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def cached_files(self):
+        if not os.path.isdir(self.cache_directory):
+            return []
+        return os.listdir(self.cache_directory)
+
+    def test_cache(self):
+        parsed = configure._LoggingConfiguration().parse_configuration(CONFIGURATION)
+        self.assertEqual(len(self.cached_files()), 1)
+
+        cached = configure._LoggingConfiguration().parse_configuration(CONFIGURATION)
+        self.assertEqual(cached, parsed)
+        self.assertIs(type(cached['loggers'].keys()[0]), str)
+
+    def test_non_string_keys(self):
+        contents = CONFIGURATION + '    1: {level: DEBUG}\n'
+        parsed = configure._LoggingConfiguration().parse_configuration(contents)
+
+        self.assertIn(1, parsed['loggers'])
+        self.assertEqual(self.cached_files(), [])
+        self.assertEqual(configure._LoggingConfiguration().parse_configuration(contents), parsed)
+
+    def test_read_only_directory(self):
+        with patch('os.access', return_value=False) as access:
+            parsed = configure._LoggingConfiguration().parse_configuration(CONFIGURATION)
+
+        # the closest existing directory is the one checked
+        access.assert_called_once_with(self.directory, os.W_OK | os.X_OK)
+        self.assertEqual(parsed['root'], {'level': 'INFO'})
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'cache')))
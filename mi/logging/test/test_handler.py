@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+
+"""
+@package mi.logging.test.test_handler
+@file mi/logging/test/test_handler.py
+@brief Test code for the queue handler and the message rate limiter
+"""
+
+import logging
+import Queue
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.logging.handler import MessageRateLimiter, QueueHandler, QueueListener
+
+
+class CapturingHandler(logging.Handler):
+    """ keeps the records it handles """
+    def __init__(self, name=None):
+        logging.Handler.__init__(self)
+        self.records = []
+        if name is not None:
+            self.set_name(name)
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_record(msg, args=(), created=0.0, name='mi.test'):
+    record = logging.LogRecord(name, logging.INFO, __file__, 1, msg, args, None)
+    record.created = created
+    return record
+
+
+@attr('UNIT', group='mi')
+class HandlerUnitTestCase(MiUnitTest):
+
+    def test_rate_limit(self):
+        limiter = MessageRateLimiter(2, 60)
+
+        allowed = [limiter.check(make_record('value %d', (n,), created=n))[0] for n in range(5)]
+        self.assertEqual(allowed, [True, True, False, False, False])
+
+        # other templates are counted separately
+        self.assertTrue(limiter.check(make_record('other %d', (1,), created=5))[0])
+
+        # the suppressed records are summarized once the period is over
+        allowed, summaries = limiter.check(make_record('value %d', (6,), created=61))
+        self.assertTrue(allowed)
+        self.assertEqual([summary.getMessage() for summary in summaries],
+                         ['3 similar messages suppressed: value %d'])
+
+        limiter.check(make_record('other %d', (2,), created=62))
+        limiter.check(make_record('other %d', (3,), created=63))
+        self.assertEqual([summary.getMessage() for summary in limiter.flush()],
+                         ['1 similar messages suppressed: other %d'])
+        self.assertEqual(limiter.flush(), [])
+
+    def test_listener_stop(self):
+        queue = Queue.Queue()
+        handler = CapturingHandler()
+        listener = QueueListener(queue, [handler])
+        listener.start()
+
+        for n in range(10):
+            queue.put(make_record('value %d', (n,)))
+        listener.stop()
+
+        # the queued records are handled before the thread ends
+        self.assertFalse(listener.is_alive())
+        self.assertEqual([record.getMessage() for record in handler.records], ['value %d' % n for n in range(10)])
+
+    def test_queue_handler(self):
+        queued = CapturingHandler('test_handler_queued')
+        direct = CapturingHandler()
+        queue_handler = QueueHandler(['test_handler_queued'], rateLimit=0)
+
+        logger = logging.getLogger('mi.logging.test.test_handler')
+        logger.propagate = False
+        logger.addHandler(queue_handler)
+        logger.addHandler(direct)
+        try:
+            try:
+                raise ValueError('bad value')
+            except ValueError:
+                logger.error('failed on %s', 'x', exc_info=True)
+            queue_handler.flush()
+        finally:
+            logger.removeHandler(queue_handler)
+            logger.removeHandler(direct)
+            queue_handler.close()
+
+        # the queued record is formatted, and the record given to the other handlers is unchanged
+        self.assertEqual(queued.records[0].msg, 'failed on x')
+        self.assertIn('ValueError: bad value', queued.records[0].exc_text)
+        self.assertEqual(direct.records[0].args, ('x',))
+        self.assertIs(direct.records[0].exc_info[0], ValueError)
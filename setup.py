@@ -9,6 +9,7 @@ setup(
     packages=find_packages(),
     package_data={
         '': ['*.yml'],
+        'mi.dataset.driver': ['driver_manifest.json'],
     },
     install_requires=[
         "pyyaml",
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+Build the driver manifest read by mi.dataset.driver_registry, from the source
+of the drivers and parsers.  Run it whenever a driver is added or changed.
+
+    python utils/build_driver_manifest.py
+    python utils/build_driver_manifest.py --check
+"""
+
+import json
+import sys
+
+import click as click
+
+from mi.dataset.driver_registry import MANIFEST_PATH, build_manifest, write_manifest
+
+
+@click.command()
+@click.option('--out', type=click.Path(), default=MANIFEST_PATH)
+@click.option('--check', is_flag=True, help='Only check that the manifest is up to date')
+def main(out, check):
+    manifest = build_manifest()
+
+    if check:
+        with open(out) as manifest_file:
+            if json.load(manifest_file) != json.loads(json.dumps(manifest)):
+                print '%s is out of date' % out
+                sys.exit(1)
+        print '%s is up to date' % out
+        return
+
+    write_manifest(manifest, out)
+    print 'Wrote %d drivers to %s' % (len(manifest['drivers']), out)
+
+
+if __name__ == '__main__':
+    main()
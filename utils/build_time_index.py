@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+"""
+Build the sidecar time index of large raw data files, so parsers asked for the
+records from a start time (parse_file.py --start --use-index) begin near it.
+
+    python utils/build_time_index.py --format pd0 --stride 100 ADCP_CCE1T_20.000
+"""
+
+import click as click
+
+from mi.dataset.time_index import DEFAULT_STRIDE, ENTRY_FUNCTIONS, build_index, index_path
+
+
+@click.command()
+@click.option('--format', 'file_format', type=click.Choice(sorted(ENTRY_FUNCTIONS)), required=True)
+@click.option('--stride', type=click.IntRange(min=1), default=DEFAULT_STRIDE, help='Number of records per index entry')
+@click.argument('files', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+def main(file_format, stride, files):
+    for file_path in files:
+        index = build_index(file_path, file_format, stride)
+        print 'Wrote %d entries to %s' % (len(index), index_path(file_path))
+
+
+if __name__ == '__main__':
+    main()
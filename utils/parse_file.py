@@ -7,11 +7,12 @@ from functools import wraps
 
 import click as click
 import datetime
-import pandas as pd
-import xarray as xr
-import numpy as np
 
 from mi.core.log import get_logger, LoggerManager
+from mi.core.time import string_to_ntp_date_time
+from mi.dataset.dataset_parser import ParseOptions
+from mi.dataset.driver_registry import get_registry
+from mi.dataset.parse_cache import ParseCache, set_parse_cache, DEFAULT_MAX_BYTES
 
 try:
     import cPickle as pickle
@@ -19,7 +20,6 @@ except ImportError:
     import pickle
 
 
-lm = LoggerManager()
 log = get_logger()
 base_path = os.path.dirname(os.path.dirname(__file__))
 
@@ -78,9 +78,10 @@ class ParticleHandler(object):
     Particle handler which flattens all data particle "values" lists to key: value pairs in the parent dictionary
     Also contains a method to output the particle data as a dictionary of pandas dataframes
     """
-    def __init__(self, output_path=None, formatter=None):
+    def __init__(self, output_path=None, formatter=None, parse_options=None):
         self.samples = {}
         self.failure = False
+        self.parse_options = parse_options
         if output_path is None:
             output_path = os.getcwd()
         self.output_path = output_path
@@ -112,12 +113,14 @@ class ParticleHandler(object):
 
     @log_timing
     def to_dataframes(self):
+        import pandas as pd     # pandas and xarray are slow to import, so only for the formats using them
         data_frames = {}
         for particle_type in self.samples:
             data_frames[particle_type] = self.fix_arrays(pd.DataFrame(self.samples[particle_type]))
         return data_frames
 
     def to_datasets(self):
+        import pandas as pd
         datasets = {}
         for particle_type in self.samples:
             datasets[particle_type] = self.fix_arrays(pd.DataFrame(self.samples[particle_type]), return_as_xr=True)
@@ -126,6 +129,8 @@ class ParticleHandler(object):
     @staticmethod
     @log_timing
     def fix_arrays(data_frame, return_as_xr=False):
+        import numpy as np
+        import xarray as xr
         # round-trip the dataframe through xray to get the multidimensional indexing correct
         new_ds = xr.Dataset()
         for each in data_frame:
@@ -180,6 +185,10 @@ class ParticleHandler(object):
 
 
 def find_driver(driver_string):
+    entry = get_registry().resolve(driver_string)
+    if entry is not None:
+        return entry.load()
+
     try:
         return importlib.import_module(driver_string)
     except ImportError:
@@ -190,11 +199,14 @@ def find_driver(driver_string):
     raise Exception('Unable to locate driver: %r', driver_string)
 
 
-def run(driver, files, fmt, out):
+def run(driver, files, fmt, out, cache=None, cache_size=DEFAULT_MAX_BYTES, parse_options=None):
+    LoggerManager()
     monkey_patch_particles()
+    if cache is not None:
+        set_parse_cache(ParseCache(cache, cache_size))
     log.info('Importing driver: %s', driver)
     module = find_driver(driver)
-    particle_handler = ParticleHandler(output_path=out, formatter=fmt)
+    particle_handler = ParticleHandler(output_path=out, formatter=fmt, parse_options=parse_options)
     for file_path in files:
         log.info('Begin parsing: %s', file_path)
         with StopWatch('Parsing file: %s took' % file_path):
@@ -206,10 +218,23 @@ def run(driver, files, fmt, out):
 @click.command()
 @click.option('--fmt', type=click.Choice(['csv', 'json', 'pd-pickle', 'xr-pickle']), default='csv')
 @click.option('--out', type=click.Path(exists=False), default=None)
+@click.option('--cache', type=click.Path(file_okay=False), default=None,
+              help='Directory to cache the particles parsed from each file in')
+@click.option('--cache-size', type=int, default=DEFAULT_MAX_BYTES, help='Size limit of the cache in bytes')
+@click.option('--start', default=None, help='Earliest particle time wanted, ISO8601 such as 2014-01-05T00:00:00Z')
+@click.option('--end', default=None, help='Latest particle time wanted, ISO8601')
+@click.option('--stream', multiple=True, help='Particle stream wanted, all streams if not given')
+@click.option('--use-index', is_flag=True, help='Seek to the start time with the time index of each file')
 @click.argument('driver', nargs=1)
 @click.argument('files', nargs=-1, type=click.Path(exists=True))
-def main(driver, files, fmt, out):
-    run(driver, files, fmt, out)
+def main(driver, files, fmt, out, cache, cache_size, start, end, stream, use_index):
+    parse_options = None
+    if start or end or stream:
+        parse_options = ParseOptions(start_time=string_to_ntp_date_time(str(start)) if start else None,
+                                     end_time=string_to_ntp_date_time(str(end)) if end else None,
+                                     streams=stream or None,
+                                     use_time_index=use_index)
+    run(driver, files, fmt, out, cache, cache_size, parse_options)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Measure the startup cost of the ingest code: the time a new interpreter takes
+to run each statement, less the time it takes to start and do nothing.  Each
+statement is run several times and the best time is reported.
+
+    python utils/startup_benchmark.py
+    python utils/startup_benchmark.py --runs 10 'import mi.dataset.dataset_driver'
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import click as click
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_STATEMENTS = [
+    'import mi.core.log',
+    'import mi.core.log; mi.core.log.LoggerManager()',
+    'from mi.core.log import get_logger; get_logger().info("started")',
+    'import mi.dataset.driver.nutnr_b.dcl_full.nutnr_b_dcl_full_recovered_driver',
+    'import utils.parse_file',
+]
+
+
+def best_time(statement, runs):
+    """
+    Run a statement in new interpreters
+    :param statement: python statement to run
+    :param runs: number of times to run it
+    :return: the shortest wall clock time in seconds
+    """
+    best = None
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(runs):
+            start = time.time()
+            subprocess.check_call([sys.executable, '-c', statement], cwd=base_path, stdout=devnull, stderr=devnull)
+            elapsed = time.time() - start
+            if best is None or elapsed < best:
+                best = elapsed
+    return best
+
+
+@click.command()
+@click.option('--runs', type=int, default=5)
+@click.argument('statements', nargs=-1)
+def main(statements, runs):
+    statements = statements or DEFAULT_STATEMENTS
+    baseline = best_time('pass', runs)
+    print '%8.3fs  %s' % (baseline, 'interpreter startup')
+    for statement in statements:
+        print '%8.3fs  %s' % (best_time(statement, runs) - baseline, statement)
+
+
+if __name__ == '__main__':
+    main()